@@ -623,8 +623,10 @@ class TokenProtector:
         errors = []
         restored = translated
 
-        # Check all tokens are present and restore
-        for placeholder, original in token_map.items():
+        # Check all tokens are present and restore. Reverse insertion order:
+        # the TAG pass may wrap placeholders created by earlier categories
+        # (<NEWLINE> -> <NEWLINE_2> -> <NEWLINE2>), so unwind newest first.
+        for placeholder, original in reversed(list(token_map.items())):
             if placeholder not in restored:
                 errors.append(f"Missing token: {placeholder} (original: {original})")
             else:
@@ -718,6 +720,218 @@ class TextNormalizer:
         return stripped
 
 
+# =============================================================================
+# DEDUP / FAN-OUT STAGE
+# =============================================================================
+
+class DedupFanout:
+    """
+    Global dedup stage in front of translation.
+
+    Occurrences (from any segment or ROM) are grouped by their token-protected
+    form with all placeholders stripped plus the slot layout (where each
+    placeholder sits in the stripped text). Interior whitespace and newlines
+    are part of the key; leading/trailing whitespace is kept per occurrence
+    and put back on fan-out. One string per group is sent; the translation is
+    fanned back out to every occurrence with that occurrence's own control
+    codes substituted slot by slot.
+
+    Usage:
+        dedup = DedupFanout()
+        for crc, texts in roms.items():
+            for t in texts:
+                dedup.add(t, source=crc)
+        results = dedup.run(translate_batch, batch_size=32)
+        print(dedup.stats(batch_size=32)['calls_saved'])
+    """
+
+    PLACEHOLDER_RE = re.compile(r'<[A-Z_0-9]+(?:_\d+)?>')
+
+    def __init__(self, protector: TokenProtector = None, normalizer: TextNormalizer = None,
+                 send_protected: bool = True):
+        """
+        Args:
+            protector: TokenProtector (default: new instance)
+            normalizer: TextNormalizer (default: new instance)
+            send_protected: unique_texts() returns placeholder form; if False,
+                the representative's original text is sent and translations
+                are re-protected before fan-out
+        """
+        self.protector = protector or TokenProtector()
+        self.normalizer = normalizer or TextNormalizer()
+        self.send_protected = send_protected
+        self._groups: Dict[Tuple[str, Tuple[int, ...]], int] = {}
+        self._group_reps: List[int] = []
+        self._occurrences: List[Dict[str, Any]] = []
+        self.errors: Dict[int, List[str]] = {}
+        self.calls_made = 0
+
+    def _slots(self, protected: str) -> List[str]:
+        return [m.group(0) for m in self.PLACEHOLDER_RE.finditer(protected)]
+
+    @staticmethod
+    def _split_edges(protected: str) -> Tuple[str, str, str]:
+        """(leading whitespace, body, trailing whitespace)."""
+        body = protected.strip()
+        if not body:
+            return protected, "", ""
+        lead = protected[:len(protected) - len(protected.lstrip())]
+        trail = protected[len(protected.rstrip()):]
+        return lead, body, trail
+
+    def dedup_key(self, protected: str) -> Tuple[str, Tuple[int, ...]]:
+        """
+        Group key: placeholder-free body + position of each slot in it.
+
+        Only the outer whitespace is ignored (restored per occurrence by
+        fan_out_one); interior spacing and line breaks must match verbatim.
+        """
+        _, body, _ = self._split_edges(protected)
+
+        def strip(text: str) -> str:
+            return self.PLACEHOLDER_RE.sub('', text)
+
+        layout = tuple(len(strip(body[:m.start()]))
+                       for m in self.PLACEHOLDER_RE.finditer(body))
+        return strip(body), layout
+
+    def add(self, text: str, source: Optional[str] = None, ref: Any = None) -> int:
+        """
+        Register one occurrence.
+
+        Args:
+            text: Source text with control codes
+            source: Origin label (e.g. ROM CRC32) for cross-ROM stats
+            ref: Caller reference kept with the occurrence
+
+        Returns:
+            Group index (position in unique_texts())
+        """
+        protected, token_map, _ = self.protector.protect_tokens(text or "")
+        key = self.dedup_key(protected)
+        lead, _, trail = self._split_edges(protected)
+        occ_id = len(self._occurrences)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = len(self._group_reps)
+            self._group_reps.append(occ_id)
+        self._occurrences.append({
+            'text': text or "",
+            'protected': protected,
+            'token_map': token_map,
+            'slots': self._slots(protected),
+            'lead': lead,
+            'trail': trail,
+            'group': group,
+            'source': source,
+            'ref': ref,
+        })
+        return group
+
+    def add_many(self, texts: List[str], source: Optional[str] = None) -> List[int]:
+        """add() for each text; returns the group index of each."""
+        return [self.add(t, source=source) for t in texts]
+
+    def unique_texts(self) -> List[str]:
+        """One text per group, in first-seen order."""
+        key = 'protected' if self.send_protected else 'text'
+        return [self._occurrences[occ][key] for occ in self._group_reps]
+
+    def text_of(self, occ_id: int) -> str:
+        """Original text of an occurrence."""
+        return self._occurrences[occ_id]['text']
+
+    def references(self) -> List[Any]:
+        """Caller references, one per occurrence."""
+        return [occ['ref'] for occ in self._occurrences]
+
+    def _to_rep_placeholders(self, translation: str, rep: Dict[str, Any]) -> str:
+        """Re-protect a raw translation and rename its placeholders to the representative's."""
+        protected, token_map, _ = self.protector.protect_tokens(translation)
+        free: Dict[str, List[str]] = {}
+        for ph in rep['slots']:
+            free.setdefault(rep['token_map'].get(ph, ph), []).append(ph)
+
+        def rename(match):
+            original = token_map.get(match.group(0))
+            pool = free.get(original)
+            return pool.pop(0) if pool else (original or match.group(0))
+
+        return self.PLACEHOLDER_RE.sub(rename, protected)
+
+    def fan_out_one(self, occ_id: int, translation: Optional[str]) -> str:
+        """Translation of the occurrence's group, with its own control codes restored."""
+        occ = self._occurrences[occ_id]
+        if not translation:
+            return occ['text']
+        rep = self._occurrences[self._group_reps[occ['group']]]
+        if not self.send_protected:
+            translation = self._to_rep_placeholders(translation, rep)
+        slot_of = {ph: occ['slots'][i] for i, ph in enumerate(rep['slots']) if i < len(occ['slots'])}
+        remapped = self.PLACEHOLDER_RE.sub(lambda m: slot_of.get(m.group(0), m.group(0)), translation)
+        if remapped.strip():
+            remapped = occ['lead'] + remapped.strip() + occ['trail']
+        restored, errors = self.protector.unprotect_tokens(remapped, occ['token_map'])
+        if errors:
+            self.errors[occ_id] = errors
+        return restored
+
+    def fan_out(self, translations: List[Optional[str]]) -> List[str]:
+        """
+        Expand per-group translations to every occurrence (in add() order).
+        Missing/empty translations keep the original text.
+        """
+        self.errors = {}
+        return [
+            self.fan_out_one(i, translations[occ['group']] if occ['group'] < len(translations) else None)
+            for i, occ in enumerate(self._occurrences)
+        ]
+
+    def run(self, translate_fn: Callable[[List[str]], List[Optional[str]]],
+            batch_size: int = 1) -> List[str]:
+        """
+        Translate each group once and fan out.
+
+        Args:
+            translate_fn: Batch of texts -> translations (same length)
+            batch_size: Texts per translate_fn call
+
+        Returns:
+            Restored translation per occurrence
+        """
+        batch_size = max(1, int(batch_size))
+        unique = self.unique_texts()
+        translations: List[Optional[str]] = []
+        for start in range(0, len(unique), batch_size):
+            batch = unique[start:start + batch_size]
+            out = list(translate_fn(batch) or [])
+            self.calls_made += 1
+            translations.extend(out[:len(batch)] + [None] * (len(batch) - len(out)))
+        return self.fan_out(translations)
+
+    def stats(self, batch_size: int = 1) -> Dict[str, int]:
+        """Dedup counters; calls_* assume `batch_size` texts per request."""
+        batch_size = max(1, int(batch_size))
+        occurrences = len(self._occurrences)
+        unique = len(self._group_reps)
+        cross_source = sum(
+            1 for occ in self._occurrences
+            if occ['source'] != self._occurrences[self._group_reps[occ['group']]]['source']
+        )
+        calls_without = math.ceil(occurrences / batch_size)
+        calls_with = math.ceil(unique / batch_size)
+        return {
+            'occurrences': occurrences,
+            'unique': unique,
+            'strings_saved': occurrences - unique,
+            'cross_source_duplicates': cross_source,
+            'calls_without_dedup': calls_without,
+            'calls_with_dedup': calls_with,
+            'calls_saved': calls_without - calls_with,
+            'fanout_errors': len(self.errors),
+        }
+
+
 # =============================================================================
 # TRANSLATION UNIT BUILDER
 # =============================================================================
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+ADAPTIVE BATCHER - Lotes de tradução dimensionados por tokens e latência
+================================================================================
+Substitui contagens fixas (200 textos por lote Gemini, --batch-size 8...):
+- Empacota strings por tokens estimados até o orçamento do modelo
+  (janela de contexto e limite de saída, com margem para o prompt)
+- Mede latência e falhas de parse de cada lote enviado
+- Ajusta o número de itens por lote online (hill-climbing em strings/s):
+  cresce enquanto a vazão melhora e as falhas ficam abaixo da tolerância;
+  encolhe pela metade quando a resposta não pode ser mapeada, fixando um
+  teto que é relaxado aos poucos após sequências de sucesso
+================================================================================
+"""
+
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Janela de contexto (tokens) por prefixo de modelo. Modelos Ollama usam o
+# num_ctx padrão do servidor, não a janela nominal do modelo.
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "gemini-2.0": 1_048_576,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gpt-4o": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5": 16_385,
+    "deepl": 32_000,
+}
+# Limite de tokens de saída por prefixo de modelo
+MODEL_OUTPUT_TOKENS: Dict[str, int] = {
+    "gemini": 8_192,
+    "gpt-4o": 16_384,
+    "gpt-4": 4_096,
+    "gpt-3.5": 4_096,
+}
+DEFAULT_CONTEXT_TOKENS = 4_096  # num_ctx típico do Ollama
+DEFAULT_OUTPUT_TOKENS = 2_048
+
+PROMPT_OVERHEAD_TOKENS = 400    # Instruções de sistema + cabeçalho do lote
+ITEM_OVERHEAD_TOKENS = 4        # "[N] " / "id|||" + quebra de linha
+OUTPUT_EXPANSION = 1.3          # PT-BR costuma sair ~30% maior que EN
+SAFETY_MARGIN = 0.8
+
+
+def _lookup_prefix(table: Dict[str, int], model: str, default: int) -> int:
+    model = str(model or "").lower()
+    best = ""
+    for prefix in table:
+        if model.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    return table[best] if best else default
+
+
+def context_window_for(model: str) -> int:
+    """Janela de contexto estimada do modelo (tokens)."""
+    return _lookup_prefix(MODEL_CONTEXT_TOKENS, model, DEFAULT_CONTEXT_TOKENS)
+
+
+def output_limit_for(model: str) -> int:
+    """Limite de tokens de saída estimado do modelo."""
+    return _lookup_prefix(MODEL_OUTPUT_TOKENS, model, DEFAULT_OUTPUT_TOKENS)
+
+
+def estimate_text_tokens(text: Any) -> int:
+    """
+    Estimativa de tokens: ~4 caracteres ASCII por token; caracteres fora do
+    ASCII (kana, kanji, acentos raros) contam como um token cada.
+    """
+    text = str(text or "")
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def token_budget_for(model: str, prompt_overhead: int = PROMPT_OVERHEAD_TOKENS) -> int:
+    """
+    Tokens de entrada (itens + overhead por item) que cabem num lote: a
+    entrada e a saída (entrada * OUTPUT_EXPANSION) dividem a janela de
+    contexto, e a saída não pode passar do limite de geração.
+    """
+    context = max(0, context_window_for(model) - prompt_overhead)
+    by_context = context / (1.0 + OUTPUT_EXPANSION)
+    by_output = output_limit_for(model) / OUTPUT_EXPANSION
+    return max(1, int(min(by_context, by_output) * SAFETY_MARGIN))
+
+
+class AdaptiveBatcher:
+    """
+    Gera lotes por orçamento de tokens e ajusta o tamanho pela telemetria.
+
+    Uso:
+        batcher = AdaptiveBatcher(model="gemini-2.0-flash")
+        for batch in batcher.iter_batches(textos):
+            t0 = time.monotonic()
+            saida, parsed = traduz(batch)
+            batcher.record(len(batch), time.monotonic() - t0, ok=parsed)
+
+    iter_batches() lê o tamanho atual a cada lote, então o ajuste feito por
+    record() vale já para o próximo lote. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        model: str = "",
+        token_budget: Optional[int] = None,
+        initial_size: int = 16,
+        min_size: int = 1,
+        max_size: int = 256,
+        max_failure_rate: float = 0.1,
+        growth: float = 1.25,
+        shrink: float = 0.5,
+        probe_batches: int = 2,
+        relax_after: int = 20,
+        ewma_alpha: float = 0.3,
+        token_estimator: Callable[[Any], int] = estimate_text_tokens,
+    ):
+        """
+        Args:
+            model: Nome do modelo (define janela/limite de saída)
+            token_budget: Orçamento de tokens por lote (default: derivado do modelo)
+            initial_size: Itens por lote no início
+            min_size / max_size: Limites do tamanho do lote
+            max_failure_rate: Taxa (EWMA) de falhas de parse tolerada para crescer
+            growth / shrink: Fatores de crescimento e de redução
+            probe_batches: Lotes completos medidos antes de decidir crescer
+            relax_after: Sucessos seguidos para relaxar o teto após uma falha
+            ewma_alpha: Peso da medição mais recente nas médias móveis
+            token_estimator: Estimador de tokens de um item
+        """
+        self.model = model
+        self.token_budget = int(token_budget or token_budget_for(model))
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size))
+        self.max_failure_rate = float(max_failure_rate)
+        self.growth = float(growth)
+        self.shrink = float(shrink)
+        self.probe_batches = max(1, int(probe_batches))
+        self.relax_after = max(1, int(relax_after))
+        self.alpha = float(ewma_alpha)
+        self.token_estimator = token_estimator
+
+        self._size = min(self.max_size, max(self.min_size, int(initial_size)))
+        self._ceiling = self.max_size
+        self._rate: Optional[float] = None        # strings/s no tamanho atual
+        self._samples = 0                         # lotes completos no tamanho atual
+        self._prev_size: Optional[int] = None
+        self._prev_rate: Optional[float] = None
+        self._failure_rate = 0.0
+        self._streak = 0
+        self._token_limited = False
+        self._lock = threading.Lock()
+        self.stats_counters = {"batches": 0, "items": 0, "failures": 0, "seconds": 0.0}
+
+    @property
+    def size(self) -> int:
+        """Itens por lote atualmente."""
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Empacotamento
+    # ------------------------------------------------------------------
+    def iter_batches(self, items: Iterable[Any], key: Optional[Callable[[Any], Any]] = None) -> Iterator[List[Any]]:
+        """
+        Agrupa `items` em lotes de até `size` itens e `token_budget` tokens.
+        Um item sozinho acima do orçamento vira um lote próprio.
+
+        Args:
+            items: Itens na ordem de envio
+            key: Extrai o texto do item (ex.: lambda t: t['texto'])
+        """
+        batch: List[Any] = []
+        tokens = 0
+        for item in items:
+            cost = self.token_estimator(key(item) if key else item) + ITEM_OVERHEAD_TOKENS
+            if batch and (len(batch) >= self._size or tokens + cost > self.token_budget):
+                self._token_limited = len(batch) < self._size
+                yield batch
+                batch, tokens = [], 0
+            batch.append(item)
+            tokens += cost
+        if batch:
+            yield batch
+
+    def create_batches(self, items: Iterable[Any], key: Optional[Callable[[Any], Any]] = None) -> List[List[Any]]:
+        """Todos os lotes de uma vez, com o tamanho atual."""
+        return list(self.iter_batches(items, key))
+
+    # ------------------------------------------------------------------
+    # Telemetria
+    # ------------------------------------------------------------------
+    def record(self, n_items: int, latency: float, ok: bool = True):
+        """
+        Registra o resultado de um lote enviado.
+
+        Args:
+            n_items: Itens no lote
+            latency: Duração da chamada (s)
+            ok: False se a resposta não pôde ser mapeada (falha de parse)
+        """
+        if n_items <= 0:
+            return
+        with self._lock:
+            counters = self.stats_counters
+            counters["batches"] += 1
+            counters["items"] += n_items
+            counters["seconds"] += max(0.0, latency)
+            self._failure_rate += self.alpha * ((0.0 if ok else 1.0) - self._failure_rate)
+
+            if not ok:
+                counters["failures"] += 1
+                self._ceiling = max(self.min_size, min(self._ceiling, n_items - 1))
+                self._set_size(min(self._size, int(n_items * self.shrink)))
+                self._prev_size = self._prev_rate = None
+                self._streak = 0
+                return
+
+            self._streak += 1
+            if self._streak >= self.relax_after and self._ceiling < self.max_size:
+                self._ceiling = min(self.max_size, self._ceiling + max(1, self._ceiling // 10))
+                self._streak = 0
+
+            # Lotes parciais (cauda, orçamento de tokens) não medem o tamanho atual
+            if n_items < self._size:
+                return
+            rate = n_items / max(latency, 1e-6)
+            self._rate = rate if self._rate is None else self._rate + self.alpha * (rate - self._rate)
+            self._samples += 1
+            if self._samples < self.probe_batches:
+                return
+
+            if self._prev_rate is not None and self._rate < self._prev_rate and self._prev_size < self._size:
+                # Crescer piorou a vazão: volta e trava o teto aqui
+                self._ceiling = max(self.min_size, self._size - 1)
+                self._set_size(self._prev_size)
+                self._prev_size = self._prev_rate = None
+                return
+
+            if (self._failure_rate <= self.max_failure_rate
+                    and self._size < self._ceiling
+                    and not self._token_limited):
+                self._prev_size, self._prev_rate = self._size, self._rate
+                self._set_size(min(self._ceiling, max(self._size + 1, int(self._size * self.growth))))
+
+    def _set_size(self, size: int):
+        size = min(self.max_size, max(self.min_size, int(size)))
+        if size != self._size:
+            self._size = size
+            self._rate = None
+            self._samples = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Resumo da telemetria."""
+        with self._lock:
+            counters = dict(self.stats_counters)
+            seconds = counters["seconds"]
+            return {
+                **counters,
+                "size": self._size,
+                "ceiling": self._ceiling,
+                "token_budget": self.token_budget,
+                "failure_rate": round(self._failure_rate, 4),
+                "strings_per_s": round(counters["items"] / seconds, 3) if seconds > 0 else 0.0,
+            }
+
+
+_shared_batchers: Dict[str, AdaptiveBatcher] = {}
+_shared_lock = threading.Lock()
+
+
+def get_batcher(model: str, **kwargs) -> AdaptiveBatcher:
+    """Batcher compartilhado por modelo (a telemetria persiste entre chamadas)."""
+    with _shared_lock:
+        batcher = _shared_batchers.get(model)
+        if batcher is None:
+            batcher = _shared_batchers[model] = AdaptiveBatcher(model=model, **kwargs)
+        return batcher
@@ -3,26 +3,38 @@ Sistema de Fila Inteligente para Tradução em Lotes
 ===================================================
 
 Recursos:
-- Fila de prioridades com agendamento inteligente
-- Processamento em background com pausas automáticas
-- Salvamento de progresso incremental
+- Fila de prioridades com envelhecimento (LOW antigo não passa fome)
+- Vários workers em background, cada um com seu heap e roubo de trabalho
+- Journal append-only do progresso (replay após crash) + snapshot compacto
 - Resumo de traduções interrompidas
-- Estatísticas em tempo real
+- Estatísticas em tempo real (profundidade da fila, vazão)
 """
 
+import heapq
+import itertools
 import json
+import os
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
-from queue import PriorityQueue
-from threading import Thread, Event, Lock
-from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Callable, Tuple
+from threading import Thread, Event, Lock, RLock, Condition
+from dataclasses import dataclass, field
 from enum import IntEnum
 import logging
+import sys
+
+try:
+    from .adaptive_batcher import AdaptiveBatcher
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from adaptive_batcher import AdaptiveBatcher
 
 logger = logging.getLogger(__name__)
 
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
 
 class Priority(IntEnum):
     """Prioridades de tradução"""
@@ -46,42 +58,206 @@ class TranslationBatch:
     attempts: int = field(default=0, compare=False)
 
 
+class WorkStealingQueue:
+    """
+    Fila de prioridade com um heap por worker e roubo de trabalho.
+
+    Chave de ordenação (estática, sem reordenar o heap):
+        priority * aging_seconds + instante_de_entrada
+    Ou seja, cada `aging_seconds` de espera vale um nível de prioridade.
+
+    Cada worker consome do próprio heap; rouba de outro quando o seu está
+    vazio ou quando o topo alheio é melhor por pelo menos um nível.
+    """
+
+    def __init__(self, shards: int = 1, aging_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            shards: Número de heaps (um por worker)
+            aging_seconds: Espera que vale um nível de prioridade (0 = sem envelhecimento)
+            clock: Relógio monotônico
+        """
+        self.shards = max(1, int(shards))
+        self.aging_seconds = max(0.0, float(aging_seconds))
+        self.clock = clock
+        self._level = self.aging_seconds or 1.0
+        self._heaps: List[List[Tuple[float, int, TranslationBatch]]] = [[] for _ in range(self.shards)]
+        self._locks = [Lock() for _ in range(self.shards)]
+        self._cond = Condition()
+        self._size = 0
+        self._seq = itertools.count()
+        self._next_shard = itertools.count()
+        self.steals = 0
+
+    def _score(self, batch: TranslationBatch) -> float:
+        if not self.aging_seconds:
+            return float(batch.priority)
+        return float(batch.priority) * self.aging_seconds + self.clock()
+
+    def put(self, batch: TranslationBatch, shard: Optional[int] = None):
+        """Enfileira (round-robin entre os heaps se shard=None)"""
+        if shard is None:
+            shard = next(self._next_shard)
+        shard %= self.shards
+        with self._locks[shard]:
+            heapq.heappush(self._heaps[shard], (self._score(batch), next(self._seq), batch))
+        with self._cond:
+            self._size += 1
+            self._cond.notify()
+
+    def _peek(self, shard: int, lowest: bool):
+        with self._locks[shard]:
+            heap = self._heaps[shard]
+            if not heap:
+                return None
+            return max(heap) if lowest else heap[0]
+
+    def _better(self, entry, other, lowest: bool, margin: float = 0.0) -> bool:
+        if other is None:
+            return True
+        if lowest:
+            return entry[0] >= other[0] + margin if margin else entry[:2] > other[:2]
+        return entry[0] <= other[0] - margin if margin else entry[:2] < other[:2]
+
+    def take(self, shard: int = 0, lowest: bool = False) -> Optional[TranslationBatch]:
+        """
+        Retira um batch sem bloquear; None se a fila está vazia.
+
+        Args:
+            shard: Heap do worker que está pedindo
+            lowest: Pega o de menor prioridade efetiva (workers de backend local)
+        """
+        shard %= self.shards
+        while True:
+            own = self._peek(shard, lowest)
+            victim, best = shard, own
+            other_best = None
+            other_shard = None
+            for i in range(self.shards):
+                if i == shard:
+                    continue
+                entry = self._peek(i, lowest)
+                if entry is not None and self._better(entry, other_best, lowest):
+                    other_shard, other_best = i, entry
+            if other_best is not None and (own is None or self._better(other_best, own, lowest, self._level)):
+                victim, best = other_shard, other_best
+            if best is None:
+                return None
+
+            with self._locks[victim]:
+                heap = self._heaps[victim]
+                if not lowest and heap and heap[0] is best:
+                    heapq.heappop(heap)
+                elif lowest:
+                    idx = next((k for k, e in enumerate(heap) if e is best), None)
+                    if idx is None:
+                        continue
+                    heap[idx] = heap[-1]
+                    heap.pop()
+                    heapq.heapify(heap)
+                else:
+                    continue  # Outro worker levou o topo: tenta de novo
+            with self._cond:
+                self._size -= 1
+                if victim != shard:
+                    self.steals += 1
+            return best[2]
+
+    def wait(self, timeout: float) -> bool:
+        """Espera até haver algo na fila (ou timeout); True se há itens"""
+        with self._cond:
+            if self._size == 0:
+                self._cond.wait(timeout)
+            return self._size > 0
+
+    def wake_all(self):
+        """Acorda workers bloqueados em wait()"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def shard_sizes(self) -> List[int]:
+        return [len(h) for h in self._heaps]
+
+    def depth_by_priority(self) -> Dict[str, int]:
+        depth = {p.name: 0 for p in Priority}
+        for i in range(self.shards):
+            with self._locks[i]:
+                for _, _, batch in self._heaps[i]:
+                    depth[Priority(batch.priority).name] += 1
+        return depth
+
+
 class BatchQueueManager:
     """Gerenciador de fila de traduções com priorização"""
 
     def __init__(self,
                  progress_file: str = "translation_queue.json",
-                 auto_save_interval: int = 10):
+                 auto_save_interval: int = 10,
+                 batcher: Optional[AdaptiveBatcher] = None,
+                 num_workers: int = 4,
+                 aging_seconds: float = 60.0,
+                 compact_every: int = 1000):
         """
         Inicializa gerenciador de fila
 
         Args:
-            progress_file: Arquivo para salvar progresso
-            auto_save_interval: Intervalo de auto-save (em batches processados)
+            progress_file: Snapshot do progresso (o journal fica ao lado, .journal.jsonl)
+            auto_save_interval: fsync do journal a cada N registros
+            batcher: Batcher adaptativo usado por add_batches_auto(batch_size=None);
+                recebe a latência/resultado de cada batch processado
+            num_workers: Threads de tradução em start_processing()
+            aging_seconds: Espera que vale um nível de prioridade (0 = sem envelhecimento)
+            compact_every: Registros no journal antes de reescrever o snapshot
         """
         self.progress_file = Path(progress_file)
-        self.auto_save_interval = auto_save_interval
+        self.journal_file = self.progress_file.with_suffix('.journal.jsonl')
+        self.auto_save_interval = max(1, int(auto_save_interval))
+        self.compact_every = max(1, int(compact_every))
+        self.batcher = batcher
+        self.num_workers = max(1, int(num_workers))
 
-        # Fila de prioridades
-        self.queue = PriorityQueue()
-        self.lock = Lock()
+        # Fila de prioridades (um heap por worker)
+        self.queue = WorkStealingQueue(self.num_workers, aging_seconds)
+        self.lock = RLock()
 
         # Estado
         self.batches_processed = 0
         self.batches_failed = 0
         self.batches_pending = 0
         self.total_batches = 0
+        self.cleared_completed = 0
         self.current_batch: Optional[TranslationBatch] = None
+        self.in_flight: Dict[int, Any] = {}
 
         # Histórico completo (para salvar/carregar)
         self.all_batches: Dict[int, TranslationBatch] = {}
 
+        # Journal
+        self._journal_lock = Lock()
+        self._journal_fh = None
+        self._journal_seq = 0
+        self._journal_records = 0
+        self._journal_unsynced = 0
+
+        # Métricas de vazão: (instante, textos) de cada batch concluído
+        self._completions: deque = deque()
+
         # Controle de execução
         self.is_running = False
         self.is_paused = False
         self.stop_event = Event()
         self.pause_event = Event()
         self.worker_thread: Optional[Thread] = None
+        self.worker_threads: List[Thread] = []
+        self._active_workers = 0
+        self._idle_poll = 0.05
 
         # Callbacks
         self.on_batch_complete: Optional[Callable] = None
@@ -89,7 +265,7 @@ class BatchQueueManager:
         self.on_queue_complete: Optional[Callable] = None
         self.on_quota_exceeded: Optional[Callable] = None
 
-        # Carregar progresso anterior
+        # Carregar progresso anterior (snapshot + replay do journal)
         self._load_progress()
 
         logger.info(f"✅ BatchQueueManager inicializado - {self.batches_pending} batches pendentes")
@@ -121,9 +297,10 @@ class BatchQueueManager:
                 status='pending'
             )
 
-            self.queue.put(batch)
             self.all_batches[batch_id] = batch
             self.batches_pending += 1
+            self._journal('add', batch=self._batch_to_dict(batch))
+            self.queue.put(batch)
 
             logger.info(f"📦 Batch #{batch_id} adicionado à fila (prioridade: {priority.name}, {len(texts)} textos)")
 
@@ -131,7 +308,7 @@ class BatchQueueManager:
 
     def add_batches_auto(self,
                          all_texts: List[str],
-                         batch_size: int = 200,
+                         batch_size: Optional[int] = 200,
                          priority: Priority = Priority.NORMAL,
                          detect_priority: bool = False) -> List[int]:
         """
@@ -139,7 +316,8 @@ class BatchQueueManager:
 
         Args:
             all_texts: Todos os textos para traduzir
-            batch_size: Tamanho de cada batch
+            batch_size: Tamanho de cada batch (None = empacota por tokens com
+                o batcher adaptativo, no tamanho que ele aprendeu até agora)
             priority: Prioridade padrão
             detect_priority: Se deve tentar detectar prioridade automaticamente
 
@@ -149,9 +327,15 @@ class BatchQueueManager:
         batch_ids = []
 
         # Divide em chunks
-        for i in range(0, len(all_texts), batch_size):
-            chunk = all_texts[i:i+batch_size]
+        if batch_size is None:
+            if self.batcher is None:
+                self.batcher = AdaptiveBatcher()
+            chunks = self.batcher.create_batches(all_texts)
+        else:
+            chunks = [all_texts[i:i+batch_size] for i in range(0, len(all_texts), batch_size)]
 
+        start = 0
+        for chunk_index, chunk in enumerate(chunks):
             # Detecta prioridade se solicitado
             chunk_priority = priority
             if detect_priority:
@@ -161,12 +345,13 @@ class BatchQueueManager:
                 texts=chunk,
                 priority=chunk_priority,
                 metadata={
-                    'batch_index': i // batch_size,
-                    'total_batches': (len(all_texts) + batch_size - 1) // batch_size,
-                    'text_range': f"{i}-{i+len(chunk)}"
+                    'batch_index': chunk_index,
+                    'total_batches': len(chunks),
+                    'text_range': f"{start}-{start+len(chunk)}"
                 }
             )
             batch_ids.append(batch_id)
+            start += len(chunk)
 
         logger.info(f"📊 {len(batch_ids)} batches criados automaticamente de {len(all_texts)} textos")
 
@@ -193,9 +378,66 @@ class BatchQueueManager:
 
         return Priority.NORMAL
 
+
+    def _begin_run(self, workers: int) -> bool:
+        if self.is_running:
+            logger.warning("⚠️ Processamento já está rodando")
+            return False
+
+        self.is_running = True
+        self.is_paused = False
+        self.stop_event.clear()
+        self.pause_event.clear()
+        self._active_workers = workers
+        return True
+
+    def _next_batch(self, worker_id: Any, shard: int, lowest: bool = False) -> Tuple[Optional[TranslationBatch], bool]:
+        """
+        Retira um batch e o marca em andamento (atômico com o teste de fim).
+
+        Returns:
+            (batch ou None, fim) — fim=True quando a fila está vazia e nenhum
+            worker tem batch em mãos (nada mais pode voltar para a fila)
+        """
+        with self.lock:
+            batch = self.queue.take(shard, lowest=lowest)
+            if batch is None:
+                return None, not self.in_flight
+            self.in_flight[batch.batch_id] = worker_id
+            return batch, False
+
+    def _requeue(self, batch: TranslationBatch):
+        """Devolve à fila um batch retirado mas não processado"""
+        with self.lock:
+            self.in_flight.pop(batch.batch_id, None)
+            self.queue.put(batch)
+
+    def _start_batch(self, batch: TranslationBatch):
+        batch.status = 'processing'
+        batch.attempts += 1
+        self.current_batch = batch
+
+    def _worker_exit(self):
+        """Chamado por cada worker ao sair; o último fecha a execução"""
+        with self.lock:
+            self._active_workers -= 1
+            last = self._active_workers == 0
+        if not last:
+            return
+
+        self.is_running = False
+        self.current_batch = None
+        self._save_progress()
+        if self.queue.empty() and not self.stop_event.is_set():
+            logger.info("✅ Fila vazia - processamento completo")
+            if self.on_queue_complete:
+                self.on_queue_complete()
+        logger.info("🏁 Processamento finalizado")
+
     def start_processing(self,
                         translate_function: Callable,
-                        quota_manager=None):
+                        quota_manager=None,
+                        num_workers: Optional[int] = None):
         """
         Inicia processamento da fila em background
 
@@ -203,129 +445,211 @@ class BatchQueueManager:
             translate_function: Função que traduz um batch
                 Assinatura: (texts: List[str]) -> (translations: List[str], success: bool, error: str)
             quota_manager: Instância de GeminiQuotaManager (opcional)
+            num_workers: Threads concorrentes (default: o do construtor, no
+                máximo um por heap da fila)
         """
-        if self.is_running:
-            logger.warning("⚠️ Processamento já está rodando")
+        workers = min(self.queue.shards, max(1, int(num_workers or self.num_workers)))
+        if not self._begin_run(workers):
             return
 
-        self.is_running = True
-        self.stop_event.clear()
-        self.pause_event.clear()
+        quota_lock = Lock()
 
-        def worker():
-            logger.info("🚀 Iniciando processamento de fila")
+        def worker(worker_id: int):
+            logger.info(f"🚀 Worker {worker_id} iniciado")
 
             while self.is_running and not self.stop_event.is_set():
                 # Verifica pausa
                 if self.is_paused:
-                    logger.info("⏸️ Processamento pausado")
                     self.pause_event.wait()
-                    logger.info("▶️ Processamento retomado")
+                    continue
 
-                # Pega próximo batch
                 try:
-                    if self.queue.empty():
-                        logger.info("✅ Fila vazia - processamento completo")
-                        self.is_running = False
-                        if self.on_queue_complete:
-                            self.on_queue_complete()
+                    batch, done = self._next_batch(worker_id, worker_id)
+                    if done:
                         break
+                    if batch is None:
+                        self.queue.wait(self._idle_poll)
+                        continue
 
-                    batch = self.queue.get(timeout=1)
-                    self.current_batch = batch
-
-                    logger.info(f"🔄 Processando batch #{batch.batch_id} ({len(batch.texts)} textos)")
-
-                    # Verifica quota se disponível
+                    # Verifica quota se disponível (GeminiQuotaManager não é thread-safe)
                     if quota_manager:
-                        if not quota_manager.wait_if_needed():
+                        with quota_lock:
+                            allowed = quota_manager.wait_if_needed()
+                        if not allowed:
                             logger.error("⛔ Quota diária excedida - pausando processamento")
                             self.pause()
                             if self.on_quota_exceeded:
                                 self.on_quota_exceeded(batch)
                             # Recoloca batch na fila
-                            self.queue.put(batch)
+                            self._requeue(batch)
                             continue
 
-                    # Traduz
-                    batch.status = 'processing'
-                    batch.attempts += 1
+                    logger.info(f"🔄 Worker {worker_id}: batch #{batch.batch_id} ({len(batch.texts)} textos)")
+                    self._start_batch(batch)
 
                     try:
+                        started = time.monotonic()
                         translations, success, error = translate_function(batch.texts)
+                        if self.batcher is not None:
+                            self.batcher.record(len(batch.texts), time.monotonic() - started, ok=bool(success))
+                        self._finish_batch(batch, translations, success, error)
 
-                        if success:
-                            batch.translations = translations
-                            batch.status = 'completed'
-                            batch.error = None
+                        # Registra no quota manager
+                        if quota_manager:
+                            with quota_lock:
+                                quota_manager.record_request(success=bool(success))
 
-                            with self.lock:
-                                self.batches_processed += 1
-                                self.batches_pending -= 1
+                    except Exception as e:
+                        self._fail_batch(batch, e)
 
-                            logger.info(f"✅ Batch #{batch.batch_id} completo")
+                except Exception as e:
+                    logger.error(f"❌ Erro no worker {worker_id}: {e}")
+                    time.sleep(1)
 
-                            if self.on_batch_complete:
-                                self.on_batch_complete(batch)
+            self._worker_exit()
 
-                            # Registra no quota manager
-                            if quota_manager:
-                                quota_manager.record_request(success=True)
+        self.worker_threads = [Thread(target=worker, args=(i,), daemon=True) for i in range(workers)]
+        self.worker_thread = self.worker_threads[0]
+        for t in self.worker_threads:
+            t.start()
 
-                        else:
-                            batch.status = 'failed'
-                            batch.error = error
+        logger.info(f"✅ {workers} worker threads iniciadas")
 
-                            with self.lock:
-                                self.batches_failed += 1
-                                self.batches_pending -= 1
+    def _finish_batch(self, batch: TranslationBatch, translations: List[str],
+                      success: bool, error: Optional[str]):
+        """Registra o resultado de um batch traduzido (sucesso ou falha)"""
+        if success:
+            batch.translations = translations
+            batch.status = 'completed'
+            batch.error = None
 
-                            logger.error(f"❌ Batch #{batch.batch_id} falhou: {error}")
+            with self.lock:
+                self.batches_processed += 1
+                self.batches_pending -= 1
+                self.in_flight.pop(batch.batch_id, None)
+                self._completions.append((time.monotonic(), len(batch.texts)))
+                self._journal('done', id=batch.batch_id, translations=translations,
+                              attempts=batch.attempts, metadata=batch.metadata)
 
-                            if self.on_batch_error:
-                                self.on_batch_error(batch)
+            logger.info(f"✅ Batch #{batch.batch_id} completo")
 
-                            # Registra falha no quota manager
-                            if quota_manager:
-                                quota_manager.record_request(success=False)
+            if self.on_batch_complete:
+                self.on_batch_complete(batch)
+        else:
+            batch.status = 'failed'
+            batch.error = error
 
-                    except Exception as e:
-                        batch.status = 'failed'
-                        batch.error = str(e)
+            with self.lock:
+                self.batches_failed += 1
+                self.batches_pending -= 1
+                self.in_flight.pop(batch.batch_id, None)
+                self._journal('fail', id=batch.batch_id, error=error, attempts=batch.attempts)
+
+            logger.error(f"❌ Batch #{batch.batch_id} falhou: {error}")
 
-                        with self.lock:
-                            self.batches_failed += 1
-                            self.batches_pending -= 1
+            if self.on_batch_error:
+                self.on_batch_error(batch)
 
-                        logger.exception(f"❌ Exceção ao processar batch #{batch.batch_id}")
+    def _fail_batch(self, batch: TranslationBatch, exc: Exception):
+        """Registra exceção ao processar um batch"""
+        batch.status = 'failed'
+        batch.error = str(exc)
 
-                        if self.on_batch_error:
-                            self.on_batch_error(batch)
+        with self.lock:
+            self.batches_failed += 1
+            self.batches_pending -= 1
+            self.in_flight.pop(batch.batch_id, None)
+            self._journal('fail', id=batch.batch_id, error=batch.error, attempts=batch.attempts)
+
+        logger.exception(f"❌ Exceção ao processar batch #{batch.batch_id}")
+
+        if self.on_batch_error:
+            self.on_batch_error(batch)
 
-                    # Auto-save
-                    if self.batches_processed % self.auto_save_interval == 0:
-                        self._save_progress()
+    def start_scheduled(self,
+                        translators: Dict[str, Callable],
+                        scheduler,
+                        max_wait: Optional[float] = None):
+        """
+        Processa a fila com um worker por backend, roteado por QuotaScheduler.
 
-                    self.current_batch = None
+        Backends premium (Gemini) pegam os batches de maior prioridade;
+        backends locais (Ollama) pegam os de menor, ficando ocupados com
+        batches NORMAL/LOW enquanto os diálogos vão para as chaves premium.
 
+        Args:
+            translators: backend -> função (texts, key) -> (translations, success, error),
+                onde key é a BackendKey escolhida (api_key, model)
+            scheduler: QuotaScheduler com as chaves de cada backend
+            max_wait: Espera máxima por chave antes de devolver o batch à fila
+        """
+        lanes = list(translators)
+        if not self._begin_run(len(lanes)):
+            return
+
+        local_lanes = {k.backend for k in scheduler.keys.values() if not k.premium}
+        wait_limit = scheduler.max_premium_wait if max_wait is None else max_wait
+
+        def lane_worker(shard: int, backend: str):
+            translate_function = translators[backend]
+            while self.is_running and not self.stop_event.is_set():
+                if self.is_paused:
+                    self.pause_event.wait()
+                    continue
+
+                batch, done = self._next_batch(backend, shard, lowest=backend in local_lanes)
+                if done:
+                    break
+                if batch is None:
+                    # Outro worker ainda pode devolver um batch à fila
+                    self.queue.wait(self._idle_poll)
+                    continue
+
+                lease = scheduler.acquire_wait(batch.priority, backends=[backend], max_wait=wait_limit)
+                if lease is None:
+                    # Outro backend atende este batch (ou a quota acabou): devolve
+                    self._requeue(batch)
+                    overall = scheduler.time_until_available(batch.priority, backends=lanes)
+                    if overall is None or overall > wait_limit:
+                        logger.error("⛔ Quota esgotada em todos os backends - pausando processamento")
+                        self.pause()
+                        if self.on_quota_exceeded:
+                            self.on_quota_exceeded(batch)
+                    self.stop_event.wait(self._idle_poll)
+                    continue
+
+                self._start_batch(batch)
+                batch.metadata['backend'] = lease.key.key_id
+                logger.info(f"🔄 Batch #{batch.batch_id} -> {lease.key.key_id} ({len(batch.texts)} textos)")
+                success, error = False, None
+                try:
+                    started = time.monotonic()
+                    translations, success, error = translate_function(batch.texts, lease.key)
+                    if self.batcher is not None:
+                        self.batcher.record(len(batch.texts), time.monotonic() - started, ok=bool(success))
+                    self._finish_batch(batch, translations, success, error)
                 except Exception as e:
-                    logger.error(f"❌ Erro no worker: {e}")
-                    time.sleep(1)
+                    error = str(e)
+                    self._fail_batch(batch, e)
+                finally:
+                    scheduler.release(lease, success=bool(success), error=error)
 
-            # Save final
-            self._save_progress()
-            logger.info("🏁 Processamento finalizado")
+            self._worker_exit()
 
-        self.worker_thread = Thread(target=worker, daemon=True)
-        self.worker_thread.start()
+        self.worker_threads = [Thread(target=lane_worker, args=(i, name), daemon=True)
+                               for i, name in enumerate(lanes)]
+        self.worker_thread = self.worker_threads[0] if self.worker_threads else None
+        for t in self.worker_threads:
+            t.start()
 
-        logger.info("✅ Worker thread iniciada")
+        logger.info(f"✅ {len(self.worker_threads)} workers iniciados ({', '.join(lanes)})")
 
     def pause(self):
-        """Pausa processamento"""
+        """Pausa processamento (workers terminam o batch atual e esperam)"""
         if not self.is_running:
             return
 
+        self.pause_event.clear()
         self.is_paused = True
         logger.info("⏸️ Pausando processamento...")
 
@@ -347,15 +671,39 @@ class BatchQueueManager:
         self.is_running = False
         self.stop_event.set()
         self.pause_event.set()  # Desbloqueia se pausado
+        self.queue.wake_all()
 
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5)
+        for t in self.worker_threads:
+            t.join(timeout=5)
 
         self._save_progress()
         logger.info("✅ Processamento parado")
 
+    def get_metrics(self) -> Dict:
+        """Profundidade da fila e vazão (janela de THROUGHPUT_WINDOW_SECONDS)"""
+        now = time.monotonic()
+        with self.lock:
+            while self._completions and self._completions[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+                self._completions.popleft()
+            done = len(self._completions)
+            texts = sum(n for _, n in self._completions)
+            span = (now - self._completions[0][0]) if done else 0.0
+            span = max(span, 1.0) if done else 0.0
+            return {
+                'queue_depth': self.queue.qsize(),
+                'depth_by_priority': self.queue.depth_by_priority(),
+                'shard_depths': self.queue.shard_sizes(),
+                'in_flight': len(self.in_flight),
+                'workers': sum(1 for t in self.worker_threads if t.is_alive()),
+                'steals': self.queue.steals,
+                'batches_per_sec': done / span if span else 0.0,
+                'texts_per_sec': texts / span if span else 0.0,
+                'journal_records': self._journal_records,
+            }
+
     def get_stats(self) -> Dict:
         """Retorna estatísticas da fila"""
+        metrics = self.get_metrics()
         with self.lock:
             total_texts_processed = sum(
                 len(b.translations) for b in self.all_batches.values()
@@ -376,7 +724,11 @@ class BatchQueueManager:
                 'success_rate': success_rate,
                 'is_running': self.is_running,
                 'is_paused': self.is_paused,
-                'current_batch_id': self.current_batch.batch_id if self.current_batch else None
+                'current_batch_id': self.current_batch.batch_id if self.current_batch else None,
+                'queue_depth': metrics['queue_depth'],
+                'in_flight': metrics['in_flight'],
+                'batches_per_sec': metrics['batches_per_sec'],
+                'texts_per_sec': metrics['texts_per_sec'],
             }
 
     def get_status_message(self) -> str:
@@ -398,7 +750,9 @@ class BatchQueueManager:
             f"Batches: {stats['batches_processed']}/{stats['total_batches']} "
             f"({stats['batches_pending']} pendentes, {stats['batches_failed']} falhas) | "
             f"Textos: {stats['texts_translated']:,}/{stats['total_texts']:,} | "
-            f"Taxa de sucesso: {stats['success_rate']:.1f}%"
+            f"Taxa de sucesso: {stats['success_rate']:.1f}% | "
+            f"Fila: {stats['queue_depth']} ({stats['in_flight']} em andamento), "
+            f"{stats['texts_per_sec']:.1f} textos/s"
         )
 
     def get_all_translations(self) -> List[str]:
@@ -422,79 +776,188 @@ class BatchQueueManager:
 
         return all_translations
 
+
+    # ------------------------------------------------------------------
+    # Persistência: journal append-only + snapshot compacto
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _batch_to_dict(batch: TranslationBatch) -> Dict:
+        return {
+            'priority': int(batch.priority),
+            'batch_id': batch.batch_id,
+            'texts': batch.texts,
+            'translations': batch.translations,
+            'metadata': batch.metadata,
+            # Em andamento volta como pendente ao recarregar
+            'status': 'pending' if batch.status == 'processing' else batch.status,
+            'error': batch.error,
+            'attempts': batch.attempts,
+            'created_at': batch.created_at
+        }
+
+    @staticmethod
+    def _batch_from_dict(batch_dict: Dict) -> TranslationBatch:
+        return TranslationBatch(
+            priority=Priority(batch_dict['priority']),
+            batch_id=batch_dict['batch_id'],
+            texts=batch_dict['texts'],
+            translations=batch_dict.get('translations', []),
+            metadata=batch_dict.get('metadata', {}),
+            status=batch_dict.get('status', 'pending'),
+            error=batch_dict.get('error'),
+            attempts=batch_dict.get('attempts', 0),
+            created_at=batch_dict.get('created_at', datetime.now().isoformat())
+        )
+
+    def _journal(self, op: str, **data):
+        """Acrescenta um registro ao journal (uma linha JSON)"""
+        with self._journal_lock:
+            self._journal_seq += 1
+            record = {'seq': self._journal_seq, 'op': op, **data}
+            try:
+                if self._journal_fh is None:
+                    self._journal_fh = open(self.journal_file, 'a', encoding='utf-8')
+                self._journal_fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._journal_fh.flush()
+                self._journal_records += 1
+                self._journal_unsynced += 1
+                if self._journal_unsynced >= self.auto_save_interval:
+                    os.fsync(self._journal_fh.fileno())
+                    self._journal_unsynced = 0
+            except Exception as e:
+                logger.error(f"❌ Erro ao gravar journal: {e}")
+            compact = self._journal_records >= self.compact_every
+
+        if compact:
+            self._save_progress()
+
     def _save_progress(self):
-        """Salva progresso em arquivo JSON"""
+        """Grava snapshot JSON (atômico) e trunca o journal"""
         try:
-            data = {
-                'metadata': {
-                    'last_saved': datetime.now().isoformat(),
-                    'total_batches': self.total_batches,
-                    'batches_processed': self.batches_processed,
-                    'batches_failed': self.batches_failed,
-                    'batches_pending': self.batches_pending
-                },
-                'batches': {
-                    str(batch_id): {
-                        'priority': batch.priority.value,
-                        'batch_id': batch.batch_id,
-                        'texts': batch.texts,
-                        'translations': batch.translations,
-                        'metadata': batch.metadata,
-                        'status': batch.status,
-                        'error': batch.error,
-                        'attempts': batch.attempts,
-                        'created_at': batch.created_at
+            with self.lock, self._journal_lock:
+                data = {
+                    'metadata': {
+                        'last_saved': datetime.now().isoformat(),
+                        'total_batches': self.total_batches,
+                        'batches_processed': self.batches_processed,
+                        'batches_failed': self.batches_failed,
+                        'batches_pending': self.batches_pending,
+                        'cleared_completed': self.cleared_completed,
+                        'journal_seq': self._journal_seq
+                    },
+                    'batches': {
+                        str(batch_id): self._batch_to_dict(batch)
+                        for batch_id, batch in self.all_batches.items()
                     }
-                    for batch_id, batch in self.all_batches.items()
                 }
-            }
 
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                tmp_file = self.progress_file.with_suffix(self.progress_file.suffix + '.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_file, self.progress_file)
+
+                # Registros até journal_seq já estão no snapshot
+                if self._journal_fh is not None:
+                    self._journal_fh.close()
+                    self._journal_fh = None
+                open(self.journal_file, 'w', encoding='utf-8').close()
+                self._journal_records = 0
+                self._journal_unsynced = 0
 
             logger.debug(f"💾 Progresso salvo em {self.progress_file}")
 
         except Exception as e:
             logger.error(f"❌ Erro ao salvar progresso: {e}")
 
+    def _replay_journal(self, after_seq: int) -> int:
+        """Aplica registros do journal com seq > after_seq; retorna quantos"""
+        if not self.journal_file.exists():
+            return 0
+
+        applied = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última linha cortada por um crash
+                    logger.warning(f"⚠️ Journal truncado na linha {line_no} - ignorando o resto")
+                    break
+
+                seq = int(record.get('seq', 0))
+                self._journal_seq = max(self._journal_seq, seq)
+                if seq <= after_seq:
+                    continue
+
+                op = record.get('op')
+                batch = self.all_batches.get(record.get('id'))
+                if op == 'add':
+                    batch = self._batch_from_dict(record['batch'])
+                    self.all_batches[batch.batch_id] = batch
+                elif op == 'done' and batch is not None:
+                    batch.status = 'completed'
+                    batch.translations = record.get('translations', [])
+                    batch.attempts = record.get('attempts', batch.attempts)
+                    batch.metadata = record.get('metadata', batch.metadata)
+                    batch.error = None
+                elif op == 'fail' and batch is not None:
+                    batch.status = 'failed'
+                    batch.error = record.get('error')
+                    batch.attempts = record.get('attempts', batch.attempts)
+                elif op == 'retry':
+                    for batch_id in record.get('ids', []):
+                        if batch_id in self.all_batches:
+                            self.all_batches[batch_id].status = 'pending'
+                            self.all_batches[batch_id].error = None
+                elif op == 'clear':
+                    for batch_id in record.get('ids', []):
+                        if self.all_batches.pop(batch_id, None) is not None:
+                            self.cleared_completed += 1
+                applied += 1
+
+        return applied
+
     def _load_progress(self):
-        """Carrega progresso de arquivo JSON"""
-        if not self.progress_file.exists():
+        """Carrega snapshot e reaplica o journal (recupera o estado após crash)"""
+        if not self.progress_file.exists() and not self.journal_file.exists():
             logger.info("ℹ️ Nenhum progresso anterior encontrado")
             return
 
         try:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Restaura metadata
-            meta = data.get('metadata', {})
-            self.total_batches = meta.get('total_batches', 0)
-            self.batches_processed = meta.get('batches_processed', 0)
-            self.batches_failed = meta.get('batches_failed', 0)
-
-            # Restaura batches
-            batches_data = data.get('batches', {})
+            snapshot_seq = 0
+            total_batches = 0
+            if self.progress_file.exists():
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                # Restaura metadata
+                meta = data.get('metadata', {})
+                total_batches = meta.get('total_batches', 0)
+                self.cleared_completed = meta.get('cleared_completed', 0)
+                snapshot_seq = meta.get('journal_seq', 0)
+                self._journal_seq = snapshot_seq
+
+                # Restaura batches
+                for batch_id_str, batch_dict in data.get('batches', {}).items():
+                    self.all_batches[int(batch_id_str)] = self._batch_from_dict(batch_dict)
+
+            replayed = self._replay_journal(snapshot_seq)
+
+            # Contadores derivados do estado reconstruído
+            statuses = [b.status for b in self.all_batches.values()]
+            self.batches_processed = statuses.count('completed') + self.cleared_completed
+            self.batches_failed = statuses.count('failed')
+            self.total_batches = max([total_batches] + [i + 1 for i in self.all_batches])
+
+            # Recoloca pendentes/failed (e os que estavam em andamento) na fila
             pending_count = 0
-
-            for batch_id_str, batch_dict in batches_data.items():
-                batch = TranslationBatch(
-                    priority=Priority(batch_dict['priority']),
-                    batch_id=batch_dict['batch_id'],
-                    texts=batch_dict['texts'],
-                    translations=batch_dict['translations'],
-                    metadata=batch_dict['metadata'],
-                    status=batch_dict['status'],
-                    error=batch_dict.get('error'),
-                    attempts=batch_dict.get('attempts', 0),
-                    created_at=batch_dict['created_at']
-                )
-
-                batch_id = int(batch_id_str)
-                self.all_batches[batch_id] = batch
-
-                # Recoloca pendentes/failed na fila
-                if batch.status in ['pending', 'failed']:
+            for batch_id in sorted(self.all_batches):
+                batch = self.all_batches[batch_id]
+                if batch.status in ['pending', 'processing', 'failed']:
+                    if batch.status == 'processing':
+                        batch.status = 'pending'
                     self.queue.put(batch)
                     pending_count += 1
 
@@ -504,7 +967,8 @@ class BatchQueueManager:
                 f"✅ Progresso carregado - "
                 f"{self.batches_processed} completos, "
                 f"{self.batches_failed} falhas, "
-                f"{pending_count} recolocados na fila"
+                f"{pending_count} recolocados na fila, "
+                f"{replayed} registros do journal reaplicados"
             )
 
         except Exception as e:
@@ -520,6 +984,8 @@ class BatchQueueManager:
 
             for batch_id in completed_ids:
                 del self.all_batches[batch_id]
+            self.cleared_completed += len(completed_ids)
+            self._journal('clear', ids=completed_ids)
 
             logger.info(f"🧹 {len(completed_ids)} batches completados removidos da memória")
 
@@ -537,5 +1003,6 @@ class BatchQueueManager:
                 self.queue.put(batch)
                 self.batches_pending += 1
                 self.batches_failed -= 1
+            self._journal('retry', ids=[b.batch_id for b in failed_batches])
 
             logger.info(f"🔄 {len(failed_batches)} batches falhados recolocados na fila")
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import json
-import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Hashable
+
+try:
+    from .glossary_matcher import get_glossary_matcher
+except ImportError:
+    from glossary_matcher import get_glossary_matcher
 
 _GLOSSARY_PATH = Path(__file__).resolve().with_name("compact_glossary.json")
 _CACHE_MTIME: float | None = None
@@ -73,24 +77,13 @@ def _preserve_case(original: str, replacement: str) -> str:
     return replacement
 
 
-def _replace_glossary_entries(text: str, entries: Dict[str, str]) -> str:
+def _replace_glossary_entries(text: str, entries: Dict[str, str], version: Hashable = None) -> str:
     if not text or not entries:
         return text
 
-    out = text
-    ordered_entries = sorted(
-        entries.items(),
-        key=lambda item: len(item[0]),
-        reverse=True,
-    )
-    for src, dst in ordered_entries:
-        if not src:
-            continue
-        pattern = re.compile(
-            rf"(?<![{_WORD_CLASS}]){re.escape(src)}(?![{_WORD_CLASS}])",
-            re.IGNORECASE,
-        )
-        out = pattern.sub(lambda m: _preserve_case(m.group(0), dst), out)
+    # Um autômato por seção/versão do arquivo; termo mais longo vence.
+    matcher = get_glossary_matcher(entries, version=version, word_boundaries=True, word_chars=_WORD_CLASS)
+    out, _ = matcher.replace(text, repl=lambda found, dst: _preserve_case(found, dst))
     return out
 
 
@@ -107,8 +100,12 @@ def apply_compact_glossary(text: str, crc32: str = None) -> str:
     if not glossary_data:
         return text
 
-    out = _replace_glossary_entries(text, glossary_data.get("_global", {}))
+    out = _replace_glossary_entries(
+        text, glossary_data.get("_global", {}), version=(str(_GLOSSARY_PATH), _CACHE_MTIME, "_global")
+    )
     crc_key = str(crc32 or "").strip().upper()
     if crc_key:
-        out = _replace_glossary_entries(out, glossary_data.get(crc_key, {}))
+        out = _replace_glossary_entries(
+            out, glossary_data.get(crc_key, {}), version=(str(_GLOSSARY_PATH), _CACHE_MTIME, crc_key)
+        )
     return out
@@ -13,9 +13,24 @@ NÃO descomprime automaticamente - apenas identifica e marca regiões
 ================================================================================
 """
 
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Tuple, Optional
 from collections import Counter
 import struct
+import time
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    from universal_kit.entropy_map import EntropyMap
+except Exception:
+    EntropyMap = None
+
+# Versão do detect() (incrementar invalida o cache de análise)
+DETECTOR_ANALYSIS_VERSION = "1"
 
 
 class CompressionSignature:
@@ -46,6 +61,49 @@ class CompressedRegion:
                 f"algo={self.algorithm} conf={self.confidence:.2f}>")
 
 
+class _RegionOverlapIndex:
+    """
+    Índice de intervalos [offset, offset+size) para checagem de overlap.
+
+    Mantém a união ordenada (intervalos que se sobrepõem estritamente são
+    fundidos; adjacentes ficam separados) e regiões de tamanho <= 0 como
+    pontos, reproduzindo exatamente o teste linear original.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._points: List[int] = []
+
+    def add(self, offset: int, size: int) -> None:
+        if size <= 0:
+            self._points.insert(bisect_right(self._points, offset), offset)
+            return
+        start, end = offset, offset + size
+        # Intervalos com end > start e start < end sobrepõem estritamente
+        i = bisect_right(self._ends, start)
+        j = bisect_left(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def overlaps(self, offset: int, size: int) -> bool:
+        end = offset + size
+        i = bisect_left(self._starts, end) - 1
+        if i >= 0 and self._ends[i] > offset and offset < end:
+            return True
+        if size <= 0:
+            # Consulta vazia: sobrepõe se estiver estritamente dentro de uma região
+            i = bisect_left(self._starts, offset) - 1
+            if i >= 0 and self._ends[i] > offset:
+                return True
+            return False
+        k = bisect_right(self._points, offset)
+        return k < len(self._points) and self._points[k] < end
+
+
 class CompressionDetector:
     """
     Detector universal de compressão em ROMs.
@@ -105,15 +163,25 @@ class CompressionDetector:
         ),
     ]
 
-    def __init__(self, rom_data: bytes, entropy_map: Optional[List[Dict]] = None):
+    def __init__(self, rom_data: bytes, entropy_map: Optional[List[Dict]] = None,
+                 rom_key: Optional[str] = None, rom_path: Optional[str] = None):
         """
         Args:
             rom_data: Dados brutos da ROM
             entropy_map: Mapa de entropia do ROMAnalyzer (opcional)
+            rom_key: Identidade da ROM na execução (ex.: SHA-256) para
+                compartilhar o EntropyMap com as outras etapas
+            rom_path: Arquivo da ROM (identidade por caminho/tamanho/mtime
+                quando não há rom_key)
         """
         self.rom_data = rom_data
         self.entropy_map = entropy_map or []
+        self.rom_key = rom_key
+        self.rom_path = rom_path
         self.compressed_regions: List[CompressedRegion] = []
+        self.stage_timings: Dict[str, float] = {}
+        self._overlap_index = _RegionOverlapIndex()
+        self._indexed_regions: List[CompressedRegion] = []
 
     def detect(self, block_size: int = 4096) -> List[CompressedRegion]:
         """
@@ -128,26 +196,44 @@ class CompressionDetector:
         print(f"\n🗜️  COMPRESSION DETECTOR - Identifying Compressed Data")
         print(f"{'='*70}")
 
+        self.stage_timings = {}
+
         # Fase 1: Detecta por assinatura (magic numbers)
         print("[1/3] Scanning for compression signatures...")
-        self._scan_signatures()
+        self._timed_stage('signatures', self._scan_signatures)
 
         # Fase 2: Detecta por entropia alta
         print("[2/3] Analyzing entropy patterns...")
-        self._scan_entropy(block_size)
+        self._timed_stage('entropy', self._scan_entropy, block_size)
 
         # Fase 3: Detecta padrões específicos (RLE, etc)
         print("[3/3] Detecting algorithm-specific patterns...")
-        self._scan_patterns()
+        self._timed_stage('patterns', self._scan_patterns)
 
-        # Ordena por confiança
+        # Ordena por confiança (reordenação invalida o índice de overlap)
         self.compressed_regions.sort(key=lambda r: r.confidence, reverse=True)
+        self._overlap_index = _RegionOverlapIndex()
+        self._indexed_regions = []
 
+        total = sum(self.stage_timings.values())
         print(f"\n✅ Detected {len(self.compressed_regions)} compressed regions")
+        print("⏱️  " + " | ".join(
+            f"{name}: {elapsed:.3f}s" for name, elapsed in self.stage_timings.items()
+        ) + f" | total: {total:.3f}s")
         print(f"{'='*70}\n")
 
         return self.compressed_regions
 
+    def _timed_stage(self, name: str, stage, *args):
+        """Executa uma fase do detect() registrando o tempo em stage_timings."""
+        start = time.perf_counter()
+        try:
+            return stage(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_timings[name] = elapsed
+            print(f"      ↳ {name}: {elapsed:.3f}s")
+
     def _scan_signatures(self):
         """Procura por magic numbers de algoritmos conhecidos."""
         for signature in self.SIGNATURES:
@@ -281,62 +367,90 @@ class CompressionDetector:
 
         RLE típico: [count][byte] ou [byte][count]
         Exemplo: 0x05 0xFF = cinco bytes 0xFF
-        """
-        offset = 0
-        min_run_length = 4  # Mínimo de repetições para considerar RLE
 
-        while offset < len(self.rom_data) - 16:
-            # Tenta decodificar como RLE
-            count = self.rom_data[offset]
-            if count == 0 or count > 128:  # Valores implausíveis
-                offset += 1
-                continue
+        Os runs consecutivos de cada offset são calculados numa única
+        passada (_rle_run_counts); o laço só visita offsets candidatos.
+        """
+        rom_len = len(self.rom_data)
+        if rom_len <= 16:
+            return
 
-            byte_value = self.rom_data[offset + 1]
+        runs = self._rle_run_counts()
+        scan_limit = rom_len - 16
+        if np is not None:
+            candidates = np.flatnonzero(runs[:scan_limit] >= 3).tolist()
+        else:
+            candidates = [i for i in range(scan_limit) if runs[i] >= 3]
 
-            # Verifica se próximos bytes realmente repetem o padrão
-            # (seria esperado se fosse RLE real)
-            is_rle = True
-            rle_size = 2  # count + byte
+        offset = 0
+        for candidate in candidates:
+            if candidate < offset:
+                continue
+            offset = candidate
+            consecutive_runs = int(runs[offset])
 
-            # RLE pode ter múltiplos runs consecutivos
-            consecutive_runs = 0
-            scan_offset = offset
+            # Se encontrou vários runs consecutivos, provavelmente é RLE
+            estimated_size = consecutive_runs * 2
 
-            while scan_offset < len(self.rom_data) - 2 and consecutive_runs < 10:
-                run_count = self.rom_data[scan_offset]
-                run_byte = self.rom_data[scan_offset + 1]
+            region = CompressedRegion(
+                offset=offset,
+                size=estimated_size,
+                algorithm="RLE",
+                confidence=0.6  # Média-baixa (pode ser falso positivo)
+            )
+            region.properties['detection_method'] = 'pattern'
+            region.properties['run_count'] = consecutive_runs
 
-                # Valida run
-                if run_count == 0 or run_count > 128:
-                    break
+            if not self._overlaps_existing(offset, estimated_size):
+                self.compressed_regions.append(region)
 
-                consecutive_runs += 1
-                scan_offset += 2
+            offset += estimated_size
 
-            # Se encontrou vários runs consecutivos, provavelmente é RLE
-            if consecutive_runs >= 3:
-                # Estima tamanho total da região RLE
-                estimated_size = consecutive_runs * 2
-
-                region = CompressedRegion(
-                    offset=offset,
-                    size=estimated_size,
-                    algorithm="RLE",
-                    confidence=0.6  # Média-baixa (pode ser falso positivo)
-                )
-                region.properties['detection_method'] = 'pattern'
-                region.properties['run_count'] = consecutive_runs
-
-                if not self._overlaps_existing(offset, estimated_size):
-                    self.compressed_regions.append(region)
+    def _rle_run_counts(self, max_runs: int = 10):
+        """
+        Para cada offset, quantos pares [count][byte] válidos (count 1..128)
+        seguem em sequência a partir dele, limitado a max_runs.
 
-                offset += estimated_size
-            else:
-                offset += 1
+        Equivale ao laço interno original (scan_offset < len - 2, passo 2).
+        """
+        rom_len = len(self.rom_data)
+        scan_end = max(0, rom_len - 2)
+
+        if np is not None:
+            data = np.frombuffer(bytes(self.rom_data), dtype=np.uint8)
+            valid = (data >= 1) & (data <= 128)
+            valid[scan_end:] = False
+            runs = np.zeros(rom_len, dtype=np.int64)
+            for parity in (0, 1):
+                lane = valid[parity::2]
+                # Distância até o próximo offset inválido na mesma paridade
+                breaks = np.append(np.flatnonzero(~lane), lane.size)
+                idx = np.arange(lane.size)
+                runs[parity::2] = breaks[np.searchsorted(breaks, idx)] - idx
+            return np.minimum(runs, max_runs)
+
+        runs = [0] * rom_len
+        for i in range(scan_end - 1, -1, -1):
+            count = self.rom_data[i]
+            if count == 0 or count > 128:
+                continue
+            following = runs[i + 2] if i + 2 < rom_len else 0
+            runs[i] = min(max_runs, 1 + following)
+        return runs
 
     def _calculate_entropy_map(self, block_size: int):
         """Calcula mapa de entropia se não foi fornecido."""
+        if EntropyMap is not None:
+            # Compartilhado por rom_key/rom_path; sem identidade, só nesta instância
+            shared = EntropyMap.for_rom(self.rom_data, key=self.rom_key, path=self.rom_path)
+            for offset, entropy in shared.windows(block_size, min_length=max(1, block_size // 2)):
+                self.entropy_map.append({
+                    'offset': hex(offset),
+                    'offset_dec': offset,
+                    'entropy': entropy
+                })
+            return
+
         for offset in range(0, len(self.rom_data), block_size):
             block = self.rom_data[offset:offset + block_size]
             if len(block) < block_size // 2:
@@ -368,13 +482,20 @@ class CompressionDetector:
         return entropy
 
     def _overlaps_existing(self, offset: int, size: int) -> bool:
-        """Verifica se região sobrepõe com alguma já detectada."""
-        for existing in self.compressed_regions:
-            # Verifica overlap
-            if (offset < existing.offset + existing.size and
-                offset + size > existing.offset):
-                return True
-        return False
+        """Verifica se região sobrepõe com alguma já detectada (O(log n))."""
+        regions = self.compressed_regions
+        indexed = self._indexed_regions
+        # Sincroniza o índice: regiões só são anexadas durante a detecção;
+        # qualquer outra mudança na lista força reconstrução
+        if len(regions) < len(indexed) or any(
+            regions[i] is not indexed[i] for i in (0, len(indexed) - 1) if indexed
+        ):
+            self._overlap_index = _RegionOverlapIndex()
+            indexed = self._indexed_regions = []
+        for existing in regions[len(indexed):]:
+            self._overlap_index.add(existing.offset, existing.size)
+            indexed.append(existing)
+        return self._overlap_index.overlaps(offset, size)
 
     def export_report(self, output_path: str):
         """Exporta relatório de compressão para JSON."""
@@ -438,6 +559,50 @@ class CompressionDetector:
         print(f"\n{'='*70}\n")
 
 
+def detect_regions(rom_data: bytes, block_size: int = 4096,
+                   cache: Optional["AnalysisCache"] = None) -> List[Dict]:
+    """
+    detect() como dicts simples (offset, size, algorithm, confidence),
+    reaproveitando o cache de análise por SHA-256 da ROM.
+
+    Args:
+        rom_data: Bytes da ROM (não modificados)
+        block_size: Tamanho de bloco da análise de entropia
+        cache: AnalysisCache (default: cache padrão do usuário)
+    """
+    # Import tardio: o pacote utils carrega PyQt6/requests no __init__
+    try:
+        from utils.analysis_cache import AnalysisCache
+        from utils.rom_io import compute_sha256
+    except Exception:
+        AnalysisCache = None
+        compute_sha256 = None
+
+    if cache is None and AnalysisCache is not None:
+        cache = AnalysisCache()
+    use_cache = cache is not None and cache.enabled and compute_sha256 is not None
+    rom_sha = compute_sha256(bytes(rom_data)) if use_cache else None
+
+    def compute() -> List[Dict]:
+        regions = CompressionDetector(bytes(rom_data), rom_key=rom_sha).detect(block_size=block_size)
+        return [
+            {
+                'offset': int(r.offset),
+                'size': int(r.size),
+                'algorithm': str(r.algorithm),
+                'confidence': float(r.confidence),
+            }
+            for r in regions
+        ]
+
+    if not use_cache:
+        return compute()
+    return cache.get_or_compute(
+        rom_sha, "compressed_regions", DETECTOR_ANALYSIS_VERSION,
+        compute, {'block_size': int(block_size)},
+    )
+
+
 def detect_compression_in_rom(rom_path: str, entropy_map: Optional[List[Dict]] = None) -> CompressionDetector:
     """
     Função de conveniência para detecção direta.
@@ -455,7 +620,7 @@ def detect_compression_in_rom(rom_path: str, entropy_map: Optional[List[Dict]] =
         if len(data) % 1024 == 512:
             data = data[512:]
 
-    detector = CompressionDetector(data, entropy_map)
+    detector = CompressionDetector(data, entropy_map, rom_path=rom_path)
     detector.detect(block_size=4096)
     detector.print_summary()
 
@@ -18,21 +18,39 @@ Data: 2026-01
 
 import math
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from collections import Counter
 
+try:
+    from universal_kit.entropy_map import EntropyMap
+except Exception:
+    EntropyMap = None
+
 
 class DeepScavengerEngine:
     """
     Motor de recuperação de texto em áreas não detectadas.
     """
 
-    def __init__(self, rom_data: bytes, char_table: Dict[int, str]):
+    def __init__(self, rom_data: bytes, char_table: Dict[int, str],
+                 rom_key: Optional[str] = None, rom_path: Optional[str] = None):
+        """
+        Args:
+            rom_data: Dados brutos da ROM
+            char_table: Tabela de caracteres
+            rom_key: Identidade da ROM na execução (ex.: SHA-256) para
+                compartilhar o EntropyMap com as outras etapas
+            rom_path: Arquivo da ROM (identidade por caminho/tamanho/mtime
+                quando não há rom_key)
+        """
         self.rom_data = rom_data
         self.char_table = char_table
+        self.rom_key = rom_key
+        self.rom_path = rom_path
         self.min_gap_size = 50
         self.min_string_length = 3  # Relaxado (normal = 4)
         self.max_string_length = 200
+        self._entropy_map = None
 
     def calculate_entropy(self, data: bytes) -> float:
         """
@@ -100,8 +118,16 @@ class DeepScavengerEngine:
         Returns:
             (is_text_candidate, entropy)
         """
-        gap_data = self.rom_data[gap_start:gap_end]
-        entropy = self.calculate_entropy(gap_data)
+        if EntropyMap is not None:
+            # Um mapa por engine evita recontar bytes a cada gap (compartilhado
+            # entre etapas com rom_key/rom_path)
+            if self._entropy_map is None:
+                self._entropy_map = EntropyMap.for_rom(self.rom_data, key=self.rom_key, path=self.rom_path)
+            gap_len = min(gap_end, len(self.rom_data)) - max(0, gap_start)
+            entropy = self._entropy_map.region(gap_start, gap_end) if gap_len >= 10 else 0.0
+        else:
+            gap_data = self.rom_data[gap_start:gap_end]
+            entropy = self.calculate_entropy(gap_data)
 
         # Assinatura de texto: entropia entre 3.0 e 5.5
         is_candidate = 3.0 <= entropy <= 5.5
@@ -247,7 +273,7 @@ def scavenge_rom_gaps(rom_path: str, char_table: Dict[int, str],
     with open(rom_path, 'rb') as f:
         rom_data = f.read()
 
-    engine = DeepScavengerEngine(rom_data, char_table)
+    engine = DeepScavengerEngine(rom_data, char_table, rom_path=rom_path)
     return engine.scavenge(extracted_offsets)
 
 
@@ -10,18 +10,24 @@ Funcionalidades:
 - Suporte a regioes explicitas por console (config)
 - Registro de todas as alocacoes para auditoria
 - Expansao controlada de ROM quando suportado
+- FreeSpaceIndex: runs de preenchimento varridos UMA vez para uma free-list
+  ordenada por endereco + indice por tamanho (busca O(log n)), com
+  first-fit/best-fit/last-fit, restricao de banco, alinhamento, liberacao
+  com coalescencia e estatisticas de fragmentacao
 
 NAO faz varredura cega da ROM - usa apenas regioes configuradas.
 ================================================================================
 """
 
+import bisect
 import json
+import re
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-from .retro8_bank_tools import find_free_space_in_range, expand_rom_in_banks
+from .retro8_bank_tools import expand_rom_in_banks
 
 
 @dataclass
@@ -59,6 +65,282 @@ class Allocation:
         }
 
 
+class FreeSpaceIndex:
+    """
+    Free-list de blocos livres [start, end) com dois indices ordenados.
+
+    - _starts/_ends: blocos por endereco (vizinhos para coalescer, first-fit,
+      consultas restritas a um intervalo/banco)
+    - _by_size: (tamanho, start) para best-fit por bisect
+
+    Blocos adjacentes ou sobrepostos sao sempre fundidos, entao a free-list
+    nunca tem dois blocos encostados.
+
+    Args:
+        blocks: Blocos livres iniciais [(start, end), ...]
+        bank_size: Tamanho do banco (habilita bank= e cross_banks=False)
+    """
+
+    STRATEGIES = ("best", "first", "last")
+
+    def __init__(self, blocks: Iterable[Tuple[int, int]] = (), bank_size: int = 0):
+        self.bank_size = max(0, int(bank_size or 0))
+        self._starts: List[int] = []
+        self._ends: Dict[int, int] = {}
+        self._by_size: List[Tuple[int, int]] = []
+        for start, end in blocks:
+            self.add(start, end)
+
+    @classmethod
+    def scan(
+        cls,
+        rom_data: Union[bytes, bytearray, memoryview],
+        regions: Optional[Iterable[Tuple[int, int]]] = None,
+        fill_bytes: Iterable[int] = (0xFF,),
+        min_run: int = 1,
+        bank_size: int = 0,
+    ) -> "FreeSpaceIndex":
+        """
+        Varre a ROM uma unica vez e indexa os runs de preenchimento.
+
+        Args:
+            rom_data: Dados da ROM
+            regions: Intervalos [(start, end), ...] a varrer (None = ROM toda)
+            fill_bytes: Bytes considerados livres (um run pode misturar todos)
+            min_run: Runs menores que isso sao ignorados
+            bank_size: Ver FreeSpaceIndex
+        """
+        index = cls(bank_size=bank_size)
+        fills = sorted({int(b) & 0xFF for b in fill_bytes})
+        if not fills:
+            return index
+        klass = b"".join(re.escape(bytes([b])) for b in fills)
+        pattern = re.compile(b"[" + klass + b"]{%d,}" % max(1, int(min_run)))
+        size = len(rom_data)
+        for start, end in (regions if regions is not None else [(0, size)]):
+            start, end = max(0, int(start)), min(size, int(end))
+            if end <= start:
+                continue
+            for m in pattern.finditer(rom_data, start, end):
+                index.add(m.start(), m.end())
+        return index
+
+    # ------------------------------------------------------------------
+    # Estrutura
+    # ------------------------------------------------------------------
+    def _insert(self, start: int, end: int):
+        bisect.insort(self._starts, start)
+        self._ends[start] = end
+        bisect.insort(self._by_size, (end - start, start))
+
+    def _delete(self, start: int):
+        end = self._ends.pop(start)
+        del self._starts[bisect.bisect_left(self._starts, start)]
+        del self._by_size[bisect.bisect_left(self._by_size, (end - start, start))]
+
+    def _overlapping(self, lo: int, hi: int, touching: bool = False) -> List[int]:
+        """Starts dos blocos que cruzam [lo, hi) (ou encostam, se touching)."""
+        i = bisect.bisect_left(self._starts, lo)
+        if i > 0 and (self._ends[self._starts[i - 1]] > lo or
+                      (touching and self._ends[self._starts[i - 1]] == lo)):
+            i -= 1
+        out = []
+        while i < len(self._starts):
+            start = self._starts[i]
+            if start > hi or (start == hi and not touching):
+                break
+            out.append(start)
+            i += 1
+        return out
+
+    def add(self, start: int, end: int):
+        """Marca [start, end) como livre, coalescendo com os vizinhos."""
+        start, end = int(start), int(end)
+        if end <= start:
+            return
+        for s in self._overlapping(start, end, touching=True):
+            e = self._ends[s]
+            self._delete(s)
+            start, end = min(start, s), max(end, e)
+        self._insert(start, end)
+
+    def free(self, offset: int, size: int):
+        """Devolve um bloco alocado para a free-list (coalescendo)."""
+        self.add(offset, int(offset) + int(size))
+
+    def reserve(self, start: int, end: int) -> int:
+        """Remove [start, end) da free-list; retorna quantos bytes estavam livres."""
+        start, end = int(start), int(end)
+        removed = 0
+        if end <= start:
+            return 0
+        for s in self._overlapping(start, end):
+            e = self._ends[s]
+            self._delete(s)
+            removed += min(e, end) - max(s, start)
+            if s < start:
+                self._insert(s, start)
+            if e > end:
+                self._insert(end, e)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Alocacao
+    # ------------------------------------------------------------------
+    def _bank_range(self, bank: int) -> Tuple[int, int]:
+        if self.bank_size <= 0:
+            raise ValueError("bank= requer bank_size")
+        return bank * self.bank_size, (bank + 1) * self.bank_size
+
+    def _place(self, start: int, end: int, size: int, alignment: int,
+               lo: Optional[int], hi: Optional[int], cross_banks: bool) -> Optional[int]:
+        """Menor offset alinhado dentro do bloco onde cabem size bytes."""
+        if lo is not None:
+            start = max(start, lo)
+        if hi is not None:
+            end = min(end, hi)
+        cand = start
+        if alignment > 1:
+            cand = (cand + alignment - 1) // alignment * alignment
+        if not cross_banks and self.bank_size > 0:
+            bank_end = (cand // self.bank_size + 1) * self.bank_size
+            if cand + size > bank_end:
+                cand = bank_end
+                if alignment > 1:
+                    cand = (cand + alignment - 1) // alignment * alignment
+        return cand if cand + size <= end else None
+
+    def find(
+        self,
+        size: int,
+        alignment: int = 1,
+        strategy: str = "best",
+        bank: Optional[int] = None,
+        lo: Optional[int] = None,
+        hi: Optional[int] = None,
+        cross_banks: bool = True,
+    ) -> Optional[int]:
+        """
+        Procura um offset para size bytes, sem alocar.
+
+        Args:
+            size: Bytes necessarios
+            alignment: Alinhamento do offset
+            strategy: "best" (menor bloco que serve), "first" (menor endereco)
+                ou "last" (bloco de maior endereco)
+            bank: Restringe ao banco indicado (requer bank_size)
+            lo / hi: Restringe ao intervalo [lo, hi)
+            cross_banks: False impede que o bloco atravesse fronteira de banco
+
+        Returns:
+            Offset ou None
+        """
+        size = int(size)
+        alignment = max(1, int(alignment or 1))
+        if size <= 0 or not self._starts:
+            return None
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy invalida: {strategy}")
+        if bank is not None:
+            b_lo, b_hi = self._bank_range(int(bank))
+            lo = b_lo if lo is None else max(lo, b_lo)
+            hi = b_hi if hi is None else min(hi, b_hi)
+
+        def _fit(start: int) -> Optional[int]:
+            return self._place(start, self._ends[start], size, alignment, lo, hi, cross_banks)
+
+        if strategy == "best" and lo is None and hi is None:
+            # Menor bloco com tamanho >= size; alinhamento/banco podem
+            # invalidar o primeiro, entao segue para o proximo maior
+            i = bisect.bisect_left(self._by_size, (size, -1))
+            while i < len(self._by_size):
+                offset = _fit(self._by_size[i][1])
+                if offset is not None:
+                    return offset
+                i += 1
+            return None
+
+        if lo is None and hi is None:
+            candidates: List[int] = self._starts
+        else:
+            candidates = self._overlapping(
+                lo if lo is not None else 0,
+                hi if hi is not None else self._ends[self._starts[-1]],
+            )
+        if strategy == "first":
+            for start in candidates:
+                offset = _fit(start)
+                if offset is not None:
+                    return offset
+            return None
+        if strategy == "last":
+            for start in reversed(candidates):
+                offset = _fit(start)
+                if offset is not None:
+                    return offset
+            return None
+
+        best = None
+        for start in candidates:
+            offset = _fit(start)
+            if offset is None:
+                continue
+            usable = min(self._ends[start], hi if hi is not None else self._ends[start]) - \
+                max(start, lo if lo is not None else start)
+            if best is None or usable < best[0]:
+                best = (usable, offset)
+        return best[1] if best else None
+
+    def allocate(self, size: int, alignment: int = 1, strategy: str = "best", **constraints) -> Optional[int]:
+        """Como find(), mas retira o bloco da free-list."""
+        offset = self.find(size, alignment=alignment, strategy=strategy, **constraints)
+        if offset is not None:
+            self.reserve(offset, offset + int(size))
+        return offset
+
+    def copy(self) -> "FreeSpaceIndex":
+        """Copia independente (para planejar sem tocar a free-list real)."""
+        clone = FreeSpaceIndex(bank_size=self.bank_size)
+        clone._starts = list(self._starts)
+        clone._ends = dict(self._ends)
+        clone._by_size = list(self._by_size)
+        return clone
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def blocks(self) -> List[Tuple[int, int]]:
+        """Blocos livres [(start, end), ...] por endereco."""
+        return [(s, self._ends[s]) for s in self._starts]
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, offset: int) -> bool:
+        i = bisect.bisect_right(self._starts, int(offset)) - 1
+        return i >= 0 and self._ends[self._starts[i]] > int(offset)
+
+    def largest(self) -> int:
+        return self._by_size[-1][0] if self._by_size else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estatisticas de fragmentacao.
+
+        fragmentation = 1 - maior_bloco / total_livre (0 = um bloco so;
+        perto de 1 = livre pulverizado em buracos pequenos).
+        """
+        total = sum(size for size, _ in self._by_size)
+        largest = self.largest()
+        return {
+            'free_bytes': total,
+            'free_blocks': len(self._by_size),
+            'largest_block': largest,
+            'smallest_block': self._by_size[0][0] if self._by_size else 0,
+            'fragmentation': round(1.0 - largest / total, 4) if total else 0.0,
+        }
+
+
 class FreeSpaceAllocator:
     """
     Gerenciador de alocacao de espaco livre para realocacao de textos.
@@ -68,7 +350,9 @@ class FreeSpaceAllocator:
     2. Tenta regioes default do profile do console
     3. Se expansion_allowed, expande ROM e aloca no novo espaco
 
-    Todas as alocacoes sao registradas para auditoria.
+    Todas as alocacoes sao registradas para auditoria. Cada fonte tem um
+    FreeSpaceIndex (varrido na primeira alocacao), entao buracos liberados
+    sao reaproveitados e nao ha nova varredura de bytes por alocacao.
     """
 
     CONFIG_PATH = Path(__file__).parent.parent / "config" / "free_space_profiles.json"
@@ -78,7 +362,8 @@ class FreeSpaceAllocator:
         rom_data: bytearray,
         console: str,
         user_regions: Optional[List[Dict]] = None,
-        fill_byte: Optional[int] = None
+        fill_byte: Optional[int] = None,
+        strategy: str = "best"
     ):
         """
         Inicializa o alocador.
@@ -89,6 +374,7 @@ class FreeSpaceAllocator:
             user_regions: Regioes livres definidas pelo usuario
                           [{"start": 0x1000, "end": 0x2000, "comment": "..."}, ...]
             fill_byte: Byte de preenchimento (override do profile)
+            strategy: "best", "first" ou "last" (ver FreeSpaceIndex.find)
         """
         self.rom_data = rom_data
         self.console = console.upper()
@@ -101,8 +387,14 @@ class FreeSpaceAllocator:
         if fill_byte is not None:
             self.profile['fill_byte'] = fill_byte
 
+        if strategy not in FreeSpaceIndex.STRATEGIES:
+            raise ValueError(f"strategy invalida: {strategy}")
+        self.strategy = strategy
+
         # Inicializa regioes
         self.regions: List[FreeRegion] = []
+        # Free-list por fonte ("user", "default", "expansion")
+        self._indexes: Dict[str, FreeSpaceIndex] = {}
         self._init_regions(user_regions)
 
         # Registro de alocacoes
@@ -181,7 +473,8 @@ class FreeSpaceAllocator:
         self,
         size: int,
         alignment: Optional[int] = None,
-        item_uid: str = ""
+        item_uid: str = "",
+        bank: Optional[int] = None
     ) -> Optional[int]:
         """
         Aloca espaco para um bloco de dados.
@@ -190,6 +483,8 @@ class FreeSpaceAllocator:
             size: Tamanho necessario em bytes
             alignment: Alinhamento do offset (default: profile alignment)
             item_uid: Identificador do item (para auditoria)
+            bank: Restringe a alocacao a um banco (bank_size do profile);
+                  nesse caso nao ha expansao
 
         Returns:
             Offset alocado ou None se falhar
@@ -201,21 +496,27 @@ class FreeSpaceAllocator:
             alignment = self.profile.get('alignment', 1)
 
         # Estrategia 1: Tentar regioes do usuario
-        offset = self._try_allocate_from_regions(size, alignment, 'user')
+        offset = self._try_allocate_from_regions(size, alignment, 'user', bank)
         if offset is not None:
             self._register_allocation(offset, size, alignment, item_uid, 'user')
             self.stats['user_region_allocations'] += 1
             return offset
 
         # Estrategia 2: Tentar regioes default
-        offset = self._try_allocate_from_regions(size, alignment, 'default')
+        offset = self._try_allocate_from_regions(size, alignment, 'default', bank)
         if offset is not None:
             self._register_allocation(offset, size, alignment, item_uid, 'default')
             self.stats['default_region_allocations'] += 1
             return offset
 
-        # Estrategia 3: Tentar expansao
-        if self.profile.get('expansion_allowed', False):
+        # Estrategia 3: Sobras de expansoes anteriores, depois nova expansao
+        offset = self._try_allocate_from_regions(size, alignment, 'expansion', bank)
+        if offset is not None:
+            self._register_allocation(offset, size, alignment, item_uid, 'expansion')
+            self.stats['expansion_allocations'] += 1
+            return offset
+
+        if bank is None and self.profile.get('expansion_allowed', False):
             offset = self._try_expand_and_allocate(size, alignment, item_uid)
             if offset is not None:
                 self.stats['expansion_allocations'] += 1
@@ -225,42 +526,142 @@ class FreeSpaceAllocator:
         self.stats['failed_allocations'] += 1
         return None
 
+    def _index_for(self, source: str) -> FreeSpaceIndex:
+        """Free-list da fonte; varre os runs de fill_byte na primeira chamada."""
+        index = self._indexes.get(source)
+        if index is None:
+            index = FreeSpaceIndex.scan(
+                self.rom_data,
+                [(r.start, r.end) for r in self.regions if r.source == source],
+                fill_bytes=(self.profile.get('fill_byte', 0xFF),),
+                bank_size=self.profile.get('bank_size', 0),
+            )
+            self._indexes[source] = index
+        return index
+
+    def _region_at(self, offset: int) -> Optional[FreeRegion]:
+        for region in self.regions:
+            if region.start <= offset < region.end:
+                return region
+        return None
+
     def _try_allocate_from_regions(
         self,
         size: int,
         alignment: int,
-        source_filter: str
+        source_filter: str,
+        bank: Optional[int] = None
     ) -> Optional[int]:
         """Tenta alocar de regioes com source especifico."""
-        fill_byte = self.profile.get('fill_byte', 0xFF)
+        if not any(r.source == source_filter for r in self.regions):
+            return None
 
-        for region in self.regions:
-            if region.source != source_filter:
-                continue
+        offset = self._index_for(source_filter).allocate(
+            size, alignment=alignment, strategy=self.strategy, bank=bank
+        )
+        if offset is not None:
+            region = self._region_at(offset)
+            if region is not None:
+                region.used_bytes += size
+        return offset
 
-            if region.available < size:
-                continue
+    def free_lists(self) -> List[Tuple[str, FreeSpaceIndex]]:
+        """Copias das free-lists por fonte, em ordem de preferencia (para planejar)."""
+        return [
+            (source, self._index_for(source).copy())
+            for source in ('user', 'default', 'expansion')
+            if any(r.source == source for r in self.regions)
+        ]
+
+    def expansion_budget(self) -> Optional[Tuple[int, int]]:
+        """(inicio, bytes) de expansao ainda permitida pelo profile, ou None."""
+        if not self.profile.get('expansion_allowed', False):
+            return None
+        bank_size = self.profile.get('bank_size', 16384)
+        limit = self.profile.get('max_expansion_banks', 0) * bank_size
+        remaining = limit - (len(self.rom_data) - self.original_size)
+        return (len(self.rom_data), remaining) if remaining > 0 else None
 
-            # Calcula inicio disponivel (considerando bytes ja usados)
-            search_start = region.start + region.used_bytes
-            search_end = region.end
+    def allocate_at(
+        self,
+        offset: int,
+        size: int,
+        alignment: int = 1,
+        item_uid: str = ""
+    ) -> bool:
+        """
+        Aloca um offset escolhido fora do alocador (ex.: RelocationPlanner).
+
+        Offsets alem do fim da ROM expandem a ROM em bancos inteiros.
 
-            # Procura espaco livre
-            offset = find_free_space_in_range(
+        Returns:
+            True se [offset, offset+size) estava livre e foi reservado
+        """
+        if size <= 0 or offset < 0 or (alignment > 1 and offset % alignment):
+            return False
+
+        if offset + size > len(self.rom_data):
+            budget = self.expansion_budget()
+            if budget is None or offset + size > budget[0] + budget[1]:
+                return False
+            old_size, new_size = expand_rom_in_banks(
                 self.rom_data,
-                search_start,
-                search_end,
-                size,
-                patterns=(fill_byte,),
-                alignment=alignment,
-                safety_slack=0
+                self.profile.get('bank_size', 16384),
+                offset + size - len(self.rom_data),
+                fill=self.profile.get('fill_byte', 0xFF)
             )
+            # Estende a regiao de expansao contigua (um item pode cruzar bancos)
+            tail = next((r for r in self.regions if r.source == 'expansion' and r.end == old_size), None)
+            if tail is not None:
+                tail.end = new_size
+            else:
+                self.regions.append(FreeRegion(
+                    start=old_size,
+                    end=new_size,
+                    source='expansion',
+                    comment=f"ROM expansion (plan) 0x{old_size:06X}"
+                ))
+            self._index_for('expansion').add(old_size, new_size)
+            self.stats['expansion_bytes_added'] += new_size - old_size
+
+        region = self._region_at(offset)
+        if region is None or offset + size > region.end:
+            return False
+        index = self._index_for(region.source)
+        if index.find(size, strategy="first", lo=offset, hi=offset + size) != offset:
+            return False
+
+        index.reserve(offset, offset + size)
+        region.used_bytes += size
+        self._register_allocation(offset, size, alignment, item_uid, region.source)
+        stat_key = {
+            'user': 'user_region_allocations',
+            'default': 'default_region_allocations',
+        }.get(region.source, 'expansion_allocations')
+        self.stats[stat_key] += 1
+        return True
+
+    def free(self, offset: int, size: int, item_uid: str = "") -> bool:
+        """
+        Devolve uma alocacao (ou texto antigo realocado) ao espaco livre.
 
-            if offset is not None:
-                region.used_bytes += size
-                return offset
+        O bloco e coalescido com os vizinhos e pode ser reutilizado pelas
+        proximas alocacoes. So aceita bytes dentro das regioes configuradas.
 
-        return None
+        Returns:
+            True se o bloco foi devolvido
+        """
+        region = self._region_at(offset)
+        if region is None or offset + size > region.end or size <= 0:
+            return False
+        self._index_for(region.source).free(offset, size)
+        region.used_bytes = max(0, region.used_bytes - size)
+        self.allocations = [
+            a for a in self.allocations
+            if not (a.offset == offset and a.size == size and (not item_uid or a.item_uid == item_uid))
+        ]
+        self.stats['total_allocated'] = max(0, self.stats['total_allocated'] - size)
+        return True
 
     def _try_expand_and_allocate(
         self,
@@ -302,7 +703,7 @@ class FreeSpaceAllocator:
         if alignment > 1:
             offset = (offset + alignment - 1) & ~(alignment - 1)
 
-        # Cria regiao para o novo espaco
+        # Cria regiao para o novo espaco; a sobra fica na free-list
         self.regions.append(FreeRegion(
             start=old_size,
             end=new_size,
@@ -310,6 +711,9 @@ class FreeSpaceAllocator:
             comment=f"ROM expansion {banks_added + 1}",
             used_bytes=size
         ))
+        index = self._index_for('expansion')
+        index.add(old_size, new_size)
+        index.reserve(offset, offset + size)
 
         self._register_allocation(offset, size, alignment, item_uid, 'expansion')
         return offset
@@ -352,6 +756,14 @@ class FreeSpaceAllocator:
         """Retorna lista de alocacoes para incluir no mapping."""
         return [a.to_dict() for a in self.allocations]
 
+    def get_fragmentation_stats(self) -> Dict[str, Any]:
+        """Fragmentacao do espaco livre (todas as fontes ja indexadas)."""
+        merged = FreeSpaceIndex()
+        for index in self._indexes.values():
+            for start, end in index.blocks():
+                merged.add(start, end)
+        return merged.stats()
+
     def get_stats(self) -> dict:
         """Retorna estatisticas de alocacao."""
         return {
@@ -359,7 +771,9 @@ class FreeSpaceAllocator:
             'original_rom_size': self.original_size,
             'current_rom_size': len(self.rom_data),
             'total_regions': len(self.regions),
-            'total_allocations': len(self.allocations)
+            'total_allocations': len(self.allocations),
+            'strategy': self.strategy,
+            'fragmentation': self.get_fragmentation_stats()
         }
 
     def check_overlap(self) -> List[Tuple[Allocation, Allocation]]:
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+FUZZY TRANSLATION MEMORY - Busca Aproximada na Memória de Tradução
+================================================================================
+Reaproveita traduções de strings quase idênticas (comum em scripts de RPG):
+- "You got 5 Gold" ~ "You got 12 Gold"
+- "<0A>Welcome!" ~ "<0B>Welcome!"
+
+Números e placeholders/códigos de controle viram slots no template da
+fonte; templates são indexados por MinHash de n-gramas de caracteres com
+LSH em bandas. Candidatos são confirmados pelo Jaccard exato dos n-gramas
+e a tradução anterior recebe de volta os números/placeholders da nova
+fonte (se algum slot não puder ser re-substituído, o candidato é
+descartado).
+
+Só o template idêntico (texto fora dos slots igual após normalização) é
+aplicável direto (auto_apply=True). Vizinhos por Jaccard são apenas
+sugestões: n-gramas não enxergam negação/antônimos ("give him" ~ "do not
+give him", "eastern" ~ "western"), então precisam passar por tradução/QA.
+================================================================================
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+# Placeholders/códigos de controle (mesma família do QA gate) e números
+SLOT_TOKEN_RE = re.compile(
+    r"(<TILE:[0-9A-Fa-f]{2}>|<[0-9A-Fa-f]{2}>|%\d*[dsxX]|\{[A-Za-z0-9_:-]+\}|\[[A-Za-z0-9_:-]+\]|@[A-Za-z0-9_]+)"
+    r"|(\d+)"
+)
+
+PLACEHOLDER_MARK = "\ue000"
+NUMBER_MARK = "\ue001"
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_NUM_PERM = 32
+DEFAULT_BANDS = 8
+DEFAULT_NGRAM = 3
+
+# Primo > 2**32 para o hash universal (a*h + b) mod P
+_PRIME = 4294967311
+
+
+@dataclass
+class FuzzyMatch:
+    """Tradução anterior adaptada à nova fonte."""
+    source: str
+    matched_source: str
+    translation: str
+    score: float
+    auto_apply: bool = False  # True só com template idêntico
+
+
+def mask_slots(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Substitui placeholders e números por marcadores.
+
+    Returns:
+        (template canônico, [(tipo 'P'|'N', valor original), ...])
+    """
+    slots: List[Tuple[str, str]] = []
+
+    def _repl(match: "re.Match") -> str:
+        if match.group(1) is not None:
+            slots.append(("P", match.group(1)))
+            return PLACEHOLDER_MARK
+        slots.append(("N", match.group(2)))
+        return NUMBER_MARK
+
+    template = SLOT_TOKEN_RE.sub(_repl, str(text or ""))
+    template = unicodedata.normalize("NFC", template).casefold()
+    template = re.sub(r"\s+", " ", template).strip()
+    return template, slots
+
+
+def resubstitute(
+    translation: str,
+    old_slots: Sequence[Tuple[str, str]],
+    new_slots: Sequence[Tuple[str, str]],
+) -> Optional[str]:
+    """
+    Troca, na tradução anterior, os valores dos slots da fonte antiga pelos
+    da nova fonte. None se os tipos de slot divergem ou se um slot alterado
+    não aparece na tradução.
+    """
+    if [k for k, _ in old_slots] != [k for k, _ in new_slots]:
+        return None
+
+    # Ocorrências de cada (tipo, valor) da fonte antiga, em ordem
+    pending: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for idx, slot in enumerate(old_slots):
+        pending[slot].append(idx)
+
+    parts: List[str] = []
+    used: Set[int] = set()
+    last = 0
+    for match in SLOT_TOKEN_RE.finditer(translation):
+        slot = ("P", match.group(1)) if match.group(1) is not None else ("N", match.group(2))
+        queue = pending.get(slot)
+        if not queue:
+            continue
+        idx = queue.pop(0)
+        used.add(idx)
+        parts.append(translation[last:match.start()])
+        parts.append(new_slots[idx][1])
+        last = match.end()
+    parts.append(translation[last:])
+
+    for idx, (old, new) in enumerate(zip(old_slots, new_slots)):
+        if idx not in used and old[1] != new[1]:
+            return None
+    return "".join(parts)
+
+
+def _shingles(template: str, n: int) -> Set[str]:
+    if len(template) <= n:
+        return {template}
+    return {template[i:i + n] for i in range(len(template) - n + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class FuzzyTranslationMemory:
+    """
+    Índice MinHash/LSH de fontes da memória de tradução.
+
+    Templates idênticos (após mascarar slots) são resolvidos por dicionário;
+    os demais passam pelas bandas LSH e pela confirmação por Jaccard.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        ngram: int = DEFAULT_NGRAM,
+    ):
+        """
+        Args:
+            threshold: Similaridade mínima (Jaccard dos n-gramas do template)
+            num_perm: Número de permutações MinHash
+            bands: Bandas LSH (num_perm deve ser múltiplo)
+            ngram: Tamanho dos n-gramas de caracteres
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) deve ser múltiplo de bands ({bands})")
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self.ngram = int(ngram)
+
+        # Coeficientes fixos (32 bits): índice reprodutível entre execuções
+        state = 0x9E3779B97F4A7C15
+        coeffs = []
+        for _ in range(2 * self.num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+            coeffs.append(state >> 32)
+        self._a = [c | 1 for c in coeffs[0::2]]
+        self._b = coeffs[1::2]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)
+            self._b_np = np.array(self._b, dtype=np.uint64)
+
+        self._entries: List[Tuple[str, str, List[Tuple[str, str]], Set[str]]] = []
+        self._by_template: Dict[str, int] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_translation_memory(cls, tm, target_lang: Optional[str] = None, model: str = "",
+                                glossary_version: str = "", **kwargs) -> "FuzzyTranslationMemory":
+        """Indexa as entradas (com fonte conhecida) de um TranslationMemory."""
+        index = cls(**kwargs)
+        entries_kwargs = {"model": model, "glossary_version": glossary_version}
+        if target_lang is not None:
+            entries_kwargs["target_lang"] = target_lang
+        index.add_many(tm.iter_entries(**entries_kwargs))
+        return index
+
+    def add(self, source: str, translation: str) -> bool:
+        """Indexa um par (fonte, tradução). False se vazio ou template repetido."""
+        if not source or not translation:
+            return False
+        template, slots = mask_slots(source)
+        if not template or template in self._by_template:
+            return False
+        shingles = _shingles(template, self.ngram)
+        idx = len(self._entries)
+        self._entries.append((source, translation, slots, shingles))
+        self._by_template[template] = idx
+        signature = self._signature(shingles)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].append(idx)
+        return True
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Indexa vários pares; retorna quantos entraram."""
+        return sum(1 for source, translation in pairs if self.add(source, translation))
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def lookup(self, source: str, threshold: Optional[float] = None) -> Optional[FuzzyMatch]:
+        """
+        Melhor tradução anterior adaptada a `source`, ou None.
+
+        Só aplique direto quando match.auto_apply; o resto é sugestão.
+        """
+        limit = self.threshold if threshold is None else float(threshold)
+        template, slots = mask_slots(source)
+        if not template:
+            return None
+
+        exact = self._by_template.get(template)
+        if exact is not None:
+            match = self._adapt(source, exact, slots, 1.0)
+            if match is not None:
+                match.auto_apply = True
+                return match
+
+        shingles = _shingles(template, self.ngram)
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(self._signature(shingles))):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(exact)
+
+        scored = []
+        for idx in candidates:
+            score = _jaccard(shingles, self._entries[idx][3])
+            if score >= limit:
+                scored.append((score, -idx))
+        for score, neg_idx in sorted(scored, reverse=True):
+            match = self._adapt(source, -neg_idx, slots, score)
+            if match is not None:
+                return match
+        return None
+
+    def lookup_batch(self, sources: Sequence[str], threshold: Optional[float] = None) -> List[Optional[FuzzyMatch]]:
+        """lookup() para um lote (fontes repetidas consultadas uma vez)."""
+        memo: Dict[str, Optional[FuzzyMatch]] = {}
+        out: List[Optional[FuzzyMatch]] = []
+        for source in sources:
+            if source not in memo:
+                memo[source] = self.lookup(source, threshold)
+            out.append(memo[source])
+        return out
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _adapt(self, source: str, idx: int, slots, score: float) -> Optional[FuzzyMatch]:
+        old_source, translation, old_slots, _ = self._entries[idx]
+        adapted = resubstitute(translation, old_slots, slots)
+        if adapted is None:
+            return None
+        return FuzzyMatch(source=source, matched_source=old_source, translation=adapted, score=score)
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+        if np is not None:
+            h = np.array(hashes, dtype=np.uint64)[:, None]
+            values = (self._a_np[None, :] * h + self._b_np[None, :]) % np.uint64(_PRIME)
+            return values.min(axis=0).tolist()
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in zip(self._a, self._b)]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, ...]]:
+        r = self.rows
+        return [tuple(signature[i * r:(i + 1) * r]) for i in range(self.bands)]
@@ -10,10 +10,17 @@ License: MIT
 """
 
 import json
-import re
+import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+try:
+    from .glossary_matcher import GlossaryMatcher
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from glossary_matcher import GlossaryMatcher
+
 
 class GlossaryManager:
     """
@@ -43,6 +50,8 @@ class GlossaryManager:
         self.glossary_path = Path(glossary_path)
         self.glossaries: Dict[str, Dict[str, str]] = {}
         self.proper_nouns: Dict[str, str] = {}
+        # Matchers por par de idiomas; descartados quando o glossário muda
+        self._matchers: Dict[str, Tuple[GlossaryMatcher, Dict[str, int]]] = {}
         self._load_glossary()
 
     def _load_glossary(self) -> bool:
@@ -63,6 +72,7 @@ class GlossaryManager:
 
             # Carrega glossários por par de idiomas
             self.glossaries = data.get("glossary", {})
+            self._matchers.clear()
             self.proper_nouns = data.get("glossary", {}).get("proper_nouns", {})
 
             total_terms = sum(len(g) for g in self.glossaries.values())
@@ -126,23 +136,40 @@ class GlossaryManager:
         Returns:
             Tupla (texto_protegido, mapa_de_placeholders)
         """
-        glossary = self.get_glossary(language_pair)
+        matcher, term_index = self._get_matcher(language_pair)
+        if not matcher:
+            return text, {}
+
+        # Só protege termos que aparecem com a grafia exata do glossário;
+        # depois substitui todas as variações de caixa em uma passada.
+        present = {term for _, _, term, _ in matcher.finditer(text) if term in text}
         placeholders = {}
-        protected_text = text
 
-        # Ordena por comprimento decrescente (evita substituições parciais)
-        sorted_terms = sorted(glossary.keys(), key=len, reverse=True)
+        def _to_placeholder(_found: str, term: str) -> str:
+            placeholder = f"__GLOSSARY_TERM_{term_index[term]}__"
+            placeholders[placeholder] = self.glossaries[language_pair][term]
+            return placeholder
 
-        for idx, original_term in enumerate(sorted_terms):
-            if original_term in protected_text:
-                placeholder = f"__GLOSSARY_TERM_{idx}__"
-                placeholders[placeholder] = glossary[original_term]
-                # Case-insensitive replacement
-                pattern = re.compile(re.escape(original_term), re.IGNORECASE)
-                protected_text = pattern.sub(placeholder, protected_text)
+        protected_text, _ = matcher.replace(
+            text,
+            repl=_to_placeholder,
+            only=present.__contains__,
+        )
 
         return protected_text, placeholders
 
+    def _get_matcher(self, language_pair: str) -> Tuple[GlossaryMatcher, Dict[str, int]]:
+        """Matcher do par de idiomas (construído uma vez por versão do glossário)."""
+        cached = self._matchers.get(language_pair)
+        if cached is None:
+            glossary = self.get_glossary(language_pair)
+            # Índices estáveis: ordem por comprimento decrescente
+            sorted_terms = sorted(glossary.keys(), key=len, reverse=True)
+            term_index = {term: idx for idx, term in enumerate(sorted_terms)}
+            matcher = GlossaryMatcher({term: term for term in glossary})
+            cached = self._matchers[language_pair] = (matcher, term_index)
+        return cached
+
     def apply_post_translation(self, translated_text: str, placeholders: Dict[str, str]) -> str:
         """
         Aplica substituição de placeholders DEPOIS da tradução.
@@ -211,6 +238,7 @@ class GlossaryManager:
             self.glossaries[language_pair] = {}
 
         self.glossaries[language_pair][original] = translation
+        self._matchers.pop(language_pair, None)
 
         if save:
             self._save_glossary()
@@ -226,6 +254,7 @@ class GlossaryManager:
         """
         if language_pair in self.glossaries and original in self.glossaries[language_pair]:
             del self.glossaries[language_pair][original]
+            self._matchers.pop(language_pair, None)
 
             if save:
                 self._save_glossary()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+GLOSSARY MATCHER - Casamento de glossário em uma passada
+================================================================================
+Substitui o laço "uma regex por termo por string" (O(termos x strings)):
+- Todos os termos viram UMA regex em forma de trie (prefixos comuns
+  compartilhados, alternativas com primeiro caractere distinto), compilada
+  uma vez por versão do glossário e executada pelo motor C do `re`
+- Casamento mais à esquerda e mais longo (termo longo vence o prefixo curto,
+  com recuo para o curto se o longo violar a fronteira de palavra)
+- Fronteira de palavra opcional, por termo (bool ou predicado)
+- Substituição com preservação de caixa via callback
+- terms_in(): todos os termos contidos no texto (inclusive sobrepostos),
+  para checagens de gate
+
+Uso:
+    matcher = get_glossary_matcher(entries, version=mtime, word_boundaries=True)
+    out, n = matcher.replace(texto, repl=lambda achado, destino: destino)
+================================================================================
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_WORD_CHARS = "0-9A-Za-zÀ-ÖØ-öø-ÿ_"
+_MATCHER_CACHE_SIZE = 64
+
+Boundary = Union[bool, Callable[[str], bool]]
+
+
+def _fold(text: str) -> str:
+    return text.lower()
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex de um nó da trie; '' marca fim de termo (opcional e guloso)."""
+    alternatives: List[str] = []
+    leaves: List[str] = []
+    for ch in sorted(k for k in node if k):
+        child = node[ch]
+        if len(child) == 1 and "" in child:
+            leaves.append(ch)
+        else:
+            alternatives.append(re.escape(ch) + _trie_pattern(child))
+    if leaves:
+        if len(leaves) == 1:
+            alternatives.append(re.escape(leaves[0]))
+        else:
+            alternatives.append("[" + "".join(re.escape(c) for c in leaves) + "]")
+    if not alternatives:
+        return ""
+    if len(alternatives) == 1 and "" not in node:
+        return alternatives[0]
+    group = "(?:" + "|".join(alternatives) + ")"
+    return group + "?" if "" in node else group
+
+
+def build_trie_regex(terms: Iterable[str]) -> str:
+    """Regex (sem flags) que casa qualquer um dos termos, o mais longo primeiro."""
+    root: Dict[str, Any] = {}
+    for term in terms:
+        if not term:
+            continue
+        node = root
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return _trie_pattern(root)
+
+
+class GlossaryMatcher:
+    """
+    Autômato de glossário (regex-trie) construído uma vez.
+
+    Args:
+        entries: {termo: valor} (valor livre: tradução, regra do gate, etc.)
+        ignore_case: Casamento sem diferenciar caixa
+        word_boundaries: True/False para todos, ou predicado por termo
+        word_chars: Classe de caracteres de palavra (conteúdo de [...])
+    """
+
+    def __init__(self,
+                 entries: Mapping[str, Any],
+                 ignore_case: bool = True,
+                 word_boundaries: Boundary = False,
+                 word_chars: str = DEFAULT_WORD_CHARS):
+        self.ignore_case = bool(ignore_case)
+        self.word_chars = word_chars
+        self._lookup: Dict[str, Tuple[str, Any]] = {}
+        self._order: Dict[str, int] = {}
+        bounded: List[str] = []
+        free: List[str] = []
+        for term, value in entries.items():
+            term = str(term or "")
+            if not term:
+                continue
+            key = self._key(term)
+            if key in self._lookup:
+                continue
+            self._lookup[key] = (term, value)
+            self._order[term] = len(self._order)
+            wants_boundary = word_boundaries(term) if callable(word_boundaries) else bool(word_boundaries)
+            (bounded if wants_boundary else free).append(key)
+
+        self._lengths = sorted({len(k) for k in self._lookup}, reverse=True)
+        flags = re.IGNORECASE if self.ignore_case else 0
+        parts: List[str] = []
+        if bounded:
+            parts.append(rf"(?<![{word_chars}])(?:{build_trie_regex(bounded)})(?![{word_chars}])")
+        if free:
+            parts.append(f"(?:{build_trie_regex(free)})")
+        self._regex = re.compile("|".join(parts), flags) if parts else None
+        # Sem fronteira, para terms_in(): termo mais longo em cada posição
+        all_keys = bounded + free
+        self._scan = re.compile(f"(?=({build_trie_regex(all_keys)}))", flags) if all_keys else None
+
+    def _key(self, text: str) -> str:
+        return _fold(text) if self.ignore_case else text
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def __bool__(self) -> bool:
+        return bool(self._lookup)
+
+    def lookup(self, matched: str) -> Optional[Tuple[str, Any]]:
+        """(termo, valor) de um trecho casado, ou None."""
+        return self._lookup.get(self._key(matched))
+
+    def order(self, term: str) -> int:
+        """Posição do termo no glossário de origem."""
+        return self._order.get(term, len(self._order))
+
+    def finditer(self, text: str) -> Iterable[Tuple[int, int, str, Any]]:
+        """(início, fim, termo, valor) sem sobreposição, da esquerda para a direita."""
+        if self._regex is None or not text:
+            return
+        for m in self._regex.finditer(text):
+            hit = self.lookup(m.group(0))
+            if hit is not None:
+                yield m.start(), m.end(), hit[0], hit[1]
+
+    def replace(self,
+                text: str,
+                repl: Optional[Callable[[str, Any], str]] = None,
+                only: Optional[Callable[[str], bool]] = None) -> Tuple[str, int]:
+        """
+        Substitui todas as ocorrências em uma passada.
+
+        Args:
+            text: Texto de entrada
+            repl: (trecho_casado, valor) -> substituto (default: str(valor))
+            only: Filtro opcional por termo (False = mantém o trecho)
+
+        Returns:
+            (texto, número de substituições)
+        """
+        if self._regex is None or not text:
+            return text, 0
+        count = 0
+
+        def _sub(m: "re.Match") -> str:
+            nonlocal count
+            found = m.group(0)
+            hit = self.lookup(found)
+            if hit is None or (only is not None and not only(hit[0])):
+                return found
+            count += 1
+            return repl(found, hit[1]) if repl is not None else str(hit[1])
+
+        return self._regex.sub(_sub, text), count
+
+    def terms_in(self, text: str) -> List[str]:
+        """Termos contidos no texto (substring, com sobreposição), na ordem do glossário."""
+        if self._scan is None or not text:
+            return []
+        found = set()
+        for m in self._scan.finditer(text):
+            longest = self._key(m.group(1))
+            for n in self._lengths:
+                if n > len(longest):
+                    continue
+                hit = self._lookup.get(longest[:n])
+                if hit is not None:
+                    found.add(hit[0])
+        return sorted(found, key=self.order)
+
+
+_cache: "OrderedDict[Hashable, GlossaryMatcher]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_glossary_matcher(entries: Mapping[str, Any],
+                         version: Hashable = None,
+                         ignore_case: bool = True,
+                         word_boundaries: Boundary = False,
+                         word_chars: str = DEFAULT_WORD_CHARS) -> GlossaryMatcher:
+    """
+    Matcher compartilhado por versão do glossário.
+
+    Args:
+        entries: {termo: valor}
+        version: Identifica o conteúdo (mtime, contador, hash). None = calcula
+            uma impressão digital dos termos/valores (O(termos) por chamada:
+            prefira passar a versão em laços quentes)
+        ignore_case / word_boundaries / word_chars: Ver GlossaryMatcher
+    """
+    if version is None:
+        version = hash(tuple((str(k), repr(v)) for k, v in entries.items()))
+    key = (version, ignore_case, word_boundaries, word_chars)
+    with _cache_lock:
+        matcher = _cache.get(key)
+        if matcher is not None:
+            _cache.move_to_end(key)
+            return matcher
+    matcher = GlossaryMatcher(entries, ignore_case=ignore_case,
+                              word_boundaries=word_boundaries, word_chars=word_chars)
+    with _cache_lock:
+        _cache[key] = matcher
+        while len(_cache) > _MATCHER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matcher
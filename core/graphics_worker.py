@@ -21,19 +21,29 @@ from collections import Counter
 from PIL import Image
 import numpy as np
 
+try:
+    from universal_kit.entropy_map import EntropyMap
+except Exception:
+    EntropyMap = None
+
 
 class GraphicsWorker:
     """Worker para análise forense e edição gráfica de ROMs."""
 
-    def __init__(self, rom_data: bytes):
+    def __init__(self, rom_data: bytes, rom_key: Optional[str] = None, rom_path: Optional[str] = None):
         """
         Initialize Graphics Worker.
 
         Args:
             rom_data: Raw ROM bytes
+            rom_key: ROM identity for this run (e.g. SHA-256), shares the
+                EntropyMap with the other stages
+            rom_path: ROM file (path/size/mtime identity when no rom_key)
         """
         self.rom_data = bytearray(rom_data)
         self.rom_size = len(rom_data)
+        self.rom_key = rom_key
+        self.rom_path = rom_path
 
         # Paletas padrão (SNES/NES/GB)
         self.palette_gb = [
@@ -421,6 +431,18 @@ class GraphicsWorker:
         results = []
         total_chunks = self.rom_size // chunk_size
 
+        if EntropyMap is not None:
+            # Compartilhado por rom_key/rom_path; sem identidade, só nesta instância
+            shared = EntropyMap.for_rom(self.rom_data, key=self.rom_key, path=self.rom_path)
+            for offset, entropy in shared.windows(chunk_size, end=total_chunks * chunk_size):
+                results.append({
+                    'offset': offset,
+                    'offset_hex': hex(offset),
+                    'entropy': entropy,
+                    'is_compressed': entropy > 7.8
+                })
+            return results
+
         for i in range(total_chunks):
             offset = i * chunk_size
             chunk = self.rom_data[offset:offset + chunk_size]
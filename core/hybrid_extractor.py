@@ -19,6 +19,11 @@ import re
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
+try:
+    from universal_kit.entropy_map import EntropyMap
+except Exception:
+    EntropyMap = None
+
 # Importa os dois extractors
 try:
     from ultimate_extractor_v9 import UltimateExtractorV9
@@ -79,8 +84,11 @@ class HybridExtractor:
         sample_size = min(65536, len(self.rom_data))
         sample = bytes(self.rom_data[:sample_size])
 
-        # Calcula entropia
-        entropy = self._calculate_entropy(sample)
+        # Calcula entropia (só a amostra: sem copiar nem indexar a ROM inteira)
+        if EntropyMap is not None:
+            entropy = EntropyMap(sample).region(0, sample_size)
+        else:
+            entropy = self._calculate_entropy(sample)
 
         # Procura por padrões ASCII
         ascii_pattern = re.compile(b'[\x20-\x7E]{10,}')
@@ -111,10 +119,9 @@ class HybridExtractor:
         print(f"\n🎮 Executando Profile B (V9 FORENSIC)...")
 
         try:
-            extractor = UltimateExtractorV9(str(self.rom_path))
-
-            # Extrai apenas método principal
-            texts = extractor.extract_profile_b_dictionary()
+            with UltimateExtractorV9(str(self.rom_path)) as extractor:
+                # Extrai apenas método principal
+                texts = extractor.extract_profile_b_dictionary()
 
             print(f"   ✅ Profile B: {len(texts)} strings")
             return texts
@@ -8,6 +8,7 @@ automaticamente muda para Ollama (lento mas ilimitado) quando quota esgotar.
 Autor: ROM Translation Framework v5.3
 """
 
+import functools
 import logging
 import os
 import re
@@ -17,8 +18,95 @@ import time
 from typing import List, Tuple, Optional, Dict, Any
 from enum import Enum
 
+try:
+    from .translation_dispatcher import get_dispatcher, run_job
+    from .ollama_client import get_coalescer, get_ollama_client
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from translation_dispatcher import get_dispatcher, run_job
+    from ollama_client import get_coalescer, get_ollama_client
+
+# Gates do modo SPECULATIVE (opcionais)
+try:
+    from .semantic_quality_gate import SemanticQualityGate
+    from .linguistic_qa import LinguisticQA
+except Exception:
+    try:
+        from semantic_quality_gate import SemanticQualityGate
+        from linguistic_qa import LinguisticQA
+    except Exception:
+        SemanticQualityGate = None
+        LinguisticQA = None
+
+try:
+    from .nllb_engine import get_nllb_engine, nllb_language_code
+except Exception:
+    try:
+        from nllb_engine import get_nllb_engine, nllb_language_code
+    except Exception:
+        get_nllb_engine = None
+        nllb_language_code = None
+
+# Agendamento por quota (opcional): adia lotes para a próxima janela
+try:
+    from .batch_queue_manager import Priority
+except Exception:
+    try:
+        from batch_queue_manager import Priority
+    except Exception:
+        Priority = None
+
 logger = logging.getLogger(__name__)
 
+# Prefixo estável do Ollama: system e options iguais em toda requisição
+# (mudar num_ctx recarrega o modelo; o KV cache do prefixo é reaproveitado)
+OLLAMA_SYSTEM_PROMPT = (
+    "Voce e tradutor profissional de jogos retro. "
+    "Responda apenas em portugues brasileiro, sem explicacoes."
+)
+OLLAMA_OPTIONS = {
+    "temperature": 0.0,
+    # Cobre um prompt coalescido (até OLLAMA_COALESCE_ITEMS linhas "id|||tradução");
+    # com 200 (limite antigo, de 1 texto) lotes longos seriam cortados e os itens faltantes
+    # cairiam no reenvio individual
+    "num_predict": 512,
+    "num_ctx": 1024,
+    "top_p": 0.9,
+    "repeat_penalty": 1.1,
+}
+OLLAMA_COALESCE_ITEMS = 8
+OLLAMA_ID_LINES_PREFIX = (
+    "Traduza cada linha para portugues brasileiro natural e curto.\n"
+    "- Nunca mantenha a frase inteira em ingles.\n"
+    "- Nao explique.\n"
+    "- Retorne SOMENTE linhas no formato id|||traducao.\n\n"
+)
+
+
+def _normalize_for_match(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", str(value or "").lower())
+
+
+def _clean_ollama_output(value: str) -> str:
+    cleaned = str(value or "").strip()
+    if "\n\n" in cleaned:
+        cleaned = cleaned.split("\n\n")[0].strip()
+    for prefix in [
+        "Translation:",
+        "Tradução:",
+        "Traducao:",
+        "Portuguese:",
+        "PT-BR:",
+        "Saída:",
+        "Saida:",
+    ]:
+        if cleaned.startswith(prefix):
+            cleaned = cleaned[len(prefix):].strip()
+    if cleaned.startswith(("\"", "“")) and cleaned.endswith(("\"", "”")):
+        cleaned = cleaned[1:-1].strip()
+    return cleaned
+
 
 class TranslationMode(Enum):
     """Modos de tradução disponíveis"""
@@ -26,6 +114,7 @@ class TranslationMode(Enum):
     OLLAMA = "ollama"
     AUTO = "auto"  # Fallback automático
     SMART = "smart"  # NOVO: Gemini para longos, Ollama para curtos (economiza quota)
+    SPECULATIVE = "speculative"  # Rascunho local + Gemini só para o que reprovar nos gates
 
 
 class HybridTranslator:
@@ -38,13 +127,18 @@ class HybridTranslator:
     3. Salva estatísticas de uso
     """
 
-    def __init__(self, api_key: str = None, prefer_gemini: bool = True):
+    def __init__(self, api_key: str = None, prefer_gemini: bool = True,
+                 quota_scheduler=None, deferred_queue=None):
         """
         Inicializa tradutor híbrido
 
         Args:
             api_key: Google Gemini API key (opcional)
             prefer_gemini: Se True, usa Gemini primeiro (mais rápido)
+            quota_scheduler: QuotaScheduler com as chaves Gemini (opcional)
+            deferred_queue: BatchQueueManager que recebe os lotes adiados;
+                com scheduler + fila, quota esgotada no modo AUTO adia o lote
+                para a próxima janela (run_deferred) em vez de ir ao Ollama
         """
         self.api_key = api_key
         self.prefer_gemini = prefer_gemini
@@ -58,12 +152,26 @@ class HybridTranslator:
             'ollama_failures': 0,
             'fallback_switches': 0,
             'total_texts_translated': 0,
-            'gemini_quota_saved': 0  # Textos que usaram Ollama para economizar Gemini
+            'gemini_quota_saved': 0,  # Textos que usaram Ollama para economizar Gemini
+            # Modo SPECULATIVE
+            'speculative_drafted': 0,
+            'speculative_accepted': 0,
+            'speculative_escalated': 0,
+            'speculative_remote_calls': 0,
+            'speculative_draft_seconds': 0.0,
+            'speculative_remote_seconds': 0.0,
+            # Agendamento por quota
+            'gemini_deferred_batches': 0,
+            'gemini_deferred_texts': 0,
         }
 
         # Flag: quota diária esgotada, não tenta mais Gemini nesta sessão
         self._gemini_daily_exhausted = False
 
+        self.quota_scheduler = quota_scheduler
+        self.deferred_queue = deferred_queue
+        self._deferred_language: Optional[str] = None
+
         # Configuração do modo SMART (economiza quota)
         self.smart_config = {
             'short_text_threshold': 50,  # Textos <= 50 chars vão para Ollama
@@ -71,6 +179,15 @@ class HybridTranslator:
             'menu_keywords': ['START', 'CONTINUE', 'OPTIONS', 'EXIT', 'SAVE', 'LOAD'],
         }
 
+        # Configuração do modo SPECULATIVE (rascunho local, verificação remota)
+        self.speculative_config = {
+            'draft_backend': 'ollama',  # 'ollama' ou 'nllb'
+            'escalation_batch_size': 20,  # Textos por chamada ao Gemini
+            'min_linguistic_quality': 0.7,  # LinguisticQA.min_quality
+            'strict_semantic': False,  # SemanticQualityGate.strict_mode
+        }
+        self._speculative_gates: Optional[Tuple[Any, Any]] = None
+
         # Importa módulos conforme disponível
         self.gemini_available = False
         self.ollama_available = False
@@ -229,6 +346,12 @@ class HybridTranslator:
             return self._translate_with_ollama(texts, target_language)
         elif mode == TranslationMode.SMART:
             return self._translate_smart(texts, target_language)
+        elif mode == TranslationMode.SPECULATIVE:
+            return self._translate_speculative(texts, target_language, _log_callback)
+
+        # Com scheduler: a quota decide entre enviar agora e adiar o lote
+        if self._scheduling_enabled() and self.prefer_gemini and self.gemini_available:
+            return self._translate_scheduled(texts, target_language, _log)
 
         # Se quota diária já esgotou, vai direto para Ollama
         if self._gemini_daily_exhausted and self.ollama_available:
@@ -331,6 +454,86 @@ class HybridTranslator:
 
         return texts, False, "❌ Nenhum serviço de tradução disponível. Configure a API Key do Gemini."
 
+    # ------------------------------------------------------------------
+    # Agendamento por quota (QuotaScheduler + BatchQueueManager)
+    # ------------------------------------------------------------------
+    def _scheduling_enabled(self) -> bool:
+        return self.quota_scheduler is not None and self.deferred_queue is not None and Priority is not None
+
+    def _translate_scheduled(
+        self,
+        texts: List[str],
+        target_language: str,
+        _log
+    ) -> Tuple[List[str], bool, Optional[str]]:
+        """Gemini com lease do scheduler; sem quota (prevista ou 429), adia o lote."""
+        lease = self.quota_scheduler.acquire(Priority.HIGH, backends=["gemini"])
+        if lease is None:
+            return self._defer_batch(texts, target_language, _log)
+
+        translations, success, error = texts, False, None
+        try:
+            translations, success, error = self._translate_with_gemini(
+                texts, target_language, api_key=lease.key.api_key or None
+            )
+        finally:
+            self.quota_scheduler.release(lease, success=bool(success), error=error)
+
+        err_lower = str(error or "").lower()
+        if not success and ("quota" in err_lower or "429" in err_lower or "resource_exhausted" in err_lower):
+            return self._defer_batch(texts, target_language, _log)
+        return translations, success, error
+
+    def _defer_batch(
+        self,
+        texts: List[str],
+        target_language: str,
+        _log
+    ) -> Tuple[List[str], bool, Optional[str]]:
+        """Coloca o lote na fila de adiados; devolve os originais com o aviso."""
+        wait = self.quota_scheduler.time_until_available(Priority.HIGH, backends=["gemini"])
+        batch_id = self.deferred_queue.add_batch(
+            list(texts),
+            priority=Priority.HIGH,
+            metadata={'target_language': target_language, 'deferred_by': 'hybrid_translator'},
+        )
+        self._deferred_language = target_language
+        self.stats['gemini_deferred_batches'] += 1
+        self.stats['gemini_deferred_texts'] += len(texts)
+        when = f" (~{wait / 60:.0f} min)" if wait else ""
+        msg = f"Quota do Gemini esgotada: batch #{batch_id} adiado para a próxima janela{when}"
+        _log(f"[DEFER] {msg}")
+        return list(texts), False, msg
+
+    def run_deferred(self, max_wait: Optional[float] = None, wait: bool = True):
+        """
+        Processa os lotes adiados quando a quota voltar.
+
+        Args:
+            max_wait: Espera máxima por chave (default: até o próximo reset diário)
+            wait: Bloqueia até a fila terminar
+        """
+        if not self._scheduling_enabled():
+            return
+        if max_wait is None:
+            max_wait = self.quota_scheduler.predict_reset() + 60.0
+        target_language = self._deferred_language or "Portuguese (Brazil)"
+
+        def gemini_lane(texts, key):
+            return self._translate_with_gemini(texts, target_language, api_key=key.api_key or None)
+
+        queue = self.deferred_queue
+        queue.start_scheduled({"gemini": gemini_lane}, self.quota_scheduler, max_wait=max_wait)
+        if not wait:
+            return
+        for thread in list(queue.worker_threads):
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+                if queue.is_paused:
+                    # Nenhuma chave dentro de max_wait: os lotes ficam na fila
+                    queue.stop()
+                    return
+
     def _classify_text(self, text: str) -> str:
         """
         Classifica texto para decidir qual tradutor usar.
@@ -451,16 +654,146 @@ class HybridTranslator:
         error_msg = "; ".join(errors) if errors else None
         return translations, all_success, error_msg
 
-    def _translate_with_gemini(
+    def _get_speculative_gates(self) -> Tuple[Any, Any]:
+        """(SemanticQualityGate, LinguisticQA) do modo SPECULATIVE (criados uma vez)."""
+        if self._speculative_gates is None:
+            cfg = self.speculative_config
+            semantic = SemanticQualityGate(strict_mode=cfg['strict_semantic']) if SemanticQualityGate else None
+            linguistic = LinguisticQA(min_quality=cfg['min_linguistic_quality']) if LinguisticQA else None
+            self._speculative_gates = (semantic, linguistic)
+        return self._speculative_gates
+
+    def _draft_passes(self, index: int, source: str, draft: str) -> bool:
+        """Rascunho aprovado pelos dois gates (vazio/igual ao original reprova)."""
+        src = str(source or "").strip()
+        dst = str(draft or "").strip()
+        if not dst:
+            return False
+        if _normalize_for_match(dst) == _normalize_for_match(src) and any(ch.isalpha() for ch in src):
+            return False
+        semantic, linguistic = self._get_speculative_gates()
+        try:
+            if semantic is not None and semantic.evaluate(src, dst).get('blocked', False):
+                return False
+            if linguistic is not None and not linguistic.assess(str(index), src, dst).passed:
+                return False
+        except Exception as e:
+            logger.warning(f"⚠️ Gate do rascunho falhou ({e}) - escalando")
+            return False
+        return True
+
+    def _draft_with_local_model(
         self,
         texts: List[str],
         target_language: str
+    ) -> Optional[List[str]]:
+        """Rascunhos do modelo local (NLLB ou Ollama); None se nenhum disponível."""
+        backend = self.speculative_config['draft_backend']
+        if backend == 'nllb' and get_nllb_engine is not None:
+            tgt_lang = nllb_language_code(target_language)
+            if tgt_lang is None:
+                logger.warning(f"⚠️ Idioma '{target_language}' sem código NLLB - sem rascunho NLLB")
+            else:
+                try:
+                    drafts = get_nllb_engine().translate_batch(texts, tgt_lang=tgt_lang)
+                    return [d or '' for d in drafts]
+                except Exception as e:
+                    logger.warning(f"⚠️ NLLB indisponível para rascunho: {e}")
+        if self.ollama_available:
+            drafts, _success, _error = self._translate_with_ollama(texts, target_language)
+            return [d if d is not None else '' for d in drafts]
+        return None
+
+    def _translate_speculative(
+        self,
+        texts: List[str],
+        target_language: str,
+        _log_callback=None
     ) -> Tuple[List[str], bool, Optional[str]]:
-        """Traduz usando Google Gemini"""
+        """
+        Modo SPECULATIVE: rascunho local para tudo, Gemini só para o que reprovar.
+
+        1. Modelo local (Ollama ou NLLB) traduz todos os textos
+        2. SemanticQualityGate.evaluate + LinguisticQA.assess avaliam cada rascunho
+        3. Reprovados vão ao Gemini em lotes de escalation_batch_size
+        4. Se o Gemini falhar, fica o rascunho (ou o original, se não houver)
+        """
+        if not texts:
+            return [], True, None
+
+        def _log(msg):
+            if _log_callback:
+                _log_callback(msg)
+            logger.info(msg)
+
+        started = time.perf_counter()
+        drafts = self._draft_with_local_model(texts, target_language)
+        self.stats['speculative_draft_seconds'] += time.perf_counter() - started
+
+        # Sem modelo local, cada item conta como rascunho reprovado (a taxa
+        # de escalonamento reflete que tudo foi ao remoto)
+        self.stats['speculative_drafted'] += len(texts)
+        if drafts is None:
+            drafts = [''] * len(texts)
+            rejected = list(range(len(texts)))
+        else:
+            rejected = [i for i, (src, draft) in enumerate(zip(texts, drafts))
+                        if not self._draft_passes(i, src, draft)]
+            self.stats['speculative_accepted'] += len(texts) - len(rejected)
+            self.stats['gemini_quota_saved'] += len(texts) - len(rejected)
+
+        self.stats['speculative_escalated'] += len(rejected)
+
+        _log(f"📊 SPECULATIVE: {len(texts) - len(rejected)} rascunhos aprovados, "
+             f"{len(rejected)} para verificação remota")
+
+        translations = list(drafts)
+        all_success = True
+        errors = []
+        remote_ok = self.gemini_available and bool(self.api_key) and not self._gemini_daily_exhausted
+        batch_size = max(1, int(self.speculative_config['escalation_batch_size']))
+
+        for start in range(0, len(rejected), batch_size):
+            chunk = rejected[start:start + batch_size]
+            chunk_texts = [texts[i] for i in chunk]
+            result, success, error = (chunk_texts, False, "Gemini não disponível")
+            if remote_ok:
+                self.stats['speculative_remote_calls'] += 1
+                remote_started = time.perf_counter()
+                result, success, error = self._translate_with_gemini(chunk_texts, target_language)
+                self.stats['speculative_remote_seconds'] += time.perf_counter() - remote_started
+
+            if success:
+                for idx, trans in zip(chunk, result):
+                    translations[idx] = trans
+                continue
+
+            err_lower = str(error).lower()
+            if "quota" in err_lower or "429" in err_lower or "resource_exhausted" in err_lower:
+                # Quota esgotada: os lotes seguintes ficam com o rascunho
+                remote_ok = False
+            for idx in chunk:
+                if not str(translations[idx] or '').strip():
+                    translations[idx] = texts[idx]
+                    all_success = False
+            if error and f"Gemini: {error}" not in errors:
+                errors.append(f"Gemini: {error}")
+
+        error_msg = "; ".join(errors) if errors else None
+        return translations, all_success, error_msg
+
+    def _translate_with_gemini(
+        self,
+        texts: List[str],
+        target_language: str,
+        api_key: Optional[str] = None
+    ) -> Tuple[List[str], bool, Optional[str]]:
+        """Traduz usando Google Gemini (api_key: chave escolhida pelo scheduler)"""
         if not self.gemini_available:
             return texts, False, "Gemini não disponível"
 
-        if not self.api_key:
+        api_key = api_key or self.api_key
+        if not api_key:
             return texts, False, "API Key do Gemini não configurada"
 
         try:
@@ -470,7 +803,7 @@ class HybridTranslator:
 
             translations, success, error = gemini_api.translate_batch(
                 texts,
-                self.api_key,
+                api_key,
                 target_language
             )
 
@@ -501,65 +834,33 @@ class HybridTranslator:
             return texts, False, "Ollama não disponível"
 
         try:
-            import requests
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-
             model_name = str(model or self.ollama_model or "phi3:mini").strip()
             logger.info(f"⚡ Traduzindo {len(texts)} textos com Ollama ({model_name}) - MODO PARALELO...")
 
             translations = [None] * len(texts)  # Pré-aloca lista
+            client = get_ollama_client(
+                model_name, system=OLLAMA_SYSTEM_PROMPT, options=OLLAMA_OPTIONS, timeout=90,
+            )
 
-            def translate_single(index, text):
-                """Traduz um único texto"""
-                def _normalize_for_match(value: str) -> str:
-                    return re.sub(r"[^a-z0-9]+", "", str(value or "").lower())
-
-                def _clean_output(value: str) -> str:
-                    cleaned = str(value or "").strip()
-                    if "\n\n" in cleaned:
-                        cleaned = cleaned.split("\n\n")[0].strip()
-                    for prefix in [
-                        "Translation:",
-                        "Tradução:",
-                        "Traducao:",
-                        "Portuguese:",
-                        "PT-BR:",
-                        "Saída:",
-                        "Saida:",
-                    ]:
-                        if cleaned.startswith(prefix):
-                            cleaned = cleaned[len(prefix):].strip()
-                    if cleaned.startswith(("\"", "“")) and cleaned.endswith(("\"", "”")):
-                        cleaned = cleaned[1:-1].strip()
-                    return cleaned
-
-                def _request(prompt_text: str) -> str:
-                    payload = {
-                        "model": model_name,
-                        "prompt": prompt_text,
-                        "system": (
-                            "Voce e tradutor profissional de jogos retro. "
-                            "Responda apenas em portugues brasileiro, sem explicacoes."
-                        ),
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.0,
-                            "num_predict": 200,
-                            "num_ctx": 1024,
-                            "top_p": 0.9,
-                            "repeat_penalty": 1.1,
-                        },
-                    }
-                    response = requests.post(
-                        "http://127.0.0.1:11434/api/generate",
-                        json=payload,
-                        timeout=90,
-                    )
-                    if response.status_code != 200:
-                        return ""
-                    result = response.json() or {}
-                    return _clean_output(result.get("response", ""))
+            def _request(prompt_text: str) -> str:
+                try:
+                    return _clean_ollama_output(client.generate(prompt_text))
+                except Exception:
+                    return ""
+
+            def _usable(src: str, translation: str) -> bool:
+                if not translation:
+                    return False
+                if any(w in translation.lower() for w in ["translate", "rules:", "output only"]):
+                    return False
+                # Igual ao original: vai para o caminho individual (com retentativa)
+                return not (
+                    _normalize_for_match(translation) == _normalize_for_match(src)
+                    and any(ch.isalpha() for ch in src)
+                )
 
+            def translate_single(index, text, session=None):
+                """Traduz um único texto"""
                 try:
                     src = str(text or "").strip()
                     prompt = (
@@ -599,13 +900,34 @@ class HybridTranslator:
                 except Exception:
                     return index, str(text or "").strip() + "\n"
 
-            # 1 WORKER - proteção térmica para GTX 1060
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                futures = {executor.submit(translate_single, i, text): i for i, text in enumerate(texts)}
-
-                for future in as_completed(futures):
-                    index, translation = future.result()
-                    translations[index] = translation
+            # 1ª passada: textos de uma linha coalescidos em prompts multi-item
+            # (prefixo estável, sessão quente); multi-linha e o que não vier
+            # utilizável seguem pelo caminho individual abaixo
+            coalescer = get_coalescer(client, OLLAMA_ID_LINES_PREFIX, max_items=OLLAMA_COALESCE_ITEMS)
+            sources = [str(t or "").strip() for t in texts]
+            futures = {
+                i: coalescer.submit(src) for i, src in enumerate(sources) if len(src.splitlines()) <= 1
+            }
+            for i, future in futures.items():
+                try:
+                    got = _clean_ollama_output(future.result(timeout=180) or "")
+                except Exception:
+                    got = ""
+                # Mesma quantidade de linhas do original (id|||texto é uma linha por item)
+                if _usable(sources[i], got) and len(got.splitlines()) == 1:
+                    translations[i] = got + "\n"
+            pending = [i for i, t in enumerate(translations) if t is None]
+
+            # 1 WORKER - proteção térmica para GTX 1060 (limite compartilhado
+            # por todos os chamadores do backend "ollama" no processo)
+            if pending:
+                dispatcher = get_dispatcher()
+                dispatcher.ensure_backend("ollama", run_job)  # DEFAULT_BACKEND_LIMITS["ollama"]
+                jobs = [functools.partial(translate_single, i, texts[i]) for i in pending]
+                for res in dispatcher.run("ollama", jobs):
+                    if res.ok:
+                        index, translation = res.result
+                        translations[index] = translation
 
             # Verifica se traduziu tudo
             success = all(t is not None for t in translations)
@@ -633,8 +955,12 @@ class HybridTranslator:
         gemini_percent = (self.stats['gemini_requests'] / total_requests * 100) if total_requests > 0 else 0
         ollama_percent = (self.stats['ollama_requests'] / total_requests * 100) if total_requests > 0 else 0
 
+        drafted = self.stats['speculative_drafted']
+        escalation_rate = (self.stats['speculative_escalated'] / drafted) if drafted > 0 else 0.0
+
         return {
             **self.stats,
+            'speculative_escalation_rate': escalation_rate,
             'total_requests': total_requests,
             'gemini_percent': gemini_percent,
             'ollama_percent': ollama_percent,
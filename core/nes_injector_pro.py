@@ -37,6 +37,11 @@ from retro8_bank_tools import (
     detect_parallel_bank_table,
 )
 
+try:
+    from core.pointer_index import PointerIndex
+except Exception:
+    from pointer_index import PointerIndex
+
 try:
     from core.final_qa import evaluate_reinsertion_qa, write_qa_artifacts
 except Exception:
@@ -170,6 +175,7 @@ class NESInjectorPro:
         self.h = parse_ines_header(self.rom_data)
         self.source_crc32 = f"{zlib.crc32(bytes(self.rom_data)) & 0xFFFFFFFF:08X}"
         self.source_size = int(len(self.rom_data))
+        self._pointer_index: Optional[PointerIndex] = None
 
         self.bank_size = 0x4000  # 16KB PRG banks
         self.translation_runtime_info: Dict[str, Any] = {
@@ -367,31 +373,34 @@ class NESInjectorPro:
             return None
         return 0xC000 + (prg_offset - last_bank_start)
 
+    def _get_pointer_index(self) -> PointerIndex:
+        """Indice reverso 16-bit LE da ROM atual (reconstruido quando a ROM e remontada)."""
+        index = self._pointer_index
+        if index is None or index.rom_data is not self.rom_data:
+            index = PointerIndex(self.rom_data, sizes=(2,), endians=("little",))
+            self._pointer_index = index
+        return index
+
+    def _write_rom(self, offset: int, data: bytes) -> None:
+        """Escreve na ROM mantendo o indice de ponteiros atualizado."""
+        self.rom_data[offset : offset + len(data)] = data
+        if self._pointer_index is not None and self._pointer_index.rom_data is self.rom_data:
+            self._pointer_index.notify_write(offset, len(data))
+
     def _find_pointer_refs(self, prg_offset: int) -> List[PointerRef]:
         """Procura referencias de ponteiro para um offset PRG (sem header)."""
         prg_banks = max(1, self.h["prg_16k"])
         ptrs: List[PointerRef] = []
+        index = self._get_pointer_index()
 
         p8000 = self._expected_ptr_value_8000(prg_offset)
-        p8000_bytes = p8000.to_bytes(2, "little")
-        pos = 0
-        while True:
-            off = self.rom_data.find(p8000_bytes, pos)
-            if off < 0:
-                break
+        for off in index.sites(p8000, 2, "little"):
             ptrs.append(PointerRef(ptr_offset=off, table_start=None, index=None, mode="NES_8000"))
-            pos = off + 1
 
         pc000 = self._expected_ptr_value_c000_lastbank(prg_offset, prg_banks)
         if pc000 is not None:
-            pc000_bytes = int(pc000).to_bytes(2, "little")
-            pos = 0
-            while True:
-                off = self.rom_data.find(pc000_bytes, pos)
-                if off < 0:
-                    break
+            for off in index.sites(int(pc000), 2, "little"):
                 ptrs.append(PointerRef(ptr_offset=off, table_start=None, index=None, mode="NES_C000"))
-                pos = off + 1
 
         return ptrs
 
@@ -476,11 +485,11 @@ class NESInjectorPro:
 
             # 1) cabe in-place?
             if len(new_bytes) <= e.original_length:
-                self.rom_data[e.file_offset : e.file_offset + len(new_bytes)] = new_bytes
+                self._write_rom(e.file_offset, new_bytes)
                 # padding
                 pad = e.original_length - len(new_bytes)
                 if pad > 0:
-                    self.rom_data[e.file_offset + len(new_bytes) : e.file_offset + e.original_length] = b"\x00" * pad
+                    self._write_rom(e.file_offset + len(new_bytes), b"\x00" * pad)
                 stats["modified"] += 1
                 continue
 
@@ -537,7 +546,7 @@ class NESInjectorPro:
                 prg_banks += added_banks
                 self.h["prg_16k"] = prg_banks
                 self.h["prg_size"] = prg_banks * self.bank_size
-                self.rom_data[4] = prg_banks & 0xFF
+                self._write_rom(4, bytes([prg_banks & 0xFF]))
 
                 stats["rom_expanded"] += added_banks
 
@@ -545,10 +554,10 @@ class NESInjectorPro:
 
             else:
                 # escreve dentro do mesmo bank
-                self.rom_data[new_file_offset : new_file_offset + len(new_bytes)] = new_bytes
+                self._write_rom(new_file_offset, new_bytes)
 
             # limpa texto antigo (evita lixo na comparacao + reduz risco de leituras erradas)
-            self.rom_data[e.file_offset : e.file_offset + e.original_length] = b"\x00" * e.original_length
+            self._write_rom(e.file_offset, b"\x00" * e.original_length)
 
             # atualiza ponteiros
             ptr_refs = self._find_pointer_refs(prg_off)
@@ -573,7 +582,7 @@ class NESInjectorPro:
 
             for pref in ptr_refs:
                 # atualiza 16-bit ponteiro
-                self.rom_data[pref.ptr_offset : pref.ptr_offset + 2] = new_ptr_val_8000.to_bytes(2, "little")
+                self._write_rom(pref.ptr_offset, new_ptr_val_8000.to_bytes(2, "little"))
                 stats["pointers_updated"] += 1
 
                 # se cruzou bank, tenta atualizar bank table
@@ -609,7 +618,7 @@ class NESInjectorPro:
 
                     bt = bank_table_cache.get(pref.table_start)
                     if bt is not None:
-                        self.rom_data[bt + pref.index] = new_bank & 0xFF
+                        self._write_rom(bt + pref.index, bytes([new_bank & 0xFF]))
                         stats["bank_table_updates"] += 1
 
             stats["relocated"] += 1
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+NLLB ENGINE - Tradução offline em lote (NLLB-200 via transformers)
+================================================================================
+Caminho offline para máquinas só com CPU:
+- Modelo carregado uma vez por processo (get_nllb_engine)
+- Entradas tokenizadas uma vez, ordenadas por tamanho e agrupadas em
+  baldes: cada lote é preenchido (padding) só até o maior item do lote,
+  com orçamento de tokens (itens * maior comprimento) por lote
+- Quantização dinâmica int8 opcional das camadas Linear (CPU)
+- Textos repetidos na mesma chamada são gerados uma vez
+
+Interface igual às engines de translation_engine.py: translate(text)
+devolve a tradução ou None (vazia/igual ao original).
+================================================================================
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+NLLB_MODEL_NAME = "facebook/nllb-200-distilled-600M"
+DEFAULT_SRC_LANG = "eng_Latn"
+DEFAULT_TGT_LANG = "por_Latn"
+
+# Rótulos de idioma (UI/config, nome nativo ou em inglês) -> código NLLB
+LANGUAGE_NAME_CODES = [
+    ("portugu", "por_Latn"),
+    ("english", "eng_Latn"),
+    ("español", "spa_Latn"), ("spanish", "spa_Latn"),
+    ("français", "fra_Latn"), ("french", "fra_Latn"),
+    ("deutsch", "deu_Latn"), ("german", "deu_Latn"),
+    ("italian", "ita_Latn"),
+    ("日本語", "jpn_Jpan"), ("japanese", "jpn_Jpan"),
+    ("한국어", "kor_Hang"), ("korean", "kor_Hang"),
+    ("中文", "zho_Hans"), ("chinese", "zho_Hans"),
+    ("рус", "rus_Cyrl"), ("russian", "rus_Cyrl"),
+    ("العربية", "arb_Arab"), ("arabic", "arb_Arab"),
+    ("हिन्दी", "hin_Deva"), ("hindi", "hin_Deva"),
+    ("türkçe", "tur_Latn"), ("turkish", "tur_Latn"),
+    ("polski", "pol_Latn"), ("polish", "pol_Latn"),
+    ("nederlands", "nld_Latn"), ("dutch", "nld_Latn"),
+]
+LANGUAGE_ISO_CODES = {
+    "pt": "por_Latn", "en": "eng_Latn", "es": "spa_Latn", "fr": "fra_Latn",
+    "de": "deu_Latn", "it": "ita_Latn", "ja": "jpn_Jpan", "ko": "kor_Hang",
+    "zh": "zho_Hans", "ru": "rus_Cyrl", "ar": "arb_Arab", "hi": "hin_Deva",
+    "tr": "tur_Latn", "pl": "pol_Latn", "nl": "nld_Latn",
+}
+_NLLB_CODE_RE = re.compile(r"^[a-z]{3}_[A-Z][a-z]{3}$")
+
+
+def nllb_language_code(language: str) -> Optional[str]:
+    """
+    Código NLLB para um idioma ("Português (Brasil)", "pt-BR", "por_Latn"...).
+
+    Returns:
+        Código NLLB, ou None se o idioma não for reconhecido
+    """
+    lang = str(language or "").strip()
+    if _NLLB_CODE_RE.match(lang):
+        return lang
+    low = lang.lower()
+    iso = re.split(r"[-_]", low)[0]
+    if iso in LANGUAGE_ISO_CODES and len(low) <= 5:
+        return LANGUAGE_ISO_CODES[iso]
+    for key, code in LANGUAGE_NAME_CODES:
+        if key in low:
+            return code
+    return None
+
+
+def plan_batches(lengths: Sequence[int], max_tokens: int, max_batch: int) -> List[List[int]]:
+    """
+    Agrupa índices por comprimento (maior primeiro) em lotes cujo custo com
+    padding (itens * maior comprimento do lote) cabe em `max_tokens`.
+
+    Args:
+        lengths: Comprimento em tokens de cada entrada
+        max_tokens: Orçamento de tokens com padding por lote
+        max_batch: Máximo de itens por lote
+
+    Returns:
+        Lista de lotes (listas de índices de `lengths`)
+    """
+    order = sorted(range(len(lengths)), key=lambda i: (-lengths[i], i))
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    batch_max = 0
+    for idx in order:
+        n = max(1, int(lengths[idx]))
+        width = max(batch_max, n)
+        if batch and (len(batch) >= max_batch or (len(batch) + 1) * width > max_tokens):
+            batches.append(batch)
+            batch, width = [], n
+        batch.append(idx)
+        batch_max = width
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class NLLBEngine:
+    """
+    Engine NLLB-200 com lotes por comprimento e padding dinâmico.
+
+    Uso:
+        engine = get_nllb_engine(quantize_int8=True)
+        traducoes = engine.translate_many(linhas)          # textos crus
+        traducao = engine.translate("Open the door")       # None se falhar
+    """
+
+    def __init__(
+        self,
+        model_name: str = NLLB_MODEL_NAME,
+        src_lang: str = DEFAULT_SRC_LANG,
+        tgt_lang: str = DEFAULT_TGT_LANG,
+        device: Optional[str] = None,
+        quantize_int8: bool = False,
+        max_tokens_per_batch: int = 4096,
+        max_batch_size: int = 64,
+        max_length: int = 512,
+        max_new_tokens: int = 192,
+        length_ratio: float = 1.6,
+        num_beams: int = 1,
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Args:
+            model_name: Modelo transformers (NLLB-200)
+            src_lang / tgt_lang: Códigos NLLB (ex.: eng_Latn, por_Latn)
+            device: "cpu"/"cuda" (default: cuda se disponível)
+            quantize_int8: Quantização dinâmica int8 (só em CPU)
+            max_tokens_per_batch: Orçamento de tokens com padding por lote
+            max_batch_size: Máximo de textos por lote
+            max_length: Truncamento da entrada (tokens)
+            max_new_tokens: Teto de tokens gerados por texto
+            length_ratio: Saída estimada = entrada * ratio (limita a geração do lote)
+            num_beams: 1 = greedy (mais rápido)
+            num_threads: torch.set_num_threads (CPU)
+        """
+        self.model_name = model_name
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang
+        self.device = device
+        self.quantize_int8 = quantize_int8
+        self.max_tokens_per_batch = max(1, int(max_tokens_per_batch))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_length = int(max_length)
+        self.max_new_tokens = int(max_new_tokens)
+        self.length_ratio = float(length_ratio)
+        self.num_beams = max(1, int(num_beams))
+        self.num_threads = num_threads
+
+        self._tokenizer = None
+        self._model = None
+        self._torch = None
+        self._load_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.stats = {"texts": 0, "generated": 0, "batches": 0,
+                      "real_tokens": 0, "padded_tokens": 0, "seconds": 0.0}
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def runtime(self):
+        """(tokenizer, model, torch, device) já carregados."""
+        return self._tokenizer, self._model, self._torch, self.device
+
+    def load(self) -> "NLLBEngine":
+        """Carrega tokenizer/modelo (uma vez)."""
+        with self._load_lock:
+            if self._model is not None:
+                return self
+            try:
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                import torch
+            except ImportError as exc:
+                raise RuntimeError(
+                    "Dependências do NLLB ausentes. Instale: pip install transformers torch sentencepiece"
+                ) from exc
+
+            if self.num_threads:
+                torch.set_num_threads(int(self.num_threads))
+            if not self.device:
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            t0 = time.monotonic()
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name, src_lang=self.src_lang)
+            model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            model.eval()
+            if self.quantize_int8 and self.device == "cpu":
+                quantization = getattr(getattr(torch, "ao", None), "quantization", None) or torch.quantization
+                model = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            else:
+                model.to(self.device)
+
+            self._tokenizer, self._model, self._torch = tokenizer, model, torch
+            logger.info("NLLB carregado (%s, %s%s) em %.1fs", self.model_name, self.device,
+                        ", int8" if self.quantize_int8 and self.device == "cpu" else "",
+                        time.monotonic() - t0)
+        return self
+
+    # ------------------------------------------------------------------
+    # Geração
+    # ------------------------------------------------------------------
+    def _encode(self, texts: List[str]) -> List[List[int]]:
+        self._tokenizer.src_lang = self.src_lang
+        encoded = self._tokenizer(texts, truncation=True, max_length=self.max_length)
+        return [list(ids) for ids in encoded["input_ids"]]
+
+    def _generate(self, batch_ids: List[List[int]], tgt_lang: str) -> List[str]:
+        """Gera um lote já agrupado; padding só até o maior item do lote."""
+        tokenizer, torch = self._tokenizer, self._torch
+        features = [{"input_ids": ids, "attention_mask": [1] * len(ids)} for ids in batch_ids]
+        encoded = tokenizer.pad(features, padding="longest", return_tensors="pt")
+        encoded = {k: v.to(self.device) for k, v in encoded.items()}
+        longest = max(len(ids) for ids in batch_ids)
+        max_new = min(self.max_new_tokens, int(longest * self.length_ratio) + 16)
+        with torch.inference_mode():
+            generated = self._model.generate(
+                **encoded,
+                forced_bos_token_id=tokenizer.convert_tokens_to_ids(tgt_lang),
+                max_new_tokens=max_new,
+                num_beams=self.num_beams,
+                do_sample=False,
+            )
+        return [t.strip() for t in tokenizer.batch_decode(generated, skip_special_tokens=True)]
+
+    def translate_many(self, texts: Sequence[str], tgt_lang: Optional[str] = None) -> List[str]:
+        """
+        Traduz uma lista (ordem preservada). Textos vazios voltam vazios.
+
+        Args:
+            texts: Textos de entrada
+            tgt_lang: Código NLLB de destino (default: o da engine)
+
+        Returns:
+            Traduções, uma por texto
+        """
+        texts = [str(t or "").strip() for t in texts]
+        results = [""] * len(texts)
+        unique: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text:
+                unique.setdefault(text, []).append(i)
+        if not unique:
+            return results
+
+        self.load()
+        sources = list(unique)
+        tgt_lang = tgt_lang or self.tgt_lang
+        with self._run_lock:
+            t0 = time.monotonic()
+            ids = self._encode(sources)
+            lengths = [len(x) for x in ids]
+            for batch in plan_batches(lengths, self.max_tokens_per_batch, self.max_batch_size):
+                outputs = self._generate([ids[i] for i in batch], tgt_lang)
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"NLLB retornou {len(outputs)} linhas para {len(batch)} entradas")
+                for i, out in zip(batch, outputs):
+                    for pos in unique[sources[i]]:
+                        results[pos] = out
+                self.stats["batches"] += 1
+                self.stats["real_tokens"] += sum(lengths[i] for i in batch)
+                self.stats["padded_tokens"] += len(batch) * max(lengths[i] for i in batch)
+            self.stats["texts"] += len(texts)
+            self.stats["generated"] += len(sources)
+            self.stats["seconds"] += time.monotonic() - t0
+        return results
+
+    # ------------------------------------------------------------------
+    # Interface das engines (translation_engine.py)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _accept(source: str, translation: str) -> Optional[str]:
+        if not translation or translation.strip().lower() == str(source or "").strip().lower():
+            return None
+        return translation
+
+    def translate_batch(self, texts: Sequence[str], tgt_lang: Optional[str] = None) -> List[Optional[str]]:
+        """Como translate(), para uma lista (None onde falhou)."""
+        try:
+            outputs = self.translate_many(texts, tgt_lang=tgt_lang)
+        except Exception as e:
+            logger.error("NLLB exception: %s", e)
+            return [None] * len(texts)
+        return [self._accept(src, out) for src, out in zip(texts, outputs)]
+
+    def translate(self, text: str) -> Optional[str]:
+        """Tradução de um texto, ou None (vazia/igual ao original/erro)."""
+        return self.translate_batch([text])[0]
+
+    def padding_efficiency(self) -> float:
+        """Tokens reais / tokens processados com padding (1.0 = sem desperdício)."""
+        padded = self.stats["padded_tokens"]
+        return self.stats["real_tokens"] / padded if padded else 1.0
+
+
+_engines: Dict[Any, NLLBEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_nllb_engine(model_name: str = NLLB_MODEL_NAME, device: Optional[str] = None,
+                    quantize_int8: bool = False, **kwargs) -> NLLBEngine:
+    """Engine compartilhada por (modelo, device, int8): o modelo carrega uma vez."""
+    key = (model_name, device, bool(quantize_int8))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = NLLBEngine(model_name=model_name, device=device,
+                                                quantize_int8=quantize_int8, **kwargs)
+        return engine
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+OLLAMA CLIENT - Sessão quente por modelo, prefixo estável e coalescência
+================================================================================
+Camada única para as chamadas /api/generate do Ollama:
+- Uma sessão HTTP keep-alive por (servidor, modelo), com keep_alive no
+  payload para o modelo não ser descarregado entre lotes
+- Opções (num_ctx etc.) fixas por cliente: mudar num_ctx entre requisições
+  obriga o servidor a recarregar o modelo
+- Prompt = prefixo estável (regras, glossário, estilo) + corpo variável no
+  final, para o servidor reaproveitar o KV cache do prefixo; o quanto foi
+  reaproveitado aparece em prompt_eval_count (só tokens não cacheados)
+- OllamaCoalescer: pedidos pequenos e concorrentes (um texto cada) viram
+  um único prompt multi-item "id|||texto"; itens que a resposta não traz
+  são reenviados sozinhos
+
+Para benchmark offline, ver tools/ollama_stub_server.py.
+================================================================================
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:  # pragma: no cover
+    requests = None
+    HTTPAdapter = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://127.0.0.1:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+
+_ID_LINE_RE = re.compile(r"^\s*(\d+)\s*\|\|\|(.*)$")
+
+
+def parse_id_lines(raw: str) -> Dict[int, str]:
+    """Resposta "id|||traducao" por linha -> {id: traducao}."""
+    out: Dict[int, str] = {}
+    for line in str(raw or "").splitlines():
+        m = _ID_LINE_RE.match(line)
+        if m:
+            out[int(m.group(1))] = m.group(2).strip()
+    return out
+
+
+def format_id_lines(pairs: List[Tuple[int, str]]) -> str:
+    """[(id, texto)] -> bloco "id|||texto" (uma linha por item; texto sem quebras)."""
+    return "\n".join(f"{idx}|||{txt}" for idx, txt in pairs)
+
+
+class OllamaClient:
+    """
+    Cliente /api/generate com conexão e modelo mantidos quentes.
+
+    Uso:
+        client = get_ollama_client("llama3.2:latest", system=REGRAS)
+        texto = client.generate(corpo, prefix=INSTRUCOES_FIXAS)
+    """
+
+    def __init__(
+        self,
+        model: str,
+        base_url: str = DEFAULT_BASE_URL,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[str] = DEFAULT_KEEP_ALIVE,
+        timeout: float = 120.0,
+        pool_size: int = 4,
+    ):
+        """
+        Args:
+            model: Nome do modelo no Ollama
+            base_url: Servidor Ollama (sem /api/...)
+            system: System prompt estável (parte do prefixo cacheado)
+            options: Opções do modelo, fixas para todas as requisições
+            keep_alive: Tempo que o servidor mantém o modelo carregado
+            timeout: Timeout padrão (s)
+            pool_size: Conexões HTTP mantidas abertas
+        """
+        if requests is None:
+            raise RuntimeError("requests não instalado")
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.system = system
+        self.options = dict(options or {})
+        self.keep_alive = keep_alive
+        self.timeout = float(timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(pool_size)), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "prompt_tokens": 0,       # Tokens de prompt avaliados (fora do cache)
+            "output_tokens": 0,
+            "seconds": 0.0,
+        }
+
+    def generate(
+        self,
+        body: str,
+        prefix: str = "",
+        timeout: Optional[float] = None,
+        temperature: Optional[float] = None,
+        system: Optional[str] = None,
+    ) -> str:
+        """
+        Gera resposta para `prefix + body`.
+
+        Args:
+            body: Parte variável (vai no final do prompt)
+            prefix: Instruções estáveis (mesmo texto a cada chamada)
+            timeout: Timeout desta chamada (default: do cliente)
+            temperature: Sobrescreve options['temperature']
+            system: Sobrescreve o system prompt do cliente
+
+        Returns:
+            Texto de "response" (levanta requests.HTTPError em status != 200)
+        """
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "prompt": f"{prefix}{body}",
+            "stream": False,
+        }
+        system = self.system if system is None else system
+        if system:
+            payload["system"] = system
+        options = dict(self.options)
+        if temperature is not None:
+            options["temperature"] = float(temperature)
+        if options:
+            payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        t0 = time.monotonic()
+        try:
+            r = self.session.post(f"{self.base_url}/api/generate", json=payload,
+                                  timeout=self.timeout if timeout is None else timeout)
+            r.raise_for_status()
+            data = r.json() or {}
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += int(data.get("prompt_eval_count") or 0)
+            self.stats["output_tokens"] += int(data.get("eval_count") or 0)
+            self.stats["seconds"] += time.monotonic() - t0
+        return str(data.get("response", "") or "")
+
+    def warm(self, timeout: Optional[float] = None) -> bool:
+        """Carrega o modelo no servidor (prompt vazio) sem gerar texto."""
+        payload: Dict[str, Any] = {"model": self.model, "prompt": "", "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        if self.options:
+            payload["options"] = dict(self.options)
+        try:
+            r = self.session.post(f"{self.base_url}/api/generate", json=payload,
+                                  timeout=self.timeout if timeout is None else timeout)
+            return r.status_code == 200
+        except Exception as e:
+            logger.debug("warm %s falhou: %s", self.model, e)
+            return False
+
+    def close(self):
+        self.session.close()
+
+
+class OllamaCoalescer:
+    """
+    Junta pedidos de um texto cada, vindos de várias threads, em prompts
+    multi-item "id|||texto" enviados por uma thread própria.
+
+    Uso:
+        coalescer = OllamaCoalescer(client, prefix=INSTRUCOES_ID_LINHAS)
+        traducao = coalescer.translate("Open the door")
+    """
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        prefix: str,
+        max_items: int = 16,
+        max_wait: float = 0.02,
+        timeout: Optional[float] = None,
+        temperature: Optional[float] = None,
+        single_retry: bool = True,
+    ):
+        """
+        Args:
+            client: Cliente do modelo
+            prefix: Instruções estáveis que pedem saída "id|||traducao"
+            max_items: Itens por prompt
+            max_wait: Espera (s) por mais pedidos antes de enviar
+            timeout / temperature: Repassados a client.generate()
+            single_retry: Reenvia sozinho o item ausente na resposta
+        """
+        self.client = client
+        self.prefix = prefix
+        self.max_items = max(1, int(max_items))
+        self.max_wait = max(0.0, float(max_wait))
+        self.timeout = timeout
+        self.temperature = temperature
+        self.single_retry = single_retry
+
+        self._pending: List[Tuple[str, Future]] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"items": 0, "prompts": 0, "retried": 0}
+
+    def submit(self, text: str) -> "Future[Optional[str]]":
+        """Enfileira um texto; o Future resolve com a tradução (None se ausente)."""
+        text = str(text or "")
+        if len(text.splitlines()) > 1:
+            # parse_id_lines lê uma linha por id: as demais linhas se perderiam
+            raise ValueError("texto multi-linha não pode ser coalescido")
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("coalescer fechado")
+            self._pending.append((text, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name="ollama-coalescer", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+        """submit() + espera pelo resultado."""
+        return self.submit(text).result(timeout=timeout)
+
+    def translate_many(self, texts: List[str]) -> List[Optional[str]]:
+        """Enfileira todos e espera (coalescidos em prompts de até max_items)."""
+        return [f.result() for f in [self.submit(t) for t in texts]]
+
+    def _take_batch(self) -> List[Tuple[str, Future]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_items and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_items]
+            del self._pending[:self.max_items]
+            return batch
+
+    def _send(self, texts: List[str]) -> Dict[int, str]:
+        raw = self.client.generate(
+            format_id_lines(list(enumerate(texts))), prefix=self.prefix,
+            timeout=self.timeout, temperature=self.temperature,
+        )
+        self.stats["prompts"] += 1
+        return parse_id_lines(raw)
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            texts = [t for t, _ in batch]
+            self.stats["items"] += len(batch)
+            try:
+                results = self._send(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for i, (text, future) in enumerate(batch):
+                result = results.get(i)
+                if result is None and self.single_retry and len(batch) > 1:
+                    self.stats["retried"] += 1
+                    try:
+                        result = self._send([text]).get(0)
+                    except Exception as e:
+                        future.set_exception(e)
+                        continue
+                future.set_result(result)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=5.0)
+
+
+_clients: Dict[Tuple[str, str, Any], OllamaClient] = {}
+_coalescers: Dict[Tuple[Any, ...], OllamaCoalescer] = {}
+_registry_lock = threading.Lock()
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def get_ollama_client(model: str, base_url: str = DEFAULT_BASE_URL, **kwargs) -> OllamaClient:
+    """
+    Cliente compartilhado por (servidor, modelo, system, options): chamadores
+    com a mesma configuração reaproveitam conexão e prefixo cacheado.
+    """
+    key = (base_url.rstrip("/"), model, _freeze({k: kwargs.get(k) for k in ("system", "options")}))
+    with _registry_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = OllamaClient(model, base_url=base_url, **kwargs)
+        return client
+
+
+def get_coalescer(client: OllamaClient, prefix: str, **kwargs) -> OllamaCoalescer:
+    """Coalescer compartilhado por (cliente, prefixo)."""
+    key = (id(client), prefix)
+    with _registry_lock:
+        coalescer = _coalescers.get(key)
+        if coalescer is None or coalescer._closed:
+            coalescer = _coalescers[key] = OllamaCoalescer(client, prefix, **kwargs)
+        return coalescer
@@ -22,13 +22,13 @@ import os
 import sys
 import re
 import json
+import functools
 import hashlib
 import requests
 import random
 import logging
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock, Semaphore
 from typing import List, Dict, Tuple, Optional
 from collections import defaultdict, Counter, deque
@@ -37,6 +37,19 @@ import time
 import math
 import sys
 import codecs
+
+try:
+    from .translation_memory import TranslationMemory, open_for_json_cache
+    from .translation_dispatcher import BackendLimits, DispatchResult, get_dispatcher, run_job
+    from .adaptive_batcher import AdaptiveBatcher
+    from .streaming_pipeline import StreamingJsonlPipeline, batch_stage, map_stage
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from translation_memory import TranslationMemory, open_for_json_cache
+    from translation_dispatcher import BackendLimits, DispatchResult, get_dispatcher, run_job
+    from adaptive_batcher import AdaptiveBatcher
+    from streaming_pipeline import StreamingJsonlPipeline, batch_stage, map_stage
+
 sys.stdout = codecs.getwriter("utf-8")(sys.stdout.buffer, 'strict')
 
 
@@ -293,10 +306,10 @@ class TextFilter:
 # CACHE
 # ============================================================================
 class TranslationCache:
-    """Cache persistente de traduções"""
+    """Cache persistente de traduções (memória de tradução SQLite)"""
 
     def __init__(self):
-        self.cache: Dict[str, str] = {}
+        self.tm: Optional[TranslationMemory] = None
         self.hits = 0
         self.misses = 0
         self.lock = Lock()
@@ -306,34 +319,42 @@ class TranslationCache:
         return hashlib.md5(text.encode()).hexdigest()
 
     def get(self, text: str) -> Optional[str]:
+        if self.tm is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        translation = self.tm.get(text, model=Config.MODEL)
+        if translation is None:
+            # Entrada importada do JSON antigo (chave MD5): promove para a chave do texto
+            translation = self.tm.get(text, model=Config.MODEL, key=self._get_hash(text))
+            if translation is not None:
+                self.tm.put(text, translation, model=Config.MODEL)
         with self.lock:
-            hash_key = self._get_hash(text)
-            if hash_key in self.cache:
+            if translation is not None:
                 self.hits += 1
-                return self.cache[hash_key]
-            self.misses += 1
-            return None
+            else:
+                self.misses += 1
+        return translation
 
     def set(self, text: str, translation: str):
-        with self.lock:
-            hash_key = self._get_hash(text)
-            self.cache[hash_key] = translation
+        if self.tm is not None:
+            self.tm.put(text, translation, model=Config.MODEL)
 
     def load_cache(self):
-        if Config.USE_CACHE and os.path.exists(Config.CACHE_FILE):
-            try:
-                with open(Config.CACHE_FILE, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                logger.info(f"Cache carregado: {len(self.cache)} traduções")
-            except:
-                pass
+        if not Config.USE_CACHE:
+            return
+        try:
+            self.tm = open_for_json_cache(Config.CACHE_FILE, model=Config.MODEL)
+            logger.info(f"Memória de tradução: {len(self.tm)} traduções ({self.tm.db_path})")
+        except Exception as e:
+            logger.error(f"Erro ao abrir memória de tradução: {e}")
+            self.tm = None
 
     def save_cache(self):
-        if Config.USE_CACHE:
+        if self.tm is not None:
             try:
-                with open(Config.CACHE_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(self.cache, f, ensure_ascii=False, indent=2)
-                logger.info(f"Cache salvo: {len(self.cache)} traduções")
+                self.tm.flush()
+                logger.info(f"Cache salvo: {len(self.tm)} traduções")
             except Exception as e:
                 logger.error(f"Erro ao salvar cache: {e}")
 
@@ -350,7 +371,11 @@ class TextBatcher:
     """Agrupa textos curtos para traduzir em lote"""
 
     @staticmethod
-    def create_batches(texts: List[Dict]) -> List[List[Dict]]:
+    def create_batches(texts: List[Dict], batcher: Optional[AdaptiveBatcher] = None) -> List[List[Dict]]:
+        # Com batcher adaptativo: empacota por tokens no tamanho aprendido
+        if batcher is not None:
+            return batcher.create_batches(texts, key=lambda item: item['texto'])
+
         batches = []
         current_batch = []
         current_length = 0
@@ -422,8 +447,8 @@ class RobustTranslator:
             'last_errors': deque(maxlen=10)  # Últimos 10 erros
         }
 
-    def translate_text_with_retry(self, text: str) -> str:
-        """Traduz com retry exponencial + jitter"""
+    def translate_text_with_retry(self, text: str, session=None) -> str:
+        """Traduz com retry exponencial + jitter (session: pool HTTP do dispatcher)"""
 
         # Verifica cache
         cached = self.cache.get(text)
@@ -452,7 +477,7 @@ Texto:
 
 Tradução:"""
 
-                    session = self.session_manager.get_session()
+                    http = session or self.session_manager.get_session()
 
                     # Payload SEM num_gpu (causa erro em algumas versões)
                     payload = {
@@ -466,7 +491,7 @@ Tradução:"""
                         }
                     }
 
-                    response = session.post(
+                    response = http.post(
                         Config.OLLAMA_URL,
                         json=payload,
                         timeout=Config.BASE_TIMEOUT
@@ -555,7 +580,7 @@ Tradução:"""
             logger.error(f"Falha após {Config.MAX_RETRIES} tentativas")
             return text  # Fallback: retorna original
 
-    def translate_batch(self, batch: List[Dict]) -> List[Dict]:
+    def translate_batch(self, batch: List[Dict], session=None) -> List[Dict]:
         """Traduz um lote"""
         results = []
 
@@ -569,26 +594,27 @@ Tradução:"""
                 results.append(item)
                 continue
 
-            traducao = self.translate_text_with_retry(texto_original)
+            traducao = self.translate_text_with_retry(texto_original, session=session)
             item['traducao'] = traducao
             results.append(item)
 
         return results
 
-    def translate_parallel(self, texts: List[Dict]) -> List[Dict]:
+    def translate_parallel(self, texts: List[Dict], show_config: bool = True) -> List[Dict]:
         """Traduz em paralelo com monitoramento"""
 
         self.stats['total'] = len(texts)
         self.stats['start_time'] = time.time()
 
-        print(f"\n{'='*70}")
-        print(f"CONFIGURAÇÃO")
-        print(f"{'='*70}")
-        print(f"Workers: {Config.MAX_WORKERS}")
-        print(f"Batch size: {Config.BATCH_SIZE}")
-        print(f"Timeout: {Config.BASE_TIMEOUT}s")
-        print(f"Max retries: {Config.MAX_RETRIES}")
-        print(f"{'='*70}\n")
+        if show_config:
+            print(f"\n{'='*70}")
+            print(f"CONFIGURAÇÃO")
+            print(f"{'='*70}")
+            print(f"Workers: {Config.MAX_WORKERS}")
+            print(f"Batch size: {Config.BATCH_SIZE}")
+            print(f"Timeout: {Config.BASE_TIMEOUT}s")
+            print(f"Max retries: {Config.MAX_RETRIES}")
+            print(f"{'='*70}\n")
 
         batches = TextBatcher.create_batches(texts)
         print(f"[INFO] Lotes criados: {len(batches)}\n")
@@ -599,30 +625,43 @@ Tradução:"""
         # Ajusta workers se em modo degradado
         actual_workers = 1 if self.circuit_breaker.is_degraded() else Config.MAX_WORKERS
 
-        with ThreadPoolExecutor(max_workers=actual_workers) as executor:
-            future_to_batch = {
-                executor.submit(self.translate_batch, batch): i
-                for i, batch in enumerate(batches)
-            }
-
-            for future in as_completed(future_to_batch):
-                batch_results = future.result()
-                results.extend(batch_results)
-                completed += len(batch_results)
-
-                # Progresso
-                percent = (completed / len(texts)) * 100
-                elapsed = time.time() - self.stats['start_time']
-                rate = completed / elapsed if elapsed > 0 else 0
-                eta = (len(texts) - completed) / rate if rate > 0 else 0
-
-                status_icon = "⚠" if self.circuit_breaker.is_degraded() else ""
-
-                print(f"\r{status_icon}[{percent:5.1f}%] {completed}/{len(texts)} "
-                      f"| {rate:.1f}/s | ETA: {eta/60:.0f}min "
-                      f"| {self.cache.stats()} "
-                      f"| Erros: {self.stats['errors']} ({self.stats['http_500']} x 500)",
-                      end='', flush=True)
+        def on_result(res: DispatchResult):
+            nonlocal completed
+            batch_results = res.result if res.ok else res.item.args[0]
+            if not res.ok:
+                with self.lock:
+                    self.stats['errors'] += len(batch_results)
+                for item in batch_results:
+                    item.setdefault('traducao', item['texto'])
+            results.extend(batch_results)
+            completed += len(batch_results)
+
+            # Progresso
+            percent = (completed / len(texts)) * 100
+            elapsed = time.time() - self.stats['start_time']
+            rate = completed / elapsed if elapsed > 0 else 0
+            eta = (len(texts) - completed) / rate if rate > 0 else 0
+
+            status_icon = "⚠" if self.circuit_breaker.is_degraded() else ""
+
+            print(f"\r{status_icon}[{percent:5.1f}%] {completed}/{len(texts)} "
+                  f"| {rate:.1f}/s | ETA: {eta/60:.0f}min "
+                  f"| {self.cache.stats()} "
+                  f"| Erros: {self.stats['errors']} ({self.stats['http_500']} x 500)",
+                  end='', flush=True)
+
+        # Backend "ollama" do processo: MAX_WORKERS (--workers) é explícito e
+        # substitui o limite já registrado (ex.: o do HybridTranslator).
+        # Retentativas ficam em translate_text_with_retry (circuit breaker);
+        # em modo degradado só um lote em voo.
+        dispatcher = get_dispatcher()
+        dispatcher.ensure_backend(
+            "ollama", run_job, BackendLimits(max_concurrency=Config.MAX_WORKERS, max_retries=0),
+            update_limits=True,
+        )
+        jobs = [functools.partial(self.translate_batch, batch) for batch in batches]
+        dispatcher.run("ollama", jobs, on_result=on_result,
+                       window=actual_workers if actual_workers == 1 else None)
 
         print()
         results.sort(key=lambda x: x['id'])
@@ -664,9 +703,83 @@ Tradução:"""
 # ============================================================================
 # PIPELINE
 # ============================================================================
+OUTPUT_HEADER = "# LEGEND OF game - TRADUZIDO v4.0\n# ID|OFFSET|ORIGINAL|TRADUÇÃO\n\n"
+
+
+def _parse_text_line(line: str) -> Optional[Dict]:
+    """Linha ID|OFFSET|ORIGINAL -> item (None para comentários/cabeçalhos)."""
+    if line.startswith('#') or not line.strip():
+        return None
+    if 'ID|OFFSET|ORIGINAL' in line or line.startswith('-'):
+        return None
+
+    parts = line.rstrip('\n').split('|')
+    if len(parts) < 3:
+        return None
+    return {
+        'id': int(parts[0]) if parts[0].isdigit() else 0,
+        'offset': parts[1],
+        'texto': parts[2],
+        'traducao': ''
+    }
+
+
+def _format_text_line(item: Dict) -> str:
+    return f"{item['id']:05d}|{item['offset']}|{item['texto']}|{item['traducao']}"
+
+
+def processar_arquivo_traducao_stream(arquivo_entrada: str, arquivo_saida: str,
+                                      max_workers: int = None, timeout: int = None,
+                                      window: int = 2000, resume: bool = True):
+    """
+    Pipeline em streaming para arquivos grandes: lê, traduz e grava em
+    janelas de `window` textos, com checkpoint (<saida>.ckpt.json) para
+    retomar do último registro gravado após uma queda.
+    """
+    translator = RobustTranslator(max_workers=max_workers, timeout=timeout)
+    first_window = [True]
+
+    def _translate(records):
+        translator.translate_parallel([r.data for r in records], show_config=first_window[0])
+        first_window[0] = False
+        return records  # Itens traduzidos in-place; ordem de entrada preservada
+
+    def _format(record):
+        line = _format_text_line(record.data)
+        record.data = OUTPUT_HEADER + line if record.seq == 0 else line
+        return record
+
+    def _count(record, state):
+        state['textos'] = state.get('textos', 0) + 1
+
+    pipeline = StreamingJsonlPipeline(
+        arquivo_entrada,
+        arquivo_saida,
+        stages=[batch_stage(_translate, window), map_stage(_format)],
+        queue_size=max(64, window),
+        resume=resume,
+        decode=_parse_text_line,
+        encode=str,
+        on_record=_count,
+    )
+    summary = pipeline.run()
+    if summary['resumed']:
+        print(f"[RESUME] Retomado a partir do texto {summary['resumed_from']}")
+    translator.stats['total'] = summary['state'].get('textos', 0)
+    translator.cache.save_cache()
+    return translator
+
+
 def processar_arquivo_traducao(arquivo_entrada: str, arquivo_saida: str,
-                               max_workers: int = None, timeout: int = None):
-    """Pipeline completo otimizado"""
+                               max_workers: int = None, timeout: int = None,
+                               stream: bool = False, window: int = 2000):
+    """
+    Pipeline completo otimizado
+
+    Args:
+        stream: Processa em janelas com checkpoint/retomada (arquivos grandes)
+        window: Textos por janela no modo stream
+    """
 
     print(f"\n{'='*70}")
     print("TRADUTOR PARALELO v4.0 - DEPLOY CRÍTICO")
@@ -685,25 +798,28 @@ def processar_arquivo_traducao(arquivo_entrada: str, arquivo_saida: str,
 
     print(f"✓ {health_msg}\n")
 
+    if stream:
+        print(f"[STREAM] {arquivo_entrada} -> {arquivo_saida} (janelas de {window})")
+        try:
+            translator = processar_arquivo_traducao_stream(
+                arquivo_entrada, arquivo_saida, max_workers, timeout, window=window
+            )
+        except Exception as e:
+            logger.error(f"Erro no pipeline em streaming: {e}")
+            return False
+        translator.print_stats()
+        print(f"[OK] ✓ Concluído!")
+        return True
+
     print(f"[1/4] Carregando: {arquivo_entrada}")
     texts = []
 
     try:
         with open(arquivo_entrada, 'r', encoding='utf-8') as f:
             for line in f:
-                if line.startswith('#') or not line.strip():
-                    continue
-                if 'ID|OFFSET|ORIGINAL' in line or line.startswith('-'):
-                    continue
-
-                parts = line.rstrip('\n').split('|')
-                if len(parts) >= 3:
-                    texts.append({
-                        'id': int(parts[0]) if parts[0].isdigit() else 0,
-                        'offset': parts[1],
-                        'texto': parts[2],
-                        'traducao': ''
-                    })
+                item = _parse_text_line(line)
+                if item is not None:
+                    texts.append(item)
     except Exception as e:
         logger.error(f"Erro ao carregar: {e}")
         return False
@@ -723,11 +839,10 @@ def processar_arquivo_traducao(arquivo_entrada: str, arquivo_saida: str,
     print(f"\n[4/4] Salvando: {arquivo_saida}")
     try:
         with open(arquivo_saida, 'w', encoding='utf-8') as f:
-            f.write("# LEGEND OF game - TRADUZIDO v4.0\n")
-            f.write("# ID|OFFSET|ORIGINAL|TRADUÇÃO\n\n")
+            f.write(OUTPUT_HEADER)
 
             for item in results:
-                f.write(f"{item['id']:05d}|{item['offset']}|{item['texto']}|{item['traducao']}\n")
+                f.write(_format_text_line(item) + "\n")
 
         print(f"[OK] ✓ Concluído!")
         print(f"\n📄 Logs salvos em: translator_errors.log\n")
@@ -743,21 +858,25 @@ def processar_arquivo_traducao(arquivo_entrada: str, arquivo_saida: str,
 # ============================================================================
 def main():
     """Função principal - APENAS TRADUÇÃO, SEM DIAGNÓSTICO"""
-    if len(sys.argv) < 2:
-        print("\nUso: python tradutor_paralelo_v4.py <entrada> [saida] [workers] [timeout]\n")
+    # --stream: janelas com checkpoint/retomada (arquivos grandes)
+    stream = '--stream' in sys.argv
+    argv = [a for a in sys.argv if a != '--stream']
+
+    if len(argv) < 2:
+        print("\nUso: python tradutor_paralelo_v4.py <entrada> [saida] [workers] [timeout] [--stream]\n")
         sys.exit(1)
 
-    arquivo_entrada = sys.argv[1]
-    arquivo_saida = sys.argv[2] if len(sys.argv) > 2 else "textos_traduzidos.txt"
-    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
-    timeout = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    arquivo_entrada = argv[1]
+    arquivo_saida = argv[2] if len(argv) > 2 else "textos_traduzidos.txt"
+    max_workers = int(argv[3]) if len(argv) > 3 else None
+    timeout = int(argv[4]) if len(argv) > 4 else None
 
     if not os.path.exists(arquivo_entrada):
         print(f"[ERRO] Arquivo não encontrado: {arquivo_entrada}")
         sys.exit(1)
 
     # EXECUTA APENAS A TRADUÇÃO (sem diagnóstico)
-    sucesso = processar_arquivo_traducao(arquivo_entrada, arquivo_saida, max_workers, timeout)
+    sucesso = processar_arquivo_traducao(arquivo_entrada, arquivo_saida, max_workers, timeout, stream=stream)
     sys.exit(0 if sucesso else 1)
 
 
@@ -4,8 +4,8 @@
 PC TRANSLATION CACHE - Cache de Traduções para Economia de API
 ================================================================================
 Evita traduzir textos já traduzidos anteriormente:
-- Cache baseado em hash MD5 do texto original
-- Armazena traduções em JSON
+- Cache baseado em hash do texto original normalizado + idioma alvo
+- Armazena traduções na memória de tradução SQLite (importa o JSON antigo)
 - Economia massiva em traduções repetidas
 - Útil para múltiplas versões do mesmo jogo
 
@@ -13,95 +13,40 @@ NÃO requer modificação de código existente - módulo opcional
 ================================================================================
 """
 
-import json
-import hashlib
 from pathlib import Path
 from typing import Dict, Optional, Tuple
-from datetime import datetime
+
+try:
+    from .translation_memory import open_for_json_cache
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from translation_memory import open_for_json_cache
 
 
 class TranslationCache:
     """
     Cache de traduções para economizar chamadas de API.
-    Armazena traduções por hash MD5 do texto original.
+    Armazena traduções na memória de tradução SQLite (chave: hash do texto
+    normalizado + idioma alvo); o JSON antigo é importado na primeira abertura.
     """
 
-    def __init__(self, cache_file: str = "translation_cache.json"):
+    def __init__(self, cache_file: str = "translation_cache.json", max_entries: Optional[int] = None):
         """
         Args:
-            cache_file: Caminho do arquivo de cache
+            cache_file: Cache JSON antigo (migrado para a memória de tradução compartilhada)
+            max_entries: Limite de entradas (evicção LRU)
         """
         self.cache_file = Path(cache_file)
-        self.cache: Dict[str, Dict] = {}
-
-        # Carrega cache existente
-        if self.cache_file.exists():
-            self._load_cache()
-        else:
-            self.cache = {
-                'metadata': {
-                    'created': datetime.now().isoformat(),
-                    'version': '1.0',
-                    'total_entries': 0
-                },
-                'translations': {}
-            }
-
-    def _load_cache(self):
-        """Carrega cache do arquivo JSON."""
-        try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                self.cache = json.load(f)
-
-            # Migração de versões antigas (se necessário)
-            if 'metadata' not in self.cache:
-                self.cache = {
-                    'metadata': {
-                        'created': datetime.now().isoformat(),
-                        'version': '1.0',
-                        'total_entries': len(self.cache)
-                    },
-                    'translations': self.cache  # Cache antigo vira translations
-                }
-
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to load cache: {e}")
-            self.cache = {
-                'metadata': {
-                    'created': datetime.now().isoformat(),
-                    'version': '1.0',
-                    'total_entries': 0
-                },
-                'translations': {}
-            }
+        self.tm = open_for_json_cache(self.cache_file, max_entries=max_entries)
 
     def save_cache(self):
-        """Salva cache em arquivo JSON."""
+        """Grava estatísticas de uso pendentes."""
         try:
-            # Atualiza metadata
-            self.cache['metadata']['total_entries'] = len(self.cache['translations'])
-            self.cache['metadata']['last_updated'] = datetime.now().isoformat()
-
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
-
+            self.tm.flush()
         except Exception as e:
             print(f"❌ Error saving cache: {e}")
 
-    def _hash_text(self, text: str, target_language: str = "Portuguese (Brazil)") -> str:
-        """
-        Gera hash MD5 do texto + idioma alvo.
-
-        Args:
-            text: Texto original
-            target_language: Idioma alvo
-
-        Returns:
-            Hash MD5
-        """
-        combined = f"{text}|{target_language}"
-        return hashlib.md5(combined.encode('utf-8')).hexdigest()
-
     def get(self, text: str, target_language: str = "Portuguese (Brazil)") -> Optional[str]:
         """
         Busca tradução no cache.
@@ -113,16 +58,7 @@ class TranslationCache:
         Returns:
             Tradução em cache ou None
         """
-        text_hash = self._hash_text(text, target_language)
-
-        if text_hash in self.cache['translations']:
-            entry = self.cache['translations'][text_hash]
-            # Atualiza contador de hits
-            entry['hits'] = entry.get('hits', 0) + 1
-            entry['last_used'] = datetime.now().isoformat()
-            return entry['translated']
-
-        return None
+        return self.tm.get(text, target_lang=target_language)
 
     def set(self, text: str, translation: str, target_language: str = "Portuguese (Brazil)"):
         """
@@ -133,20 +69,11 @@ class TranslationCache:
             translation: Tradução
             target_language: Idioma alvo
         """
-        text_hash = self._hash_text(text, target_language)
-
-        self.cache['translations'][text_hash] = {
-            'original': text,
-            'translated': translation,
-            'target_language': target_language,
-            'created': datetime.now().isoformat(),
-            'last_used': datetime.now().isoformat(),
-            'hits': 1
-        }
+        self.tm.put(text, translation, target_lang=target_language)
 
     def get_batch(self, texts: list, target_language: str = "Portuguese (Brazil)") -> Tuple[Dict[int, str], list]:
         """
-        Busca múltiplas traduções no cache.
+        Busca múltiplas traduções no cache (uma consulta por lote).
 
         Args:
             texts: Lista de textos originais
@@ -157,11 +84,12 @@ class TranslationCache:
             - cached_translations: {index: translation}
             - uncached_texts: [(index, text)]
         """
+        found = self.tm.get_many(texts, target_lang=target_language)
         cached = {}
         uncached = []
 
         for i, text in enumerate(texts):
-            translation = self.get(text, target_language)
+            translation = found.get(text)
 
             if translation:
                 cached[i] = translation
@@ -172,49 +100,38 @@ class TranslationCache:
 
     def set_batch(self, texts: list, translations: list, target_language: str = "Portuguese (Brazil)"):
         """
-        Armazena múltiplas traduções no cache.
+        Armazena múltiplas traduções no cache (uma transação).
 
         Args:
             texts: Lista de textos originais
             translations: Lista de traduções
             target_language: Idioma alvo
         """
-        for text, translation in zip(texts, translations):
-            self.set(text, translation, target_language)
+        self.tm.put_many(zip(texts, translations), target_lang=target_language)
 
     def get_stats(self) -> Dict:
         """Retorna estatísticas do cache."""
-        total = len(self.cache['translations'])
-        total_hits = sum(entry.get('hits', 0) for entry in self.cache['translations'].values())
-
-        # Top 10 traduções mais usadas
-        sorted_entries = sorted(
-            self.cache['translations'].items(),
-            key=lambda x: x[1].get('hits', 0),
-            reverse=True
-        )
-
         top_10 = [
             {
                 'original': entry['original'][:50],
                 'translated': entry['translated'][:50],
-                'hits': entry.get('hits', 0)
+                'hits': entry['hits']
             }
-            for _, entry in sorted_entries[:10]
+            for entry in self.tm.top(10)
         ]
+        db_path = self.tm.db_path
 
         return {
-            'total_entries': total,
-            'total_hits': total_hits,
-            'cache_file': str(self.cache_file),
-            'file_size_kb': self.cache_file.stat().st_size / 1024 if self.cache_file.exists() else 0,
+            'total_entries': len(self.tm),
+            'total_hits': self.tm.total_hits(),
+            'cache_file': str(db_path),
+            'file_size_kb': db_path.stat().st_size / 1024 if db_path.exists() else 0,
             'top_10': top_10
         }
 
     def clear(self):
         """Limpa todo o cache."""
-        self.cache['translations'] = {}
-        self.save_cache()
+        self.tm.clear()
 
     def remove_old_entries(self, days: int = 90):
         """
@@ -223,20 +140,9 @@ class TranslationCache:
         Args:
             days: Dias de inatividade para remoção
         """
-        from datetime import timedelta
-
-        cutoff = datetime.now() - timedelta(days=days)
-        removed = 0
-
-        for text_hash, entry in list(self.cache['translations'].items()):
-            last_used = datetime.fromisoformat(entry.get('last_used', entry['created']))
-
-            if last_used < cutoff:
-                del self.cache['translations'][text_hash]
-                removed += 1
+        removed = self.tm.remove_older_than(days * 86400)
 
         if removed > 0:
-            self.save_cache()
             print(f"🗑️  Removed {removed} old cache entries (unused for {days}+ days)")
 
         return removed
@@ -352,7 +258,7 @@ if __name__ == "__main__":
         cache_file = sys.argv[2] if len(sys.argv) > 2 else "translation_cache.json"
         cache = TranslationCache(cache_file)
 
-        confirm = input(f"⚠️  Clear all {len(cache.cache['translations'])} entries? (yes/no): ")
+        confirm = input(f"⚠️  Clear all {len(cache.tm)} entries? (yes/no): ")
         if confirm.lower() == "yes":
             cache.clear()
             print("✅ Cache cleared")
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+POINTER INDEX - Índice Reverso de Ponteiros (valor → sítios na ROM)
+================================================================================
+Construído uma vez por ROM e compartilhado entre realocação e reinserção:
+- Para cada largura (2/3/4 bytes) e endianness, mapeia valor bruto → offsets
+- Consulta em O(log n) (NumPy: arrays ordenados + searchsorted)
+- Atualização incremental quando um ponteiro (ou qualquer byte) é reescrito
+- Mapa inverso opcional alvo → valores para mapeamentos de plugin (LoROM,
+  bancos SMS, etc.), calculado uma única vez por modo
+
+Escritas feitas fora do índice devem ser informadas via notify_write();
+sítios obsoletos são descartados na consulta (verificação contra os bytes atuais).
+================================================================================
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+Mode = Tuple[int, str]
+
+
+class PointerIndex:
+    """
+    Índice reverso valor → offsets para todas as palavras da ROM.
+
+    O índice mantém referência (sem cópia) ao bytearray da ROM. Modos
+    (largura, endianness) são indexados sob demanda na primeira consulta.
+    """
+
+    def __init__(
+        self,
+        rom_data: bytearray,
+        sizes: Iterable[int] = (2, 3, 4),
+        endians: Iterable[str] = ("little", "big"),
+    ):
+        """
+        Args:
+            rom_data: Dados da ROM (referência viva, normalmente bytearray)
+            sizes: Larguras de ponteiro suportadas
+            endians: Byte orders suportados
+        """
+        self.rom_data = rom_data
+        self.sizes = tuple(int(s) for s in sizes if int(s) in (2, 3, 4))
+        self.endians = tuple(str(e).lower() for e in endians)
+        self._base_len = len(rom_data)
+
+        # Base imutável por modo: (valores ordenados, offsets) ou dict em fallback
+        self._base: Dict[Mode, Any] = {}
+        # Overlay incremental por modo: valor → offsets reescritos
+        self._overlay: Dict[Mode, Dict[int, Set[int]]] = {}
+        # Mapas inversos por (modo, chave do mapper)
+        self._target_maps: Dict[Tuple[Mode, Hashable], Dict[int, List[int]]] = {}
+        self._mapped_cache: Dict[Tuple[Mode, Hashable], Dict[int, Optional[int]]] = {}
+
+        self.stats = {"lookups": 0, "stale_sites_dropped": 0, "writes": 0}
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    def _ensure_mode(self, size: int, endian: str) -> Mode:
+        mode = (int(size), str(endian).lower())
+        if mode[0] not in (2, 3, 4):
+            raise ValueError(f"Tamanho de ponteiro não suportado: {size}")
+        if mode not in self._base:
+            self._base[mode] = self._build_mode(*mode)
+            self._overlay.setdefault(mode, defaultdict(set))
+        return mode
+
+    def _build_mode(self, size: int, endian: str):
+        count = self._base_len - size + 1
+        if count <= 0:
+            return None
+        if np is not None:
+            rom = np.frombuffer(bytes(self.rom_data[:self._base_len]), dtype=np.uint8)
+            words = np.zeros(count, dtype=np.uint32)
+            for i in range(size):
+                shift = 8 * i if endian == "little" else 8 * (size - 1 - i)
+                words |= rom[i:i + count].astype(np.uint32) << np.uint32(shift)
+            order = np.argsort(words, kind="stable").astype(np.uint32)
+            return words[order], order
+
+        table: Dict[int, List[int]] = defaultdict(list)
+        data = bytes(self.rom_data[:self._base_len])
+        for off in range(count):
+            table[int.from_bytes(data[off:off + size], endian)].append(off)
+        return table
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def _base_sites(self, mode: Mode, value: int) -> List[int]:
+        base = self._base.get(mode)
+        if base is None:
+            return []
+        if isinstance(base, dict):
+            return list(base.get(int(value), ()))
+        if value < 0 or value > 0xFFFFFFFF:
+            return []
+        values, offsets = base
+        lo = int(np.searchsorted(values, value, side="left"))
+        hi = int(np.searchsorted(values, value, side="right"))
+        return offsets[lo:hi].tolist()
+
+    def _base_values(self, mode: Mode) -> List[int]:
+        base = self._base.get(mode)
+        if base is None:
+            return []
+        if isinstance(base, dict):
+            return list(base.keys())
+        values = base[0]
+        if values.size == 0:
+            return []
+        keep = np.empty(values.size, dtype=bool)
+        keep[0] = True
+        keep[1:] = values[1:] != values[:-1]
+        return values[keep].tolist()
+
+    def _is_current(self, offset: int, value: int, size: int, endian: str) -> bool:
+        if offset < 0 or offset + size > len(self.rom_data):
+            return False
+        return int.from_bytes(self.rom_data[offset:offset + size], endian) == value
+
+    def sites(self, value: int, size: int, endian: str, alignment: int = 1) -> List[int]:
+        """
+        Offsets onde a palavra (size, endian) atual vale `value`.
+
+        Args:
+            value: Valor bruto do ponteiro
+            size: Largura em bytes
+            endian: 'little' ou 'big'
+            alignment: Só retorna offsets múltiplos deste valor
+
+        Returns:
+            Lista ordenada de offsets
+        """
+        mode = self._ensure_mode(size, endian)
+        self.stats["lookups"] += 1
+        candidates = set(self._base_sites(mode, value))
+        candidates.update(self._overlay[mode].get(int(value), ()))
+
+        align = max(1, int(alignment))
+        result = []
+        for off in sorted(candidates):
+            if off % align != 0:
+                continue
+            if not self._is_current(off, int(value), mode[0], mode[1]):
+                self.stats["stale_sites_dropped"] += 1
+                continue
+            result.append(off)
+        return result
+
+    def sites_for_target(
+        self,
+        target: int,
+        size: int,
+        endian: str,
+        mapper: Callable[[int], Optional[int]],
+        mapper_key: Hashable,
+        alignment: int = 1,
+    ) -> List[Tuple[int, int]]:
+        """
+        Sítios cujo valor, passado por `mapper`, resulta em `target`.
+
+        O mapa inverso alvo → valores é calculado uma vez por
+        (modo, mapper_key) chamando `mapper` para cada valor distinto.
+
+        Returns:
+            Lista de (offset, valor_bruto) ordenada por offset
+        """
+        mode = self._ensure_mode(size, endian)
+        key = (mode, mapper_key)
+        inverse = self._target_maps.get(key)
+        mapped_cache = self._mapped_cache.setdefault(key, {})
+        if inverse is None:
+            inverse = defaultdict(list)
+            for value in self._base_values(mode):
+                mapped = mapper(value)
+                mapped_cache[value] = mapped
+                if mapped is not None:
+                    inverse[int(mapped)].append(value)
+            self._target_maps[key] = inverse
+
+        values = set(inverse.get(int(target), ()))
+        for value in self._overlay[mode]:
+            if value not in mapped_cache:
+                mapped_cache[value] = mapper(value)
+            if mapped_cache[value] == int(target):
+                values.add(value)
+
+        hits: List[Tuple[int, int]] = []
+        for value in values:
+            for off in self.sites(value, size, endian, alignment=alignment):
+                hits.append((off, value))
+        hits.sort()
+        return hits
+
+    # ------------------------------------------------------------------
+    # Atualização incremental
+    # ------------------------------------------------------------------
+    def notify_write(self, offset: int, length: int) -> None:
+        """
+        Informa que bytes [offset, offset+length) mudaram (ou foram anexados).
+
+        Reindexa apenas as palavras que cruzam a região alterada.
+        """
+        if length <= 0:
+            return
+        self.stats["writes"] += 1
+        rom_len = len(self.rom_data)
+        for mode, overlay in self._overlay.items():
+            size, endian = mode
+            start = max(0, int(offset) - size + 1)
+            stop = min(int(offset) + int(length), rom_len - size + 1)
+            for off in range(start, stop):
+                value = int.from_bytes(self.rom_data[off:off + size], endian)
+                overlay[value].add(off)
+
+    def write(self, offset: int, data: bytes) -> None:
+        """Escreve `data` na ROM em `offset` e atualiza o índice."""
+        end = int(offset) + len(data)
+        if end > len(self.rom_data):
+            self.rom_data.extend(b"\x00" * (end - len(self.rom_data)))
+        self.rom_data[offset:end] = data
+        self.notify_write(offset, len(data))
+
+    def write_pointer(self, offset: int, value: int, size: int, endian: str) -> None:
+        """Reescreve um ponteiro e atualiza o índice."""
+        self.write(offset, int(value).to_bytes(size, endian, signed=False))
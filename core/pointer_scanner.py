@@ -10,6 +10,11 @@ Localiza e mapeia ponteiros que referenciam strings de texto através de:
 - Reconstrução de tabelas de ponteiros
 
 Essencial para reinserção segura de traduções
+
+Modo vetorizado (NumPy): decodifica todas as palavras de 2/3/4 bytes da ROM
+numa única passada, aplica as transformações de alvo (absoluto, LoROM, HiROM,
+relativo) em lote e só instancia Pointer para os candidatos aprovados.
+Sem NumPy instalado, o scanner cai no modo escalar original.
 ================================================================================
 """
 
@@ -18,6 +23,25 @@ from typing import List, Dict, Tuple, Optional, Set
 from collections import defaultdict
 from dataclasses import dataclass
 
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+try:
+    from universal_kit.text_region_index import TextRegionIndex
+except Exception:  # pragma: no cover
+    TextRegionIndex = None  # Sem universal_kit: set de offsets por byte
+
+
+# Bancos LoROM testados (mesma ordem do modo escalar).
+LOROM_BANKS = (0x00, 0x01, 0x02, 0x03, 0x0E, 0x0F)
+
+# Offsets processados por bloco no modo vetorizado (limita pico de RAM).
+VECTOR_CHUNK_SIZE = 1 << 20
+
+MIN_POINTER_CONFIDENCE = 0.3
+
 
 @dataclass
 class Pointer:
@@ -100,25 +124,42 @@ class PointerScanner:
     Detecta tabelas de ponteiros sem conhecimento prévio do jogo.
     """
 
-    def __init__(self, rom_data: bytes, text_regions: Optional[List[Dict]] = None):
+    def __init__(self, rom_data: bytes, text_regions: Optional[List[Dict]] = None,
+                 vectorized: Optional[bool] = None):
         """
         Args:
             rom_data: Dados brutos da ROM
             text_regions: Regiões conhecidas de texto (do TextScanner)
+            vectorized: True força o modo NumPy, False força o modo escalar,
+                None (padrão) usa NumPy quando disponível
         """
         self.rom_data = rom_data
         self.text_regions = text_regions or []
         self.pointer_tables: List[PointerTable] = []
         self.all_pointers: List[Pointer] = []
 
-        # Converte text_regions para set de ranges para busca rápida
-        self.text_offsets = set()
-        for region in self.text_regions:
-            start = region.get('offset_dec', region.get('offset', 0))
-            if isinstance(start, str):
-                start = int(start, 16)
-            length = region.get('length', 64)  # Assume comprimento padrão
-            self.text_offsets.update(range(start, start + length))
+        if vectorized and np is None:
+            raise RuntimeError("NumPy é obrigatório para o modo vetorizado do PointerScanner.")
+        self.vectorized = (np is not None) if vectorized is None else bool(vectorized)
+
+        # Índice de intervalos ordenados (bisect) para busca O(log n)
+        if TextRegionIndex is not None:
+            self.text_index = TextRegionIndex.from_regions(self.text_regions, self._parse_text_region)
+        else:
+            self.text_index = set()
+            for region in self.text_regions:
+                start, length = self._parse_text_region(region)
+                self.text_index.update(range(start, start + length))
+        self.text_offsets = self.text_index  # compat: suporta "offset in text_offsets"
+
+    @staticmethod
+    def _parse_text_region(region: Dict) -> Tuple[int, int]:
+        """Extrai (offset, comprimento) de uma região do TextScanner."""
+        start = region.get('offset_dec', region.get('offset', 0))
+        if isinstance(start, str):
+            start = int(start, 16)
+        length = region.get('length', 64)  # Assume comprimento padrão
+        return start, length
 
     def scan(self, pointer_sizes: List[int] = [2, 3],
             endianness_modes: List[str] = ['little', 'big']) -> List[PointerTable]:
@@ -160,6 +201,13 @@ class PointerScanner:
 
     def _scan_pointers(self, size: int, endianness: str):
         """Varre ROM buscando ponteiros de tamanho e endianness específicos."""
+        if self.vectorized:
+            self._scan_pointers_vectorized(size, endianness)
+        else:
+            self._scan_pointers_scalar(size, endianness)
+
+    def _scan_pointers_scalar(self, size: int, endianness: str):
+        """Modo escalar: decodifica e valida um offset por vez."""
         rom_size = len(self.rom_data)
 
         # Varre ROM byte a byte
@@ -190,7 +238,7 @@ class PointerScanner:
             for target_offset in target_candidates:
                 if 0 <= target_offset < rom_size:
                     # Verifica se aponta para região de texto conhecida
-                    points_to_text = target_offset in self.text_offsets
+                    points_to_text = target_offset in self.text_index
 
                     # Calcula confiança deste ponteiro
                     confidence = self._calculate_pointer_confidence(
@@ -198,7 +246,7 @@ class PointerScanner:
                     )
 
                     # Só aceita ponteiros com confiança mínima
-                    if confidence >= 0.3:  # Threshold ajustável
+                    if confidence >= MIN_POINTER_CONFIDENCE:
                         pointer = Pointer(
                             offset=offset,
                             value=ptr_value,
@@ -210,6 +258,192 @@ class PointerScanner:
                         )
                         self.all_pointers.append(pointer)
 
+    def _scan_pointers_vectorized(self, size: int, endianness: str):
+        """
+        Modo vetorizado: mesma semântica de _scan_pointers_scalar.
+
+        Decodifica as palavras em bloco, aplica as transformações de alvo
+        em arrays e cria objetos Pointer apenas para os sobreviventes,
+        preservando a ordem (offset, candidato) do modo escalar.
+        """
+        offsets, values, targets, text_flags, confidences = self.scan_pointer_arrays(
+            size, endianness
+        )
+        for offset, value, target, to_text, conf in zip(
+            offsets.tolist(), values.tolist(), targets.tolist(),
+            text_flags.tolist(), confidences.tolist()
+        ):
+            self.all_pointers.append(Pointer(
+                offset=offset,
+                value=value,
+                size=size,
+                endianness=endianness,
+                target_offset=target,
+                points_to_text=to_text,
+                confidence=conf
+            ))
+
+    def scan_pointer_arrays(self, size: int, endianness: str):
+        """
+        Varredura vetorizada que retorna arrays compactos de acertos.
+
+        Returns:
+            Tupla (offsets, values, targets, points_to_text, confidences),
+            ordenada por offset e, dentro do offset, pela ordem dos candidatos.
+        """
+        if np is None:
+            raise RuntimeError("NumPy é obrigatório para o modo vetorizado do PointerScanner.")
+        if size not in (2, 3, 4):
+            raise ValueError(f"Tamanho de ponteiro não suportado: {size}")
+
+        rom = np.frombuffer(self.rom_data, dtype=np.uint8)
+        rom_size = int(rom.size)
+        total = rom_size - size
+        empty = (
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=bool),
+            np.empty(0, dtype=np.float64),
+        )
+        if total <= 0:
+            return empty
+
+        valid_target = self._build_non_padding_mask(rom)
+        text_mask = self._build_text_mask(rom_size) if TextRegionIndex is None else None
+        conf_table = self._confidence_lookup_table()
+
+        parts = []
+        for chunk_start in range(0, total, VECTOR_CHUNK_SIZE):
+            chunk_end = min(total, chunk_start + VECTOR_CHUNK_SIZE)
+            offsets = np.arange(chunk_start, chunk_end, dtype=np.int64)
+            values = self._decode_words(rom, chunk_start, chunk_end, size, endianness)
+
+            hits = []
+            for order, (mask, targets) in enumerate(
+                self._target_candidates_vectorized(values, offsets, size)
+            ):
+                keep = (targets >= 0) & (targets < rom_size)
+                if mask is not None:
+                    keep &= mask
+                idx = np.flatnonzero(keep)
+                if idx.size == 0:
+                    continue
+
+                hit_targets = targets[idx]
+                hit_values = values[idx]
+                if text_mask is not None:
+                    to_text = text_mask[hit_targets]
+                else:
+                    to_text = self.text_index.contains_array(hit_targets)
+                plausible = (hit_values >= 0x100) & (hit_values <= 0xFFFFFF)
+                non_padding = valid_target[hit_targets]
+                code = (
+                    (to_text.astype(np.int8) << 2)
+                    | (plausible.astype(np.int8) << 1)
+                    | non_padding.astype(np.int8)
+                )
+                confidences = conf_table[code]
+
+                survivors = confidences >= MIN_POINTER_CONFIDENCE
+                if not survivors.any():
+                    continue
+                hits.append((
+                    offsets[idx][survivors],
+                    hit_values[survivors],
+                    hit_targets[survivors],
+                    to_text[survivors],
+                    confidences[survivors],
+                    order,
+                ))
+
+            if not hits:
+                continue
+
+            # Ordena por (offset, ordem do candidato), como no modo escalar
+            columns = [np.concatenate([h[i] for h in hits]) for i in range(5)]
+            sort_key = columns[0] * 16 + np.concatenate(
+                [np.full(h[0].size, h[5], dtype=np.int64) for h in hits]
+            )
+            order_idx = np.argsort(sort_key, kind='stable')
+            parts.append(tuple(column[order_idx] for column in columns))
+
+        if not parts:
+            return empty
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    @staticmethod
+    def _decode_words(rom, start: int, end: int, size: int, endianness: str):
+        """Decodifica palavras de `size` bytes para todos os offsets [start, end)."""
+        values = np.zeros(end - start, dtype=np.int64)
+        for i in range(size):
+            shift = 8 * i if endianness == 'little' else 8 * (size - 1 - i)
+            values |= rom[start + i:end + i].astype(np.int64) << shift
+        return values
+
+    @staticmethod
+    def _target_candidates_vectorized(values, offsets, size: int):
+        """
+        Versão em lote de _calculate_target_offsets.
+
+        Gera pares (máscara, alvos) na mesma ordem dos candidatos escalares;
+        máscara None significa candidato válido para todos os offsets.
+        """
+        # 1. Absoluto
+        yield None, values
+
+        # 2. LoROM SNES
+        low = values & 0x7FFF
+        for bank in LOROM_BANKS:
+            yield None, low + (bank << 15)
+
+        # 3. HiROM SNES
+        if size >= 3:
+            bank = (values >> 16) & 0xFF
+            yield bank >= 0xC0, ((bank - 0xC0) << 16) + (values & 0xFFFF)
+
+        # 4. Relativo ao ponteiro
+        if size == 2:
+            yield values < 0x8000, offsets + values
+
+    def _build_text_mask(self, rom_size: int):
+        """Máscara booleana por byte (fallback sem TextRegionIndex)."""
+        mask = np.zeros(rom_size, dtype=bool)
+        for offset in self.text_index:
+            if 0 <= offset < rom_size:
+                mask[offset] = True
+        return mask
+
+    @staticmethod
+    def _build_non_padding_mask(rom):
+        """
+        Para cada alvo, indica se os 16 bytes seguintes não são padding
+        (mesmo critério de _calculate_pointer_confidence).
+        """
+        rom_size = int(rom.size)
+        mask = np.zeros(rom_size, dtype=bool)
+        if rom_size <= 16:
+            return mask
+        padding = ((rom == 0x00) | (rom == 0xFF)).astype(np.int32)
+        cumsum = np.concatenate(([0], np.cumsum(padding)))
+        limit = rom_size - 16
+        window = cumsum[16:16 + limit] - cumsum[:limit]
+        mask[:limit] = window < 14
+        return mask
+
+    @staticmethod
+    def _confidence_lookup_table():
+        """Confiança para cada combinação (texto, valor plausível, não-padding)."""
+        table = np.zeros(8, dtype=np.float64)
+        for code in range(8):
+            confidence = 0.0
+            if code & 4:
+                confidence += 0.5
+            if code & 2:
+                confidence += 0.2
+            if code & 1:
+                confidence += 0.3
+            table[code] = min(confidence, 1.0)
+        return table
+
     def _calculate_target_offsets(self, ptr_value: int, ptr_offset: int,
                                   size: int) -> List[int]:
         """
@@ -232,7 +466,7 @@ class PointerScanner:
             candidates.append(lorom_offset)
 
             # Tenta outros bancos comuns
-            for bank in [0x01, 0x02, 0x03, 0x0E, 0x0F]:
+            for bank in LOROM_BANKS[1:]:
                 lorom_offset = (ptr_value & 0x7FFF) + (bank << 15)
                 candidates.append(lorom_offset)
 
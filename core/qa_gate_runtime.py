@@ -35,6 +35,14 @@ except Exception:
         normalize_register_policy = None
         resolve_quality_profile = None
 
+try:
+    from .fuzzy_translation_memory import FuzzyTranslationMemory
+except Exception:
+    try:
+        from fuzzy_translation_memory import FuzzyTranslationMemory
+    except Exception:
+        FuzzyTranslationMemory = None
+
 
 POINTER_FIELDS = (
     "pointer_refs",
@@ -614,8 +622,9 @@ def _build_translation_memory(
     pure_uid_map: Dict[str, Dict[str, Any]],
     trans_rows: List[Dict[str, Any]],
     gate: Optional[Any],
-) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+) -> Tuple[Dict[str, str], List[Tuple[str, str]], Optional[Any]]:
     exact: Dict[str, str] = {}
+    sources: Dict[str, str] = {}
 
     for idx, row in enumerate(trans_rows):
         uid = _uid(row, idx=idx)
@@ -642,15 +651,23 @@ def _build_translation_memory(
         prev = exact.get(src_key)
         if not prev or len(candidate) < len(prev):
             exact[src_key] = candidate
+            sources[src_key] = str(src)
 
     ranked: List[Tuple[str, str]] = sorted(exact.items(), key=lambda kv: len(kv[0]), reverse=True)
-    return exact, ranked
+
+    # Índice aproximado (números/placeholders como slots) para quase-duplicatas.
+    fuzzy = None
+    if FuzzyTranslationMemory is not None and exact:
+        fuzzy = FuzzyTranslationMemory()
+        fuzzy.add_many((sources[key], value) for key, value in exact.items())
+    return exact, ranked, fuzzy
 
 
 def _lookup_translation_memory(
     source: str,
     tm_exact: Dict[str, str],
     tm_ranked: List[Tuple[str, str]],
+    tm_fuzzy: Optional[Any] = None,
 ) -> str:
     src_key = _canon_text(source)
     if not src_key:
@@ -669,6 +686,13 @@ def _lookup_translation_memory(
         if right in tm_exact:
             return str(tm_exact.get(right, "") or "")
 
+    # Quase-duplicatas: mesmo template com outros números/códigos de controle.
+    # Vizinhos só por similaridade (negação, antônimos) não são aplicados.
+    if tm_fuzzy is not None:
+        match = tm_fuzzy.lookup(source)
+        if match is not None and match.translation and getattr(match, "auto_apply", False):
+            return match.translation
+
     # Heurística conservadora por sobreposição textual.
     for key, value in tm_ranked:
         if not key or not value:
@@ -689,6 +713,7 @@ def _semantic_autofix_candidate(
     register_policy: str,
     tm_exact: Optional[Dict[str, str]] = None,
     tm_ranked: Optional[List[Tuple[str, str]]] = None,
+    tm_fuzzy: Optional[Any] = None,
 ) -> str:
     src = str(source or "")
     dst = str(translated or "").strip()
@@ -717,6 +742,7 @@ def _semantic_autofix_candidate(
             src,
             tm_exact if isinstance(tm_exact, dict) else {},
             tm_ranked if isinstance(tm_ranked, list) else [],
+            tm_fuzzy,
         )
         if tm_value:
             dst = tm_value
@@ -740,6 +766,7 @@ def _semantic_autofix_candidate(
                     src,
                     tm_exact if isinstance(tm_exact, dict) else {},
                     tm_ranked if isinstance(tm_ranked, list) else [],
+                    tm_fuzzy,
                 )
                 if tm_value:
                     dst = tm_value
@@ -1810,8 +1837,9 @@ def repair_translated_jsonl_semantic(
 
     tm_exact: Dict[str, str] = {}
     tm_ranked: List[Tuple[str, str]] = []
+    tm_fuzzy = None
     if gate is not None:
-        tm_exact, tm_ranked = _build_translation_memory(pure_uid_map, trans_rows, gate)
+        tm_exact, tm_ranked, tm_fuzzy = _build_translation_memory(pure_uid_map, trans_rows, gate)
 
     target_uids: List[str] = []
     target_uid_set = set()
@@ -1878,6 +1906,7 @@ def repair_translated_jsonl_semantic(
             register_policy=policy,
             tm_exact=tm_exact,
             tm_ranked=tm_ranked,
+            tm_fuzzy=tm_fuzzy,
         )
         if not isinstance(dst_new, str) or not dst_new.strip():
             continue
@@ -0,0 +1,355 @@
+"""
+Agendador de Quota Multi-Chave (Gemini + backends locais)
+=========================================================
+
+Recursos:
+- Várias chaves/modelos, cada um com seu estado RPM (janela de 60s) e
+  RPD (contador diário com reset à meia-noite do fuso configurado)
+- Cada lote vai para a chave elegível com mais folga (headroom)
+- Previsão de quanto falta para uma chave liberar (janela RPM, reset
+  diário, cooldown após 429, ou latência média se está ocupada)
+- Prioridade: CRITICAL/HIGH (diálogos) vão para os backends premium;
+  NORMAL/LOW mantêm o Ollama local ocupado e só usam premium acima de
+  uma reserva diária guardada para alta prioridade
+- Relógio injetável (clock/sleep) para testes com tempo simulado
+"""
+
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+try:
+    from .batch_queue_manager import Priority
+except ImportError:
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(__file__))
+    from batch_queue_manager import Priority
+
+logger = logging.getLogger(__name__)
+
+RPM_WINDOW_SECONDS = 60.0
+DAY_SECONDS = 86400.0
+
+# Trechos de mensagens de erro do Gemini para 429 / quota diária
+RATE_LIMIT_MARKERS = ('429', 'resource_exhausted', 'quota', 'rate limit')
+DAILY_QUOTA_MARKERS = ('per day', 'perday', 'daily')
+
+
+@dataclass
+class BackendKey:
+    """Uma chave de API (ou backend local) com limites e estado de uso"""
+    key_id: str                              # Rótulo (nunca a chave em si)
+    backend: str = "gemini"
+    model: str = ""
+    api_key: str = field(default="", repr=False)
+    rpm: Optional[int] = None                # None = sem limite por minuto
+    rpd: Optional[int] = None                # None = sem limite diário
+    premium: bool = True                     # False = local (Ollama/NLLB)
+    max_concurrency: int = 1
+
+    # Estado
+    day_start: float = 0.0
+    day_used: int = 0
+    window: Deque[float] = field(default_factory=deque, repr=False)
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    avg_latency: float = 5.0
+    successes: int = 0
+    failures: int = 0
+
+
+@dataclass
+class KeyLease:
+    """Reserva de uma chave para um lote"""
+    key: BackendKey
+    priority: Priority
+    started: float
+
+
+class QuotaScheduler:
+    """Distribui lotes entre chaves/backends respeitando RPM/RPD e prioridade"""
+
+    def __init__(self,
+                 keys: Optional[Iterable[BackendKey]] = None,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep,
+                 state_file: Optional[str] = None,
+                 reset_utc_offset_hours: Optional[float] = None,
+                 premium_reserve: float = 0.2,
+                 max_premium_wait: float = 120.0):
+        """
+        Args:
+            keys: Chaves iniciais
+            clock: Relógio (epoch em segundos)
+            sleep: Espera (substituível em testes)
+            state_file: JSON com uso diário por chave (opcional)
+            reset_utc_offset_hours: Fuso do reset diário (None = horário local)
+            premium_reserve: Fração do RPD premium reservada para CRITICAL/HIGH
+            max_premium_wait: Espera prevista (s) acima da qual alta prioridade
+                cai para um backend local
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.state_file = Path(state_file) if state_file else None
+        self.reset_utc_offset_hours = reset_utc_offset_hours
+        self.premium_reserve = premium_reserve
+        self.max_premium_wait = max_premium_wait
+        self.keys: Dict[str, BackendKey] = {}
+        self.lock = Lock()
+        self._saved_state = self._load_state()
+        for key in keys or []:
+            self.add_key(key)
+
+    @classmethod
+    def for_gemini_keys(cls,
+                        api_keys: List[str],
+                        model: str = "gemini-2.5-flash",
+                        rpm: int = 15,
+                        rpd: int = 20,
+                        local_backends: Iterable[str] = ("ollama",),
+                        **kwargs) -> "QuotaScheduler":
+        """Scheduler com uma entrada por chave Gemini + backends locais ilimitados"""
+        scheduler = cls(**kwargs)
+        for i, api_key in enumerate(api_keys):
+            scheduler.add_key(BackendKey(key_id=f"gemini#{i + 1}", backend="gemini", model=model,
+                                         api_key=api_key, rpm=rpm, rpd=rpd))
+        for name in local_backends:
+            scheduler.add_key(BackendKey(key_id=name, backend=name, premium=False))
+        return scheduler
+
+    def add_key(self, key: BackendKey):
+        """Registra uma chave (restaura o uso diário salvo, se for do mesmo dia)"""
+        with self.lock:
+            now = self.clock()
+            key.day_start = self._day_start(now)
+            saved = self._saved_state.get(key.key_id) or {}
+            if saved.get('day_start') == key.day_start:
+                key.day_used = int(saved.get('day_used', 0))
+            self.keys[key.key_id] = key
+
+    # ------------------------------------------------------------------
+    # Relógio / reset diário
+    # ------------------------------------------------------------------
+    def _day_start(self, now: float) -> float:
+        if self.reset_utc_offset_hours is None:
+            local = datetime.fromtimestamp(now)
+            return local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        offset = self.reset_utc_offset_hours * 3600.0
+        return ((now + offset) // DAY_SECONDS) * DAY_SECONDS - offset
+
+    def _refresh(self, key: BackendKey, now: float):
+        day_start = self._day_start(now)
+        if day_start != key.day_start:
+            key.day_start = day_start
+            key.day_used = 0
+        while key.window and key.window[0] <= now - RPM_WINDOW_SECONDS:
+            key.window.popleft()
+
+    def _next_reset(self, now: float) -> float:
+        # +1h cobre dias de 23h/25h (horário de verão) no fuso local
+        return self._day_start(self._day_start(now) + DAY_SECONDS + 3600.0)
+
+    # ------------------------------------------------------------------
+    # Folga e previsão
+    # ------------------------------------------------------------------
+    def _headroom(self, key: BackendKey, now: float) -> float:
+        """Fração livre do limite mais apertado (0 = indisponível agora)"""
+        self._refresh(key, now)
+        if key.in_flight >= key.max_concurrency or key.cooldown_until > now:
+            return 0.0
+        fractions = [1.0]
+        if key.rpd:
+            fractions.append((key.rpd - key.day_used) / key.rpd)
+        if key.rpm:
+            fractions.append((key.rpm - len(key.window)) / key.rpm)
+        return max(0.0, min(fractions))
+
+    def _day_fraction_left(self, key: BackendKey) -> float:
+        return (key.rpd - key.day_used) / key.rpd if key.rpd else 1.0
+
+    def _wait(self, key: BackendKey, now: float) -> float:
+        """Segundos previstos até a chave aceitar um lote"""
+        if self._headroom(key, now) > 0:
+            return 0.0
+        waits = [0.0]
+        if key.cooldown_until > now:
+            waits.append(key.cooldown_until - now)
+        if key.rpd and key.day_used >= key.rpd:
+            waits.append(self._next_reset(now) - now)
+        if key.rpm and len(key.window) >= key.rpm:
+            waits.append(key.window[0] + RPM_WINDOW_SECONDS - now)
+        if key.in_flight >= key.max_concurrency:
+            waits.append(key.avg_latency)
+        return max(waits)
+
+    def _eligible(self, priority: Priority, now: float,
+                  backends: Optional[Iterable[str]] = None) -> List[BackendKey]:
+        premium = [k for k in self.keys.values() if k.premium]
+        local = [k for k in self.keys.values() if not k.premium]
+        if priority <= Priority.HIGH:
+            if not premium:
+                keys = local
+            elif min(self._wait(k, now) for k in premium) > self.max_premium_wait:
+                keys = premium + local
+            else:
+                keys = premium
+        elif priority >= Priority.LOW and local:
+            keys = local
+        else:
+            spare = [k for k in premium if self._day_fraction_left(k) > self.premium_reserve]
+            keys = local + spare
+        if backends is not None:
+            backends = set(backends)
+            keys = [k for k in keys if k.backend in backends]
+        return keys
+
+    def time_until_available(self, priority: Priority = Priority.NORMAL,
+                             backends: Optional[Iterable[str]] = None) -> Optional[float]:
+        """Espera prevista (s) até algum backend elegível aceitar; None se não há nenhum"""
+        with self.lock:
+            now = self.clock()
+            keys = self._eligible(priority, now, backends)
+            if not keys:
+                return None
+            return min(self._wait(k, now) for k in keys)
+
+    def predict_reset(self) -> float:
+        """Segundos até o próximo reset diário (RPD) das chaves"""
+        with self.lock:
+            now = self.clock()
+            return self._next_reset(now) - now
+
+    # ------------------------------------------------------------------
+    # Reserva / liberação
+    # ------------------------------------------------------------------
+    def acquire(self, priority: Priority = Priority.NORMAL,
+                backends: Optional[Iterable[str]] = None) -> Optional[KeyLease]:
+        """
+        Reserva a chave elegível com mais folga (sem bloquear).
+
+        Returns:
+            KeyLease, ou None se nenhuma chave elegível está livre agora
+        """
+        with self.lock:
+            now = self.clock()
+            best = None
+            best_room = 0.0
+            for key in self._eligible(priority, now, backends):
+                room = self._headroom(key, now)
+                if room > best_room:
+                    best, best_room = key, room
+            if best is None:
+                return None
+            best.in_flight += 1
+            best.day_used += 1
+            best.window.append(now)
+            self._save_state()
+            return KeyLease(key=best, priority=priority, started=now)
+
+    def acquire_wait(self, priority: Priority = Priority.NORMAL,
+                     backends: Optional[Iterable[str]] = None,
+                     max_wait: Optional[float] = None) -> Optional[KeyLease]:
+        """acquire() dormindo pelo tempo previsto; None se max_wait estourar"""
+        waited = 0.0
+        while True:
+            lease = self.acquire(priority, backends)
+            if lease is not None:
+                return lease
+            wait = self.time_until_available(priority, backends)
+            if wait is None or (max_wait is not None and waited + wait > max_wait):
+                return None
+            wait = max(wait, 0.01)
+            self.sleep(wait)
+            waited += wait
+
+    def release(self, lease: KeyLease, success: bool = True,
+                rate_limited: bool = False, daily_exhausted: bool = False,
+                error: Optional[str] = None):
+        """
+        Devolve a chave com o resultado do lote.
+
+        Args:
+            lease: Reserva de acquire()
+            success: Lote traduzido
+            rate_limited: Servidor respondeu 429 (aguarda a janela RPM)
+            daily_exhausted: Servidor informou quota diária esgotada
+            error: Mensagem de erro do backend (detecta 429/quota diária)
+        """
+        if error and not success:
+            lowered = str(error).lower()
+            if any(m in lowered for m in RATE_LIMIT_MARKERS):
+                rate_limited = True
+                daily_exhausted = daily_exhausted or any(m in lowered for m in DAILY_QUOTA_MARKERS)
+        with self.lock:
+            now = self.clock()
+            key = lease.key
+            key.in_flight = max(0, key.in_flight - 1)
+            latency = max(0.0, now - lease.started)
+            key.avg_latency += 0.3 * (latency - key.avg_latency)
+            if success:
+                key.successes += 1
+            else:
+                key.failures += 1
+            if rate_limited:
+                oldest = key.window[0] if key.window else now
+                key.cooldown_until = max(key.cooldown_until, oldest + RPM_WINDOW_SECONDS)
+            if daily_exhausted and key.rpd:
+                key.day_used = max(key.day_used, key.rpd)
+            self._save_state()
+
+    # ------------------------------------------------------------------
+    # Estado / persistência
+    # ------------------------------------------------------------------
+    def status(self) -> Dict[str, Dict]:
+        """Uso e previsão por chave"""
+        with self.lock:
+            now = self.clock()
+            out = {}
+            for key in self.keys.values():
+                out[key.key_id] = {
+                    'backend': key.backend,
+                    'model': key.model,
+                    'premium': key.premium,
+                    'day_used': key.day_used,
+                    'rpd': key.rpd,
+                    'rpm_used': len(key.window),
+                    'rpm': key.rpm,
+                    'headroom': round(self._headroom(key, now), 3),
+                    'wait_seconds': round(self._wait(key, now), 1),
+                    'reset_in_seconds': round(self._next_reset(now) - now, 1),
+                    'successes': key.successes,
+                    'failures': key.failures,
+                }
+            return out
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if self.state_file is None or not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('keys', {}) if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao carregar estado do scheduler: {e}")
+            return {}
+
+    def _save_state(self):
+        if self.state_file is None:
+            return
+        try:
+            data = {
+                'keys': {k.key_id: {'day_start': k.day_start, 'day_used': k.day_used}
+                         for k in self.keys.values()},
+                'updated_at': datetime.now().isoformat(),
+            }
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar estado do scheduler: {e}")
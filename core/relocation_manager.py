@@ -4,8 +4,11 @@ Relocation manager por arquitetura.
 
 Suposicoes minimas:
 1) Alocacao de espaco livre usa FreeSpaceAllocator existente.
-2) Atualizacao de ponteiros prioriza busca rapida por padrao binario.
+2) Atualizacao de ponteiros prioriza busca rapida por padrao binario,
+   via PointerIndex construido uma vez por ROM (reusado entre relocacoes).
 3) PointerScanner existente entra como fallback para deteccao automatica.
+4) Tail merge: payload (com terminador) que ja existe como sufixo de um
+   payload realocado antes nesta ROM reaproveita esses bytes.
 """
 
 from __future__ import annotations
@@ -17,11 +20,15 @@ from typing import Any
 try:
     from .console_memory_model import ConsoleMemoryModel
     from .free_space_allocator import FreeSpaceAllocator
+    from .pointer_index import PointerIndex
     from .pointer_scanner import PointerScanner
+    from .tail_merge import TailMergeIndex
 except Exception:  # pragma: no cover
     from console_memory_model import ConsoleMemoryModel
     from free_space_allocator import FreeSpaceAllocator
+    from pointer_index import PointerIndex
     from pointer_scanner import PointerScanner
+    from tail_merge import TailMergeIndex
 
 
 def _to_console_alias(console_type: str) -> str:
@@ -35,8 +42,32 @@ def _to_console_alias(console_type: str) -> str:
 
 
 class RelocationManager:
-    def __init__(self, console_model: ConsoleMemoryModel):
+    def __init__(self, console_model: ConsoleMemoryModel, tail_merge: bool = True):
         self.console_model = console_model
+        self._pointer_index: PointerIndex | None = None
+        self.tail_merge = bool(tail_merge)
+        self._tail_index: TailMergeIndex | None = None
+        self._tail_rom: bytearray | None = None
+
+    def get_pointer_index(self, rom_data: bytearray) -> PointerIndex:
+        """
+        Retorna o PointerIndex da ROM, construindo-o na primeira chamada.
+
+        Escritas feitas na ROM fora deste manager devem ser informadas via
+        index.notify_write() para que novos sitios sejam indexados.
+        """
+        index = self._pointer_index
+        if index is None or index.rom_data is not rom_data:
+            index = PointerIndex(rom_data, sizes=(2, 3, 4), endians=self._endianness_modes())
+            self._pointer_index = index
+        return index
+
+    def get_tail_index(self, rom_data: bytearray) -> TailMergeIndex:
+        """Payloads realocados nesta ROM (recriado quando a ROM muda)."""
+        if self._tail_index is None or self._tail_rom is not rom_data:
+            self._tail_index = TailMergeIndex()
+            self._tail_rom = rom_data
+        return self._tail_index
 
     def relocate(
         self,
@@ -49,6 +80,8 @@ class RelocationManager:
         - Valida via ConsoleMemoryModel
         - Atualiza ponteiros usando PointerScanner
         - Evita sobrescrever codigo
+        - Reaproveita o sufixo de um payload ja realocado (tail merge)
+        - Realoja os guests que viviam nos bytes apagados do texto antigo
         """
         if not isinstance(rom_data, bytearray):
             raise TypeError("rom_data precisa ser bytearray")
@@ -62,6 +95,8 @@ class RelocationManager:
             "pointers_updated": 0,
             "in_bounds": False,
             "within_free_space": False,
+            "tail_merged": False,
+            "guests_rehomed": 0,
         }
         if old_offset < 0 or not new_bytes:
             result["reason"] = "invalid_input"
@@ -69,6 +104,13 @@ class RelocationManager:
 
         console = _to_console_alias(self.console_model.console_type)
         allocator = FreeSpaceAllocator(rom_data, console)
+        fill = int(allocator.profile.get("fill_byte", 0xFF)) & 0xFF
+        if self.tail_merge:
+            shared = self._relocate_into_tail(rom_data, old_offset, bytes(new_bytes), fill, allocator)
+            if shared is not None:
+                result.update(shared)
+                return result
+
         alignment = max(1, int(getattr(self.console_model, "alignment", 1)))
         new_offset = allocator.allocate(
             size=len(new_bytes),
@@ -86,13 +128,11 @@ class RelocationManager:
             result["within_free_space"] = self._is_within_allocator_regions(new_offset, len(new_bytes), allocator)
             return result
 
-        rom_data[new_offset : new_offset + len(new_bytes)] = new_bytes
-        fill = int(allocator.profile.get("fill_byte", 0xFF)) & 0xFF
-        clear_len = min(len(new_bytes), max(0, len(rom_data) - old_offset))
-        if clear_len > 0:
-            rom_data[old_offset : old_offset + clear_len] = bytes([fill]) * clear_len
-
+        self.get_pointer_index(rom_data).write(new_offset, new_bytes)
         pointers_updated = self._update_pointers(rom_data, old_offset, new_offset)
+        clear_len = min(len(new_bytes), max(0, len(rom_data) - old_offset))
+        guests = self._release_old(rom_data, old_offset, clear_len, fill, allocator,
+                                   new_host=(new_offset, bytes(new_bytes)))
         result.update(
             {
                 "relocated": True,
@@ -100,12 +140,114 @@ class RelocationManager:
                 "new_offset": int(new_offset),
                 "bytes_written": int(len(new_bytes)),
                 "pointers_updated": int(pointers_updated),
+                "guests_rehomed": int(guests),
                 "in_bounds": (new_offset + len(new_bytes)) <= len(rom_data),
                 "within_free_space": self._is_within_allocator_regions(new_offset, len(new_bytes), allocator),
             }
         )
         return result
 
+    def _relocate_into_tail(
+        self,
+        rom_data: bytearray,
+        old_offset: int,
+        new_bytes: bytes,
+        fill: int,
+        allocator: FreeSpaceAllocator,
+    ) -> dict[str, Any] | None:
+        """Aponta para o sufixo igual de um payload ja realocado; None se nao houver."""
+        tails = self.get_tail_index(rom_data)
+        shared_offset = tails.find(new_bytes, rom_data)
+        if shared_offset is None:
+            return None
+        clear_len = min(len(new_bytes), max(0, len(rom_data) - old_offset))
+        # O texto antigo sera apagado: nao pode conter o host
+        if shared_offset < old_offset + clear_len and shared_offset + len(new_bytes) > old_offset:
+            return None
+
+        tails.bytes_saved += len(new_bytes)
+        pointers_updated = self._update_pointers(rom_data, old_offset, shared_offset)
+        tails.add_guest(shared_offset, new_bytes)
+        guests = self._release_old(rom_data, old_offset, clear_len, fill, allocator)
+        return {
+            "relocated": True,
+            "reason": "ok",
+            "new_offset": int(shared_offset),
+            "bytes_written": 0,
+            "pointers_updated": int(pointers_updated),
+            "in_bounds": (shared_offset + len(new_bytes)) <= len(rom_data),
+            "within_free_space": True,
+            "tail_merged": True,
+            "guests_rehomed": int(guests),
+        }
+
+    def _release_old(
+        self,
+        rom_data: bytearray,
+        old_offset: int,
+        clear_len: int,
+        fill: int,
+        allocator: FreeSpaceAllocator,
+        new_host: tuple[int, bytes] | None = None,
+    ) -> int:
+        """
+        Apaga o texto antigo (ponteiros ja movidos) sem deixar guests orfaos.
+
+        Guests que viviam nos bytes apagados sao realojados antes (sufixo de
+        outro host ou espaco novo). Se algum nao couber, os bytes antigos
+        ficam como estao, ainda hospedando esse guest.
+
+        Returns:
+            Numero de guests realojados
+        """
+        tails = self.get_tail_index(rom_data)
+        if tails.release_guest(old_offset):
+            # Era guest: os bytes sao do host, que continua em uso
+            if new_host is not None:
+                tails.add(*new_host)
+            return 0
+
+        end = old_offset + clear_len
+        # Guest no proprio old_offset (duplicata exata): os ponteiros ja seguiram o host
+        orphans = [(off, data) for off, data in tails.forget(old_offset, end) if off != old_offset]
+        if new_host is not None:
+            tails.add(*new_host)
+        stranded = [(off, data) for off, data in orphans
+                    if not self._rehome_guest(rom_data, off, data, allocator)]
+        if stranded:
+            for off, data in stranded:
+                tails.add_guest(off, data)
+        elif clear_len > 0:
+            self.get_pointer_index(rom_data).write(old_offset, bytes([fill]) * clear_len)
+        return len(orphans) - len(stranded)
+
+    def _rehome_guest(
+        self,
+        rom_data: bytearray,
+        guest_offset: int,
+        payload: bytes,
+        allocator: FreeSpaceAllocator,
+    ) -> bool:
+        """Move os ponteiros de um guest para outro sufixo igual ou para espaco novo."""
+        tails = self.get_tail_index(rom_data)
+        target = tails.find(payload, rom_data)
+        if target is not None:
+            tails.add_guest(target, payload)
+        else:
+            alignment = max(1, int(getattr(self.console_model, "alignment", 1)))
+            target = allocator.allocate(
+                size=len(payload),
+                alignment=alignment,
+                item_uid=f"reloc_{guest_offset:06X}",
+            )
+            if target is None or not self.console_model.validate_write(target, len(payload)):
+                return False
+            self.get_pointer_index(rom_data).write(target, payload)
+            tails.add(target, payload)
+            tails.bytes_saved -= len(payload)
+        self._update_pointers(rom_data, guest_offset, target)
+        return True
+
     def _is_within_allocator_regions(self, offset: int, size: int, allocator: FreeSpaceAllocator) -> bool:
         end = int(offset) + int(size)
         for region in getattr(allocator, "regions", []):
@@ -123,6 +265,7 @@ class RelocationManager:
         if not refs:
             refs = self._collect_pointer_refs_scanner(rom_data, old_offset)
 
+        index = self.get_pointer_index(rom_data)
         updated = 0
         for ref in refs:
             ptr_off = int(ref["offset"])
@@ -130,7 +273,7 @@ class RelocationManager:
             endian = str(ref["endianness"])
             value = self._new_pointer_value(new_offset, ptr_size)
             try:
-                rom_data[ptr_off : ptr_off + ptr_size] = int(value).to_bytes(ptr_size, endian, signed=False)
+                index.write_pointer(ptr_off, value, ptr_size, endian)
                 updated += 1
             except Exception:
                 continue
@@ -140,27 +283,25 @@ class RelocationManager:
         refs: list[dict[str, Any]] = []
         seen: set[tuple[int, int, str]] = set()
         endianness_modes = self._endianness_modes()
+        index = self.get_pointer_index(rom_data)
 
         for size in (2, 3, 4):
             candidates = self._candidate_pointer_values(old_offset, size)
             for endian in endianness_modes:
                 for candidate in candidates:
-                    try:
-                        pattern = int(candidate).to_bytes(size, endian, signed=False)
-                    except OverflowError:
+                    if int(candidate) >= (1 << (size * 8)):
                         continue
-                    pos = bytes(rom_data).find(pattern)
-                    while pos >= 0:
+                    for pos in index.sites(int(candidate), size, endian):
                         key = (pos, size, endian)
                         if key not in seen:
                             seen.add(key)
                             refs.append({"offset": pos, "size": size, "endianness": endian})
-                        pos = bytes(rom_data).find(pattern, pos + 1)
         return refs
 
     def _collect_pointer_refs_scanner(self, rom_data: bytearray, old_offset: int) -> list[dict[str, Any]]:
         endianness_modes = self._endianness_modes()
-        scanner = PointerScanner(bytes(rom_data))
+        # Scanner só lê (e é descartado aqui): usa o bytearray sem copiar
+        scanner = PointerScanner(rom_data)
         with contextlib.redirect_stdout(io.StringIO()):
             scanner.scan(pointer_sizes=[2, 3, 4], endianness_modes=endianness_modes)
 
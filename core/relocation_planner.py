@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+RELOCATION PLANNER - Empacotamento global de textos realocados
+================================================================================
+Em vez de alocar cada string que estourou o espaco original na ordem em que
+chega (e ver as grandes falharem depois que as pequenas ocuparam os melhores
+buracos), coleta todos os itens de overflow e resolve o empacotamento de uma
+vez:
+
+- Largest-first decreasing: maiores (e mais restritos) primeiro, best-fit
+- Restricao de banco por item: janela de offsets alcancaveis pelos ponteiros
+  (ver sms_pointer_transform.reachable_offset_range); varios ponteiros =
+  intersecao das janelas
+- Pools em ordem de preferencia (regioes do usuario, default...) e, por
+  ultimo, expansao virtual da ROM
+- Busca local opcional (sem ILP):
+  1) ejecao: libera um item ja colocado para abrir espaco a um nao colocado
+     e recoloca o ejetado em outro buraco
+  2) compactacao: traz itens da expansao de volta para buracos da ROM
+
+Saida: RelocationPlan com mapa de alocacao, relatorio do que nao coube e bytes
+de expansao necessarios. O planner nao escreve na ROM; o consumidor aplica o
+plano com allocate_at() do seu alocador.
+
+Uso:
+    planner = RelocationPlanner([("user", index.copy())], expansion=(len(rom), 0x8000))
+    plan = planner.plan([PackingItem("text_1", 40, window=(0x8000, 0xC000))])
+================================================================================
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .free_space_allocator import FreeSpaceIndex
+
+Window = Tuple[int, int]
+
+EXPANSION_POOL = "expansion"
+# Placement dentro dos bytes de outra string (ver core/tail_merge.py)
+TAIL_MERGE_POOL = "tail_merge"
+
+
+@dataclass
+class PackingItem:
+    """Um bloco a realocar."""
+    uid: Hashable
+    size: int
+    alignment: int = 1
+    window: Optional[Window] = None  # [lo, hi) alcancavel pelos ponteiros
+    order: int = 0                   # ordem original (desempate estavel)
+
+
+@dataclass
+class Placement:
+    """Onde um item foi colocado."""
+    offset: int
+    size: int
+    pool: str
+
+    def to_dict(self) -> dict:
+        return {'offset': f"0x{self.offset:06X}", 'size': self.size, 'pool': self.pool}
+
+
+@dataclass
+class RelocationPlan:
+    """Resultado do planejamento."""
+    placements: Dict[Hashable, Placement] = field(default_factory=dict)
+    unplaced: List[Dict[str, Any]] = field(default_factory=list)
+    expansion_bytes: int = 0
+    moves: int = 0
+    bytes_saved: int = 0  # bytes que nao precisaram de espaco (tail merge)
+
+    def offset_of(self, uid: Hashable) -> Optional[int]:
+        placement = self.placements.get(uid)
+        return placement.offset if placement else None
+
+    def reason_for(self, uid: Hashable) -> Optional[str]:
+        for entry in self.unplaced:
+            if entry['uid'] == uid:
+                return entry['reason']
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            'placed': len(self.placements),
+            'unplaced_count': len(self.unplaced),
+            'expansion_bytes': self.expansion_bytes,
+            'local_search_moves': self.moves,
+            'tail_merge_bytes_saved': self.bytes_saved,
+            'allocation_map': {str(uid): p.to_dict() for uid, p in self.placements.items()},
+            'unplaced': [dict(entry, uid=str(entry['uid'])) for entry in self.unplaced],
+        }
+
+
+def intersect_windows(windows: Sequence[Optional[Window]]) -> Optional[Window]:
+    """Intersecao de janelas (None = sem restricao). Vazia -> (0, 0)."""
+    lo, hi = None, None
+    for window in windows:
+        if window is None:
+            continue
+        lo = window[0] if lo is None else max(lo, window[0])
+        hi = window[1] if hi is None else min(hi, window[1])
+    if lo is None:
+        return None
+    return (lo, hi) if hi > lo else (0, 0)
+
+
+class RelocationPlanner:
+    """
+    Planejador de realocacao em lote.
+
+    Args:
+        pools: [(nome, FreeSpaceIndex), ...] em ordem de preferencia. Os
+            indices sao consumidos: passe copias se a free-list real nao deve
+            mudar.
+        expansion: (inicio, limite_em_bytes) de expansao virtual da ROM, ou None
+        bank_size: Granularidade da expansao (expansion_bytes e arredondado)
+        local_search: Habilita ejecao/compactacao apos o guloso
+        max_moves: Limite de tentativas da busca local
+    """
+
+    def __init__(self,
+                 pools: Sequence[Tuple[str, FreeSpaceIndex]],
+                 expansion: Optional[Tuple[int, int]] = None,
+                 bank_size: int = 0x4000,
+                 local_search: bool = True,
+                 max_moves: int = 2000):
+        self.pools: List[Tuple[str, FreeSpaceIndex]] = list(pools)
+        self.expansion_start: Optional[int] = None
+        if expansion is not None and expansion[1] > 0:
+            self.expansion_start = int(expansion[0])
+            self.pools.append((EXPANSION_POOL, FreeSpaceIndex(
+                [(expansion[0], expansion[0] + expansion[1])], bank_size=bank_size)))
+        self.bank_size = max(1, int(bank_size or 1))
+        self.local_search = bool(local_search)
+        self.max_moves = max(0, int(max_moves))
+
+    # ------------------------------------------------------------------
+    def _try_place(self, item: PackingItem, pools: Optional[List[Tuple[str, FreeSpaceIndex]]] = None
+                   ) -> Optional[Placement]:
+        lo, hi = item.window if item.window is not None else (None, None)
+        for name, index in (pools if pools is not None else self.pools):
+            offset = index.allocate(item.size, alignment=item.alignment, strategy="best", lo=lo, hi=hi)
+            if offset is not None:
+                return Placement(offset, item.size, name)
+        return None
+
+    def _release(self, placement: Placement):
+        self._pool(placement.pool).free(placement.offset, placement.size)
+
+    def _restore(self, placement: Placement):
+        self._pool(placement.pool).reserve(placement.offset, placement.offset + placement.size)
+
+    def _pool(self, name: str) -> FreeSpaceIndex:
+        for pool_name, index in self.pools:
+            if pool_name == name:
+                return index
+        raise KeyError(name)
+
+    @staticmethod
+    def _window_overlaps(item: PackingItem, placement: Placement) -> bool:
+        if item.window is None:
+            return True
+        return placement.offset < item.window[1] and placement.offset + placement.size > item.window[0]
+
+    def _expansion_bytes(self, placements: Dict[Hashable, Placement]) -> int:
+        if self.expansion_start is None:
+            return 0
+        used = max((p.offset + p.size for p in placements.values() if p.pool == EXPANSION_POOL),
+                   default=self.expansion_start)
+        grown = used - self.expansion_start
+        return -(-grown // self.bank_size) * self.bank_size if grown > 0 else 0
+
+    # ------------------------------------------------------------------
+    def plan(self, items: Sequence[PackingItem]) -> RelocationPlan:
+        """Resolve o empacotamento; cada uid deve ser unico."""
+        result = RelocationPlan()
+        by_uid = {item.uid: item for item in items}
+        pending: List[PackingItem] = []
+
+        def _width(item: PackingItem) -> int:
+            return item.window[1] - item.window[0] if item.window is not None else 1 << 62
+
+        for item in sorted(items, key=lambda it: (-it.size, _width(it), it.order)):
+            if item.size <= 0:
+                result.unplaced.append({'uid': item.uid, 'size': item.size, 'reason': 'invalid_size'})
+                continue
+            if item.window is not None and item.window[1] <= item.window[0]:
+                result.unplaced.append({'uid': item.uid, 'size': item.size, 'reason': 'empty_pointer_window'})
+                continue
+            placement = self._try_place(item)
+            if placement is None:
+                pending.append(item)
+            else:
+                result.placements[item.uid] = placement
+
+        if self.local_search:
+            pending = self._eject_for(pending, result, by_uid)
+            self._compact(result, by_uid)
+
+        for item in sorted(pending, key=lambda it: it.order):
+            result.unplaced.append({
+                'uid': item.uid,
+                'size': item.size,
+                'reason': 'no_space_in_window' if item.window is not None else 'no_space',
+            })
+        result.expansion_bytes = self._expansion_bytes(result.placements)
+        return result
+
+    def _eject_for(self, pending: List[PackingItem], result: RelocationPlan,
+                   by_uid: Dict[Hashable, PackingItem]) -> List[PackingItem]:
+        """Ejecao: abre espaco para um item pendente tirando um colocado."""
+        still: List[PackingItem] = []
+        for item in pending:
+            placed = False
+            victims = sorted(
+                (uid for uid, p in result.placements.items() if self._window_overlaps(item, p)),
+                key=lambda uid: (result.placements[uid].size, by_uid[uid].order),
+            )
+            for uid in victims:
+                if result.moves >= self.max_moves:
+                    break
+                result.moves += 1
+                old = result.placements[uid]
+                self._release(old)
+                new_item = self._try_place(item)
+                if new_item is not None:
+                    new_victim = self._try_place(by_uid[uid])
+                    if new_victim is not None:
+                        result.placements[item.uid] = new_item
+                        result.placements[uid] = new_victim
+                        placed = True
+                        break
+                    self._release(new_item)
+                self._restore(old)
+            if not placed:
+                still.append(item)
+        return still
+
+    def _compact(self, result: RelocationPlan, by_uid: Dict[Hashable, PackingItem]):
+        """Compactacao: tira da expansao o que cabe em buracos da ROM."""
+        rom_pools = [pool for pool in self.pools if pool[0] != EXPANSION_POOL]
+        in_expansion = sorted(
+            (uid for uid, p in result.placements.items() if p.pool == EXPANSION_POOL),
+            key=lambda uid: -result.placements[uid].offset,
+        )
+        for uid in in_expansion:
+            if result.moves >= self.max_moves:
+                break
+            result.moves += 1
+            placement = self._try_place(by_uid[uid], rom_pools)
+            if placement is not None:
+                self._release(result.placements[uid])
+                result.placements[uid] = placement
@@ -20,6 +20,7 @@ V6.0 PRO (NeuroROM AI)
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Dict
 
@@ -68,6 +69,13 @@ def _find_all(haystack: bytes, needle: bytes) -> List[int]:
     return out
 
 
+def _count(haystack, needle: bytes) -> int:
+    """bytes.count (sem sobreposição) também para memoryview/mmap, sem copiar."""
+    if hasattr(haystack, "count"):
+        return haystack.count(needle)
+    return sum(1 for _ in re.finditer(re.escape(needle), haystack))
+
+
 def find_free_space_in_range(
     rom: bytearray,
     start: int,
@@ -403,7 +411,7 @@ def detect_sms_pointer_base(
                 if little_endian
                 else bytes([(addr >> 8) & 0xFF, addr & 0xFF])
             )
-            score += rom.count(b)
+            score += _count(rom, b)
         if score > best_score:
             best_score = score
             best_base = base
@@ -28,6 +28,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Mapping
 
 from .free_space_allocator import FreeSpaceAllocator
+from .relocation_planner import PackingItem, RelocationPlanner, intersect_windows
 from .retro8_bank_tools import patch_u16, patch_banked_pointer3, patch_bank_table_entry
 from .reinsertion_rules import ReinsertionRules, ReinsertionResult
 try:
@@ -61,6 +62,7 @@ try:
     from .console_memory_model import ConsoleMemoryModel
     from .encoding_adapter import EncodingAdapter
     from .glyph_metrics import GlyphMetrics
+    from .pointer_index import PointerIndex
     from .pointer_scanner import PointerScanner
     from .relocation_manager import RelocationManager
     from .runtime_qa_simulator import RuntimeQASimulator
@@ -71,6 +73,7 @@ except Exception:
         from console_memory_model import ConsoleMemoryModel
         from encoding_adapter import EncodingAdapter
         from glyph_metrics import GlyphMetrics
+        from pointer_index import PointerIndex
         from pointer_scanner import PointerScanner
         from relocation_manager import RelocationManager
         from runtime_qa_simulator import RuntimeQASimulator
@@ -80,18 +83,19 @@ except Exception:
         ConsoleMemoryModel = None
         EncodingAdapter = None
         GlyphMetrics = None
+        PointerIndex = None
         PointerScanner = None
         RelocationManager = None
         RuntimeQASimulator = None
         TextLayoutEngine = None
 
 try:
-    from .compression_detector import CompressionDetector
+    from .compression_detector import detect_regions
 except Exception:
     try:
-        from compression_detector import CompressionDetector
+        from compression_detector import detect_regions
     except Exception:
-        CompressionDetector = None
+        detect_regions = None
 
 try:
     from plugins.plugin_registry import get_plugin_for_rom as _get_plugin_for_rom
@@ -483,6 +487,13 @@ class SafeReinserter:
             "algorithms": list(self.COMPRESSION_PROFILE_BY_CONSOLE.get(str(self.console), [])),
         }
         self.detected_compressed_regions: List[Dict[str, Any]] = []
+        # Índice reverso de ponteiros (construído sob demanda, uma vez por ROM)
+        self._pointer_index = None
+        # Realocação em lote: itens que estouram são planejados juntos no fim
+        self.batch_relocation = True
+        self.relocation_local_search = True
+        self._deferred_relocations: Optional[List[Dict[str, Any]]] = None
+        self.last_relocation_plan: Optional[Dict[str, Any]] = None
 
         # Estatísticas
         self.stats = {
@@ -1210,11 +1221,12 @@ class SafeReinserter:
     def _detect_compressed_regions_with_detector(self) -> List[Dict[str, Any]]:
         if self.detected_compressed_regions:
             return list(self.detected_compressed_regions)
-        if CompressionDetector is None:
+        if detect_regions is None:
             return []
         try:
-            detector = CompressionDetector(bytes(self.rom_data))
-            regions = detector.detect(block_size=2048)
+            # Cache de análise por SHA-256: reinserções repetidas na mesma ROM
+            # não refazem a detecção
+            regions = detect_regions(bytes(self.rom_data), block_size=2048)
         except Exception as exc:
             print(f"⚠️  CompressionDetector indisponível neste runtime: {exc}")
             return []
@@ -1222,14 +1234,14 @@ class SafeReinserter:
         normalized: List[Dict[str, Any]] = []
         for reg in regions or []:
             try:
-                offset = int(getattr(reg, "offset", -1))
-                size = int(getattr(reg, "size", 0))
+                offset = int(reg.get("offset", -1))
+                size = int(reg.get("size", 0))
             except Exception:
                 continue
             if offset < 0 or size <= 0:
                 continue
-            algo = self._normalize_compression_name(getattr(reg, "algorithm", ""))
-            confidence = float(getattr(reg, "confidence", 0.0) or 0.0)
+            algo = self._normalize_compression_name(reg.get("algorithm", ""))
+            confidence = float(reg.get("confidence", 0.0) or 0.0)
             normalized.append(
                 {
                     "offset": int(offset),
@@ -1368,6 +1380,16 @@ class SafeReinserter:
             block["entries"].sort(key=lambda it: (int(it.get("local_offset", 0)), int(it.get("text_id", 0))))
         return blocks
 
+    def _get_pointer_index(self):
+        """PointerIndex compartilhado para self.rom_data (reconstruído se a ROM for trocada)."""
+        if PointerIndex is None:
+            return None
+        index = self._pointer_index
+        if index is None or index.rom_data is not self.rom_data:
+            index = PointerIndex(self.rom_data)
+            self._pointer_index = index
+        return index
+
     def _get_plugin_for_pointer_search(self, rom_bytes: bytes):
         """Obtém plugin de console para mapeamento de ponteiros."""
         if _get_plugin_for_rom is None:
@@ -1386,10 +1408,13 @@ class SafeReinserter:
         old_offset: int,
         new_offset: int,
         max_refs: int = 512,
+        pointer_index: Optional[PointerIndex] = None,
     ) -> List[Dict[str, Any]]:
         """
         Procura referências de ponteiro para old_offset e gera refs atualizáveis.
-        Estratégia: varredura linear com mapeamento do plugin (segura e genérica).
+        Estratégia: consulta ao PointerIndex (mapa inverso alvo → valores com
+        mapeamento do plugin), mesma ordem e validação da varredura linear.
+        Sem índice compartilhado, constrói um índice temporário para rom_bytes.
         """
         refs: List[Dict[str, Any]] = []
         seen_ptr_offsets: set = set()
@@ -1423,16 +1448,19 @@ class SafeReinserter:
             # fallback direto
             return int(value) if 0 <= int(value) < rom_len else None
 
+        if pointer_index is None:
+            pointer_index = PointerIndex(bytearray(rom_bytes), sizes=sizes, endians=endians)
+        mapper_key = (type(plugin).__name__ if plugin else "direct", rom_len)
+
         for size in sizes:
             for end in endians:
                 max_val = 1 << (size * 8)
-                for off in range(0, rom_len - size + 1):
-                    # alinhamento leve para reduzir falso-positivo
-                    if off % max(1, size) != 0:
-                        continue
-                    raw = int.from_bytes(rom_bytes[off:off + size], end, signed=False)
-                    mapped = _map_value(raw)
-                    if mapped != int(old_offset):
+                # alinhamento leve para reduzir falso-positivo
+                hits = pointer_index.sites_for_target(
+                    int(old_offset), size, end, _map_value, mapper_key, alignment=max(1, size)
+                )
+                for off, raw in hits:
+                    if off + size > rom_len:
                         continue
 
                     # valida se novo valor aponta para o novo offset
@@ -1495,6 +1523,8 @@ class SafeReinserter:
         except Exception:
             return False
         self.rom_data[ptr_offset:ptr_offset + ptr_size] = data
+        if self._pointer_index is not None and self._pointer_index.rom_data is self.rom_data:
+            self._pointer_index.notify_write(ptr_offset, ptr_size)
         return True
 
     def _apply_compressed_blocks_auto(self, translations: Dict[int, str]) -> Dict[str, Any]:
@@ -1623,7 +1653,8 @@ class SafeReinserter:
             if not touched:
                 continue
 
-            comp_res = comp_engine.compress(bytes(decomp_buf), alg_enum)
+            # budget = tamanho original: se o greedy estourar, tenta parse ótimo antes de realocar
+            comp_res = comp_engine.compress(bytes(decomp_buf), alg_enum, {"budget": block_size})
             if not comp_res.success or not comp_res.data:
                 for item in touched:
                     _mark_blocked(int(item.get("text_id", -1)), "compressed_recompress_failed")
@@ -1667,6 +1698,7 @@ class SafeReinserter:
                     old_offset=int(block_off),
                     new_offset=int(new_off),
                     max_refs=512,
+                    pointer_index=self._get_pointer_index(),
                 )
                 filtered_refs: List[Dict[str, Any]] = []
                 for ref in refs:
@@ -3158,6 +3190,8 @@ class SafeReinserter:
         self._processed_text_ids.update(applied_compressed_ids)
         self._processed_text_ids.update(blocked_compressed_ids)
 
+        self._deferred_relocations = [] if self.batch_relocation else None
+        self.last_relocation_plan = None
         for text_id, translated_text in sorted(translations.items(), key=lambda kv: int(kv[0])):
             if int(text_id) in applied_compressed_ids or int(text_id) in blocked_compressed_ids:
                 continue
@@ -3175,6 +3209,7 @@ class SafeReinserter:
                 })
                 self.stats['skipped'] += 1
                 print(f"⚠️  Skipped text #{text_id}: {e}")
+        self._flush_deferred_relocations()
 
         missing_before = len(self.segment_audit_rows)
         self._append_missing_untranslated_rows()
@@ -3391,15 +3426,110 @@ class SafeReinserter:
             self._log_blocked(text_id, segment["failure_reason"])
             return False
 
+        if self._deferred_relocations is not None:
+            # Conta como aplicado agora; _flush_deferred_relocations corrige se falhar
+            self._deferred_relocations.append({
+                "text_id": text_id,
+                "segment": segment,
+                "encoded": encoded_with_term,
+                "original_offset": original_offset,
+                "original_length": original_length,
+                "pointer_refs": pointer_refs,
+            })
+            return True
+
         new_offset = self.allocator.allocate(
             size=len(encoded_with_term),
             alignment=2,
             item_uid=f"text_{text_id}"
         )
+        return self._commit_relocation(
+            text_id, segment, encoded_with_term, original_offset, original_length, pointer_refs, new_offset
+        )
+
+    def _relocation_window(self, pref: Dict[str, Any], original_offset: int) -> Optional[Tuple[int, int]]:
+        """Offsets que o ponteiro alcança sem trocar de banco (espelha _compute_pointer_value)."""
+        ptr_size = int(self._safe_int(pref.get("ptr_size"), default=2) or 2)
+        if ptr_size != 2 or pref.get("bank_table_offset"):
+            return None  # banco é regravado junto com o ponteiro
+        mode = str(pref.get("addressing_mode", "ABSOLUTE") or "ABSOLUTE").upper()
+        bank_size = int(self.allocator.profile.get("bank_size", 0x4000) or 0x4000)
+        if mode in ("LOROM_16", "NES_8000", "NES_C000", "SMS_BASE", "SMS_BASE8000", "SMS_BASE4000"):
+            bank_start = (int(original_offset) // bank_size) * bank_size
+            return bank_start, bank_start + bank_size
+        if mode == "HIROM_16":
+            page_start = (int(original_offset) // 0x10000) * 0x10000
+            return page_start, page_start + 0x10000
+        addend = int(self._safe_int(pref.get("addend"), default=0) or 0)
+        return max(0, -addend), max(0, 0x10000 - addend)
+
+    def _flush_deferred_relocations(self):
+        """Planeja e aplica as realocações adiadas (largest-first, por banco)."""
+        deferred = self._deferred_relocations or []
+        self._deferred_relocations = None
+        if not deferred:
+            return
+
+        items = [
+            PackingItem(
+                uid=entry["text_id"],
+                size=len(entry["encoded"]),
+                alignment=2,
+                window=intersect_windows([
+                    self._relocation_window(pref, entry["original_offset"])
+                    for pref in entry["pointer_refs"]
+                ]),
+                order=order,
+            )
+            for order, entry in enumerate(deferred)
+        ]
+        planner = RelocationPlanner(
+            self.allocator.free_lists(),
+            expansion=self.allocator.expansion_budget(),
+            bank_size=int(self.allocator.profile.get("bank_size", 0x4000) or 0x4000),
+            local_search=self.relocation_local_search,
+        )
+        plan = planner.plan(items)
+        self.last_relocation_plan = plan.to_dict()
+
+        for entry in deferred:
+            text_id = entry["text_id"]
+            new_offset = plan.offset_of(text_id)
+            reason = plan.reason_for(text_id) or "allocation failed"
+            if new_offset is not None and not self.allocator.allocate_at(
+                new_offset, len(entry["encoded"]), alignment=2, item_uid=f"text_{text_id}"
+            ):
+                new_offset, reason = None, "planned offset no longer free"
+            applied = self._commit_relocation(
+                text_id,
+                entry["segment"],
+                entry["encoded"],
+                entry["original_offset"],
+                entry["original_length"],
+                entry["pointer_refs"],
+                new_offset,
+                failure_reason=f"NO_FREE_SPACE: {reason}",
+            )
+            if not applied:
+                self.stats['inserted'] -= 1
+                self.stats['skipped'] += 1
+
+    def _commit_relocation(
+        self,
+        text_id: int,
+        segment: Dict[str, Any],
+        encoded_with_term: bytes,
+        original_offset: int,
+        original_length: int,
+        pointer_refs: List[Dict[str, Any]],
+        new_offset: Optional[int],
+        failure_reason: str = "NO_FREE_SPACE: allocation failed",
+    ) -> bool:
+        """Escreve o texto em new_offset e repointa (com rollback se falhar)."""
         if new_offset is None:
             self.stats['allocation_failed'] += 1
             segment["status"] = "ABORTED_RELOCATION"
-            segment["failure_reason"] = "NO_FREE_SPACE: allocation failed"
+            segment["failure_reason"] = failure_reason
             self.segment_audit_rows.append(segment)
             self._log_blocked(text_id, segment["failure_reason"])
             return False
@@ -23,6 +23,11 @@ import struct
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
+try:
+    from utils.rom_io import RomImage
+except Exception:
+    RomImage = None
+
 
 class SegaExtractor:
     """Extrator especializado para plataformas Sega"""
@@ -73,15 +78,20 @@ class SegaExtractor:
         """
         self.rom_path = Path(rom_path)
         self.rom_data = None
+        self.rom_image = None
         self.platform = None
         self.config = None
 
         if not self.rom_path.exists():
             raise FileNotFoundError(f"ROM não encontrada: {rom_path}")
 
-        # Carrega ROM
-        with open(self.rom_path, 'rb') as f:
-            self.rom_data = bytearray(f.read())
+        # Carrega ROM (mmap somente leitura; SMD decodificado vira bytearray próprio)
+        if RomImage is not None:
+            self.rom_image = RomImage(self.rom_path)
+            self.rom_data = self.rom_image.view()
+        else:
+            with open(self.rom_path, 'rb') as f:
+                self.rom_data = bytearray(f.read())
 
         # Detecta plataforma
         self._detect_platform()
@@ -89,6 +99,26 @@ class SegaExtractor:
         # Decodifica SMD se necessário
         if self.config.get('interleaved'):
             self._decode_smd()
+            if not isinstance(self.rom_data, memoryview):
+                # Decodificada é cópia própria: o mapeamento já não é usado
+                self.close()
+
+    def close(self):
+        """Libera o mapeamento da ROM (rom_data deixa de ser válido se era view)."""
+        if isinstance(self.rom_data, memoryview):
+            try:
+                self.rom_data.release()
+            except BufferError:
+                pass  # Views derivadas vivas: o mmap fecha quando forem coletadas
+        if self.rom_image is not None:
+            self.rom_image.close()
+            self.rom_image = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def _detect_platform(self):
         """Detecta plataforma Sega automaticamente"""
@@ -239,7 +269,7 @@ class SegaExtractor:
         2) varre u16 LE na ROM e tenta resolver para offsets dentro do bank 16KB
         3) valida string por terminador + confiança
         """
-        rom = bytes(self.rom_data)
+        rom = self.rom_data  # leitura por índice: a view do mmap serve, sem copiar a ROM
         bank_size = int(self.config.get('bank_size', 0x4000))
 
         # Import seguro (projeto pode rodar como pacote ou script)
@@ -718,8 +748,8 @@ def main():
     output_path = sys.argv[2] if len(sys.argv) > 2 else None
 
     try:
-        extractor = SegaExtractor(rom_path)
-        texts, saved_path = extractor.extract_and_save(output_path)
+        with SegaExtractor(rom_path) as extractor:
+            texts, saved_path = extractor.extract_and_save(output_path)
 
         print(f"✅ Extração concluída!")
         print(f"📊 {len(texts)} strings extraídas")
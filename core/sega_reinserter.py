@@ -21,11 +21,13 @@ except Exception:
     requests = None
 
 from utils.rom_io import (
+    RomImage,
     atomic_write_bytes,
     compute_checksums,
     ensure_parent_dir,
     make_backup,
 )
+from core.free_space_allocator import FreeSpaceIndex
 try:
     from core.final_qa import evaluate_reinsertion_qa, write_qa_artifacts
 except Exception:
@@ -81,18 +83,26 @@ except Exception:
     MultiCompress = None
 
 try:
-    from core.compression_detector import CompressionDetector
+    from core.compression_detector import detect_regions
 except Exception:
     try:
-        from compression_detector import CompressionDetector
+        from compression_detector import detect_regions
     except Exception:
-        CompressionDetector = None
+        detect_regions = None
 
 try:
     from universal_kit.endian_pointer_hunter import EndianPointerHunter
 except Exception:
     EndianPointerHunter = None
 
+try:
+    from core.pointer_index import PointerIndex
+except Exception:
+    try:
+        from pointer_index import PointerIndex
+    except Exception:
+        PointerIndex = None
+
 try:
     from plugins.plugin_registry import get_plugin_for_rom as _get_plugin_for_rom
 except Exception:
@@ -106,6 +116,14 @@ except Exception:
     except Exception:
         SMSGlyphInjector = None
 
+try:
+    from core.glossary_matcher import GlossaryMatcher
+except Exception:
+    try:
+        from glossary_matcher import GlossaryMatcher
+    except Exception:
+        GlossaryMatcher = None
+
 try:
     from core.compact_glossary import apply_compact_glossary
 except Exception:
@@ -532,7 +550,9 @@ class SegaMasterSystemReinserter:
     def __init__(self):
         self.mapping: Dict[str, MapEntry] = {}
         self.mapping_crc32: Optional[str] = None
+        self._jsonl_declared_crc32: Optional[str] = None
         self._tbl_loader = None
+        self._pointer_index = None
         self._tile_entry_len: int = 1
         self._tile_space_seq: Optional[bytes] = None
         self._token_re = re.compile(r"(\{[^}]+\}|\[[^\]]+\]|<[^>]+>)")
@@ -553,6 +573,7 @@ class SegaMasterSystemReinserter:
         self._custom_dictionary: Dict[str, str] = {}
         self._custom_dict_word_map: Dict[str, str] = {}
         self._custom_dict_phrase_items: List[Tuple[str, str]] = []
+        self._custom_dict_phrase_matcher: Optional[Any] = None
         self._api_fallback_cache: Dict[str, str] = {}
         self._api_fallback_calls: int = 0
         self._api_fallback_success: int = 0
@@ -837,6 +858,7 @@ class SegaMasterSystemReinserter:
         self._custom_dictionary = {}
         self._custom_dict_word_map = {}
         self._custom_dict_phrase_items = []
+        self._custom_dict_phrase_matcher = None
         self._custom_dict_path = None
         raw_path = self._translation_runtime_policy.get("custom_dictionary")
         candidates = self._candidate_custom_dictionary_paths(raw_path)
@@ -868,6 +890,9 @@ class SegaMasterSystemReinserter:
             else:
                 self._custom_dict_phrase_items.append((key, val))
         self._custom_dict_phrase_items.sort(key=lambda kv: len(kv[0]), reverse=True)
+        if GlossaryMatcher is not None and self._custom_dict_phrase_items:
+            # Todas as frases em um autômato só (uma passada por string).
+            self._custom_dict_phrase_matcher = GlossaryMatcher(dict(self._custom_dict_phrase_items))
 
     def _collect_guardrail_warnings(self) -> List[str]:
         """
@@ -933,10 +958,14 @@ class SegaMasterSystemReinserter:
         out = self._normalize_unicode_nfc(text)
         changed = 0
 
-        for src, dst in self._custom_dict_phrase_items:
-            pattern = re.compile(re.escape(src), flags=re.IGNORECASE)
-            out, replaced = pattern.subn(dst, out)
+        if self._custom_dict_phrase_matcher is not None:
+            out, replaced = self._custom_dict_phrase_matcher.replace(out)
             changed += int(replaced)
+        else:
+            for src, dst in self._custom_dict_phrase_items:
+                pattern = re.compile(re.escape(src), flags=re.IGNORECASE)
+                out, replaced = pattern.subn(dst, out)
+                changed += int(replaced)
 
         if self._custom_dict_word_map:
             def _repl(match: re.Match) -> str:
@@ -1470,11 +1499,11 @@ class SegaMasterSystemReinserter:
         return str(algo).upper() in {str(x).upper() for x in allowed}
 
     def _detect_compressed_regions_for_rom(self, rom_bytes: bytes) -> List[Dict[str, Any]]:
-        if not rom_bytes or CompressionDetector is None:
+        if not rom_bytes or detect_regions is None:
             return []
         try:
-            detector = CompressionDetector(bytes(rom_bytes))
-            regions = detector.detect(block_size=2048)
+            # Cache de análise por SHA-256 (reinserções repetidas na mesma ROM)
+            regions = detect_regions(bytes(rom_bytes), block_size=2048)
         except Exception as exc:
             if DEBUG:
                 print(f"[WARN] CompressionDetector indisponível: {exc}")
@@ -1483,8 +1512,8 @@ class SegaMasterSystemReinserter:
         normalized: List[Dict[str, Any]] = []
         for reg in regions or []:
             try:
-                off = int(getattr(reg, "offset", -1))
-                size = int(getattr(reg, "size", 0))
+                off = int(reg.get("offset", -1))
+                size = int(reg.get("size", 0))
             except Exception:
                 continue
             if off < 0 or size <= 0:
@@ -1493,8 +1522,8 @@ class SegaMasterSystemReinserter:
                 {
                     "offset": int(off),
                     "size": int(size),
-                    "algorithm": self._normalize_compression_name(getattr(reg, "algorithm", "")),
-                    "confidence": float(getattr(reg, "confidence", 0.0) or 0.0),
+                    "algorithm": self._normalize_compression_name(reg.get("algorithm", "")),
+                    "confidence": float(reg.get("confidence", 0.0) or 0.0),
                 }
             )
         return normalized
@@ -1605,6 +1634,16 @@ class SegaMasterSystemReinserter:
             )
         return blocks
 
+    def _get_pointer_index(self, rom: bytearray):
+        """PointerIndex compartilhado para `rom` (reconstruído se a ROM for trocada)."""
+        if PointerIndex is None:
+            return None
+        index = self._pointer_index
+        if index is None or index.rom_data is not rom:
+            index = PointerIndex(rom)
+            self._pointer_index = index
+        return index
+
     def _get_plugin_for_pointer_search(self, rom_bytes: bytes):
         """Obtém plugin de console para mapeamento de ponteiros."""
         if _get_plugin_for_rom is None:
@@ -1734,10 +1773,13 @@ class SegaMasterSystemReinserter:
         old_offset: int,
         new_offset: int,
         max_refs: int = 512,
+        pointer_index: Optional[PointerIndex] = None,
     ) -> List[Dict[str, Any]]:
         """
         Procura referências de ponteiro para old_offset e gera refs atualizáveis.
-        Estratégia: varredura linear com mapeamento do plugin (segura e genérica).
+        Estratégia: consulta ao PointerIndex (mapa inverso alvo → valores com
+        mapeamento do plugin), mesma ordem e validação da varredura linear.
+        Sem índice compartilhado, constrói um índice temporário para rom_bytes.
         """
         refs: List[Dict[str, Any]] = []
         seen_ptr_offsets: set = set()
@@ -1771,16 +1813,19 @@ class SegaMasterSystemReinserter:
             # fallback direto
             return int(value) if 0 <= int(value) < rom_len else None
 
+        if pointer_index is None:
+            pointer_index = PointerIndex(bytearray(rom_bytes), sizes=sizes, endians=endians)
+        mapper_key = (type(plugin).__name__ if plugin else "direct", rom_len)
+
         for size in sizes:
             for end in endians:
                 max_val = 1 << (size * 8)
-                for off in range(0, rom_len - size + 1):
-                    # alinhamento leve para reduzir falso-positivo
-                    if off % max(1, size) != 0:
-                        continue
-                    raw = int.from_bytes(rom_bytes[off:off + size], end, signed=False)
-                    mapped = _map_value(raw)
-                    if mapped != int(old_offset):
+                # alinhamento leve para reduzir falso-positivo
+                hits = pointer_index.sites_for_target(
+                    int(old_offset), size, end, _map_value, mapper_key, alignment=max(1, size)
+                )
+                for off, raw in hits:
+                    if off + size > rom_len:
                         continue
 
                     # valida se novo valor aponta para o novo offset
@@ -2076,7 +2121,8 @@ class SegaMasterSystemReinserter:
             if not touched_keys:
                 continue
 
-            comp_res = comp_engine.compress(bytes(decomp_buf), alg)
+            # budget = tamanho original: se o greedy estourar, tenta parse ótimo antes de realocar
+            comp_res = comp_engine.compress(bytes(decomp_buf), alg, {"budget": block_size})
             if not comp_res.success or not comp_res.data:
                 for it, _meta in touched_keys:
                     key = str(it.get("key", ""))
@@ -2133,6 +2179,7 @@ class SegaMasterSystemReinserter:
                     old_offset=block_off,
                     new_offset=new_off,
                     max_refs=512,
+                    pointer_index=self._get_pointer_index(rom),
                 )
                 if not refs:
                     # rollback
@@ -6619,96 +6666,27 @@ class SegaMasterSystemReinserter:
     ) -> Tuple[Optional[int], Optional[int]]:
         """Encontra região contínua de filler_bytes com tamanho mínimo.
 
-        Estratégia:
-        1) Prioriza espaço livre no FINAL da ROM (blocos 0xFF/0x00), reduzindo
-           risco de colidir com regiões ativas.
-        2) Depois busca de trás para frente por runs válidos.
-        3) Fallback: busca progressiva clássica.
+        Estratégia: prioriza os runs de MAIOR endereço (o bloco livre no final
+        da ROM primeiro), reduzindo risco de colidir com regiões ativas. Cada
+        filler é varrido uma vez para um FreeSpaceIndex; faixas proibidas são
+        recortadas da free-list antes da busca.
         """
         if min_len <= 0:
             return None, None
         rom_len = len(rom)
-        forbidden = self._merge_ranges_with_gap(
-            [
-                (
-                    max(0, int(s)),
-                    min(int(rom_len), int(e)),
-                )
-                for s, e in (forbidden_ranges or [])
-                if int(e) > int(s)
-            ],
-            merge_gap=0,
-        )
-
-        def _fit_candidate_in_run(run_start: int, run_end: int) -> Optional[int]:
-            if run_end <= run_start:
-                return None
-            candidate = self._align(int(run_start), alignment)
-            while candidate + min_len <= run_end:
-                cand_end = candidate + min_len
-                collision = None
-                for fs, fe in forbidden:
-                    if fe <= candidate:
-                        continue
-                    if fs >= cand_end:
-                        break
-                    collision = (fs, fe)
-                    break
-                if collision is None:
-                    return candidate
-                candidate = self._align(max(candidate + 1, int(collision[1])), alignment)
-            return None
+        forbidden = [
+            (max(0, int(s)), min(int(rom_len), int(e)))
+            for s, e in (forbidden_ranges or [])
+            if int(e) > int(s)
+        ]
 
         for fb in filler_bytes:
-            # 1) Trailing run no final da ROM.
-            j = rom_len - 1
-            while j >= 0 and rom[j] == fb:
-                j -= 1
-            tail_start = j + 1
-            tail_len = rom_len - tail_start
-            if tail_len >= min_len:
-                aligned = _fit_candidate_in_run(tail_start, rom_len)
-                if aligned is not None:
-                    return aligned, fb
-
-            # 2) Runs em ordem reversa (prioriza offsets mais altos).
-            i = rom_len - 1
-            while i >= 0:
-                if rom[i] != fb:
-                    i -= 1
-                    continue
-                run_end = i + 1
-                while i >= 0 and rom[i] == fb:
-                    i -= 1
-                run_start = i + 1
-                run_len = run_end - run_start
-                if run_len < min_len:
-                    continue
-                aligned = _fit_candidate_in_run(run_start, run_end)
-                if aligned is not None:
-                    return aligned, fb
-
-            # 3) Fallback clássico (frente -> trás).
-            run_start = None
-            run_len = 0
-            for i in range(rom_len):
-                if rom[i] == fb:
-                    if run_start is None:
-                        run_start = i
-                        run_len = 1
-                    else:
-                        run_len += 1
-                else:
-                    if run_start is not None and run_len >= min_len:
-                        aligned = _fit_candidate_in_run(run_start, run_start + run_len)
-                        if aligned is not None:
-                            return aligned, fb
-                    run_start = None
-                    run_len = 0
-            if run_start is not None and run_len >= min_len:
-                aligned = _fit_candidate_in_run(run_start, run_start + run_len)
-                if aligned is not None:
-                    return aligned, fb
+            index = FreeSpaceIndex.scan(rom, fill_bytes=(fb,), min_run=min_len)
+            for fs, fe in forbidden:
+                index.reserve(fs, fe)
+            offset = index.find(min_len, alignment=alignment, strategy="last")
+            if offset is not None:
+                return offset, fb
         return None, None
 
     def _calc_pointer_value(self, new_offset: int, ref: Dict[str, Any]) -> Optional[int]:
@@ -6734,6 +6712,8 @@ class SegaMasterSystemReinserter:
         except Exception:
             return False
         rom[ptr_offset : ptr_offset + ptr_size] = data
+        if self._pointer_index is not None and self._pointer_index.rom_data is rom:
+            self._pointer_index.notify_write(ptr_offset, ptr_size)
         return True
 
     def _refs_are_generic(
@@ -6892,7 +6872,14 @@ class SegaMasterSystemReinserter:
         create_backup: bool = True,
         report_path: Optional[Path] = None,
         delta_context: Optional[Dict[str, Any]] = None,
+        segment_capture: Optional[Dict[str, Any]] = None,
     ) -> Tuple[Path, Dict[str, int]]:
+        """Reinsere as traduções e grava ROM + artefatos.
+
+        segment_capture: dict opcional que recebe a ROM final, o items_report e
+        os diff_ranges (usado pela reinserção incremental). Com dry_run=True a
+        execução termina logo após a captura, sem gravar artefatos.
+        """
         self.set_target_rom(rom_path)
 
         if mapping_path is None:
@@ -9227,6 +9214,7 @@ class SegaMasterSystemReinserter:
                             old_offset=int(entry.offset),
                             new_offset=int(new_offset),
                             max_refs=512,
+                            pointer_index=self._get_pointer_index(rom),
                         )
                         discovered_refs, discovered_rejected = self._filter_pointer_refs_for_safety(
                             discovered_refs,
@@ -9908,6 +9896,19 @@ class SegaMasterSystemReinserter:
         ]
         diff_blocked = bool(diff_outside)
 
+        if segment_capture is not None:
+            segment_capture.update(
+                {
+                    "rom": bytes(rom),
+                    "items": list(items_report),
+                    "diff_ranges": list(diff_ranges),
+                    "diff_blocked": diff_blocked,
+                    "pool_info": dict(pool_info) if pool_info else {},
+                }
+            )
+            if dry_run:
+                return output_rom_path, stats
+
         diff_payload = {
             "crc32": crc_tag,
             "rom_size": rom_size,
@@ -11129,6 +11130,20 @@ SMSReinserter = SegaMasterSystemReinserter
 class SegaReinserter:
     """Wrapper com API compatível com GUI (interface_tradutor_final.py)."""
 
+    INCREMENTAL_STATE_SCHEMA = "neurorom.incremental_reinsert.v1"
+    # Acima desta fração de segmentos alterados a reinserção completa compensa
+    INCREMENTAL_MAX_CHANGED_RATIO = 0.5
+    # Artefatos da reinserção completa que descrevem a ROM inteira (out/<CRC><sufixo>)
+    INCREMENTAL_STALE_ARTIFACTS = (
+        "_reinsertion_report.json",
+        "_proof.json",
+        "_qa_final.json",
+        "_coverage_summary.json",
+        "_report.txt",
+        "_qa_final.txt",
+    )
+    INCREMENTAL_STALE_BANNER = "[DESATUALIZADO]"
+
     def __init__(self, rom_path: str):
         self.rom_path = Path(rom_path)
         self._core = SegaMasterSystemReinserter()
@@ -11574,6 +11589,8 @@ class SegaReinserter:
 
         proof_data = self._load_json_safe(artifacts.get("proof"))
         report_data = self._load_json_safe(artifacts.get("report_json"))
+        if proof_data.get("stale") or report_data.get("stale"):
+            return None  # Artefatos anteriores a um patch incremental
         reported_before_issue_index = self._extract_issue_index_from_artifacts(
             proof_data, report_data
         )
@@ -11729,6 +11746,320 @@ class SegaReinserter:
             },
         }
 
+    # ------------------------------------------------------------------
+    # Reinserção incremental (só segmentos alterados)
+    # ------------------------------------------------------------------
+    def _incremental_enabled(self, incremental: Optional[bool]) -> bool:
+        if incremental is None:
+            return os.environ.get("NEUROROM_INCREMENTAL_REINSERT", "0") == "1"
+        return bool(incremental)
+
+    def _incremental_state_path(self, output_rom_path: Path) -> Path:
+        return output_rom_path.with_name(output_rom_path.name + ".incremental.json")
+
+    def _segment_hashes(
+        self,
+        translations: Dict[str, str],
+        fallback_meta: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, str]:
+        """Hash por segmento: texto + metadados que influenciam a codificação."""
+        out: Dict[str, str] = {}
+        for key, text in translations.items():
+            payload = json.dumps(
+                {"text": text, "meta": fallback_meta.get(key, {})},
+                sort_keys=True,
+                ensure_ascii=False,
+                default=str,
+            )
+            out[str(key)] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return out
+
+    def _incremental_inputs_fingerprint(
+        self,
+        mapping_path: Path,
+        force_blocked: bool,
+        strict: bool,
+    ) -> str:
+        """Entradas globais: se mudarem, a reinserção volta a ser completa."""
+        digest = hashlib.sha256()
+        digest.update(mapping_path.read_bytes())
+        digest.update(
+            json.dumps(
+                {
+                    "force_blocked": bool(force_blocked),
+                    "strict": bool(strict),
+                    "policy": self.get_runtime_policy(),
+                    "custom_dictionary": sorted(self._core._custom_dictionary.items()),
+                    "env": {
+                        k: v for k, v in os.environ.items() if k.startswith("NEUROROM_")
+                        and k != "NEUROROM_INCREMENTAL_REINSERT"
+                    },
+                },
+                sort_keys=True,
+                ensure_ascii=False,
+                default=str,
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def _segment_footprints(
+        self,
+        keys: List[str],
+        fallback_meta: Dict[str, Dict[str, Any]],
+        items: List[Dict[str, Any]],
+    ) -> Dict[str, List[List[int]]]:
+        """Bytes que cada segmento pode escrever: slot, ponteiros e bloco realocado."""
+        core = self._core
+        extra: Dict[str, List[Tuple[int, int]]] = {}
+        for item in items:
+            if not isinstance(item, dict) or item.get("key") is None:
+                continue
+            key = str(item.get("key"))
+            new_off = core._parse_optional_int_value(item.get("new_offset"))
+            new_len = core._parse_optional_int_value(item.get("new_len"))
+            if new_off is not None and new_len:
+                extra.setdefault(key, []).append((int(new_off), int(new_off) + int(new_len)))
+            for ptr in item.get("pointer_offsets") or []:
+                ptr_off = core._parse_optional_int_value(ptr)
+                if ptr_off is not None:
+                    extra.setdefault(key, []).append((int(ptr_off), int(ptr_off) + 2))
+
+        out: Dict[str, List[List[int]]] = {}
+        for key in keys:
+            ranges: List[Tuple[int, int]] = list(extra.get(key, []))
+            entry = core.mapping.get(key)
+            meta = fallback_meta.get(key)
+            if entry is not None:
+                slot = int(core._resolve_entry_slot_total_len(entry, meta if isinstance(meta, dict) else None))
+                ranges.append((int(entry.offset), int(entry.offset) + slot))
+                for ref in entry.pointer_refs or []:
+                    ptr_off = core._parse_optional_int_value(ref.get("ptr_offset"))
+                    if ptr_off is not None:
+                        ranges.append((int(ptr_off), int(ptr_off) + int(ref.get("ptr_size", 2) or 2)))
+                for ptr_off in entry.pointer_offsets or []:
+                    ranges.append((int(ptr_off), int(ptr_off) + 2))
+            if isinstance(meta, dict):
+                for ref in meta.get("pointer_refs") or []:
+                    if not isinstance(ref, dict):
+                        continue
+                    ptr_off = core._parse_optional_int_value(ref.get("ptr_offset"))
+                    if ptr_off is not None:
+                        ranges.append((int(ptr_off), int(ptr_off) + int(ref.get("ptr_size", 2) or 2)))
+            out[key] = [[a, b] for a, b in core._merge_addr_ranges(ranges)]
+        return out
+
+    def _write_incremental_state(
+        self,
+        output_rom_path: Path,
+        mapping_path: Path,
+        fingerprint: str,
+        hashes: Dict[str, str],
+        footprints: Dict[str, List[List[int]]],
+        output_crc32: str,
+        source_crc32: str,
+    ) -> None:
+        # Tags dos artefatos desta reinserção completa (mesma regra de file_tags)
+        artifact_tags: List[str] = []
+        for tag in (output_crc32, source_crc32, self._core.mapping_crc32 or source_crc32):
+            tag = str(tag or "").upper()
+            if tag and tag not in artifact_tags:
+                artifact_tags.append(tag)
+        state = {
+            "schema": self.INCREMENTAL_STATE_SCHEMA,
+            "source_rom": str(self.rom_path),
+            "source_crc32": source_crc32,
+            "output_rom": str(output_rom_path),
+            "output_crc32": output_crc32,
+            "artifact_tags": artifact_tags,
+            "mapping_path": str(mapping_path),
+            "inputs_fingerprint": fingerprint,
+            "gui_stats": dict(self.stats),
+            "segments": {
+                key: {"hash": hashes[key], "footprint": footprints.get(key, [])}
+                for key in sorted(hashes)
+            },
+        }
+        atomic_write_bytes(
+            self._incremental_state_path(output_rom_path),
+            json.dumps(state, ensure_ascii=False).encode("utf-8"),
+        )
+
+    def _mark_artifacts_stale(
+        self,
+        tags: List[str],
+        output_rom_path: Path,
+        output_crc32: str,
+        changed: List[str],
+    ) -> List[str]:
+        """
+        Marca relatório/prova/QA da última reinserção completa como desatualizados.
+
+        Esses artefatos descrevem a ROM inteira; depois de um patch incremental
+        eles não batem mais com a saída. JSON ganha "stale": true e
+        "stale_info" (segmentos alterados acumulados); TXT ganha um cabeçalho.
+        """
+        out_dir = self.rom_path.parent / "out"
+        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        marked: List[str] = []
+        for tag in tags:
+            for suffix in self.INCREMENTAL_STALE_ARTIFACTS:
+                path = out_dir / f"{tag}{suffix}"
+                if not path.exists():
+                    continue
+                if suffix.endswith(".json"):
+                    data = self._load_json_safe(path)
+                    if not isinstance(data, dict):
+                        continue
+                    previous = data.get("stale_info") if isinstance(data.get("stale_info"), dict) else {}
+                    data["stale"] = True
+                    data["stale_info"] = {
+                        "reason": "incremental_reinsert",
+                        "output_rom": str(output_rom_path),
+                        "output_crc32": output_crc32,
+                        "changed_segments": sorted(
+                            set(previous.get("changed_segments", []) or []) | set(changed)
+                        ),
+                        "timestamp": timestamp,
+                    }
+                    payload = json.dumps(data, indent=2, ensure_ascii=False)
+                else:
+                    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+                    if lines and lines[0].startswith(self.INCREMENTAL_STALE_BANNER):
+                        lines = lines[1:]
+                    banner = (
+                        f"{self.INCREMENTAL_STALE_BANNER} Saída alterada por reinserção incremental "
+                        f"(CRC32 {output_crc32}); refaça a reinserção completa para atualizar."
+                    )
+                    payload = "\n".join([banner] + lines) + "\n"
+                atomic_write_bytes(path, payload.encode("utf-8"))
+                marked.append(str(path))
+        return marked
+
+    def _try_incremental_reinsert(
+        self,
+        translations: Dict[str, str],
+        translated_path: Path,
+        fallback_meta: Dict[str, Dict[str, Any]],
+        output_rom_path: Path,
+        mapping_path: Path,
+        fingerprint: str,
+        force_blocked: bool,
+        strict: bool,
+    ) -> Optional[Tuple[bool, str]]:
+        """
+        Reaplica só os segmentos cujo hash mudou desde a última reinserção.
+
+        Codifica os segmentos alterados sobre a ROM original (mesmo pipeline de
+        apply_translation, sem artefatos), restaura na ROM de saída os bytes
+        antigos desses segmentos e grava só as páginas sujas. Retorna None
+        quando a reinserção completa é necessária.
+        """
+        started = datetime.now(timezone.utc)
+        state = self._load_json_safe(self._incremental_state_path(output_rom_path))
+        if state.get("schema") != self.INCREMENTAL_STATE_SCHEMA or not output_rom_path.exists():
+            return None
+        if state.get("inputs_fingerprint") != fingerprint:
+            return None
+
+        with RomImage(self.rom_path) as src_img:
+            source_crc32 = src_img.crc32()
+        if state.get("source_crc32") != source_crc32:
+            return None
+        with RomImage(output_rom_path) as out_img:
+            if state.get("output_crc32") != out_img.crc32():
+                return None  # Saída alterada fora do fluxo incremental
+
+        old_segments: Dict[str, Dict[str, Any]] = state.get("segments", {}) or {}
+        hashes = self._segment_hashes(translations, fallback_meta)
+        changed = sorted(
+            {k for k, h in hashes.items() if (old_segments.get(k) or {}).get("hash") != h}
+            | {k for k in old_segments if k not in hashes}
+        )
+        if not changed:
+            self.stats.update(state.get("gui_stats", {}) or {})
+            self.stats["incremental_changed"] = 0
+            return True, f"Reinserção incremental: nenhum segmento alterado ({output_rom_path})"
+        if len(changed) > max(1, len(hashes)) * self.INCREMENTAL_MAX_CHANGED_RATIO:
+            return None
+
+        # Segmentos alterados sobre a ROM original, sem artefatos
+        changed_set = set(changed)
+        capture: Dict[str, Any] = {}
+        self._core.apply_translation(
+            rom_path=self.rom_path,
+            translated_path=translated_path,
+            mapping_path=mapping_path,
+            output_rom_path=output_rom_path,
+            force_blocked=force_blocked,
+            translated={k: v for k, v in translations.items() if k in changed_set},
+            fallback_entries=(fallback_meta if fallback_meta else None),
+            strict=strict,
+            dry_run=True,
+            create_backup=False,
+            segment_capture=capture,
+        )
+        new_rom = capture.get("rom")
+        with RomImage(self.rom_path) as src_img:
+            source_size = len(src_img)
+        if new_rom is None or capture.get("diff_blocked") or len(new_rom) != source_size:
+            return None
+
+        present = [k for k in changed if k in hashes]
+        new_footprints = self._segment_footprints(present, fallback_meta, capture.get("items", []))
+        changed_ranges: List[Tuple[int, int]] = []
+        for key in changed:
+            changed_ranges.extend(tuple(r) for r in (old_segments.get(key) or {}).get("footprint", []))
+            changed_ranges.extend(tuple(r) for r in new_footprints.get(key, []))
+        changed_ranges = self._core._merge_addr_ranges(changed_ranges)
+        diff_ranges = [(int(r["start"]), int(r["end"])) for r in capture.get("diff_ranges", [])]
+
+        # Tudo o que o lote mexeu precisa estar nos segmentos alterados
+        # (glifos, blocos comprimidos etc. exigem reinserção completa)
+        if any(not self._core._range_is_allowed(a, b, changed_ranges) for a, b in diff_ranges):
+            return None
+        for key, seg in old_segments.items():
+            if key in changed_set:
+                continue
+            for a, b in seg.get("footprint", []):
+                if self._core._range_overlaps_any(int(a), int(b), changed_ranges):
+                    return None  # Segmento inalterado compartilha bytes com um alterado
+
+        with RomImage(self.rom_path) as src_img, RomImage(output_rom_path) as out_img:
+            for key in changed:
+                for a, b in (old_segments.get(key) or {}).get("footprint", []):
+                    a, b = int(a), min(int(b), source_size)
+                    if b > a:
+                        out_img.write(a, src_img.view(a, b))
+            new_view = memoryview(new_rom)
+            for a, b in diff_ranges:
+                out_img.write(a, new_view[a:b])
+            patched_pages = len(out_img.dirty_pages())
+            out_img.flush()
+            output_crc32 = out_img.crc32()
+
+        for key in changed:
+            if key in hashes:
+                old_segments[key] = {"hash": hashes[key], "footprint": new_footprints.get(key, [])}
+            else:
+                old_segments.pop(key, None)
+        self.stats.update(state.get("gui_stats", {}) or {})
+        self.stats["incremental_changed"] = len(changed)
+        state["segments"] = old_segments
+        state["output_crc32"] = output_crc32
+        stale = self._mark_artifacts_stale(
+            list(state.get("artifact_tags") or []), output_rom_path, output_crc32, changed
+        )
+        atomic_write_bytes(
+            self._incremental_state_path(output_rom_path),
+            json.dumps(state, ensure_ascii=False).encode("utf-8"),
+        )
+        elapsed_ms = (datetime.now(timezone.utc) - started).total_seconds() * 1000.0
+        return True, (
+            f"Reinserção incremental concluída: {output_rom_path} | "
+            f"segmentos={len(changed)} | paginas={patched_pages} | "
+            f"artefatos_desatualizados={len(stale)} | {elapsed_ms:.1f}ms"
+        )
+
     def reinsert(
         self,
         translations: Dict[str, str],
@@ -11739,11 +12070,14 @@ class SegaReinserter:
         dry_run: bool = False,
         report_path: Optional[str] = None,
         mapping_path: Optional[str] = None,
+        incremental: Optional[bool] = None,
     ) -> Tuple[bool, str]:
         """Executa reinserção e retorna (success, message).
 
         Args:
             force_blocked: Se True, tenta reinserir itens marcados como NOT_PLAUSIBLE_TEXT_SMS
+            incremental: Reaplica só os segmentos alterados desde a última execução
+                (None = variável NEUROROM_INCREMENTAL_REINSERT=1)
         """
         try:
             translated_path = self._translated_path or self.rom_path
@@ -11782,6 +12116,40 @@ class SegaReinserter:
                     self._meta_source_path = str(meta_path)
             delta_force_strict = os.environ.get("NEUROROM_DELTA_FORCE_STRICT", "0") == "1"
             strict_run = bool(strict or (delta_context and delta_force_strict))
+
+            # Incremental: delta e pós-patch CRC reescrevem a saída por fora do mapa de segmentos
+            incremental_ctx: Optional[Dict[str, Any]] = None
+            if (
+                self._incremental_enabled(incremental)
+                and translations
+                and not dry_run
+                and not delta_context
+                and os.environ.get("NEUROROM_SMS_POSTPATCH_ENABLE", "0") == "0"
+            ):
+                inc_mapping = resolved_mapping or self._core._guess_mapping_path(
+                    translated_path, self.rom_path
+                )
+                if inc_mapping is not None and Path(inc_mapping).exists():
+                    inc_fingerprint = self._incremental_inputs_fingerprint(
+                        Path(inc_mapping), force_blocked, strict_run
+                    )
+                    inc_result = self._try_incremental_reinsert(
+                        translations=translations,
+                        translated_path=translated_path,
+                        fallback_meta=fallback_meta,
+                        output_rom_path=Path(output_rom_path),
+                        mapping_path=Path(inc_mapping),
+                        fingerprint=inc_fingerprint,
+                        force_blocked=force_blocked,
+                        strict=strict_run,
+                    )
+                    if inc_result is not None:
+                        return inc_result
+                    incremental_ctx = {
+                        "mapping_path": Path(inc_mapping),
+                        "fingerprint": inc_fingerprint,
+                        "capture": {},
+                    }
             out_path, core_stats = self._core.apply_translation(
                 rom_path=self.rom_path,
                 translated_path=translated_path,
@@ -11795,14 +12163,15 @@ class SegaReinserter:
                 create_backup=create_backup,
                 report_path=(Path(report_path) if report_path else None),
                 delta_context=delta_context,
+                segment_capture=(incremental_ctx["capture"] if incremental_ctx else None),
             )
             postpatch_summary: Optional[Dict[str, Any]] = None
             # Pós-patch CRC pode sobrescrever textos já corrigidos em alguns jogos.
             # Mantém desligado por padrão; ativa apenas quando o usuário solicitar.
             postpatch_enabled = os.environ.get("NEUROROM_SMS_POSTPATCH_ENABLE", "0") != "0"
-            src_bytes = self.rom_path.read_bytes()
-            src_crc32, _ = compute_checksums(src_bytes)
-            src_size = len(src_bytes)
+            with RomImage(self.rom_path) as src_img:
+                src_crc32 = src_img.crc32()
+                src_size = len(src_img)
             if (
                 postpatch_enabled
                 and not dry_run
@@ -11854,6 +12223,23 @@ class SegaReinserter:
                 if isinstance(residual, dict) and residual.get("enabled"):
                     core_stats["POSTPATCH_RESIDUAL_EN"] = int(residual.get("hits_count", 0))
 
+            if incremental_ctx and incremental_ctx["capture"].get("rom") is not None:
+                capture = incremental_ctx["capture"]
+                hashes = self._segment_hashes(translations, fallback_meta)
+                with RomImage(out_path) as out_img:
+                    output_crc32 = out_img.crc32()
+                self._write_incremental_state(
+                    output_rom_path=Path(out_path),
+                    mapping_path=incremental_ctx["mapping_path"],
+                    fingerprint=incremental_ctx["fingerprint"],
+                    hashes=hashes,
+                    footprints=self._segment_footprints(
+                        list(hashes), fallback_meta, capture.get("items", [])
+                    ),
+                    output_crc32=output_crc32,
+                    source_crc32=str(src_crc32).upper(),
+                )
+
             msg = f"Reinserção concluída: {out_path}"
             if delta_context:
                 msg += f" | delta={delta_context.get('delta_path')}"
@@ -15,6 +15,14 @@ import unicodedata
 from collections import Counter
 from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+try:
+    from .glossary_matcher import GlossaryMatcher
+except Exception:
+    try:
+        from glossary_matcher import GlossaryMatcher
+    except Exception:
+        GlossaryMatcher = None
+
 
 PLACEHOLDER_RE = re.compile(
     r"(<TILE:[0-9A-Fa-f]{2}>|<[0-9A-Fa-f]{2}>|%\d*[dsxX]|\{[A-Za-z0-9_:-]+\}|\[[A-Za-z0-9_:-]+\]|@[A-Za-z0-9_]+)"
@@ -281,6 +289,7 @@ class SemanticQualityGate:
         min_semantic_score_strict: float = 82.0,
     ) -> None:
         self.glossary = self._normalize_glossary(glossary)
+        self._glossary_matcher, self._terms_by_canon = self._build_glossary_matcher()
         self.register_policy = self._normalize_register_policy(register_policy)
         self.strict_mode = bool(strict_mode)
         self.min_semantic_score_standard = float(min_semantic_score_standard)
@@ -331,6 +340,28 @@ class SemanticQualityGate:
 
         return normalized
 
+    def _build_glossary_matcher(self) -> Tuple[Optional[Any], Dict[str, List[str]]]:
+        """Autômato com a forma canônica de todos os termos (uma passada por texto)."""
+        terms_by_canon: Dict[str, List[str]] = {}
+        self._glossary_order = {term: idx for idx, term in enumerate(self.glossary)}
+        self._glossary_by_canon = {_canon(key): value for key, value in self.glossary.items()}
+        for term in self.glossary:
+            key = _canon(term)
+            if key:
+                terms_by_canon.setdefault(key, []).append(term)
+        if GlossaryMatcher is None or not terms_by_canon:
+            return None, terms_by_canon
+        return GlossaryMatcher({key: key for key in terms_by_canon}, ignore_case=False), terms_by_canon
+
+    def _glossary_terms_in(self, source_canon: str) -> List[str]:
+        """Termos do glossário cuja forma canônica aparece no texto, na ordem do glossário."""
+        if self._glossary_matcher is None:
+            keys = [key for key in self._terms_by_canon if key in source_canon]
+        else:
+            keys = self._glossary_matcher.terms_in(source_canon)
+        found = [term for key in keys for term in self._terms_by_canon.get(key, [])]
+        return sorted(found, key=self._glossary_order.__getitem__)
+
     def _semantic_threshold_used(self) -> float:
         if self.strict_mode:
             return float(self.min_semantic_score_strict)
@@ -341,10 +372,8 @@ class SemanticQualityGate:
         dst_canon = _canon(translated)
         hits: List[str] = []
         violations: List[str] = []
-        for src_term, rule in self.glossary.items():
-            src_term_canon = _canon(src_term)
-            if not src_term_canon or src_term_canon not in src_canon:
-                continue
+        for src_term in self._glossary_terms_in(src_canon):
+            rule = self.glossary[src_term]
             hits.append(src_term)
             expected = str(rule.get("target", src_term) or src_term)
             preserve = bool(rule.get("preserve", False))
@@ -401,10 +430,10 @@ class SemanticQualityGate:
                 continue
             if token not in out:
                 out.append(token)
-        for term, rule in self.glossary.items():
-            category = str(rule.get("category", "") or "").lower()
+        for term in self._glossary_terms_in(_canon(source)):
+            category = str(self.glossary[term].get("category", "") or "").lower()
             if category in {"proper_noun", "city", "npc", "item", "spell", "class", "location", "virtue"}:
-                if _canon(term) in _canon(source) and term not in out:
+                if term not in out:
                     out.append(term)
         return out
 
@@ -461,7 +490,7 @@ class SemanticQualityGate:
             if tok in ui_acronyms or tok in self.glossary:
                 src_acr.append(tok)
         dst_canon = _canon(translated)
-        glossary_by_canon = {_canon(key): value for key, value in self.glossary.items()}
+        glossary_by_canon = self._glossary_by_canon
         for acr in src_acr:
             alternatives = {_canon(acr)}
             rule = glossary_by_canon.get(_canon(acr))
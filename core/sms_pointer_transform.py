@@ -17,7 +17,7 @@ This value is always a multiple of 0x4000 (16KB bank size).
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 
 
@@ -189,6 +189,39 @@ def offset_to_pointer(offset: int, ctx: PointerContext) -> int:
     return pointer_value
 
 
+SLOT_POINTER_RANGES = {
+    "DIRECT": (0x0000, 0x4000),
+    "BANKED_SLOT1": (0x4000, 0x8000),
+    "BANKED_SLOT2": (0x8000, 0xC000),
+}
+
+
+def reachable_offset_range(ctx: PointerContext, current_offset: Optional[int] = None) -> Tuple[int, int]:
+    """
+    ROM offsets a pointer with this context can target without changing
+    its bank mapping.
+
+    DIRECT/BANKED_SLOT* are limited to their slot window. INFERRED uses the
+    slot of the current target (when known), otherwise the whole 16-bit range.
+
+    Args:
+        ctx: Pointer context
+        current_offset: Offset the pointer targets today (optional)
+
+    Returns:
+        (start, end) half-open range of ROM offsets
+    """
+    ptr_range = SLOT_POINTER_RANGES.get(ctx.addressing_mode)
+    if ptr_range is None and current_offset is not None:
+        ptr = current_offset - ctx.bank_addend
+        if 0 <= ptr < 0xC000 and ctx.bank_size > 0:
+            slot = ptr // ctx.bank_size
+            ptr_range = (slot * ctx.bank_size, (slot + 1) * ctx.bank_size)
+    if ptr_range is None:
+        ptr_range = (0, 0x10000)
+    return max(0, ptr_range[0] + ctx.bank_addend), max(0, ptr_range[1] + ctx.bank_addend)
+
+
 def infer_bank_addend(pointer_value: int, rom_offset: int) -> int:
     """
     Infer bank_addend from known pointer-offset pair.
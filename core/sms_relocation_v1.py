@@ -24,9 +24,20 @@ from typing import Dict, List, Optional, Tuple, Any, Set
 from copy import deepcopy
 from datetime import datetime, timezone
 
+from .free_space_allocator import FreeSpaceIndex
+from .relocation_planner import (
+    PackingItem,
+    Placement,
+    RelocationPlan,
+    RelocationPlanner,
+    TAIL_MERGE_POOL,
+    intersect_windows,
+)
+from .tail_merge import plan_tail_merge
 from .sms_pointer_transform import (
     pointer_to_offset,
     offset_to_pointer,
+    reachable_offset_range,
     PointerContext,
     PointerRef,
 )
@@ -69,6 +80,15 @@ class RelocationConfig:
     # Encoding for text
     encoding: str = "ascii"
 
+    # Plan all relocations together (largest-first, bank windows) in process_all
+    batch_planning: bool = True
+
+    # Ejection/compaction local search after the greedy planning pass
+    planner_local_search: bool = True
+
+    # Share bytes between relocated strings whose payloads are suffixes of others
+    tail_merge: bool = True
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -81,6 +101,9 @@ class RelocationConfig:
             "default_terminator": self.default_terminator,
             "allowed_addressing_modes": list(self.allowed_addressing_modes),
             "encoding": self.encoding,
+            "batch_planning": self.batch_planning,
+            "planner_local_search": self.planner_local_search,
+            "tail_merge": self.tail_merge,
         }
 
     @classmethod
@@ -108,6 +131,9 @@ class RelocationConfig:
                 "DIRECT", "BANKED_SLOT1", "BANKED_SLOT2", "INFERRED"
             ])),
             encoding=d.get("encoding", "ascii"),
+            batch_planning=d.get("batch_planning", True),
+            planner_local_search=d.get("planner_local_search", True),
+            tail_merge=d.get("tail_merge", True),
         )
 
 
@@ -128,13 +154,17 @@ class AllocationResult:
 class FreeSpaceAllocator:
     """
     Manages free space allocation within configured regions.
-    Uses first-fit strategy, only allocates in runs of fill bytes.
+    Uses first-fit strategy (or best-fit), only allocates in runs of fill bytes.
+
+    Fill runs are scanned once into a FreeSpaceIndex; allocations carve the
+    free-list and free() returns blocks to it (coalescing with neighbours).
     """
 
-    def __init__(self, rom_data: bytearray, config: RelocationConfig):
+    def __init__(self, rom_data: bytearray, config: RelocationConfig, strategy: str = "first"):
         self.rom_data = rom_data
         self.config = config
         self.rom_size = len(rom_data)
+        self.strategy = strategy
 
         # Track allocations: offset -> size
         self.allocations: Dict[int, int] = {}
@@ -142,13 +172,44 @@ class FreeSpaceAllocator:
         # Track available space per region
         self.region_usage: Dict[int, int] = {}  # region_index -> bytes_used
 
-    def find_free_run(self, size_needed: int) -> AllocationResult:
+        # Built lazily, on the ROM state at the first allocation
+        self._index: Optional[FreeSpaceIndex] = None
+
+    def _valid_regions(self) -> List[Tuple[int, int, int]]:
+        """(region_index, start, end) of regions inside the ROM."""
+        return [
+            (idx, start, end)
+            for idx, (start, end) in enumerate(self.config.free_space_regions)
+            if start < end <= self.rom_size
+        ]
+
+    @property
+    def index(self) -> FreeSpaceIndex:
+        if self._index is None:
+            self._index = FreeSpaceIndex.scan(
+                self.rom_data,
+                [(start, end) for _, start, end in self._valid_regions()],
+                fill_bytes=self.config.fill_bytes,
+            )
+        return self._index
+
+    def _aligned_size(self, size_needed: int) -> int:
+        if self.config.alignment > 1:
+            return ((size_needed + self.config.alignment - 1)
+                    // self.config.alignment * self.config.alignment)
+        return size_needed
+
+    def find_free_run(self, size_needed: int, bank: Optional[int] = None,
+                      bank_size: int = 0x4000) -> AllocationResult:
         """
         Find a contiguous run of fill bytes large enough for size_needed.
-        Uses first-fit strategy within configured regions only.
+        Regions are tried in configured order; inside each region the
+        allocator strategy picks the run.
 
         Args:
             size_needed: Number of bytes needed (including terminator)
+            bank: Optional ROM bank the run must lie in
+            bank_size: Bank size used with bank
 
         Returns:
             AllocationResult with offset if found, error otherwise
@@ -159,24 +220,20 @@ class FreeSpaceAllocator:
                 error="No free_space_regions configured"
             )
 
-        # Apply alignment
-        aligned_size = size_needed
-        if self.config.alignment > 1:
-            aligned_size = ((size_needed + self.config.alignment - 1)
-                           // self.config.alignment * self.config.alignment)
-
-        for region_idx, (region_start, region_end) in enumerate(self.config.free_space_regions):
-            # Validate region bounds
-            if region_start >= self.rom_size or region_end > self.rom_size:
-                continue
-            if region_start >= region_end:
-                continue
-
-            # Search for free run within this region
-            offset = self._find_run_in_region(
-                region_start, region_end, aligned_size
+        aligned_size = self._aligned_size(size_needed)
+        for region_idx, region_start, region_end in self._valid_regions():
+            lo, hi = region_start, region_end
+            if bank is not None:
+                lo, hi = max(lo, bank * bank_size), min(hi, (bank + 1) * bank_size)
+                if hi <= lo:
+                    continue
+            offset = self.index.find(
+                aligned_size,
+                alignment=self.config.alignment,
+                strategy=self.strategy,
+                lo=lo,
+                hi=hi,
             )
-
             if offset is not None:
                 return AllocationResult(
                     success=True,
@@ -190,34 +247,6 @@ class FreeSpaceAllocator:
             error=f"No free space found for {size_needed} bytes in configured regions"
         )
 
-    def _find_run_in_region(self, start: int, end: int, size: int) -> Optional[int]:
-        """
-        Find a run of fill bytes within a specific region.
-        Skips already allocated areas.
-        """
-        # Apply alignment to start
-        if self.config.alignment > 1:
-            aligned_start = ((start + self.config.alignment - 1)
-                            // self.config.alignment * self.config.alignment)
-        else:
-            aligned_start = start
-
-        pos = aligned_start
-        while pos + size <= end:
-            # Check if this position is already allocated
-            if self._is_allocated(pos, size):
-                pos += self.config.alignment if self.config.alignment > 1 else 1
-                continue
-
-            # Check if we have a run of fill bytes
-            if self._is_fill_run(pos, size):
-                return pos
-
-            # Move to next aligned position
-            pos += self.config.alignment if self.config.alignment > 1 else 1
-
-        return None
-
     def _is_allocated(self, offset: int, size: int) -> bool:
         """Check if range overlaps with any existing allocation."""
         for alloc_offset, alloc_size in self.allocations.items():
@@ -237,18 +266,21 @@ class FreeSpaceAllocator:
                 return False
         return True
 
-    def allocate(self, size_needed: int) -> AllocationResult:
+    def allocate(self, size_needed: int, bank: Optional[int] = None,
+                 bank_size: int = 0x4000) -> AllocationResult:
         """
         Allocate space and mark it as used.
 
         Args:
             size_needed: Number of bytes needed
+            bank / bank_size: Optional bank constraint (see find_free_run)
 
         Returns:
             AllocationResult with offset if successful
         """
-        result = self.find_free_run(size_needed)
+        result = self.find_free_run(size_needed, bank=bank, bank_size=bank_size)
         if result.success and result.offset is not None:
+            self.index.reserve(result.offset, result.offset + result.size)
             self.allocations[result.offset] = result.size
             if result.region_index is not None:
                 self.region_usage[result.region_index] = (
@@ -256,6 +288,38 @@ class FreeSpaceAllocator:
                 )
         return result
 
+    def allocate_at(self, offset: int, size_needed: int) -> AllocationResult:
+        """
+        Allocate a specific offset (e.g. chosen by the relocation planner).
+
+        Fails if any byte of the aligned range is not free.
+        """
+        size = self._aligned_size(size_needed)
+        region_idx = next(
+            (idx for idx, start, end in self._valid_regions() if start <= offset and offset + size <= end),
+            None,
+        )
+        if region_idx is None:
+            return AllocationResult(success=False, error=f"0x{offset:06X} outside free_space_regions")
+        if self.index.find(size, strategy="first", lo=offset, hi=offset + size) != offset:
+            return AllocationResult(success=False, error=f"0x{offset:06X}+{size} is not free")
+        self.index.reserve(offset, offset + size)
+        self.allocations[offset] = size
+        self.region_usage[region_idx] = self.region_usage.get(region_idx, 0) + size
+        return AllocationResult(success=True, offset=offset, size=size, region_index=region_idx)
+
+    def free(self, offset: int) -> bool:
+        """Release an allocation made by allocate(); the block becomes reusable."""
+        size = self.allocations.pop(offset, None)
+        if size is None:
+            return False
+        self.index.free(offset, size)
+        for region_idx, start, end in self._valid_regions():
+            if start <= offset < end:
+                self.region_usage[region_idx] = max(0, self.region_usage.get(region_idx, 0) - size)
+                break
+        return True
+
     def get_stats(self) -> Dict[str, Any]:
         """Get allocation statistics."""
         total_free = sum(end - start for start, end in self.config.free_space_regions)
@@ -266,6 +330,8 @@ class FreeSpaceAllocator:
             "remaining": total_free - total_used,
             "allocation_count": len(self.allocations),
             "region_usage": dict(self.region_usage),
+            "strategy": self.strategy,
+            "fragmentation": self.index.stats(),
         }
 
 
@@ -334,6 +400,7 @@ class RelocationReport:
     results: List[ReinsertionResult] = field(default_factory=list)
     failures: List[ReinsertionResult] = field(default_factory=list)
     allocator_stats: Dict[str, Any] = field(default_factory=dict)
+    relocation_plan: Dict[str, Any] = field(default_factory=dict)
 
 
 class SMSRelocationEngine:
@@ -354,6 +421,8 @@ class SMSRelocationEngine:
         self.config = config
         self.allocator = FreeSpaceAllocator(self.rom_data, config)
         self.report = RelocationReport()
+        # Batch plan from plan_relocations(), consumed by _reinsert_relocated()
+        self._plan: Optional[RelocationPlan] = None
 
     def reinsert_item(self, item: ReinsertionItem) -> ReinsertionResult:
         """
@@ -455,8 +524,20 @@ class SMSRelocationEngine:
         """Reinsert text in new location and update pointers."""
         size_needed = len(encoded) + 1
 
-        # Allocate new space
-        alloc_result = self.allocator.allocate(size_needed)
+        # Allocate new space (already reserved when process_all planned the batch)
+        shared = False
+        if self._plan is not None and (item.id in self._plan.placements or self._plan.reason_for(item.id)):
+            placement = self._plan.placements.get(item.id)
+            if placement is None:
+                alloc_result = AllocationResult(
+                    success=False,
+                    error=f"Relocation planner: {self._plan.reason_for(item.id)} for {size_needed} bytes",
+                )
+            else:
+                shared = placement.pool == TAIL_MERGE_POOL
+                alloc_result = AllocationResult(success=True, offset=placement.offset, size=placement.size)
+        else:
+            alloc_result = self.allocator.allocate(size_needed)
         if not alloc_result.success:
             return ReinsertionResult(
                 id=item.id,
@@ -468,15 +549,17 @@ class SMSRelocationEngine:
 
         new_offset = alloc_result.offset
 
-        # Write text at new location
-        for i, byte in enumerate(encoded):
-            if new_offset + i < len(self.rom_data):
-                self.rom_data[new_offset + i] = byte
+        # Tail-merged: the bytes are the suffix of another string's payload
+        if not shared:
+            # Write text at new location
+            for i, byte in enumerate(encoded):
+                if new_offset + i < len(self.rom_data):
+                    self.rom_data[new_offset + i] = byte
 
-        # Write terminator
-        term_offset = new_offset + len(encoded)
-        if term_offset < len(self.rom_data):
-            self.rom_data[term_offset] = item.terminator
+            # Write terminator
+            term_offset = new_offset + len(encoded)
+            if term_offset < len(self.rom_data):
+                self.rom_data[term_offset] = item.terminator
 
         # Update pointers
         pointer_updates = []
@@ -498,7 +581,7 @@ class SMSRelocationEngine:
                 method="relocated",
                 original_offset=item.offset,
                 new_offset=new_offset,
-                bytes_written=len(encoded) + 1,
+                bytes_written=0 if shared else len(encoded) + 1,
                 pointers_updated=pointers_updated,
                 error=f"Pointer update failures: {failed_updates}",
                 pointer_updates=pointer_updates,
@@ -510,7 +593,7 @@ class SMSRelocationEngine:
             method="relocated",
             original_offset=item.offset,
             new_offset=new_offset,
-            bytes_written=len(encoded) + 1,
+            bytes_written=0 if shared else len(encoded) + 1,
             pointers_updated=pointers_updated,
             pointer_updates=pointer_updates,
         )
@@ -604,6 +687,115 @@ class SMSRelocationEngine:
         result["bytes_written"] = ptr_bytes.hex()
         return result
 
+    def _item_window(self, item: ReinsertionItem) -> Optional[Tuple[int, int]]:
+        """Offsets every pointer of the item can reach (intersection)."""
+        windows = []
+        for ref in item.pointer_refs:
+            bank_addend = ref.get("bank_addend", 0)
+            if isinstance(bank_addend, str):
+                bank_addend = int(bank_addend, 16)
+            ctx = PointerContext(
+                ptr_size=ref.get("ptr_size", 2),
+                endianness=ref.get("endianness", "little"),
+                addressing_mode=ref.get("addressing_mode", "INFERRED"),
+                bank_addend=bank_addend,
+            )
+            windows.append(reachable_offset_range(ctx, item.offset))
+        return intersect_windows(windows)
+
+    def _payload(self, item: ReinsertionItem) -> Optional[bytes]:
+        """Encoded text + terminator, or None if reinsert_item() would reject it."""
+        if not (0 <= item.offset < len(self.rom_data)) or item.max_len_bytes <= 0:
+            return None
+        if not (0 <= int(item.terminator) <= 255):
+            return None
+        if item.offset + item.max_len_bytes + 1 > len(self.rom_data):
+            return None
+        try:
+            return item.text_dst.encode(item.encoding) + bytes([int(item.terminator)])
+        except UnicodeEncodeError:
+            return None
+
+    def plan_relocations(self, items: List[ReinsertionItem]) -> RelocationPlan:
+        """
+        Plan free space for every item that will not fit in place.
+
+        Items are packed largest-first inside the bank window of their
+        pointers, with optional local search, instead of first-come
+        first-served. With config.tail_merge, a payload that is a suffix
+        of another payload (terminator included) gets no bytes of its own
+        and points into that string. Planned blocks are reserved right
+        away; reinsert_item() then uses the planned offsets.
+        """
+        seen: Dict[int, int] = {}
+        for item in items:
+            seen[item.id] = seen.get(item.id, 0) + 1
+
+        payloads: Dict[int, bytes] = {}
+        in_place: Dict[int, int] = {}
+        windows: Dict[int, Optional[Tuple[int, int]]] = {}
+        order: Dict[int, int] = {}
+        for idx, item in enumerate(items):
+            payload = self._payload(item) if seen[item.id] == 1 else None
+            if payload is None:
+                continue
+            payloads[item.id] = payload
+            order[item.id] = idx
+            if len(payload) <= item.max_len_bytes:
+                in_place[item.id] = item.offset
+            else:
+                windows[item.id] = self._item_window(item)
+
+        # Tail merge: guests ride on a host's bytes at host + delta
+        guests: Dict[int, Tuple[int, int]] = {}
+        if self.config.tail_merge:
+            merges = plan_tail_merge(payloads, pinned=in_place)
+            for uid, (host, delta) in merges.items():
+                window = windows[uid]
+                if host in in_place:
+                    target = in_place[host] + delta
+                    if window is None or window[0] <= target < window[1]:
+                        guests[uid] = (host, delta)
+                    continue
+                shifted = None if window is None else (window[0] - delta, window[1] - delta)
+                host_window = intersect_windows([windows[host], shifted])
+                if host_window is None or host_window[1] > host_window[0]:
+                    windows[host] = host_window
+                    guests[uid] = (host, delta)
+
+        packing = [
+            PackingItem(
+                uid=uid,
+                size=self.allocator._aligned_size(len(payloads[uid])),
+                alignment=self.config.alignment,
+                window=window,
+                order=order[uid],
+            )
+            for uid, window in windows.items()
+            if uid not in guests
+        ]
+        planner = RelocationPlanner(
+            [("free_space", self.allocator.index.copy())],
+            local_search=self.config.planner_local_search,
+        )
+        plan = planner.plan(packing)
+
+        for uid, placement in list(plan.placements.items()):
+            if not self.allocator.allocate_at(placement.offset, len(payloads[uid])).success:
+                del plan.placements[uid]
+                plan.unplaced.append({'uid': uid, 'size': placement.size, 'reason': 'planned_block_taken'})
+        for uid, (host, delta) in guests.items():
+            host_offset = in_place.get(host, plan.offset_of(host))
+            if host_offset is None:
+                plan.unplaced.append({'uid': uid, 'size': len(payloads[uid]), 'reason': 'tail_host_unplaced'})
+                continue
+            plan.placements[uid] = Placement(host_offset + delta, len(payloads[uid]), TAIL_MERGE_POOL)
+            plan.bytes_saved += len(payloads[uid])
+
+        self._plan = plan
+        self.report.relocation_plan = plan.to_dict()
+        return plan
+
     def process_all(self, items: List[ReinsertionItem]) -> RelocationReport:
         """
         Process all reinsertion items.
@@ -615,6 +807,8 @@ class SMSRelocationEngine:
             RelocationReport with all results
         """
         self.report = RelocationReport(total_items=len(items))
+        if self.config.batch_planning:
+            self.plan_relocations(items)
 
         for item in items:
             result = self.reinsert_item(item)
@@ -632,6 +826,7 @@ class SMSRelocationEngine:
                 self.report.failures.append(result)
 
         self.report.allocator_stats = self.allocator.get_stats()
+        self._plan = None
         return self.report
 
     def get_modified_rom(self) -> bytes:
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+STREAMING PIPELINE - Pipeline JSONL em estágios com memória limitada
+================================================================================
+Processa extrações grandes (PS1/N64 com centenas de MB) sem carregar o
+arquivo inteiro:
+- Leitura incremental do JSONL (offsets de byte por registro)
+- Estágios geradores (filtro, dedupe, tradução, QA...) em threads próprias,
+  ligados por filas limitadas: a leitura pausa quando a tradução atrasa
+- Checkpoint atômico (<saida>.ckpt.json) com offset de entrada e de saída
+  do último registro gravado; ao retomar, a saída é truncada nesse ponto e
+  a leitura continua do registro seguinte
+
+Os estágios devem preservar a ordem dos registros (podem descartar ou
+agrupar em lotes, mas não reordenar).
+================================================================================
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = ".ckpt.json"
+
+_END = object()
+
+
+@dataclass
+class Record:
+    """Registro em trânsito entre estágios."""
+    seq: int                      # Índice do registro na entrada (0-based)
+    offset_end: int               # Offset de byte logo após a linha na entrada
+    data: Any                     # Objeto decodificado (gravado na saída)
+    meta: Dict[str, Any] = field(default_factory=dict)  # Rascunho dos estágios (não gravado)
+
+
+Stage = Callable[[Iterator[Record]], Iterable[Record]]
+
+
+def map_stage(fn: Callable[[Record], Optional[Record]]) -> Stage:
+    """Estágio registro a registro; fn retorna o registro (ou None para descartar)."""
+    def _stage(records: Iterator[Record]) -> Iterator[Record]:
+        for record in records:
+            out = fn(record)
+            if out is not None:
+                yield out
+    return _stage
+
+
+def batch_stage(fn: Callable[[List[Record]], Iterable[Record]], batch_size: int) -> Stage:
+    """Estágio em janelas de até `batch_size` registros (ex.: dedupe + tradução em lote)."""
+    batch_size = max(1, int(batch_size))
+
+    def _stage(records: Iterator[Record]) -> Iterator[Record]:
+        window: List[Record] = []
+        for record in records:
+            window.append(record)
+            if len(window) >= batch_size:
+                yield from fn(window)
+                window = []
+        if window:
+            yield from fn(window)
+    return _stage
+
+
+class BoundedMemo:
+    """Dicionário LRU com limite de entradas (dedupe entre janelas sem crescer sem fim)."""
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+def _json_decode(line: str) -> Optional[Any]:
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def _json_encode(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def checkpoint_path_for(output_path: Union[str, Path]) -> Path:
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + CHECKPOINT_SUFFIX)
+
+
+class StreamingJsonlPipeline:
+    """
+    Pipeline leitura → estágios → escrita com checkpoint e retomada.
+
+    Uso:
+        pipeline = StreamingJsonlPipeline(
+            "entrada.jsonl", "saida.jsonl",
+            stages=[map_stage(filtra), batch_stage(traduz_lote, 256), map_stage(qa)],
+        )
+        resumo = pipeline.run()
+    """
+
+    def __init__(
+        self,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        stages: Sequence[Stage] = (),
+        queue_size: int = 256,
+        checkpoint_every: int = 1000,
+        checkpoint_seconds: float = 30.0,
+        resume: bool = True,
+        decode: Callable[[str], Optional[Any]] = _json_decode,
+        encode: Callable[[Any], str] = _json_encode,
+        on_record: Optional[Callable[[Record, Dict[str, Any]], None]] = None,
+        state: Optional[Dict[str, Any]] = None,
+        keep_checkpoint: bool = False,
+    ):
+        """
+        Args:
+            input_path: Arquivo de entrada (uma entrada por linha)
+            output_path: Arquivo de saída
+            stages: Estágios em ordem (ver map_stage/batch_stage)
+            queue_size: Capacidade de cada fila entre estágios
+            checkpoint_every: Registros gravados entre checkpoints
+            checkpoint_seconds: Intervalo máximo entre checkpoints
+            resume: Retoma do checkpoint se ele corresponder à entrada
+            decode: Linha -> objeto (None ignora a linha)
+            encode: Objeto -> linha (sem \\n)
+            on_record: Chamado na thread de escrita antes de gravar cada
+                registro; pode acumular métricas em `state`
+            state: Estado JSON-serializável persistido com o checkpoint
+            keep_checkpoint: Mantém o checkpoint (marcado complete) ao terminar
+        """
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.checkpoint_path = checkpoint_path_for(self.output_path)
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.checkpoint_seconds = float(checkpoint_seconds)
+        self.resume = resume
+        self.decode = decode
+        self.encode = encode
+        self.on_record = on_record
+        self.state: Dict[str, Any] = dict(state or {})
+        self.keep_checkpoint = keep_checkpoint
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def _fingerprint(self) -> Dict[str, Any]:
+        st = self.input_path.stat()
+        return {"input": str(self.input_path.resolve()), "input_size": st.st_size,
+                "input_mtime_ns": st.st_mtime_ns}
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Checkpoint válido para esta entrada/saída, ou None."""
+        try:
+            ckpt = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(ckpt, dict) or ckpt.get("version") != CHECKPOINT_VERSION:
+            return None
+        fingerprint = self._fingerprint()
+        if any(ckpt.get(k) != v for k, v in fingerprint.items()):
+            return None
+        try:
+            if self.output_path.stat().st_size < int(ckpt.get("output_offset", 0)):
+                return None
+        except OSError:
+            return None
+        return ckpt
+
+    def _save_checkpoint(self, fout, input_offset: int, records_in: int, records_out: int,
+                         complete: bool = False):
+        fout.flush()
+        os.fsync(fout.fileno())
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            **self._fingerprint(),
+            "input_offset": int(input_offset),
+            "output_offset": int(fout.tell()),
+            "records_in": int(records_in),
+            "records_out": int(records_out),
+            "complete": bool(complete),
+            "updated_at": time.time(),
+            "state": self.state,
+        }
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    # ------------------------------------------------------------------
+    # Threads
+    # ------------------------------------------------------------------
+    def _put(self, q: "queue.Queue", item) -> bool:
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+
+    def _drain(self, q: "queue.Queue") -> Iterator[Record]:
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _pump(self, iterable_factory: Callable[[], Iterable[Record]], out_q: "queue.Queue"):
+        try:
+            for item in iterable_factory():
+                if not self._put(out_q, item):
+                    return
+        except BaseException as e:  # noqa: BLE001 - repassado à thread principal
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._put(out_q, _END)
+
+    def _read(self, start_offset: int, start_seq: int) -> Iterator[Record]:
+        seq = start_seq
+        offset = start_offset
+        with open(self.input_path, "rb") as fin:
+            fin.seek(start_offset)
+            for raw in fin:
+                offset += len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                data = self.decode(line)
+                if data is None:
+                    continue
+                yield Record(seq=seq, offset_end=offset, data=data)
+                seq += 1
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def run(self) -> Dict[str, Any]:
+        """
+        Executa até o fim da entrada.
+
+        Returns:
+            {'records_in', 'records_out', 'resumed', 'resumed_from', 'state'}
+        """
+        ckpt = self.load_checkpoint() if self.resume else None
+        input_offset = records_in = records_out = output_offset = 0
+        if ckpt is not None:
+            input_offset = int(ckpt["input_offset"])
+            records_in = int(ckpt["records_in"])
+            records_out = int(ckpt["records_out"])
+            output_offset = int(ckpt["output_offset"])
+            self.state = dict(ckpt.get("state") or {})
+        resumed_from = records_in
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if ckpt is not None:
+            with open(self.output_path, "r+b") as f:
+                f.truncate(output_offset)
+            fout = open(self.output_path, "ab")
+        else:
+            fout = open(self.output_path, "wb")
+
+        self._stop.clear()
+        self._errors = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(
+            target=self._pump, args=(lambda: self._read(input_offset, records_in), queues[0]),
+            name="stream-read", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            factory = (lambda st=stage, q=queues[i]: st(self._drain(q)))
+            threads.append(threading.Thread(target=self._pump, args=(factory, queues[i + 1]),
+                                            name=f"stream-stage-{i}", daemon=True))
+        for t in threads:
+            t.start()
+
+        last_offset, last_seq = input_offset, records_in - 1
+        since_commit = 0
+        last_commit = time.monotonic()
+        complete = False
+        try:
+            for record in self._drain(queues[-1]):
+                if self.on_record is not None:
+                    self.on_record(record, self.state)
+                fout.write((self.encode(record.data) + "\n").encode("utf-8"))
+                records_out += 1
+                last_offset, last_seq = record.offset_end, record.seq
+                since_commit += 1
+                if (since_commit >= self.checkpoint_every
+                        or time.monotonic() - last_commit >= self.checkpoint_seconds):
+                    self._save_checkpoint(fout, last_offset, last_seq + 1, records_out)
+                    since_commit = 0
+                    last_commit = time.monotonic()
+            if self._errors:
+                raise self._errors[0]
+            complete = True
+        finally:
+            self._stop.set()
+            # Linhas gravadas estão completas: o progresso até aqui vale mesmo em erro
+            try:
+                self._save_checkpoint(fout, last_offset, last_seq + 1, records_out, complete=complete)
+            finally:
+                fout.close()
+            for t in threads:
+                t.join(timeout=1.0)
+        if complete and not self.keep_checkpoint:
+            try:
+                self.checkpoint_path.unlink()
+            except OSError:
+                pass
+
+        return {
+            "records_in": last_seq + 1,
+            "records_out": records_out,
+            "resumed": ckpt is not None,
+            "resumed_from": resumed_from,
+            "state": self.state,
+        }
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+TAIL MERGE - Compartilhamento de sufixos entre strings reinseridas
+================================================================================
+Se o payload codificado de uma string (COM o terminador) e sufixo do payload
+de outra, ela nao precisa de bytes proprios: o ponteiro aponta para dentro da
+outra, em host + (len(host) - len(guest)). Ex.: "Obrigado.\\0" dentro de
+"Muito obrigado.\\0" nao, mas "brigado.\\0" sim; duplicatas exatas sempre.
+
+Como o terminador faz parte do payload, so sufixos completos sao alvos
+validos (um ponteiro no meio precisa terminar no mesmo terminador). Por isso
+basta um indice de sufixos: dict {sufixo: (host, delta)} preenchido do maior
+payload para o menor. Strings de ROMs 8-bit sao curtas, entao o custo
+O(soma de len^2) de hashing fica pequeno.
+
+- plan_tail_merge(): lote (motor SMS) -> {guest: (host, delta)}
+- TailMergeIndex: online (RelocationManager), payloads ja gravados na ROM;
+  guardam tambem os guests, que precisam ser realojados quando os bytes do
+  host sao sobrescritos (forget devolve os afetados)
+================================================================================
+"""
+
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+
+def plan_tail_merge(payloads: Mapping[Hashable, bytes],
+                    pinned: Iterable[Hashable] = (),
+                    min_len: int = 1) -> Dict[Hashable, Tuple[Hashable, int]]:
+    """
+    Escolhe quais payloads podem viver dentro de outros.
+
+    Args:
+        payloads: {uid: bytes codificados incluindo terminador}
+        pinned: uids com bytes ja fixos na ROM (sempre host, nunca guest)
+        min_len: Payloads menores que isso nao sao compartilhados
+
+    Returns:
+        {guest_uid: (host_uid, delta)}; o guest fica em offset(host) + delta
+    """
+    pinned = set(pinned)
+    order = {uid: i for i, uid in enumerate(payloads)}
+    # Maior primeiro; em empate, host fixo primeiro (nao custa espaco)
+    ranked = sorted(payloads, key=lambda uid: (-len(payloads[uid]), uid not in pinned, order[uid]))
+
+    suffixes: Dict[bytes, Tuple[Hashable, int]] = {}
+    guests: Dict[Hashable, Tuple[Hashable, int]] = {}
+    for uid in ranked:
+        data = bytes(payloads[uid])
+        if not data:
+            continue
+        if uid not in pinned and len(data) >= min_len:
+            hit = suffixes.get(data)
+            if hit is not None:
+                guests[uid] = hit
+                continue
+        for delta in range(len(data)):
+            suffixes.setdefault(data[delta:], (uid, delta))
+    return guests
+
+
+class TailMergeIndex:
+    """
+    Sufixos dos payloads ja gravados em uma ROM, para consulta online.
+
+    Args:
+        min_len: Payloads menores que isso nao sao compartilhados
+    """
+
+    def __init__(self, min_len: int = 2):
+        self.min_len = max(1, int(min_len))
+        self._suffixes: Dict[bytes, int] = {}
+        self._hosts: Dict[int, bytes] = {}
+        self._guests: Dict[int, bytes] = {}
+        self.bytes_saved = 0
+
+    def add(self, offset: int, payload: bytes):
+        """Registra um payload gravado em offset."""
+        data = bytes(payload)
+        if not data:
+            return
+        self._hosts[int(offset)] = data
+        for delta in range(len(data)):
+            self._suffixes.setdefault(data[delta:], int(offset) + delta)
+
+    def add_guest(self, offset: int, payload: bytes):
+        """Registra um payload que vive dentro de um host (sem bytes proprios)."""
+        data = bytes(payload)
+        if data:
+            self._guests[int(offset)] = data
+
+    def release_guest(self, offset: int) -> bool:
+        """
+        Desfaz o registro do guest em offset (a string dele mudou de lugar).
+
+        Returns:
+            True se offset era um guest: os bytes sao do host e nao podem ser
+            apagados
+        """
+        offset = int(offset)
+        if offset in self._hosts or offset not in self._guests:
+            return False
+        del self._guests[offset]
+        return True
+
+    def find(self, payload: bytes, rom_data: Optional[bytes] = None) -> Optional[int]:
+        """
+        Offset onde payload ja existe como sufixo de um host, ou None.
+
+        Com rom_data, confere os bytes (escritas fora do indice invalidam).
+        """
+        data = bytes(payload)
+        if len(data) < self.min_len:
+            return None
+        offset = self._suffixes.get(data)
+        if offset is None:
+            return None
+        if rom_data is not None and bytes(rom_data[offset:offset + len(data)]) != data:
+            return None
+        return offset
+
+    def forget(self, start: int, end: int) -> List[Tuple[int, bytes]]:
+        """
+        Descarta hosts e guests que cruzam [start, end) (bytes sobrescritos).
+
+        Returns:
+            [(offset, payload)] dos guests descartados: os ponteiros deles
+            ainda apontam para os bytes antigos e precisam ser realojados
+        """
+        orphans = [(off, data) for off, data in self._guests.items()
+                   if off < end and off + len(data) > start]
+        for off, _ in orphans:
+            del self._guests[off]
+        stale = [off for off, data in self._hosts.items() if off < end and off + len(data) > start]
+        if not stale:
+            return orphans
+        for off in stale:
+            del self._hosts[off]
+        self._suffixes.clear()
+        for off, data in self._hosts.items():
+            for delta in range(len(data)):
+                self._suffixes.setdefault(data[delta:], off + delta)
+        return orphans
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+TRANSLATION DISPATCHER - Despacho assíncrono de traduções por backend
+================================================================================
+Um único caminho de despacho para GUI, CLI e drivers de batch:
+- Um backend por serviço (Ollama, Gemini, DeepL, ChatGPT...), cada um com
+  seu pool de conexões HTTP (requests.Session) e seu pool de workers
+- Limite de concorrência, RPM e tokens/min independentes por backend
+  (compartilhados entre todos os event loops/threads que usam o dispatcher)
+- Retentativas com backoff exponencial + jitter
+- Resultados entregues NA ORDEM de entrada, via async iterator (stream) ou
+  callback (run)
+
+As chamadas de rede continuam síncronas (requests); o asyncio coordena
+janela, orçamento e ordem, e cada backend executa no próprio executor.
+================================================================================
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:  # pragma: no cover
+    requests = None
+    HTTPAdapter = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackendLimits:
+    """Limites de um backend."""
+    max_concurrency: int = 1
+    rpm: Optional[float] = None          # Requisições por minuto (None = livre)
+    tpm: Optional[float] = None          # Tokens estimados por minuto (None = livre)
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_jitter: float = 0.3
+
+
+@dataclass
+class DispatchResult:
+    """Resultado de um item despachado."""
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    exception: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Limites por serviço compartilhados pelo processo (GUI, CLI, batch).
+# Valores conservadores dos planos gratuitos/iniciais; o primeiro registro
+# de um backend vale para todos os chamadores, salvo ensure_backend(...,
+# update_limits=True).
+DEFAULT_BACKEND_LIMITS: Dict[str, BackendLimits] = {
+    # GPU local: 1 worker (proteção térmica); retentativas ficam no chamador
+    "ollama": BackendLimits(max_concurrency=1, max_retries=0),
+    # Gemini free tier: 15 RPM / 1M TPM (gemini_api já faz retry/quota)
+    "gemini": BackendLimits(max_concurrency=2, rpm=15, tpm=1_000_000, max_retries=0),
+    # DeepL Free: limite por caracteres/mês; RPM baixo para evitar 429
+    "deepl": BackendLimits(max_concurrency=2, rpm=60, max_retries=1),
+    # OpenAI tier 1 (gpt-3.5/4o-mini): margem sob 500 RPM / 200k TPM
+    "chatgpt": BackendLimits(max_concurrency=2, rpm=60, tpm=90_000, max_retries=0),
+}
+
+
+def limits_for(name: str) -> BackendLimits:
+    """Limites padrão do backend (BackendLimits() se desconhecido)."""
+    default = DEFAULT_BACKEND_LIMITS.get(name)
+    return BackendLimits(**vars(default)) if default is not None else BackendLimits()
+
+
+def estimate_tokens(item: Any) -> int:
+    """Estimativa grosseira (~4 caracteres por token); respeita item.tokens."""
+    if getattr(item, "tokens", None):
+        return int(item.tokens)
+    if isinstance(item, functools.partial):
+        item = item.args
+    if isinstance(item, (list, tuple)):
+        return sum(estimate_tokens(x) for x in item)
+    if isinstance(item, dict):
+        item = item.get("texto") or item.get("text") or ""
+    return len(str(item or "")) // 4 + 1
+
+
+def run_job(job: Callable[[Any], Any], session: Any) -> Any:
+    """`call` genérico: cada item é um callable job(session) (ex.: functools.partial)."""
+    return job(session)
+
+
+class _RateBudget:
+    """
+    Orçamento RPM/TPM thread-safe (GCRA): reserve() devolve quanto esperar
+    antes de enviar, já reservando a vaga.
+    """
+
+    def __init__(self, rpm: Optional[float], tpm: Optional[float], burst: int = 1):
+        self._req_interval = 60.0 / rpm if rpm else 0.0
+        self._tok_interval = 60.0 / tpm if tpm else 0.0
+        self._tolerance = self._req_interval * max(0, burst - 1)
+        self._req_tat = 0.0
+        self._tok_tat = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        if not self._req_interval and not self._tok_interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._req_interval:
+                delay = max(delay, self._req_tat - self._tolerance - now)
+            if self._tok_interval:
+                delay = max(delay, self._tok_tat - now)
+            start = now + delay
+            if self._req_interval:
+                self._req_tat = max(self._req_tat, start) + self._req_interval
+            if self._tok_interval:
+                self._tok_tat = max(self._tok_tat, start) + tokens * self._tok_interval
+            return delay
+
+
+class _Backend:
+    def __init__(self, name: str, call: Callable[[Any, Any], Any], limits: BackendLimits,
+                 token_estimator: Callable[[Any], int]):
+        self.name = name
+        self.call = call
+        self.limits = limits
+        self.token_estimator = token_estimator
+        self.budget = _RateBudget(limits.rpm, limits.tpm, burst=limits.max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, limits.max_concurrency),
+                                           thread_name_prefix=f"tm-{name}")
+        self.session = None
+        if requests is not None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, limits.max_concurrency))
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if self.session is not None:
+            self.session.close()
+
+
+class TranslationDispatcher:
+    """
+    Dispatcher assíncrono com limites por backend.
+
+    Uso:
+        dispatcher.register_backend("ollama", call, BackendLimits(max_concurrency=2))
+        async for res in dispatcher.stream("ollama", textos): ...
+        resultados = dispatcher.run("ollama", textos, on_result=callback)
+
+    `call(item, session)` é síncrono e recebe a requests.Session do backend.
+    """
+
+    def __init__(self):
+        self._backends: Dict[str, _Backend] = {}
+        self._lock = threading.Lock()
+        self._limit_conflicts = set()
+
+    def register_backend(self, name: str, call: Callable[[Any, Any], Any],
+                         limits: Optional[BackendLimits] = None,
+                         token_estimator: Callable[[Any], int] = estimate_tokens):
+        """Registra (ou substitui) um backend."""
+        backend = _Backend(name, call, limits or BackendLimits(), token_estimator)
+        with self._lock:
+            old = self._backends.get(name)
+            self._backends[name] = backend
+        if old is not None:
+            old.close()
+
+    def ensure_backend(self, name: str, call: Callable[[Any, Any], Any],
+                       limits: Optional[BackendLimits] = None,
+                       token_estimator: Callable[[Any], int] = estimate_tokens,
+                       update_limits: bool = False):
+        """
+        Registra o backend só se ainda não existir (sem `limits`, usa
+        DEFAULT_BACKEND_LIMITS).
+
+        Se já existir com limites diferentes dos pedidos, os vigentes são
+        mantidos com aviso no log; com update_limits=True o backend é
+        recriado com os novos limites (contadores preservados).
+        """
+        with self._lock:
+            current = self._backends.get(name)
+            if current is None:
+                self._backends[name] = _Backend(name, call, limits or limits_for(name), token_estimator)
+                return
+            if limits is None or limits == current.limits:
+                return
+            if not update_limits:
+                if (name, repr(limits)) not in self._limit_conflicts:
+                    self._limit_conflicts.add((name, repr(limits)))
+                    logger.warning(
+                        "Backend %s já registrado com %s; limites pedidos ignorados: %s",
+                        name, current.limits, limits,
+                    )
+                return
+            backend = _Backend(name, call, limits, token_estimator)
+            backend.stats = current.stats
+            self._backends[name] = backend
+        logger.info("Backend %s: limites atualizados de %s para %s", name, current.limits, limits)
+        current.close()
+
+    def has_backend(self, name: str) -> bool:
+        return name in self._backends
+
+    def backend_stats(self, name: str) -> Dict[str, int]:
+        return dict(self._backend(name).stats)
+
+    def close(self):
+        """Encerra executores e sessões de todos os backends."""
+        with self._lock:
+            backends, self._backends = list(self._backends.values()), {}
+        for backend in backends:
+            backend.close()
+
+    def _backend(self, name: str) -> _Backend:
+        backend = self._backends.get(name)
+        if backend is None:
+            raise KeyError(f"Backend não registrado: {name}")
+        return backend
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    async def _dispatch_one(self, backend: _Backend, index: int, item: Any) -> DispatchResult:
+        loop = asyncio.get_running_loop()
+        limits = backend.limits
+        tokens = backend.token_estimator(item)
+        attempts = 0
+        while True:
+            attempts += 1
+            delay = backend.budget.reserve(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            backend.count("requests")
+            try:
+                result = await loop.run_in_executor(backend.executor, backend.call, item, backend.session)
+                return DispatchResult(index=index, item=item, result=result, attempts=attempts)
+            except Exception as e:
+                if attempts > limits.max_retries:
+                    backend.count("failures")
+                    logger.error(f"[{backend.name}] item {index} falhou após {attempts} tentativas: {e}")
+                    return DispatchResult(index=index, item=item, error=str(e) or type(e).__name__,
+                                          attempts=attempts, exception=e)
+                backend.count("retries")
+                wait = limits.backoff_base * (2 ** (attempts - 1))
+                wait *= 1 + random.uniform(-limits.backoff_jitter, limits.backoff_jitter)
+                await asyncio.sleep(max(0.0, wait))
+
+    async def stream(self, backend_name: str, items: Iterable[Any],
+                     window: Optional[int] = None) -> AsyncIterator[DispatchResult]:
+        """
+        Despacha `items` e produz os resultados na ordem de entrada.
+
+        Args:
+            backend_name: Backend registrado
+            items: Itens (textos, lotes...) passados a `call`
+            window: Máximo de itens em voo (default: 4x a concorrência)
+        """
+        backend = self._backend(backend_name)
+        window = window or max(4 * backend.limits.max_concurrency, 8)
+        source = iter(enumerate(items))
+        pending: Dict[int, "asyncio.Task"] = {}
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        index, item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[index] = asyncio.ensure_future(self._dispatch_one(backend, index, item))
+                if next_index not in pending:
+                    break
+                result = await pending.pop(next_index)
+                next_index += 1
+                yield result
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+    async def gather(self, backend_name: str, items: Iterable[Any],
+                     on_result: Optional[Callable[[DispatchResult], None]] = None,
+                     window: Optional[int] = None) -> List[DispatchResult]:
+        """Versão coletora de stream(), com callback opcional por resultado."""
+        results: List[DispatchResult] = []
+        async for result in self.stream(backend_name, items, window=window):
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+        return results
+
+    def run(self, backend_name: str, items: Iterable[Any],
+            on_result: Optional[Callable[[DispatchResult], None]] = None,
+            window: Optional[int] = None) -> List[DispatchResult]:
+        """
+        Ponto de entrada síncrono (QThread, CLI, batch): roda o event loop
+        até o fim, chamando `on_result` na ordem de entrada.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.gather(backend_name, items, on_result, window))
+        raise RuntimeError("TranslationDispatcher.run() chamado dentro de um event loop; use stream()/gather()")
+
+
+_shared_dispatcher: Optional[TranslationDispatcher] = None
+_shared_lock = threading.Lock()
+
+
+def get_dispatcher() -> TranslationDispatcher:
+    """Dispatcher compartilhado pelo processo (limites valem para todos os chamadores)."""
+    global _shared_dispatcher
+    with _shared_lock:
+        if _shared_dispatcher is None:
+            _shared_dispatcher = TranslationDispatcher()
+        return _shared_dispatcher
+
+
+def dispatch_call(backend_name: str, job: Callable[[Any], Any], tokens: Optional[int] = None,
+                  limits: Optional[BackendLimits] = None) -> Any:
+    """
+    Executa job(session) pelo backend compartilhado (limites do processo) e
+    devolve o resultado; a exceção final do job é relançada.
+
+    Para workers que fazem uma requisição por vez (QThreads da GUI).
+
+    Args:
+        backend_name: Serviço ("gemini", "chatgpt", ...)
+        job: Callable que recebe a requests.Session do backend
+        tokens: Estimativa de tokens para o orçamento TPM (default: 1)
+        limits: Limites no primeiro registro (default: DEFAULT_BACKEND_LIMITS)
+    """
+    dispatcher = get_dispatcher()
+    dispatcher.ensure_backend(backend_name, run_job, limits)
+    if tokens:
+        job = functools.partial(job)
+        job.tokens = int(tokens)
+    result = dispatcher.run(backend_name, [job])[0]
+    if result.exception is not None:
+        raise result.exception
+    if not result.ok:
+        raise RuntimeError(result.error)
+    return result.result
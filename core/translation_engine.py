@@ -26,6 +26,14 @@ import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 
+try:
+    from .translation_memory import open_for_json_cache
+    from .nllb_engine import get_nllb_engine
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from translation_memory import open_for_json_cache
+    from nllb_engine import get_nllb_engine
+
 # UTF-8 Configuration for cross-platform compatibility
 try:
     if hasattr(sys.stdout, "reconfigure"):
@@ -54,7 +62,7 @@ def safe_print(*args, **kwargs):
 # ============================================================================
 class Config:
     """Central configuration for translation engines"""
-    MODE = "offline"  # Options: offline, gemini, deepl
+    MODE = "offline"  # Options: offline, nllb, gemini, deepl
     GEMINI_API_KEY = ""
     DEEPL_API_KEY = ""
 
@@ -67,8 +75,13 @@ class Config:
     WORKERS = 1
     TIMEOUT = 60
     CACHE_FILE = "cache_translations.json"
+    CACHE_MODEL = "translation_engine"  # TM tag shared by every MODE (like the old JSON cache)
     MIN_LENGTH = 2
 
+    # NLLB (offline, CPU)
+    NLLB_INT8 = False
+    NLLB_PREFETCH = 512  # Lines translated per batched NLLB call
+
 # ============================================================================
 # 2. TEXT FILTERING SYSTEM
 # ============================================================================
@@ -195,61 +208,60 @@ class EncodingFixer:
 # 3. CACHING SYSTEM
 # ============================================================================
 class TranslationCache:
-    """Persistent cache to avoid re-translating identical strings"""
+    """Persistent cache to avoid re-translating identical strings (SQLite translation memory)"""
     def __init__(self):
-        self.cache = {}
+        self.tm = None
         self.lock = Lock()
         self.hits = 0
         self.misses = 0
         self.load()
 
     def load(self):
-        """Load cache from disk"""
-        if os.path.exists(Config.CACHE_FILE):
-            try:
-                with open(Config.CACHE_FILE, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                safe_print(f"✅ Loaded {len(self.cache)} cached translations")
-            except Exception as e:
-                logging.error(f"Cache load error: {e}")
+        """Open the translation memory (imports the legacy JSON cache once)"""
+        try:
+            self.tm = open_for_json_cache(Config.CACHE_FILE, model=Config.CACHE_MODEL)
+            safe_print(f"✅ Loaded {len(self.tm)} cached translations")
+        except Exception as e:
+            logging.error(f"Cache load error: {e}")
+            self.tm = None
 
     def save(self):
-        """Save cache to disk"""
+        """Flush pending usage stats to disk"""
         try:
-            with open(Config.CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            if self.tm is not None:
+                self.tm.flush()
         except Exception as e:
             logging.error(f"Cache save error: {e}")
 
     def get(self, text: str) -> str:
         """Get translation from cache"""
+        translation = self.tm.get(text, model=Config.CACHE_MODEL) if self.tm is not None else None
         with self.lock:
-            if text in self.cache:
+            if translation is not None:
                 self.hits += 1
-                return self.cache[text]
-            self.misses += 1
-            return None
+            else:
+                self.misses += 1
+        return translation
 
     def set(self, original: str, translation: str):
         """Store translation in cache - only if actually translated"""
-        with self.lock:
-            # ANTI-CACHE FALSO: não salva se tradução == original
-            original_clean = original.strip().lower()
-            translation_clean = translation.strip().lower()
+        # ANTI-CACHE FALSO: não salva se tradução == original
+        original_clean = original.strip().lower()
+        translation_clean = translation.strip().lower()
 
-            if original_clean == translation_clean:
-                logging.warning(f"Cache REJECTED (same as original): {original[:50]}")
-                return False  # Indica que não foi cacheado
+        if original_clean == translation_clean:
+            logging.warning(f"Cache REJECTED (same as original): {original[:50]}")
+            return False  # Indica que não foi cacheado
 
-            # Não salva se tradução está vazia ou é muito curta
-            if not translation.strip() or len(translation.strip()) < 2:
-                logging.warning(f"Cache REJECTED (empty/short): {original[:50]}")
-                return False
+        # Não salva se tradução está vazia ou é muito curta
+        if not translation.strip() or len(translation.strip()) < 2:
+            logging.warning(f"Cache REJECTED (empty/short): {original[:50]}")
+            return False
 
-            self.cache[original] = translation
-            if len(self.cache) % 100 == 0:  # Auto-save every 100 entries
-                self.save()
-            return True
+        if self.tm is None:
+            return False
+        self.tm.put(original, translation, model=Config.CACHE_MODEL)
+        return True
 
     def get_stats(self):
         """Get cache statistics"""
@@ -259,7 +271,7 @@ class TranslationCache:
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': hit_rate,
-            'total_cached': len(self.cache)
+            'total_cached': len(self.tm) if self.tm is not None else 0
         }
 
 # ============================================================================
@@ -467,16 +479,47 @@ class ROMTranslator:
         self.cache = TranslationCache()
         self.mode = mode
         self.engine = self._get_engine()
+        self._prefetched = {}  # Batched results from prefetch()
         
     def _get_engine(self):
         """Select translation engine based on mode"""
+        if self.mode == 'nllb':
+            # Shared instance: the model loads once per process
+            return get_nllb_engine(quantize_int8=Config.NLLB_INT8)
         engines = {
             'offline': OllamaEngine,
             'gemini': GeminiEngine,
             'deepl': DeepLEngine
         }
         return engines.get(self.mode, OllamaEngine)
-    
+
+    def prefetch(self, texts: list):
+        """
+        Batch-translate texts for engines with translate_batch (NLLB);
+        translate_text() then picks the results up line by line.
+        """
+        translate_batch = getattr(self.engine, 'translate_batch', None)
+        if translate_batch is None:
+            return
+        tm = self.cache.tm
+        pending = []
+        seen = set()
+        for text in texts:
+            if not text or text in seen or text in self._prefetched:
+                continue
+            seen.add(text)
+            if not TextFilter.should_translate(text):
+                continue
+            if tm is not None and tm.get(text, model=Config.CACHE_MODEL) is not None:
+                continue
+            pending.append(text)
+        step = max(1, Config.NLLB_PREFETCH)
+        for start in range(0, len(pending), step):
+            chunk = pending[start:start + step]
+            for text, translation in zip(chunk, translate_batch(chunk)):
+                if translation is not None:
+                    self._prefetched[text] = translation
+
     def translate_text(self, text: str, max_retries: int = 2) -> tuple:
         """
         Translate single text with caching.
@@ -494,7 +537,9 @@ class ROMTranslator:
         # Tenta traduzir com retries
         translation = None
         for attempt in range(max_retries):
-            translation = self.engine.translate(text)
+            translation = self._prefetched.get(text) if attempt == 0 else None
+            if translation is None:
+                translation = self.engine.translate(text)
 
             if translation is not None:
                 # Aplica correção de encoding (mojibake)
@@ -530,6 +575,10 @@ class ROMTranslator:
         # Detect format
         format_type = FileFormatHandler.detect_format(lines[0]) if lines else "unknown"
         safe_print(f"📋 Detected format: {format_type}")
+
+        if hasattr(self.engine, 'translate_batch'):
+            parsed = (FileFormatHandler.parse_line(l.strip(), format_type) for l in lines if l.strip())
+            self.prefetch([d.get('text', '') for d in parsed if d])
         
         translated_lines = []
         failed_lines = []  # Rastreia linhas que falharam
@@ -741,8 +790,10 @@ def main():
     )
     parser.add_argument('input', help='Input text file to translate')
     parser.add_argument('output', nargs='?', help='Output file (optional)')
-    parser.add_argument('--mode', choices=['offline', 'gemini', 'deepl'], 
+    parser.add_argument('--mode', choices=['offline', 'nllb', 'gemini', 'deepl'], 
                        default='offline', help='Translation engine')
+    parser.add_argument('--int8', action='store_true',
+                       help='NLLB: int8 dynamic quantization (CPU)')
     parser.add_argument('--gemini-key', help='Gemini API key')
     parser.add_argument('--deepl-key', help='DeepL API key')
     parser.add_argument('--workers', type=int, default=1, help='Parallel workers')
@@ -752,6 +803,7 @@ def main():
     # Configure
     Config.MODE = args.mode
     Config.WORKERS = args.workers
+    Config.NLLB_INT8 = args.int8
     
     if args.gemini_key:
         Config.GEMINI_API_KEY = args.gemini_key
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+TRANSLATION MEMORY - Memória de Tradução Unificada (SQLite/WAL)
+================================================================================
+Armazena traduções em um único banco SQLite em modo WAL:
+- Chave: hash SHA-256 do texto fonte (exato, só NFC) + idioma alvo +
+  modelo + versão do glossário
+- get/put em lote (uma transação por lote)
+- Evicção LRU aproximada (last_used atualizado em lotes)
+- Escritores concorrentes: uma conexão por thread + busy_timeout
+- Importação dos caches JSON antigos (dict plano, dict por hash MD5 e
+  formato {'metadata', 'translations'} do pc_translation_cache)
+- Um banco por usuário (default_db_path): todos os caches JSON migram
+  para o mesmo arquivo
+
+Substitui os caches JSON que eram carregados inteiros e regravados com
+indent=2 a cada save.
+================================================================================
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_TARGET_LANG = "pt-BR"
+
+# Caminho do banco único (padrão: ~/.cache/neurorom/translation_memory.sqlite3)
+TM_DB_ENV = "NEUROROM_TM_DB"
+
+# Toques de last_used acumulados antes de gravar (LRU aproximado)
+TOUCH_FLUSH_SIZE = 256
+
+# Evicção só dispara quando o banco passa max_entries * (1 + margem)
+EVICTION_SLACK = 0.10
+
+_SQLITE_MAX_VARS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tm_entries (
+    src_key TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    model TEXT NOT NULL,
+    glossary_version TEXT NOT NULL,
+    source TEXT,
+    translation TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (src_key, target_lang, model, glossary_version)
+);
+CREATE INDEX IF NOT EXISTS tm_entries_last_used ON tm_entries(last_used);
+CREATE TABLE IF NOT EXISTS tm_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_HEX_KEY_RE = re.compile(r"^[0-9a-f]{32}$|^[0-9a-f]{64}$")
+
+
+def normalize_source(text: str) -> str:
+    """Normalização da chave: só NFC (quebras de linha e bordas fazem parte do texto)."""
+    return unicodedata.normalize("NFC", text or "")
+
+
+def source_key(text: str) -> str:
+    """Hash SHA-256 do texto fonte (normalize_source)."""
+    return hashlib.sha256(normalize_source(text).encode("utf-8")).hexdigest()
+
+
+def default_db_path() -> Path:
+    """Banco único da memória de tradução (env NEUROROM_TM_DB ou ~/.cache/neurorom)."""
+    env = os.environ.get(TM_DB_ENV, "").strip()
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".cache" / "neurorom" / "translation_memory.sqlite3"
+
+
+def _iso_to_ts(value, default: float) -> float:
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class TranslationMemory:
+    """
+    Memória de tradução persistente e thread-safe.
+
+    Cada entrada é identificada por (src_key, target_lang, model,
+    glossary_version). src_key é source_key(texto) por padrão; chamadores
+    com chave própria (ex.: hash legado) passam key=/keys= explicitamente.
+    """
+
+    def __init__(self, db_path, max_entries: Optional[int] = None, busy_timeout: float = 30.0):
+        """
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+            max_entries: Limite de entradas (None = sem limite)
+            busy_timeout: Espera máxima (s) por lock de escrita
+        """
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.busy_timeout = float(busy_timeout)
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._touched: Dict[Tuple[str, str, str, str], float] = {}
+
+        if self.db_path.parent and not self.db_path.parent.exists():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Grava toques pendentes e fecha todas as conexões."""
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    def get(self, text: str, target_lang: str = DEFAULT_TARGET_LANG, model: str = "",
+            glossary_version: str = "", key: Optional[str] = None) -> Optional[str]:
+        """Tradução em memória para `text` (ou para `key`), ou None."""
+        keys = None if key is None else [key]
+        found = self.get_many([text], target_lang, model, glossary_version, keys=keys)
+        return found.get(text)
+
+    def get_many(self, texts: Sequence[str], target_lang: str = DEFAULT_TARGET_LANG,
+                 model: str = "", glossary_version: str = "",
+                 keys: Optional[Sequence[str]] = None) -> Dict[str, str]:
+        """
+        Busca em lote.
+
+        Args:
+            texts: Textos fonte
+            keys: Chaves explícitas alinhadas a `texts` (default: source_key)
+
+        Returns:
+            {texto: tradução} apenas para os encontrados
+        """
+        texts = list(texts)
+        if keys is None:
+            keys = [source_key(t) for t in texts]
+        by_key: Dict[str, List[str]] = {}
+        for text, k in zip(texts, keys):
+            by_key.setdefault(k, []).append(text)
+
+        found: Dict[str, str] = {}
+        conn = self._conn()
+        unique = list(by_key)
+        for i in range(0, len(unique), _SQLITE_MAX_VARS):
+            chunk = unique[i:i + _SQLITE_MAX_VARS]
+            rows = conn.execute(
+                "SELECT src_key, translation FROM tm_entries "
+                "WHERE target_lang = ? AND model = ? AND glossary_version = ? "
+                f"AND src_key IN ({','.join('?' * len(chunk))})",
+                [target_lang, model, glossary_version, *chunk],
+            ).fetchall()
+            for k, translation in rows:
+                for text in by_key[k]:
+                    found[text] = translation
+
+        now = time.time()
+        hit_keys = {k for k in unique if by_key[k][0] in found}
+        with self._lock:
+            self.hits += sum(1 for t in texts if t in found)
+            self.misses += sum(1 for t in texts if t not in found)
+            for k in hit_keys:
+                self._touched[(k, target_lang, model, glossary_version)] = now
+            pending = len(self._touched)
+        if pending >= TOUCH_FLUSH_SIZE:
+            self.flush()
+        return found
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def count(self) -> int:
+        """Total de entradas."""
+        return self._conn().execute("SELECT COUNT(*) FROM tm_entries").fetchone()[0]
+
+    def iter_entries(self, target_lang: str = DEFAULT_TARGET_LANG, model: str = "",
+                     glossary_version: str = "") -> Iterator[Tuple[str, str]]:
+        """(fonte, tradução) das entradas com texto fonte conhecido."""
+        cur = self._conn().execute(
+            "SELECT source, translation FROM tm_entries "
+            "WHERE target_lang = ? AND model = ? AND glossary_version = ? AND source IS NOT NULL",
+            (target_lang, model, glossary_version),
+        )
+        for row in cur:
+            yield row[0], row[1]
+
+    def top(self, n: int = 10) -> List[Dict]:
+        """Entradas mais usadas (source, translation, hits)."""
+        self.flush()
+        rows = self._conn().execute(
+            "SELECT source, translation, hits FROM tm_entries ORDER BY hits DESC LIMIT ?", (int(n),)
+        ).fetchall()
+        return [{"original": s or "", "translated": t, "hits": h} for s, t, h in rows]
+
+    def total_hits(self) -> int:
+        """Soma de hits de todas as entradas."""
+        self.flush()
+        return self._conn().execute("SELECT COALESCE(SUM(hits), 0) FROM tm_entries").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+    def put(self, text: str, translation: str, target_lang: str = DEFAULT_TARGET_LANG,
+            model: str = "", glossary_version: str = "", key: Optional[str] = None):
+        """Grava uma tradução."""
+        keys = None if key is None else [key]
+        self.put_many([(text, translation)], target_lang, model, glossary_version, keys=keys)
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], target_lang: str = DEFAULT_TARGET_LANG,
+                 model: str = "", glossary_version: str = "",
+                 keys: Optional[Sequence[str]] = None) -> int:
+        """
+        Grava traduções em uma única transação.
+
+        Args:
+            pairs: (texto fonte, tradução)
+            keys: Chaves explícitas alinhadas a `pairs` (default: source_key)
+
+        Returns:
+            Número de entradas gravadas
+        """
+        pairs = list(pairs)
+        if keys is None:
+            keys = [source_key(text) for text, _ in pairs]
+        now = time.time()
+        rows = [
+            (k, target_lang, model, glossary_version, text, translation, now, now)
+            for (text, translation), k in zip(pairs, keys)
+        ]
+        if not rows:
+            return 0
+        self._write(rows)
+        self._maybe_evict()
+        return len(rows)
+
+    def _write(self, rows: List[Tuple]):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO tm_entries "
+                "(src_key, target_lang, model, glossary_version, source, translation, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT(src_key, target_lang, model, glossary_version) DO UPDATE SET "
+                "source = COALESCE(excluded.source, tm_entries.source), "
+                "translation = excluded.translation, last_used = excluded.last_used",
+                rows,
+            )
+
+    def flush(self):
+        """Grava last_used/hits acumulados pelas leituras."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE tm_entries SET last_used = MAX(last_used, ?), hits = hits + 1 "
+                "WHERE src_key = ? AND target_lang = ? AND model = ? AND glossary_version = ?",
+                [(ts, *k) for k, ts in touched.items()],
+            )
+
+    # ------------------------------------------------------------------
+    # Evicção e manutenção
+    # ------------------------------------------------------------------
+    def _maybe_evict(self):
+        if not self.max_entries:
+            return
+        if self.count() > self.max_entries * (1 + EVICTION_SLACK):
+            self.evict(self.max_entries)
+
+    def evict(self, max_entries: Optional[int] = None) -> int:
+        """Remove as entradas menos usadas recentemente até sobrar `max_entries`."""
+        limit = self.max_entries if max_entries is None else max_entries
+        if limit is None:
+            return 0
+        self.flush()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "DELETE FROM tm_entries WHERE rowid IN ("
+                "SELECT rowid FROM tm_entries ORDER BY last_used ASC "
+                "LIMIT MAX(0, (SELECT COUNT(*) FROM tm_entries) - ?))",
+                (int(limit),),
+            )
+        return cur.rowcount
+
+    def remove_older_than(self, seconds: float) -> int:
+        """Remove entradas sem uso há mais de `seconds`."""
+        self.flush()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM tm_entries WHERE last_used < ?", (time.time() - seconds,))
+        return cur.rowcount
+
+    def clear(self):
+        """Remove todas as entradas."""
+        with self._lock:
+            self._touched.clear()
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM tm_entries")
+
+    # ------------------------------------------------------------------
+    # Importação dos caches JSON
+    # ------------------------------------------------------------------
+    def import_db(self, db_path, force: bool = False) -> int:
+        """
+        Copia as entradas de outro banco da memória de tradução (uma vez por
+        arquivo, salvo force=True). Entradas já existentes são mantidas.
+
+        Returns:
+            Número de entradas importadas
+        """
+        db_path = Path(db_path)
+        marker = f"imported_db:{db_path.resolve()}"
+        conn = self._conn()
+        if not force and conn.execute("SELECT 1 FROM tm_meta WHERE key = ?", (marker,)).fetchone():
+            return 0
+        try:
+            src = sqlite3.connect(str(db_path), timeout=self.busy_timeout)
+            try:
+                rows = src.execute(
+                    "SELECT src_key, target_lang, model, glossary_version, source, translation, "
+                    "created, last_used, hits FROM tm_entries"
+                ).fetchall()
+            finally:
+                src.close()
+        except sqlite3.Error:
+            return 0
+
+        before = self.count()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO tm_entries "
+                "(src_key, target_lang, model, glossary_version, source, translation, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("INSERT OR REPLACE INTO tm_meta (key, value) VALUES (?, ?)",
+                         (marker, datetime.now().isoformat()))
+        imported = self.count() - before
+        self._maybe_evict()
+        return imported
+
+    def import_json(self, json_path, target_lang: str = DEFAULT_TARGET_LANG, model: str = "",
+                    glossary_version: str = "", keyed_by_hash: Optional[bool] = None,
+                    force: bool = False) -> int:
+        """
+        Importa um cache JSON antigo (uma vez por arquivo, salvo force=True).
+
+        Formatos aceitos:
+        - {'metadata': ..., 'translations': {hash: {'original', 'translated', ...}}}
+        - {texto: tradução}
+        - {hash_md5: tradução} (chave mantida como src_key; fonte desconhecida)
+
+        Args:
+            keyed_by_hash: Força a interpretação das chaves do dict plano
+                (None = detecta: todas as chaves hex de 32/64 chars)
+
+        Returns:
+            Número de entradas importadas
+        """
+        json_path = Path(json_path)
+        marker = f"imported:{json_path.resolve()}"
+        conn = self._conn()
+        if not force and conn.execute("SELECT 1 FROM tm_meta WHERE key = ?", (marker,)).fetchone():
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict):
+            return 0
+
+        now = time.time()
+        rows = []
+        translations = data.get("translations") if "metadata" in data else None
+        if isinstance(translations, dict):
+            for entry in translations.values():
+                if not isinstance(entry, dict) or "original" not in entry or "translated" not in entry:
+                    continue
+                created = _iso_to_ts(entry.get("created"), now)
+                rows.append((
+                    source_key(entry["original"]), entry.get("target_language", target_lang),
+                    model, glossary_version, entry["original"], entry["translated"],
+                    created, _iso_to_ts(entry.get("last_used"), created), int(entry.get("hits", 0)),
+                ))
+        else:
+            items = [(k, v) for k, v in data.items() if isinstance(v, str)]
+            if keyed_by_hash is None:
+                keyed_by_hash = bool(items) and all(_HEX_KEY_RE.match(k) for k, _ in items)
+            for k, translation in items:
+                if keyed_by_hash:
+                    rows.append((k, target_lang, model, glossary_version, None, translation, now, now, 0))
+                else:
+                    rows.append((source_key(k), target_lang, model, glossary_version, k,
+                                 translation, now, now, 0))
+
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO tm_entries "
+                "(src_key, target_lang, model, glossary_version, source, translation, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("INSERT OR REPLACE INTO tm_meta (key, value) VALUES (?, ?)",
+                         (marker, datetime.now().isoformat()))
+        self._maybe_evict()
+        return len(rows)
+
+
+def open_for_json_cache(json_path, max_entries: Optional[int] = None, db_path=None,
+                        **import_kwargs) -> TranslationMemory:
+    """
+    Abre a memória de tradução compartilhada e migra um cache JSON antigo.
+
+    Todos os caches usam o mesmo banco (db_path ou default_db_path()); o
+    JSON é importado uma vez, assim como um <nome>.sqlite3 ao lado dele
+    criado por versões anteriores. Com max_entries, a evicção vale para o
+    banco inteiro.
+    """
+    json_path = Path(json_path)
+    tm = TranslationMemory(db_path or default_db_path(), max_entries=max_entries)
+    legacy_db = json_path.with_suffix(".sqlite3")
+    if legacy_db.exists() and legacy_db.resolve() != tm.db_path.resolve():
+        tm.import_db(legacy_db)
+    if json_path.exists():
+        tm.import_json(json_path, **import_kwargs)
+    return tm
@@ -16,10 +16,17 @@ Version: 1.0.0
 
 import re
 import hashlib
-import json
 from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
-from collections import defaultdict
+
+try:
+    from .translation_memory import TranslationMemory, open_for_json_cache
+    from .TRANSLATION_PREP_LAYER import DedupFanout
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from translation_memory import TranslationMemory, open_for_json_cache
+    from TRANSLATION_PREP_LAYER import DedupFanout
 
 
 class TranslationOptimizer:
@@ -34,6 +41,8 @@ class TranslationOptimizer:
         """
         self.cache_file = cache_file or "translation_cache.json"
         self.cache = self._load_cache()
+        self.fanout = DedupFanout(send_protected=False)
+        self._fanout_occ: Dict[int, int] = {}
 
         # Estatísticas
         self.stats = {
@@ -50,21 +59,14 @@ class TranslationOptimizer:
             'final_count': 0
         }
 
-    def _load_cache(self) -> Dict[str, str]:
-        """Load translation cache from disk."""
-        try:
-            if Path(self.cache_file).exists():
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+    def _load_cache(self) -> TranslationMemory:
+        """Open the shared translation memory (imports the legacy JSON cache once)."""
+        return open_for_json_cache(self.cache_file, keyed_by_hash=True)
 
     def save_cache(self):
-        """Save translation cache to disk."""
+        """Flush pending translation-memory writes."""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            self.cache.flush()
         except Exception as e:
             print(f"⚠️ Erro ao salvar cache: {e}")
 
@@ -297,16 +299,25 @@ class TranslationOptimizer:
         """
         self.stats['original_count'] = len(texts)
 
-        # Mapeamento: hash normalizado -> lista de índices originais
-        hash_to_indices = defaultdict(list)
+        # Agrupamento global: cada forma protegida é traduzida uma vez e
+        # reconstruct_translations devolve os códigos de controle de cada linha
+        self.fanout = DedupFanout(send_protected=False)
+        self._fanout_occ: Dict[int, int] = {}
 
         # Textos únicos a traduzir
         unique_texts = []
-        unique_hashes = set()
 
         # Índice reverso: qual índice do unique_texts usar para cada índice original
         index_mapping = {}
 
+        # Cache consultado em lote (uma consulta para toda a lista)
+        cached_hashes = set()
+        if use_cache:
+            stripped = [t.strip() for t in texts]
+            hashes = [self.compute_hash(t) for t in stripped]
+            found = self.cache.get_many(stripped, keys=hashes)
+            cached_hashes = {h for t, h in zip(stripped, hashes) if t in found}
+
         for i, text in enumerate(texts):
             text = text.strip()
 
@@ -351,29 +362,20 @@ class TranslationOptimizer:
 
             # FILTRO 7: Cache
             text_hash = self.compute_hash(text)
-            if use_cache and text_hash in self.cache:
+            if use_cache and text_hash in cached_hashes:
                 self.stats['cache_hits'] += 1
                 # Retorna tradução do cache diretamente
                 index_mapping[i] = -2  # -2 = usar cache
                 continue
 
-            # FILTRO 8: Deduplicação semântica
-            if text_hash in unique_hashes:
-                # Já existe, mapeia para o índice existente
-                existing_idx = len([h for h in unique_hashes if h != text_hash])
-                # Encontra o índice correto
-                for idx, unique_text in enumerate(unique_texts):
-                    if self.compute_hash(unique_text) == text_hash:
-                        index_mapping[i] = idx
-                        hash_to_indices[text_hash].append(i)
-                        self.stats['deduplicated'] += 1
-                        break
-            else:
-                # Novo texto único
-                unique_hashes.add(text_hash)
-                index_mapping[i] = len(unique_texts)
+            # FILTRO 8: Deduplicação (forma protegida, sem tokens) com fan-out
+            self._fanout_occ[i] = len(self._fanout_occ)
+            group = self.fanout.add(text, ref=i)
+            index_mapping[i] = group
+            if group == len(unique_texts):
                 unique_texts.append(text)
-                hash_to_indices[text_hash].append(i)
+            else:
+                self.stats['deduplicated'] += 1
 
         self.stats['final_count'] = len(unique_texts)
 
@@ -396,6 +398,14 @@ class TranslationOptimizer:
         """
         result = []
 
+        # Traduções do cache buscadas em lote
+        cache_idx = [i for i in range(len(original_texts)) if index_mapping.get(i, -1) == -2]
+        cached = self.cache.get_many(
+            [original_texts[i] for i in cache_idx],
+            keys=[self.compute_hash(original_texts[i]) for i in cache_idx],
+        )
+        new_entries = []
+
         for i, original_text in enumerate(original_texts):
             mapping_idx = index_mapping.get(i, -1)
 
@@ -404,22 +414,25 @@ class TranslationOptimizer:
                 result.append(original_text)
             elif mapping_idx == -2:
                 # Usar cache
-                text_hash = self.compute_hash(original_text)
-                cached = self.cache.get(text_hash, original_text)
-                result.append(cached)
+                result.append(cached.get(original_text, original_text))
             elif mapping_idx >= 0 and mapping_idx < len(unique_translations):
-                # Usar tradução
+                # Usar tradução (com os códigos de controle desta linha)
                 translation = unique_translations[mapping_idx]
+                occ_id = self._fanout_occ.get(i)
+                if occ_id is not None and self.fanout.text_of(occ_id) == original_text:
+                    translation = self.fanout.fan_out_one(occ_id, translation)
 
                 # Atualiza cache
-                text_hash = self.compute_hash(original_text)
-                self.cache[text_hash] = translation
+                new_entries.append((original_text, translation))
 
                 result.append(translation)
             else:
                 # Fallback
                 result.append(original_text)
 
+        if new_entries:
+            self.cache.put_many(new_entries, keys=[self.compute_hash(t) for t, _ in new_entries])
+
         return result
 
     def get_stats_report(self) -> str:
@@ -264,7 +264,7 @@ class UltimateExtractorV7:
         Returns:
             (recovered_strings, statistics)
         """
-        self.scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table)
+        self.scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table, rom_path=str(self.rom_path))
         return self.scavenger_engine.scavenge(extracted_offsets)
 
     def save_results(self, main_strings: List[Tuple[int, str]],
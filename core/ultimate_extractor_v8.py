@@ -803,7 +803,7 @@ class UltimateExtractorV8:
             # Só executa Scavenger
             print("\n🔹 ETAPA 3: DEEP SCAVENGER (limpeza)")
             extracted_offsets = [offset for offset, _ in filtered_strings]
-            scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table)
+            scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table, rom_path=str(self.rom_path))
             recovered_strings, scavenger_stats = scavenger_engine.scavenge(extracted_offsets)
 
             # Filtra recuperadas
@@ -874,7 +874,7 @@ class UltimateExtractorV8:
                         # Scavenger
                         print("\n🔹 ETAPA 3: DEEP SCAVENGER")
                         extracted_offsets = [offset for offset, _ in filtered_strings]
-                        scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table)
+                        scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table, rom_path=str(self.rom_path))
                         recovered_strings, scavenger_stats = scavenger_engine.scavenge(extracted_offsets)
 
                         if recovered_strings:
@@ -908,7 +908,7 @@ class UltimateExtractorV8:
         print("\n🔹 ETAPA 3: DEEP SCAVENGER\n")
 
         extracted_offsets = [offset for offset, _ in filtered_strings]
-        scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table)
+        scavenger_engine = DeepScavengerEngine(self.rom_data, self.char_table, rom_path=str(self.rom_path))
         recovered_strings, scavenger_stats = scavenger_engine.scavenge(extracted_offsets)
 
         # Filtra recuperadas
@@ -40,6 +40,26 @@ except ImportError:
     print("⚠️ SuperTextFilter não encontrado, usando filtro básico")
     SuperTextFilter = None
 
+try:
+    from universal_kit.entropy_map import EntropyMap
+except Exception:
+    EntropyMap = None
+
+try:
+    from utils.analysis_cache import AnalysisCache
+    from utils.rom_io import compute_sha256
+except Exception:
+    AnalysisCache = None
+    compute_sha256 = None
+
+try:
+    from utils.rom_io import RomImage
+except Exception:
+    RomImage = None
+
+# Versão dos métodos 1-5 do kernel (incrementar invalida o cache de análise)
+V9_ANALYSIS_VERSION = "9.8"
+
 
 class UltimateExtractorV9:
     """
@@ -124,6 +144,7 @@ class UltimateExtractorV9:
     def __init__(self, rom_path: str):
         self.rom_path = rom_path
         self.rom_data = None
+        self.rom_image = None
         self.rom_size = 0
         self.has_header = False
         self.is_hirom = False
@@ -148,10 +169,32 @@ class UltimateExtractorV9:
         # ✅ KERNEL V 9.8: Load MTE Dictionary for Profile B
         self._load_mte_dictionary()
 
+    def close(self):
+        """Libera o mapeamento da ROM (rom_data deixa de ser válido se era view)."""
+        if isinstance(self.rom_data, memoryview):
+            try:
+                self.rom_data.release()
+            except BufferError:
+                pass  # Views derivadas vivas: o mmap fecha quando forem coletadas
+        if self.rom_image is not None:
+            self.rom_image.close()
+            self.rom_image = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _load_rom(self):
         """Carrega a ROM e detecta header SMC."""
-        with open(self.rom_path, 'rb') as f:
-            self.rom_data = bytearray(f.read())
+        if RomImage is not None:
+            # O extrator só lê: view do mmap, sem copiar a ROM para a memória
+            self.rom_image = RomImage(self.rom_path)
+            self.rom_data = self.rom_image.view()
+        else:
+            with open(self.rom_path, 'rb') as f:
+                self.rom_data = bytearray(f.read())
 
         self.rom_size = len(self.rom_data)
 
@@ -1164,11 +1207,18 @@ class UltimateExtractorV9:
 
         print(f"   🛡️ FILTRO DE BOOT: Ignorando região < 0x{boot_zone_limit:X}")
 
-        for offset in range(boot_zone_limit, len(self.rom_data) - window_size, step):
-            window = self.rom_data[offset:offset + window_size]
+        if EntropyMap is not None:
+            # Serviço compartilhado: janelas completas iniciando antes de len - window_size
+            windows = EntropyMap.for_rom(self.rom_data, path=self.rom_path).windows(
+                window_size, step, start=boot_zone_limit, end=len(self.rom_data) - 1
+            )
+        else:
+            windows = (
+                (offset, self._calculate_entropy(self.rom_data[offset:offset + window_size]))
+                for offset in range(boot_zone_limit, len(self.rom_data) - window_size, step)
+            )
 
-            # Calcula entropia
-            entropy = self._calculate_entropy(window)
+        for offset, entropy in windows:
 
             # Entropia alta (> 4.5) indica texto comprimido ou código
             # Entropia média (3.0 - 4.5) indica texto ASCII
@@ -1228,30 +1278,39 @@ class UltimateExtractorV9:
 
         return entropy
 
-    def extract_all(self, output_path: str) -> Dict:
+    def _collect_texts_cached(self) -> Tuple[List[Dict], Dict]:
         """
-        Executa extração completa usando todos os métodos do Kernel V 9.8 [FORENSIC KERNEL]
-
-        ✅ PRIORIDADE 1: PROFILE B MASTER DECODER (Dual Block: $0E + $1C)
-        ✅ TABELAS PADRÃO: MAIN (0x00-0x61) + SYLLABLES (0x88-0xE8)
-        ✅ DECODIFICAÇÃO PERFEITA: 'Hero', 'Princess', 'and ', 'the ', etc
-        ✅ FORENSIC MODULES: Mirroring, Script Crawler, Dictionary Lookup, Shift-JIS
-
-        Args:
-            output_path: Caminho do arquivo de saída
-
-        Returns:
-            Estatísticas da extração
+        Executa os métodos 1-5 ou reaproveita o resultado do cache de análise
+        (chave: SHA-256 da ROM + versão do kernel + filtros opcionais ativos).
         """
-        print(f"\n{'='*80}")
-        print(f"NEUROROM AI V 6.0 PRO SUITE - KERNEL V 9.8 [FORENSIC KERNEL]")
-        print(f"{'='*80}\n")
-        print(f"🎮 PROFILE B MASTER DECODER: Tabelas Padrão de Interoperabilidade")
-        print(f"🎮 DUAL BLOCK EXTRACTION: Bank $0E (0x70000) + Bank $1C (0xE0000)")
-        print(f"🎮 SYLLABLES DECODER: 'Hero', 'Princess', 'and', 'the', 'Sacred Item'")
-        print(f"🔬 FORENSIC MODULES: Mirroring + Script Crawler + Dictionary + Shift-JIS")
-        print(f"🛡️ FILTRO DE BOOT: Região < 0x8000 ignorada\n")
-
+        cache = AnalysisCache() if AnalysisCache is not None else None
+        if cache is None or not cache.enabled:
+            return self._collect_texts()
+
+        rom_sha = self.rom_image.sha256() if self.rom_image is not None else compute_sha256(self.rom_data)
+        # SuperTextFilter e EntropyMap são opcionais e mudam o resultado
+        params = {
+            "text_filter": type(self.text_filter).__name__ if self.text_filter else "basic",
+            "entropy_map": EntropyMap is not None,
+        }
+        cached = cache.get(rom_sha, "ultimate_v9", V9_ANALYSIS_VERSION, params)
+        if isinstance(cached, dict):
+            print(f"♻️  Métodos 1-5 carregados do cache de análise")
+            self.mte_dictionary.update(cached["mte_dictionary"])
+            self.script_opcodes.update(cached["script_opcodes"])
+            return cached["texts"], cached["stats"]
+
+        all_texts, stats = self._collect_texts()
+        cache.put(rom_sha, "ultimate_v9", V9_ANALYSIS_VERSION, {
+            "texts": all_texts,
+            "stats": stats,
+            "mte_dictionary": self.mte_dictionary,
+            "script_opcodes": self.script_opcodes,
+        }, params)
+        return all_texts, stats
+
+    def _collect_texts(self) -> Tuple[List[Dict], Dict]:
+        """Métodos 1-5 de extração + remoção de duplicatas por offset."""
         all_texts = []
         stats = {
             'profile_b_master_decoder': 0,
@@ -1354,6 +1413,34 @@ class UltimateExtractorV9:
         all_texts = list(unique_texts.values())
         stats['total'] = len(all_texts)
 
+        return all_texts, stats
+
+    def extract_all(self, output_path: str) -> Dict:
+        """
+        Executa extração completa usando todos os métodos do Kernel V 9.8 [FORENSIC KERNEL]
+
+        ✅ PRIORIDADE 1: PROFILE B MASTER DECODER (Dual Block: $0E + $1C)
+        ✅ TABELAS PADRÃO: MAIN (0x00-0x61) + SYLLABLES (0x88-0xE8)
+        ✅ DECODIFICAÇÃO PERFEITA: 'Hero', 'Princess', 'and ', 'the ', etc
+        ✅ FORENSIC MODULES: Mirroring, Script Crawler, Dictionary Lookup, Shift-JIS
+
+        Args:
+            output_path: Caminho do arquivo de saída
+
+        Returns:
+            Estatísticas da extração
+        """
+        print(f"\n{'='*80}")
+        print(f"NEUROROM AI V 6.0 PRO SUITE - KERNEL V 9.8 [FORENSIC KERNEL]")
+        print(f"{'='*80}\n")
+        print(f"🎮 PROFILE B MASTER DECODER: Tabelas Padrão de Interoperabilidade")
+        print(f"🎮 DUAL BLOCK EXTRACTION: Bank $0E (0x70000) + Bank $1C (0xE0000)")
+        print(f"🎮 SYLLABLES DECODER: 'Hero', 'Princess', 'and', 'the', 'Sacred Item'")
+        print(f"🔬 FORENSIC MODULES: Mirroring + Script Crawler + Dictionary + Shift-JIS")
+        print(f"🛡️ FILTRO DE BOOT: Região < 0x8000 ignorada\n")
+
+        all_texts, stats = self._collect_texts_cached()
+
         # Salva arquivo
         print(f"\n📝 Salvando arquivo de extração...")
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -1463,8 +1550,8 @@ def main():
         output_path = os.path.join(rom_dir, f"{rom_name}_V98_FORENSIC.txt")
 
     # Executa extração
-    extractor = UltimateExtractorV9(rom_path)
-    stats = extractor.extract_all(output_path)
+    with UltimateExtractorV9(rom_path) as extractor:
+        stats = extractor.extract_all(output_path)
 
     return 0
 
@@ -26,7 +26,26 @@ from .rom_analyzer import ROMAnalyzer
 from .text_scanner import TextScanner
 from .charset_inference import CharsetInferenceEngine
 from .pointer_scanner import PointerScanner
-from .compression_detector import CompressionDetector
+from .compression_detector import CompressedRegion, CompressionDetector
+from .charset_inference import CharsetCandidate
+from .pointer_scanner import Pointer, PointerTable
+from .text_scanner import TextCandidate
+
+try:
+    from utils.analysis_cache import AnalysisCache, register_cache_type
+    from utils.rom_io import RomImage, compute_sha256
+except Exception:
+    AnalysisCache = None
+    RomImage = None
+    compute_sha256 = None
+else:
+    # Resultados das etapas 1-5 gravados no cache (JSON, sem pickle)
+    for _cls in (CompressedRegion, TextCandidate, CharsetCandidate, PointerTable, Pointer):
+        register_cache_type(_cls)
+
+# Versão das etapas 1-5 (incrementar ao mudar analisadores/parâmetros invalida o cache)
+# 2: cache em JSON
+STATIC_ANALYSIS_VERSION = "2"
 
 
 class UniversalExtractionPipeline:
@@ -34,11 +53,14 @@ class UniversalExtractionPipeline:
     Pipeline completo de extração automática de ROMs.
     """
 
-    def __init__(self, rom_path: str, output_dir: Optional[str] = None):
+    def __init__(self, rom_path: str, output_dir: Optional[str] = None,
+                 use_cache: bool = True, cache: Optional["AnalysisCache"] = None):
         """
         Args:
             rom_path: Caminho para arquivo ROM
             output_dir: Diretório para outputs (default: rom_path_output/)
+            use_cache: Reaproveita análise estática (etapas 1-5) do cache em disco
+            cache: AnalysisCache a usar (default: cache padrão do usuário)
         """
         self.rom_path = Path(rom_path)
         self.output_dir = Path(output_dir) if output_dir else self.rom_path.parent / f"{self.rom_path.stem}_output"
@@ -52,6 +74,13 @@ class UniversalExtractionPipeline:
         self.compressed_regions = []
         self.extracted_texts = []
 
+        self.cache = None
+        if use_cache and AnalysisCache is not None:
+            self.cache = cache or AnalysisCache()
+        self.cache_hit = False
+        # SHA-256 da ROM quando o cache o calcula: identidade do EntropyMap nas etapas
+        self.rom_sha: Optional[str] = None
+
     def run_full_analysis(self) -> Dict:
         """
         Executa pipeline completo de análise automática.
@@ -66,6 +95,30 @@ class UniversalExtractionPipeline:
         print(f"Output: {self.output_dir}")
         print(f"{'='*70}\n")
 
+        cache_key = self._cache_key()
+        self.rom_sha = cache_key
+        if cache_key and self._load_cached_analysis(cache_key):
+            print("\n♻️  Análise estática (etapas 1-5) carregada do cache")
+        else:
+            self._run_static_analysis()
+            if cache_key:
+                self._store_cached_analysis(cache_key)
+
+        # Etapa 6: Consolidação e exportação
+        print("\n" + "="*70)
+        print("STAGE 6: CONSOLIDATION & EXPORT")
+        print("="*70)
+        final_data = self._consolidate_results()
+        self._export_universal_format(final_data)
+
+        print(f"\n{'='*70}")
+        print(f"✅ PIPELINE COMPLETED SUCCESSFULLY")
+        print(f"{'='*70}\n")
+
+        return final_data
+
+    def _run_static_analysis(self):
+        """Etapas 1-5: análise estática completa."""
         # Etapa 1: Análise estrutural da ROM
         print("\n" + "="*70)
         print("STAGE 1: ROM STRUCTURE ANALYSIS")
@@ -96,18 +149,40 @@ class UniversalExtractionPipeline:
         print("="*70)
         self._run_pointer_scanning()
 
-        # Etapa 6: Consolidação e exportação
-        print("\n" + "="*70)
-        print("STAGE 6: CONSOLIDATION & EXPORT")
-        print("="*70)
-        final_data = self._consolidate_results()
-        self._export_universal_format(final_data)
-
-        print(f"\n{'='*70}")
-        print(f"✅ PIPELINE COMPLETED SUCCESSFULLY")
-        print(f"{'='*70}\n")
-
-        return final_data
+    def _cache_key(self) -> Optional[str]:
+        """SHA-256 da ROM para o cache de análise (None se cache desativado)."""
+        if self.cache is None or not self.cache.enabled:
+            return None
+        try:
+            # Hash sobre o mapeamento: ISOs grandes não são lidas inteiras para memória
+            with RomImage(self.rom_path) as rom:
+                return rom.sha256()
+        except OSError:
+            return None
+
+    def _load_cached_analysis(self, rom_sha: str) -> bool:
+        """Restaura resultados das etapas 1-5 do cache. True em caso de hit."""
+        cached = self.cache.get(rom_sha, "universal_pipeline", STATIC_ANALYSIS_VERSION)
+        if not isinstance(cached, dict):
+            return False
+        self.rom_analysis = cached["rom_analysis"]
+        self.rom_analysis.setdefault('file_info', {})['filename'] = self.rom_path.name
+        self.compressed_regions = cached["compressed_regions"]
+        self.text_candidates = cached["text_candidates"]
+        self.charset_tables = cached["charset_tables"]
+        self.pointer_tables = cached["pointer_tables"]
+        self.cache_hit = True
+        return True
+
+    def _store_cached_analysis(self, rom_sha: str):
+        """Grava resultados das etapas 1-5 no cache."""
+        self.cache.put(rom_sha, "universal_pipeline", STATIC_ANALYSIS_VERSION, {
+            "rom_analysis": self.rom_analysis,
+            "compressed_regions": self.compressed_regions,
+            "text_candidates": self.text_candidates,
+            "charset_tables": self.charset_tables,
+            "pointer_tables": self.pointer_tables,
+        })
 
     def _run_rom_analysis(self):
         """Etapa 1: Análise estrutural."""
@@ -129,7 +204,7 @@ class UniversalExtractionPipeline:
         # Usa mapa de entropia da etapa anterior
         entropy_map = self.rom_analysis.get('entropy_map', [])
 
-        detector = CompressionDetector(data, entropy_map)
+        detector = CompressionDetector(data, entropy_map, rom_key=self.rom_sha, rom_path=str(self.rom_path))
         self.compressed_regions = detector.detect()
         detector.print_summary()
         detector.export_report(str(self.output_dir / 'compression_report.json'))
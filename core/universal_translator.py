@@ -1320,8 +1320,8 @@ class GenesisDriver(PlatformDriver):
         method = "GENESIS_ASCII_SCAN"
 
         try:
-            extractor = SegaExtractor(rom_path)
-            rows = extractor.extract_texts(min_length=4)
+            with SegaExtractor(rom_path) as extractor:
+                rows = extractor.extract_texts(min_length=4)
             diagnostics["sega_extractor_rows"] = int(len(rows))
 
             runs: List[Tuple[int, bytes, str, int]] = []
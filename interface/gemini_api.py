@@ -40,6 +40,15 @@ except (ImportError, ValueError):
         GeminiQuotaManager = None  # Define como None se não disponível
         print("⚠️ QuotaManager não disponível - rodando sem controle de quota")
 
+# Batcher adaptativo (tamanho de lote por tokens + latência/falhas de parse)
+try:
+    from ..core.adaptive_batcher import get_batcher
+except (ImportError, ValueError):
+    try:
+        from core.adaptive_batcher import get_batcher
+    except ImportError:
+        get_batcher = None  # Sem batcher: tamanho de lote fixo
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,7 +70,7 @@ MODEL_CANDIDATES = [
 ]
 MODEL_NAME = MODEL_CANDIDATES[0]
 RATE_LIMIT_DELAY = 4.0  # Segundos entre chamadas (free tier: 10-15 RPM → 1 req a cada 4-6s)
-MAX_BATCH_SIZE = 200  # Traduz até 200 textos por requisição
+MAX_BATCH_SIZE = 200  # Lote inicial por requisição (o AdaptiveBatcher ajusta online)
 NEUROROM_BATCH_SIZE = 50  # Batch fixo solicitado para automação de strings
 
 # Instância global do quota manager (singleton)
@@ -293,7 +302,8 @@ def _translate_single_batch(
     max_retries: int = 3,
     model_name: Optional[str] = None,
     _fallback_attempted: bool = False,
-    _mismatch_retried: bool = False
+    _mismatch_retried: bool = False,
+    _outcome: Optional[Dict[str, Any]] = None
 ) -> Tuple[List[str], bool, Optional[str]]:
     """
     Traduz uma lista de linhas em um único bloco usando Gemini API.
@@ -306,6 +316,8 @@ def _translate_single_batch(
         target_language: Idioma de destino
         timeout: Timeout em segundos
         max_retries: Número máximo de tentativas (default: 3)
+        _outcome: Se informado, recebe {"parsed": bool} da última resposta
+            (False = caiu fora do parse por IDs numerados)
 
     Returns:
         Tupla: (linhas_traduzidas, sucesso, mensagem_erro)
@@ -405,6 +417,8 @@ def _translate_single_batch(
 
             # Tentativa 1: Parse por IDs numerados [N]
             parsed = _parse_numbered_response(translated_text, len(lines))
+            if _outcome is not None:
+                _outcome["parsed"] = parsed is not None
             if parsed is not None:
                 # Conta itens efetivamente traduzidos vs mantidos como original
                 mapped_count = sum(
@@ -547,12 +561,12 @@ def _translate_batch_legacy(
     timeout: float = 120.0
 ) -> Tuple[List[str], bool, Optional[str]]:
     """
-    Traduz uma lista de linhas usando auto-batching otimizado.
+    Traduz uma lista de linhas usando auto-batching adaptativo.
 
-    Divide automaticamente listas grandes em batches de MAX_BATCH_SIZE
-    para reduzir o número de requisições à API e respeitar rate limits.
-
-    Exemplo: 1000 textos com MAX_BATCH_SIZE=200 = 5 requisições
+    Os lotes são empacotados por tokens estimados até o orçamento do modelo,
+    começando em MAX_BATCH_SIZE textos; o tamanho é ajustado a cada lote pela
+    latência e pelas falhas do parse por IDs numerados (ver AdaptiveBatcher).
+    Sem o batcher, divide em lotes fixos de MAX_BATCH_SIZE.
 
     Args:
         lines: Lista de strings para traduzir (qualquer tamanho)
@@ -572,44 +586,55 @@ def _translate_batch_legacy(
     if not lines:
         return [], True, None
 
-    # Se a lista couber em um único batch, usa função direta
-    if len(lines) <= MAX_BATCH_SIZE:
-        return _translate_single_batch(lines, api_key, target_language, timeout)
-
-    # Dividir em batches e traduzir cada um
-    print(f"📦 Dividindo {len(lines)} textos em batches de {MAX_BATCH_SIZE}...")
+    batcher = None
+    if get_batcher is not None:
+        batcher = get_batcher(
+            _detected_model_name or MODEL_NAME,
+            initial_size=MAX_BATCH_SIZE,
+            max_size=MAX_BATCH_SIZE * 4,
+        )
+        batches = batcher.iter_batches(lines)
+    else:
+        batches = (lines[i:i + MAX_BATCH_SIZE] for i in range(0, len(lines), MAX_BATCH_SIZE))
 
     all_translations = []
-    batch_count = (len(lines) + MAX_BATCH_SIZE - 1) // MAX_BATCH_SIZE
-
-    for i in range(0, len(lines), MAX_BATCH_SIZE):
-        batch_num = (i // MAX_BATCH_SIZE) + 1
-        batch = lines[i:i + MAX_BATCH_SIZE]
+    batch_num = 0
+    done = 0
 
-        print(f"   🔄 Traduzindo batch {batch_num}/{batch_count} ({len(batch)} textos)...")
+    for batch in batches:
+        batch_num += 1
+        if batch_num > 1 or len(batch) < len(lines):
+            print(f"   🔄 Traduzindo batch {batch_num} ({len(batch)} textos, {done}/{len(lines)} prontos)...")
 
+        outcome: Dict[str, Any] = {}
+        started = time.monotonic()
         batch_translations, success, error = _translate_single_batch(
-            batch, api_key, target_language, timeout
+            batch, api_key, target_language, timeout, _outcome=outcome
         )
+        # Só respostas recebidas medem o tamanho do lote (quota/rede não)
+        if batcher is not None and "parsed" in outcome:
+            batcher.record(len(batch), time.monotonic() - started, ok=bool(outcome["parsed"]))
 
         if not success:
             # Se um batch falhar, retornar o que conseguimos + originais restantes
             warning_msg = (
-                f"Erro no batch {batch_num}/{batch_count}: {error}\n"
+                f"Erro no batch {batch_num}: {error}\n"
                 f"Traduzidos: {len(all_translations)}/{len(lines)}"
             )
             print(f"   ⚠️  {warning_msg}")
 
             # Adicionar traduções já feitas + originais restantes
             all_translations.extend(batch_translations)
-            all_translations.extend([l + "\n" for l in lines[i + len(batch):]])
+            all_translations.extend([l + "\n" for l in lines[done + len(batch):]])
 
             return all_translations, False, warning_msg
 
         all_translations.extend(batch_translations)
-        print(f"   ✅ Batch {batch_num}/{batch_count} completo")
+        done += len(batch)
 
-    print(f"✅ Tradução completa: {len(all_translations)} textos em {batch_count} requisições")
+    if batch_num > 1:
+        stats = f" | lote atual: {batcher.size}" if batcher is not None else ""
+        print(f"✅ Tradução completa: {len(all_translations)} textos em {batch_num} requisições{stats}")
     return all_translations, True, None
 
 
@@ -263,6 +263,58 @@ except Exception:
     except Exception:
         LinguisticQA = None
 
+try:
+    from core.nllb_engine import get_nllb_engine
+except Exception:
+    get_nllb_engine = None
+
+# Despacho compartilhado (concorrência/RPM/TPM por serviço em todo o processo)
+try:
+    from core.translation_dispatcher import dispatch_call, limits_for
+except Exception:
+    dispatch_call = None
+    limits_for = None
+
+_BACKEND_LIMITS_CACHE: Dict[str, object] = {}
+
+
+def _backend_limits(backend: str):
+    """
+    Limites do serviço: padrão do dispatcher sobrescrito pela chave opcional
+    "backend_limits" do translator_config.json, ex.:
+    {"backend_limits": {"gemini": {"rpm": 15, "max_concurrency": 2}}}
+    """
+    if backend not in _BACKEND_LIMITS_CACHE:
+        overrides = {}
+        try:
+            cfg_path = Path(__file__).resolve().parent / "translator_config.json"
+            with open(cfg_path, "r", encoding="utf-8") as f:
+                overrides = (json.load(f).get("backend_limits") or {}).get(backend) or {}
+        except Exception:
+            overrides = {}
+        limits = limits_for(backend)
+        for key, value in overrides.items():
+            if hasattr(limits, key):
+                setattr(limits, key, value)
+        _BACKEND_LIMITS_CACHE[backend] = limits
+    return _BACKEND_LIMITS_CACHE[backend]
+
+
+def _call_backend(backend: str, job, tokens: int = 0):
+    """job(session) pelo dispatcher compartilhado; chamada direta se indisponível."""
+    if dispatch_call is None:
+        return job(None)
+    return dispatch_call(backend, job, tokens=tokens, limits=_backend_limits(backend))
+
+
+def _estimate_tokens(texts) -> int:
+    return sum(len(str(t or "")) for t in texts) // 4 + 1
+
+try:
+    from core.glossary_matcher import GlossaryMatcher
+except Exception:
+    GlossaryMatcher = None
+
 # Import Security Manager
 try:
     from core.security_manager import SecurityManager
@@ -1206,8 +1258,8 @@ class ExtractionWorker(QThread):
             import json as _json
             from core.sega_extractor import SegaExtractor
 
-            sega = SegaExtractor(self.rom_path)
-            texts = sega.extract_texts(min_length=4)
+            with SegaExtractor(self.rom_path) as sega:
+                texts = sega.extract_texts(min_length=4)
             if not texts:
                 self.log_signal.emit("[WARN] SMS PRO: Nenhum texto confiável encontrado.")
                 self.progress_signal.emit(100)
@@ -1466,12 +1518,16 @@ class GeminiWorker(QThread):
                 batch_original = [item[2] for item in batch_jobs]
 
                 try:
-                    translations = gemini_api.translate_batch(
-                        batch_payload,
-                        "English",
-                        self.target_language,
-                        120.0,
-                        api_key=self.api_key,
+                    translations = _call_backend(
+                        "gemini",
+                        lambda _session: gemini_api.translate_batch(
+                            batch_payload,
+                            "English",
+                            self.target_language,
+                            120.0,
+                            api_key=self.api_key,
+                        ),
+                        tokens=_estimate_tokens(batch_payload),
                     )
                 except Exception as e:
                     self.log_signal.emit(
@@ -1602,6 +1658,13 @@ def _map_target_language_to_nllb(target_language: str) -> str:
     return "por_Latn"
 
 
+def _get_nllb_engine():
+    """Engine NLLB compartilhada (core/nllb_engine.py): modelo carregado uma vez."""
+    if get_nllb_engine is None:
+        raise RuntimeError("core.nllb_engine indisponível")
+    return get_nllb_engine(NLLB_MODEL_NAME)
+
+
 def _load_nllb_runtime():
     """Carrega tokenizer/modelo NLLB com cache de processo."""
     if (
@@ -1616,20 +1679,7 @@ def _load_nllb_runtime():
             _NLLB_RUNTIME_CACHE["device"],
         )
 
-    try:
-        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-        import torch
-    except ImportError as exc:
-        raise RuntimeError(
-            "Dependências do NLLB ausentes. Instale: pip install transformers torch sentencepiece"
-        ) from exc
-
-    tokenizer = AutoTokenizer.from_pretrained(NLLB_MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(NLLB_MODEL_NAME)
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model.to(device)
-    model.eval()
+    tokenizer, model, torch, device = _get_nllb_engine().load().runtime()
 
     _NLLB_RUNTIME_CACHE["tokenizer"] = tokenizer
     _NLLB_RUNTIME_CACHE["model"] = model
@@ -1645,31 +1695,10 @@ def _translate_batch_with_nllb(lines: list[str], target_language: str):
         return [], True, None
 
     try:
-        tokenizer, model, torch, device = _load_nllb_runtime()
-        target_lang_code = _map_target_language_to_nllb(target_language)
-
-        tokenizer.src_lang = "eng_Latn"
-        forced_bos_token_id = tokenizer.convert_tokens_to_ids(target_lang_code)
-
-        encoded = tokenizer(
-            lines,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512,
+        # Lotes por comprimento + padding dinâmico dentro da engine
+        translated = _get_nllb_engine().translate_many(
+            lines, tgt_lang=_map_target_language_to_nllb(target_language)
         )
-        encoded = {k: v.to(device) for k, v in encoded.items()}
-
-        with torch.inference_mode():
-            generated_tokens = model.generate(
-                **encoded,
-                forced_bos_token_id=forced_bos_token_id,
-                max_new_tokens=192,
-                num_beams=1,
-                do_sample=False,
-            )
-
-        translated = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
         if len(translated) != len(lines):
             raise RuntimeError(
                 f"NLLB retornou {len(translated)} linhas para {len(lines)} entradas"
@@ -1771,10 +1800,14 @@ class HybridWorker(QThread):
                 if not force_nllb:
                     stats["gemini_requests"] += 1
                     try:
-                        g_result, g_success, g_error = gemini_api.translate_batch(
-                            current_batch,
-                            self.api_key,
-                            self.target_language,
+                        g_result, g_success, g_error = _call_backend(
+                            "gemini",
+                            lambda _session: gemini_api.translate_batch(
+                                current_batch,
+                                self.api_key,
+                                self.target_language,
+                            ),
+                            tokens=_estimate_tokens(current_batch),
                         )
                     except Exception as exc:
                         g_result, g_success, g_error = None, False, _sanitize_error(exc)
@@ -1920,7 +1953,8 @@ class NLLBWorker(QThread):
                 self.error_signal.emit(_sanitize_error(exc))
                 return
 
-            batch_size = 32
+            # Lotes grandes: a engine reagrupa por comprimento internamente
+            batch_size = 256
             current_batch = []
 
             def _flush_nllb_batch(processed_count: int):
@@ -2173,6 +2207,7 @@ class TilemapWorker(QThread):
         self._custom_dict = self._load_custom_dictionary(
             self._worker_cfg.get("custom_dictionary")
         )
+        self._custom_dict_matcher = self._build_custom_dict_matcher()
         self._merge_custom_dict_into_short_map()
         self._configure_translation_service()
 
@@ -2275,12 +2310,35 @@ class TilemapWorker(QThread):
         except Exception:
             return raw
 
+    def _build_custom_dict_matcher(self):
+        """Autômato único do dicionário customizado (construído ao carregar)."""
+        if GlossaryMatcher is None or not isinstance(self._custom_dict, dict):
+            return None
+        entries = {}
+        for raw_src, raw_dst in self._custom_dict.items():
+            src = str(raw_src or "").strip()
+            dst = str(raw_dst or "").strip()
+            if src and dst:
+                entries[src] = dst
+        if not entries:
+            return None
+        # Termos só com letras/dígitos/espaço exigem fronteira de palavra.
+        return GlossaryMatcher(
+            entries,
+            word_boundaries=lambda src: bool(re.fullmatch(r"[A-Za-zÀ-ÿ0-9_ ]+", src)),
+            word_chars="A-Za-zÀ-ÿ0-9_",
+        )
+
     def _apply_custom_dictionary_replace(self, text: str) -> str:
         if not isinstance(text, str) or not text:
             return ""
         if not isinstance(self._custom_dict, dict) or not self._custom_dict:
             return self._normalize_nfc_text(text)
         out = self._normalize_nfc_text(text)
+        matcher = getattr(self, "_custom_dict_matcher", None)
+        if matcher is not None:
+            out, _ = matcher.replace(out)
+            return self._normalize_nfc_text(out)
         items = sorted(
             self._custom_dict.items(),
             key=lambda kv: len(str(kv[0])),
@@ -2944,8 +3002,12 @@ class TilemapWorker(QThread):
                 "Responda SOMENTE com a tradução final.\n"
                 f"TEXTO: {prompt_text}"
             )
-        translations, success, error_msg = gemini_api.translate_batch(
-            [prompt_text], self.api_key, self.target_language, 120.0
+        translations, success, error_msg = _call_backend(
+            "gemini",
+            lambda _session: gemini_api.translate_batch(
+                [prompt_text], self.api_key, self.target_language, 120.0
+            ),
+            tokens=_estimate_tokens([prompt_text]),
         )
         if not success or not translations:
             if error_msg:
@@ -4744,11 +4806,15 @@ Do NOT add explanations. Only return the translated lines with numbers.
                         "max_tokens": 2000,
                     }
 
-                    response = requests.post(
-                        "https://api.openai.com/v1/chat/completions",
-                        headers=headers,
-                        json=payload,
-                        timeout=60,
+                    response = _call_backend(
+                        "chatgpt",
+                        lambda session: (session or requests).post(
+                            "https://api.openai.com/v1/chat/completions",
+                            headers=headers,
+                            json=payload,
+                            timeout=60,
+                        ),
+                        tokens=_estimate_tokens([prompt]) + payload["max_tokens"],
                     )
 
                     if response.status_code == 200:
@@ -34,6 +34,19 @@ from ..export.proof_generator import ProofGenerator
 from ..export.report_generator import ReportGenerator
 from .policy_enforcer import PolicyEnforcer
 
+try:
+    from ..utils.analysis_cache import AnalysisCache, register_cache_type
+    from ..utils.rom_io import compute_sha256
+except Exception:
+    AnalysisCache = None
+    compute_sha256 = None
+else:
+    register_cache_type(StaticTextItem)
+
+# Bump when static extraction changes, to invalidate cached static items
+# (2: JSON cache format)
+STATIC_EXTRACTION_VERSION = "2"
+
 
 @dataclass
 class ExtractionConfig:
@@ -48,6 +61,8 @@ class ExtractionConfig:
     validate_reinsertion: bool = True
     enforce_policies: bool = True
     deterministic_seed: Optional[int] = None  # CRC32 if None
+    use_analysis_cache: bool = True  # Reuse cached static extraction per ROM
+    analysis_cache_dir: Optional[Path] = None  # Default: ~/.cache/neurorom/analysis
 
 
 @dataclass
@@ -129,8 +144,8 @@ class PluginOrchestrator:
         should_use_runtime = self._should_use_runtime(plugin)
         extraction_mode = "hybrid" if should_use_runtime else "static"
 
-        # Phase 1: Static extraction
-        static_items = self._extract_static(rom_data, plugin)
+        # Phase 1: Static extraction (cached per ROM SHA-256)
+        static_items = self._extract_static_cached(rom_data, plugin)
 
         # Phase 2: Runtime extraction (if enabled)
         runtime_items: List[RuntimeTextItem] = []
@@ -186,6 +201,38 @@ class PluginOrchestrator:
 
         return False
 
+    def _extract_static_cached(self, rom_data: bytes,
+                               plugin: BaseConsolePlugin) -> List[StaticTextItem]:
+        """
+        Phase 1 through the persistent analysis cache.
+
+        Cached entries are keyed by ROM SHA-256, plugin and extraction
+        version; runs that logged errors are not cached.
+        """
+        if not self.config.use_analysis_cache or AnalysisCache is None:
+            return self._extract_static(rom_data, plugin)
+
+        cache = AnalysisCache(self.config.analysis_cache_dir)
+        rom_sha = compute_sha256(rom_data)
+        params = {
+            "plugin": type(plugin).__name__,
+            "console": plugin.console_spec.console_type.value,
+        }
+        cached = cache.get(rom_sha, "plugin_static", STATIC_EXTRACTION_VERSION, params)
+        if isinstance(cached, dict):
+            self.warnings.extend(cached.get("warnings", []))
+            return cached["items"]
+
+        errors_before = len(self.errors)
+        warnings_before = len(self.warnings)
+        items = self._extract_static(rom_data, plugin)
+        if len(self.errors) == errors_before:
+            cache.put(rom_sha, "plugin_static", STATIC_EXTRACTION_VERSION, {
+                "items": items,
+                "warnings": self.warnings[warnings_before:],
+            }, params)
+        return items
+
     def _extract_static(self, rom_data: bytes,
                         plugin: BaseConsolePlugin) -> List[StaticTextItem]:
         """
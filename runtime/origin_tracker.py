@@ -199,15 +199,15 @@ class OriginTracker:
             return None
 
         # Check if any pointer points to this offset
-        for target, pointer_off in self._pointer_cache.items():
-            if target == offset:
-                return StaticOrigin(
-                    rom_offset=offset,
-                    pointer_offset=pointer_off,
-                    method="pointer",
-                    confidence=0.85,
-                    match_type="pointer_target",
-                )
+        pointer_off = self._pointer_cache.get(offset)
+        if pointer_off is not None:
+            return StaticOrigin(
+                rom_offset=offset,
+                pointer_offset=pointer_off,
+                method="pointer",
+                confidence=0.85,
+                match_type="pointer_target",
+            )
 
         return StaticOrigin(
             rom_offset=offset,
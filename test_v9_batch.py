@@ -34,10 +34,9 @@ def test_rom(rom_path, output_dir):
 
     try:
         # Cria extrator
-        extrator = UltimateExtractorV9(str(rom_path))
-
-        # Executa extração
-        resultado = extrator.extract_with_protection()
+        with UltimateExtractorV9(str(rom_path)) as extrator:
+            # Executa extração
+            resultado = extrator.extract_with_protection()
 
         tempo_decorrido = time.time() - inicio
 
@@ -1,6 +1,7 @@
 from pathlib import Path
 import sys
 import os
+import tempfile
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -9,3 +10,9 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Mantém suíte determinística para testes que validam delta incremental.
 os.environ.setdefault("NEUROROM_ENABLE_DELTA", "1")
+
+# Cache de análise fora do ~/.cache do usuário durante a suíte.
+os.environ.setdefault("NEUROROM_ANALYSIS_CACHE_DIR", tempfile.mkdtemp(prefix="neurorom-analysis-"))
+
+# Memória de tradução compartilhada também fora do ~/.cache.
+os.environ.setdefault("NEUROROM_TM_DB", os.path.join(tempfile.mkdtemp(prefix="neurorom-tm-"), "tm.sqlite3"))
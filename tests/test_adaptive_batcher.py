@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.adaptive_batcher import AdaptiveBatcher, estimate_text_tokens, token_budget_for
+from core.batch_queue_manager import BatchQueueManager
+
+
+def test_orcamento_por_modelo_e_estimativa():
+    assert token_budget_for("gemini-2.0-flash") > token_budget_for("llama3.2:latest")
+    assert estimate_text_tokens("abcdefgh") == 2
+    assert estimate_text_tokens("ドラゴン") == 4
+
+
+def test_empacota_por_tokens_e_tamanho():
+    batcher = AdaptiveBatcher(token_budget=40, initial_size=5)
+    items = ["x" * 40] * 3 + ["y" * 400] + ["z"] * 12
+    batches = batcher.create_batches(items)
+
+    assert [len(b) for b in batches] == [2, 1, 1, 5, 5, 2]
+    assert batches[2] == ["y" * 400]  # Acima do orçamento: lote próprio
+    assert sum(batches, []) == items
+
+
+def test_converge_abaixo_do_limite_de_parse():
+    # Latência com overhead fixo por requisição; acima de 60 itens o modelo
+    # perde a numeração da resposta.
+    batcher = AdaptiveBatcher(token_budget=10**6, initial_size=4, max_size=500)
+    sizes = []
+    for _ in range(300):
+        n = batcher.size
+        ok = n <= 60
+        batcher.record(n, 2.0 + 0.02 * n, ok=ok)
+        sizes.append(n)
+
+    tail = sizes[-50:]
+    assert max(tail) <= 60 + 10  # Só sondas esporádicas acima do limite
+    assert sum(tail) / len(tail) > 30
+    assert batcher.stats()["failures"] >= 1
+
+
+def test_reduz_quando_crescer_piora_vazao():
+    batcher = AdaptiveBatcher(token_budget=10**6, initial_size=10, max_size=200, probe_batches=1)
+    # Vazão cai acima de 20 itens (ex.: fila interna do servidor)
+    sizes = []
+    for _ in range(200):
+        n = batcher.size
+        batcher.record(n, n / 10.0 if n <= 20 else n / 5.0, ok=True)
+        sizes.append(n)
+    tail = sizes[-100:]
+    assert max(tail) <= 30
+    assert sum(1 for n in tail if n <= 20) >= 85  # Sonda acima do teto só de vez em quando
+
+
+def test_fila_usa_batcher_adaptativo(tmp_path):
+    batcher = AdaptiveBatcher(token_budget=10**6, initial_size=7)
+    manager = BatchQueueManager(progress_file=str(tmp_path / "queue.json"), batcher=batcher)
+    ids = manager.add_batches_auto([f"text {i}" for i in range(20)], batch_size=None)
+
+    sizes = [len(manager.all_batches[i].texts) for i in ids]
+    assert sizes == [7, 7, 6]
+    assert manager.all_batches[ids[-1]].metadata["text_range"] == "14-20"
@@ -0,0 +1,142 @@
+import argparse
+import os
+import pickle
+import random
+import struct
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import core.universal_pipeline as pipeline_module
+from core.compression_detector import detect_regions
+from tools.analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+from utils.analysis_cache import AnalysisCache, CACHE_DIR_ENV, CACHE_ENABLED_ENV, CACHE_MAGIC
+from utils.rom_io import compute_sha256
+
+ROM_SHA = compute_sha256(b"rom de teste")
+
+
+def test_put_get_e_get_or_compute(tmp_path):
+    cache = AnalysisCache(tmp_path, enabled=True)
+    artifact = {"regions": [(0x100, 0x40)], "charset": {0x41: "A"}}
+
+    assert cache.get(ROM_SHA, "scan", "1") is None
+    cache.put(ROM_SHA, "scan", "1", artifact, {"min_length": 4})
+    assert cache.get(ROM_SHA, "scan", "1", {"min_length": 4}) == artifact
+    assert cache.get(ROM_SHA, "scan", "1", {"min_length": 5}) is None
+
+    calls = []
+    compute = lambda: calls.append(1) or [1, 2, 3]
+    assert cache.get_or_compute(ROM_SHA, "ptr", "1", compute) == [1, 2, 3]
+    assert cache.get_or_compute(ROM_SHA, "ptr", "1", compute) == [1, 2, 3]
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 2
+
+
+def test_versao_nova_ou_arquivo_corrompido_invalidam(tmp_path):
+    cache = AnalysisCache(tmp_path, enabled=True)
+    path = cache.put(ROM_SHA, "scan", "1", [1])
+
+    assert cache.get(ROM_SHA, "scan", "2") is None
+    assert not path.exists()
+
+    path = cache.put(ROM_SHA, "scan", "2", [2])
+    raw = bytearray(path.read_bytes())
+    raw[-1] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    assert cache.get(ROM_SHA, "scan", "2") is None
+
+    cache.put(ROM_SHA, "scan", "2", [2])
+    cache.put(ROM_SHA, "other", "2", [3])
+    assert cache.invalidate(ROM_SHA, "scan") == 1
+    assert cache.invalidate(ROM_SHA) == 1
+
+
+def test_cache_desativado_por_ambiente(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_ENABLED_ENV, "0")
+    cache = AnalysisCache(tmp_path)
+    assert cache.put(ROM_SHA, "scan", "1", [1]) is None
+    assert cache.get_or_compute(ROM_SHA, "scan", "1", lambda: [7]) == [7]
+    assert not any(tmp_path.iterdir())
+
+
+def test_pipeline_pula_analise_estatica_no_segundo_run(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    rom = bytes(rng.choice(b"HERO SWORD the castle \x00\xff") for _ in range(16384))
+    rom_path = tmp_path / "game.sms"
+    rom_path.write_bytes(rom)
+    cache = AnalysisCache(tmp_path / "cache", enabled=True)
+
+    first = pipeline_module.UniversalExtractionPipeline(str(rom_path), str(tmp_path / "out1"), cache=cache)
+    expected = first.run_full_analysis()
+    assert not first.cache_hit
+
+    second = pipeline_module.UniversalExtractionPipeline(str(rom_path), str(tmp_path / "out2"), cache=cache)
+    monkeypatch.setattr(second, "_run_static_analysis", lambda: (_ for _ in ()).throw(AssertionError))
+    got = second.run_full_analysis()
+    assert second.cache_hit
+
+    for data in (expected, got):
+        data["metadata"].pop("extraction_date")
+    assert got == expected
+
+
+class _Boom:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('pickle executado')",))
+
+
+def test_formato_json_nao_executa_pickle_antigo(tmp_path):
+    cache = AnalysisCache(tmp_path, enabled=True)
+    artifact = {"raw": b"\x00\xffABC", "pair": (1, "a"), "ids": {3}, "__tuple__": "chave marcadora"}
+    path = cache.put(ROM_SHA, "scan", "1", artifact)
+    assert cache.get(ROM_SHA, "scan", "1") == artifact
+    assert b"pickle" not in zlib.decompress(path.read_bytes()[10:])
+
+    # Arquivo no formato antigo (pickle): descartado sem desserializar
+    body = zlib.compress(pickle.dumps({"analyzer_version": "1", "params_key": "", "value": _Boom()}))
+    path.write_bytes(struct.pack(">4sHI", CACHE_MAGIC, 1, zlib.crc32(body)) + body)
+    assert cache.get(ROM_SHA, "scan", "1") is None
+    assert not path.exists()
+
+    # Objeto de classe não registrada: não grava
+    assert cache.put(ROM_SHA, "scan", "1", _Boom()) is None
+
+
+def test_deteccao_de_compressao_da_reinsercao_usa_cache(tmp_path, monkeypatch):
+    rng = random.Random(9)
+    rom = bytes(rng.randrange(256) for _ in range(8192)) + bytes(8192)
+    cache = AnalysisCache(tmp_path, enabled=True)
+
+    first = detect_regions(rom, block_size=2048, cache=cache)
+    monkeypatch.setattr("core.compression_detector.CompressionDetector.detect",
+                        lambda *a, **kw: (_ for _ in ()).throw(AssertionError))
+    assert detect_regions(rom, block_size=2048, cache=cache) == first
+    assert cache.stats["hits"] == 1
+
+
+def test_compression_detector_nao_importa_pacote_utils():
+    code = "import sys, core.compression_detector; print('utils' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=str(PROJECT_ROOT),
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_opcoes_de_cache_dos_lotes_vao_para_o_ambiente(tmp_path, monkeypatch):
+    monkeypatch.delenv(CACHE_DIR_ENV, raising=False)
+    monkeypatch.delenv(CACHE_ENABLED_ENV, raising=False)
+    parser = argparse.ArgumentParser()
+    add_analysis_cache_arguments(parser)
+
+    apply_analysis_cache_arguments(parser.parse_args([]))
+    assert CACHE_DIR_ENV not in os.environ and CACHE_ENABLED_ENV not in os.environ
+
+    apply_analysis_cache_arguments(parser.parse_args(["--analysis-cache-dir", str(tmp_path), "--no-analysis-cache"]))
+    assert os.environ[CACHE_DIR_ENV] == str(tmp_path.resolve())
+    assert os.environ[CACHE_ENABLED_ENV] == "0"
+    assert AnalysisCache().enabled is False
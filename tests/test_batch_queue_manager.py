@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.batch_queue_manager import BatchQueueManager, Priority, TranslationBatch, WorkStealingQueue
+
+
+def _batch(batch_id, priority):
+    return TranslationBatch(priority=priority, batch_id=batch_id, texts=[str(batch_id)])
+
+
+def test_envelhecimento_evita_fome_de_baixa_prioridade():
+    now = [0.0]
+    queue = WorkStealingQueue(shards=1, aging_seconds=60, clock=lambda: now[0])
+    queue.put(_batch(0, Priority.LOW))
+    queue.put(_batch(1, Priority.CRITICAL))
+    assert queue.take().batch_id == 1
+
+    now[0] = 200.0  # LOW esperou mais de 3 níveis
+    queue.put(_batch(2, Priority.CRITICAL))
+    assert [queue.take().batch_id, queue.take().batch_id] == [0, 2]
+    assert queue.take() is None
+
+
+def test_worker_rouba_de_outro_heap():
+    queue = WorkStealingQueue(shards=2, aging_seconds=0)
+    for i in range(4):
+        queue.put(_batch(i, Priority.NORMAL), shard=0)
+    queue.put(_batch(9, Priority.CRITICAL), shard=0)
+    queue.put(_batch(5, Priority.LOW), shard=1)
+
+    # Topo alheio melhor por um nível ou mais: rouba antes do próprio
+    assert queue.take(shard=1).batch_id == 9
+    assert queue.take(shard=1).batch_id == 0
+    assert queue.steals == 2 and queue.qsize() == 4
+    assert queue.depth_by_priority() == {"CRITICAL": 0, "HIGH": 0, "NORMAL": 3, "LOW": 1}
+    # Mesmo nível: cada um fica com o próprio heap
+    queue.put(_batch(6, Priority.NORMAL), shard=1)
+    assert queue.take(shard=1).batch_id == 6
+    assert queue.take(shard=0, lowest=True).batch_id == 5
+    assert queue.steals == 3
+
+
+def test_workers_concorrentes_com_pausa_e_metricas(tmp_path):
+    manager = BatchQueueManager(progress_file=str(tmp_path / "q.json"), num_workers=4)
+    for i in range(24):
+        manager.add_batch([f"t{i}"], priority=Priority.LOW if i % 2 else Priority.HIGH)
+
+    active, peak = [0], [0]
+    guard = threading.Lock()
+
+    def translate(texts):
+        with guard:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with guard:
+            active[0] -= 1
+        return [t.upper() for t in texts], True, None
+
+    manager.start_processing(translate)
+    time.sleep(0.05)
+    manager.pause()
+    time.sleep(0.05)
+    frozen = manager.batches_processed
+    time.sleep(0.1)
+    assert manager.batches_processed == frozen < 24
+    manager.resume()
+    for t in manager.worker_threads:
+        t.join(timeout=10)
+
+    assert manager.batches_processed == 24 and manager.batches_pending == 0
+    assert peak[0] > 1
+    metrics = manager.get_metrics()
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+    assert metrics["batches_per_sec"] > 0
+    assert manager.get_all_translations()[:2] == ["T0", "T1"]
+
+
+def test_replay_do_journal_apos_crash(tmp_path):
+    progress = tmp_path / "q.json"
+    first = BatchQueueManager(progress_file=str(progress), num_workers=1)
+    for i in range(5):
+        first.add_batch([f"t{i}"], priority=Priority.NORMAL)
+    for _ in range(2):
+        batch, _ = first._next_batch(0, 0)
+        first._start_batch(batch)
+        first._finish_batch(batch, [f"ok {batch.batch_id}"], True, None)
+    batch, _ = first._next_batch(0, 0)
+    first._start_batch(batch)  # "Crash" com este batch em andamento, sem snapshot
+    assert not progress.exists()
+    with open(first.journal_file, "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "op": "do')  # Linha cortada no meio
+
+    second = BatchQueueManager(progress_file=str(progress), num_workers=2)
+    assert second.batches_processed == 2 and second.batches_pending == 3
+    assert [second.all_batches[i].status for i in range(5)] == \
+        ["completed", "completed", "pending", "pending", "pending"]
+    assert second.add_batch(["novo"]) == 5
+
+    second._save_progress()
+    assert second.journal_file.read_text(encoding="utf-8") == ""
+    third = BatchQueueManager(progress_file=str(progress))
+    assert third.all_batches[1].translations == ["ok 1"] and third.batches_pending == 4
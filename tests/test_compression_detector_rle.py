@@ -0,0 +1,87 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "core"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import compression_detector as detector_module
+from compression_detector import CompressionDetector, _RegionOverlapIndex
+
+
+def _reference_rle(rom: bytes, existing):
+    """Laço original (varredura por offset + overlap linear)."""
+    regions = list(existing)
+    found = []
+    offset = 0
+    while offset < len(rom) - 16:
+        if rom[offset] == 0 or rom[offset] > 128:
+            offset += 1
+            continue
+        runs = 0
+        scan = offset
+        while scan < len(rom) - 2 and runs < 10:
+            if rom[scan] == 0 or rom[scan] > 128:
+                break
+            runs += 1
+            scan += 2
+        if runs >= 3:
+            size = runs * 2
+            if not any(offset < o + s and offset + size > o for o, s in regions):
+                regions.append((offset, size))
+                found.append((offset, size, runs))
+            offset += size
+        else:
+            offset += 1
+    return found
+
+
+def _rom(size: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.choice([0x00, 0x00, 0x05, 0x80, 0x81, 0xFF, rng.randrange(256)]) for _ in range(size))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False], ids=["numpy", "python"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_detect_rle_equivale_ao_laco_original(monkeypatch, use_numpy, seed):
+    if not use_numpy:
+        monkeypatch.setattr(detector_module, "np", None)
+    rom = _rom(6000, seed)
+    detector = CompressionDetector(rom)
+    existing = [(100, 300), (2000, 0), (4000, 50)]
+    for off, size in existing:
+        detector.compressed_regions.append(detector_module.CompressedRegion(off, size, "X", 0.9))
+
+    detector._detect_rle()
+
+    got = [
+        (r.offset, r.size, r.properties["run_count"])
+        for r in detector.compressed_regions
+        if r.algorithm == "RLE"
+    ]
+    assert got == _reference_rle(rom, existing)
+
+
+def test_indice_de_overlap_reproduz_teste_linear():
+    rng = random.Random(8)
+    index = _RegionOverlapIndex()
+    regions = []
+    for _ in range(200):
+        off, size = rng.randrange(0, 5000), rng.choice([0, rng.randrange(1, 80)])
+        index.add(off, size)
+        regions.append((off, size))
+    for _ in range(2000):
+        off, size = rng.randrange(0, 5100), rng.choice([0, rng.randrange(1, 120)])
+        expected = any(off < o + s and off + size > o for o, s in regions)
+        assert index.overlaps(off, size) == expected
+
+
+def test_detect_registra_tempo_por_fase(capsys):
+    detector = CompressionDetector(_rom(20000, 4))
+    detector.detect(block_size=1024)
+    assert set(detector.stage_timings) == {"signatures", "entropy", "patterns"}
+    assert all(t >= 0 for t in detector.stage_timings.values())
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.TRANSLATION_PREP_LAYER import DedupFanout
+from core.translation_optimizer import TranslationOptimizer
+
+
+def _fake_translate(batch):
+    return [t.replace("Hello", "Ola").replace("world", "mundo").replace("Got", "Pegou")
+            .replace("gold", "ouro").replace("YES", "SIM") for t in batch]
+
+
+def test_envia_uma_vez_e_restaura_codigos_por_ocorrencia():
+    dedup = DedupFanout()
+    rows = [
+        ("YES", "ROM_A"), ("YES", "ROM_B"), ("YES", "ROM_B"),
+        ("Hello[NEWLINE]world[END]", "ROM_A"),
+        ("Hello[NEWLINE]world[WAIT]", "ROM_B"),
+        ("Got [0A] gold", "ROM_A"),
+        ("Got [0B] gold", "ROM_B"),
+        ("[0B]Got gold", "ROM_B"),  # Slot em outra posição: grupo próprio
+    ]
+    for text, rom in rows:
+        dedup.add(text, source=rom)
+
+    sent = []
+    results = dedup.run(lambda batch: sent.extend(batch) or _fake_translate(batch), batch_size=1)
+
+    assert len(sent) == 4
+    assert results == [
+        "SIM", "SIM", "SIM",
+        "Ola[NEWLINE]mundo[END]",
+        "Ola[NEWLINE]mundo[WAIT]",
+        "Pegou [0A] ouro",
+        "Pegou [0B] ouro",
+        "[0B]Pegou ouro",
+    ]
+    stats = dedup.stats(batch_size=1)
+    assert stats["calls_saved"] == 4 and dedup.calls_made == 4
+    assert stats["cross_source_duplicates"] == 4
+    assert stats["fanout_errors"] == 0
+
+
+def test_espacos_das_bordas_e_quebras_de_linha_por_ocorrencia():
+    dedup = DedupFanout()
+    texts = ["  YES  ", "YES", "YES\n", "Hello\nworld", "Hello world"]
+    dedup.add_many(texts)
+
+    # Bordas não separam grupos; quebra de linha interna sim
+    assert len(dedup.unique_texts()) == 3
+    assert dedup.run(_fake_translate) == ["  SIM  ", "SIM", "SIM\n", "Ola\nmundo", "Ola mundo"]
+
+
+def test_traducao_crua_com_tokens_reordenados():
+    dedup = DedupFanout(send_protected=False)
+    dedup.add_many(["Got [0A] and [0B]", "Got [0C] and [0D]"])
+    assert dedup.unique_texts() == ["Got [0A] and [0B]"]
+    assert dedup.fan_out(["[0B] e [0A] pegou"]) == ["[0B] e [0A] pegou", "[0D] e [0C] pegou"]
+    assert dedup.fan_out([None]) == ["Got [0A] and [0B]", "Got [0C] and [0D]"]
+
+
+def test_optimizer_nao_copia_codigos_do_representante(tmp_path):
+    optimizer = TranslationOptimizer(cache_file=str(tmp_path / "cache.json"))
+    lines = ["Open the door[0A]", "Open the door[0B]", "Open the door[0A]"]
+    unique, mapping = optimizer.optimize_text_list(lines, use_cache=False)
+
+    assert unique == ["Open the door[0A]"]
+    assert optimizer.stats["deduplicated"] == 2
+    result = optimizer.reconstruct_translations(["Abra a porta[0A]"], lines, mapping)
+    assert result == ["Abra a porta[0A]", "Abra a porta[0B]", "Abra a porta[0A]"]
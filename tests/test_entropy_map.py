@@ -0,0 +1,134 @@
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import universal_kit.entropy_map as entropy_map_module
+from universal_kit.entropy_map import EntropyMap
+
+
+def _counter_entropy(data: bytes) -> float:
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum((c / total) * math.log2(c / total) for c in Counter(data).values())
+
+
+def _sample_rom(size: int = 12000, seed: int = 4) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.choice([0x00, 0x00, 0x41, rng.randrange(256)]) for _ in range(size))
+
+
+CASES = [
+    # block_size, stride, start, end, min_length
+    (256, None, 0, None, None),
+    (100, 50, 300, 11999, None),
+    (1024, None, 0, None, 512),
+    (100, 33, 5, None, None),
+    (64, 200, 0, None, None),
+]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False], ids=["numpy", "python"])
+@pytest.mark.parametrize("case", CASES)
+def test_janelas_equivalem_ao_counter(monkeypatch, use_numpy, case):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(entropy_map_module, "np", None)
+    rom = _sample_rom()
+    block_size, stride, start, end, min_length = case
+
+    got = EntropyMap(rom).windows(block_size, stride, start, end, min_length)
+
+    step = stride or block_size
+    stop = len(rom) if end is None else end
+    need = block_size if min_length is None else min_length
+    expected = [
+        (off, _counter_entropy(rom[off:min(off + block_size, stop)]))
+        for off in range(start, stop, step)
+        if min(off + block_size, stop) - off >= need
+    ]
+    assert [off for off, _ in got] == [off for off, _ in expected]
+    for (_, a), (_, b) in zip(got, expected):
+        assert a == pytest.approx(b, abs=1e-9)
+
+
+def test_mapas_compartilhados_por_identidade_sem_reter_bytes(tmp_path):
+    EntropyMap.clear_shared()
+    rom = _sample_rom(4096, seed=9)
+    rom_path = tmp_path / "game.bin"
+    rom_path.write_bytes(rom)
+
+    first = EntropyMap.for_rom(rom, path=str(rom_path))
+    first.windows(256)
+    first.windows(256)
+    assert first.stats["window_scans"] == 1 and first.stats["cache_hits"] == 1
+    assert first.data is rom
+
+    second = EntropyMap.for_rom(bytearray(rom), path=str(rom_path))
+    second.windows(256)
+    assert second.stats["window_scans"] == 0 and second.stats["cache_hits"] == 1
+
+    # Cache compartilhado guarda só (tamanho, mapas, mapa base), nunca a ROM
+    for size, maps, base_maps in EntropyMap._shared.values():
+        assert size == len(rom)
+        assert all(isinstance(v, list) for v in maps.values())
+        assert all(not isinstance(v, (bytes, bytearray)) for v in base_maps.values())
+
+    # Sem identidade: memoização só na instância
+    private = EntropyMap.for_rom(rom)
+    private.windows(256)
+    assert private.stats == {"window_scans": 1, "cache_hits": 0, "base_scans": 0}
+
+
+def test_tamanhos_de_bloco_derivados_do_mapa_base():
+    pytest.importorskip("numpy")
+    EntropyMap.clear_shared()
+    rom = _sample_rom(20000, seed=11)
+    shared = EntropyMap.for_rom(rom, key="sha-da-rom")
+
+    for block_size, stride, start in [(256, None, 0), (4096, None, 0), (1024, 512, 512), (100, 50, 0)]:
+        got = shared.windows(block_size, stride, start=start)
+        expected = EntropyMap(rom).windows(block_size, stride, start=start)
+        assert [off for off, _ in got] == [off for off, _ in expected]
+        for (_, a), (_, b) in zip(got, expected):
+            assert a == pytest.approx(b, abs=1e-9)
+
+    # Um único mapa base serve 256, 4096 e 1024/512; 100/50 não alinha
+    assert shared.stats["base_scans"] == 1
+    other = EntropyMap.for_rom(rom, key="sha-da-rom")
+    other.windows(2048)
+    assert other.stats["base_scans"] == 0
+
+
+def test_region_e_find_regions():
+    rom = bytes(512) + bytes(range(256)) * 2 + bytes(512)
+    emap = EntropyMap(rom)
+
+    assert emap.region(0, 512) == 0.0
+    assert emap.region(512, 1024) == pytest.approx(8.0)
+    assert emap.find_regions(128, 7.0, 8.0) == [(512, 1024)]
+
+
+def test_detector_e_hunter_compartilham_mapa_pela_chave_da_execucao():
+    pytest.importorskip("numpy")
+    from core.compression_detector import CompressionDetector
+    from universal_kit.compression_hunter import CompressionHunter
+
+    EntropyMap.clear_shared()
+    rom = _sample_rom(16384, seed=3)
+    CompressionDetector(rom, rom_key="run-sha")._calculate_entropy_map(4096)
+    hunter = CompressionHunter(rom, rom_key="run-sha")
+    hunter._scan_entropy(0, len(rom))
+
+    assert list(EntropyMap._shared) == ["run-sha"]
+    # O hunter (blocos de 256) deriva do mapa base criado pelo detector
+    assert hunter._entropy_map.stats["base_scans"] == 0
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.free_space_allocator import FreeSpaceAllocator, FreeSpaceIndex
+from core.sms_relocation_v1 import FreeSpaceAllocator as SMSFreeSpaceAllocator, RelocationConfig
+
+
+def _rom():
+    rom = bytearray(b"\x11" * 0x100)
+    rom[0x10:0x30] = b"\xFF" * 0x20  # 32 livres
+    rom[0x40:0x48] = b"\xFF" * 0x08  # 8 livres
+    rom[0x80:0x90] = b"\xFF" * 0x10  # 16 livres (atravessa o banco 0x88)
+    return rom
+
+
+def test_estrategias_alinhamento_e_banco():
+    index = FreeSpaceIndex.scan(_rom(), bank_size=0x88)
+    assert index.blocks() == [(0x10, 0x30), (0x40, 0x48), (0x80, 0x90)]
+    assert index.find(6) == 0x40  # best-fit: menor buraco que serve
+    assert index.find(6, strategy="first") == 0x10
+    assert index.find(6, strategy="last") == 0x80
+    assert index.find(12, alignment=0x20) == 0x80
+    assert index.find(12, alignment=0x20, strategy="first") == 0x20
+    assert index.find(8, bank=1) == 0x88
+    assert index.find(10, cross_banks=False) == 0x10
+    assert index.find(0x21) is None
+    stats = index.stats()
+    assert stats["free_bytes"] == 56 and stats["largest_block"] == 32
+    assert stats["fragmentation"] == round(1 - 32 / 56, 4)
+
+
+def test_alocar_liberar_e_coalescer():
+    index = FreeSpaceIndex([(0, 0x40)])
+    a = index.allocate(0x10, strategy="first")
+    b = index.allocate(0x10, strategy="first")
+    assert (a, b) == (0, 0x10) and index.blocks() == [(0x20, 0x40)]
+    index.free(a, 0x10)
+    assert index.find(0x10) == 0  # buraco reaproveitado (best-fit)
+    index.free(b, 0x10)
+    assert index.blocks() == [(0, 0x40)] and len(index) == 1
+    assert index.reserve(0x08, 0x50) == 0x38 and index.blocks() == [(0, 0x08)]
+
+
+def test_alocadores_usam_o_indice():
+    rom = _rom()
+    alloc = FreeSpaceAllocator(rom, "SMS", user_regions=[{"start": 0, "end": 0x100}])
+    first = alloc.allocate(6, alignment=1, item_uid="a")
+    assert first == 0x40
+    assert alloc.free(first, 6, item_uid="a")
+    assert alloc.allocate(6, alignment=1, item_uid="c") == 0x40
+    assert alloc.get_stats()["fragmentation"]["free_blocks"] >= 2
+
+    config = RelocationConfig(free_space_regions=[(0, 0x100)], fill_bytes=(0xFF,))
+    sms = SMSFreeSpaceAllocator(bytearray(rom), config)
+    r1, r2 = sms.allocate(0x18), sms.allocate(0x0C)
+    assert (r1.offset, r2.offset) == (0x10, 0x80)  # first-fit: 0x28..0x30 sobra 8
+    assert sms.free(0x10) and sms.allocate(0x20).offset == 0x10
+    assert sms.allocate(4, bank=1, bank_size=0x88).offset == 0x8C
@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import core.fuzzy_translation_memory as fuzzy_module
+from core.fuzzy_translation_memory import FuzzyTranslationMemory, mask_slots, resubstitute
+from core.qa_gate_runtime import _lookup_translation_memory
+from core.translation_memory import TranslationMemory
+
+PAIRS = [
+    ("You got 5 Gold", "Você ganhou 5 de Ouro"),
+    ("<0A>Welcome to the castle!", "<0A>Bem-vindo ao castelo!"),
+    ("The king is waiting for you in the throne room.", "O rei espera por você na sala do trono."),
+    ("HP %d/%d", "PV %d/%d"),
+]
+
+
+def test_mascara_e_resubstituicao():
+    template, slots = mask_slots("You got 5 Gold and 2 <TILE:3F>")
+    assert slots == [("N", "5"), ("N", "2"), ("P", "<TILE:3F>")]
+    assert template == mask_slots("you got 99 gold AND 7 <TILE:40>")[0]
+
+    _, new_slots = mask_slots("You got 12 Gold and 3 <TILE:40>")
+    assert resubstitute("Ganhou 5 de Ouro e 2 <TILE:3F>", slots, new_slots) == "Ganhou 12 de Ouro e 3 <TILE:40>"
+    # Número alterado que não aparece na tradução: não dá para adaptar
+    assert resubstitute("Ganhou cinco de Ouro e 2 <TILE:3F>", slots, new_slots) is None
+
+
+@pytest.mark.parametrize("use_numpy", [True, False], ids=["numpy", "python"])
+def test_lookup_quase_duplicatas(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(fuzzy_module, "np", None)
+    index = FuzzyTranslationMemory()
+    assert index.add_many(PAIRS) == len(PAIRS)
+
+    got = index.lookup_batch([
+        "You got 12 Gold",
+        "<0B>Welcome to the castle!",
+        "The king is waiting for you in the throne room!",
+        "The queen left the castle",
+    ])
+    assert got[0].translation == "Você ganhou 12 de Ouro" and got[0].score == 1.0
+    assert got[0].auto_apply
+    assert got[1].translation == "<0B>Bem-vindo ao castelo!" and got[1].auto_apply
+    assert got[2].translation == "O rei espera por você na sala do trono." and got[2].score >= 0.85
+    # Texto fora dos slots mudou: apenas sugestão
+    assert not got[2].auto_apply
+    assert got[3] is None
+
+
+def test_indice_a_partir_da_memoria_sqlite(tmp_path):
+    tm = TranslationMemory(tmp_path / "tm.sqlite3")
+    tm.put_many(PAIRS, model="llama")
+    index = FuzzyTranslationMemory.from_translation_memory(tm, model="llama")
+    assert len(index) == len(PAIRS)
+    assert index.lookup("You got 250 Gold").translation == "Você ganhou 250 de Ouro"
+
+
+def test_qa_gate_usa_indice_aproximado():
+    index = FuzzyTranslationMemory()
+    index.add_many(PAIRS)
+    assert _lookup_translation_memory("You got 30 Gold", {}, [], index) == "Você ganhou 30 de Ouro"
+    assert _lookup_translation_memory("You got 30 Gold", {}, []) == ""
+
+
+def test_negacao_nao_e_aplicada_automaticamente():
+    index = FuzzyTranslationMemory()
+    index.add_many([
+        ("Give him the sword of the eastern gate", "Dê a ele a espada do portão leste"),
+    ])
+    for source in ("Do not give him the sword of the eastern gate",
+                   "Give him the sword of the western gate"):
+        match = index.lookup(source, threshold=0.5)
+        assert match is None or not match.auto_apply
+        assert _lookup_translation_memory(source, {}, [], index) == ""
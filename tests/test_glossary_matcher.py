@@ -0,0 +1,52 @@
+import re
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.compact_glossary import _WORD_CLASS, _preserve_case, _replace_glossary_entries
+from core.glossary_manager import GlossaryManager
+from core.glossary_matcher import GlossaryMatcher
+from core.semantic_quality_gate import SemanticQualityGate
+
+
+def test_mais_longo_vence_e_recua_na_fronteira():
+    matcher = GlossaryMatcher(
+        {"Fire": "Fogo", "Fire Sword": "Espada de Fogo", "fir": "abeto", "a-b": "x"},
+        word_boundaries=True,
+    )
+    out, n = matcher.replace("FIRE SWORD, Fire Swordfish, firs a-b")
+    assert out == "Espada de Fogo, Fogo Swordfish, firs x"
+    assert n == 3
+    assert matcher.terms_in("fire swordy") == ["Fire", "Fire Sword", "fir"]
+
+
+def test_equivale_ao_laco_de_regex_por_termo():
+    entries = {"hit points": "PV", "potion": "pocao", "sword": "espada", "Long Sword": "Espada Longa"}
+    text = "Potion heals Hit Points. LONG SWORD > sword, swords"
+
+    expected = text
+    for src, dst in sorted(entries.items(), key=lambda kv: len(kv[0]), reverse=True):
+        pattern = re.compile(rf"(?<![{_WORD_CLASS}]){re.escape(src)}(?![{_WORD_CLASS}])", re.IGNORECASE)
+        expected = pattern.sub(lambda m: _preserve_case(m.group(0), dst), expected)
+
+    assert _replace_glossary_entries(text, entries, version="teste") == expected
+
+
+def test_consumidores_usam_o_matcher(tmp_path):
+    path = tmp_path / "glossary.json"
+    path.write_text('{"glossary": {"en_to_pt": {"save file": "arquivo", "save": "salvar"}}}', encoding="utf-8")
+    gm = GlossaryManager(str(path))
+    protected, placeholders = gm.apply_pre_translation("Open save file, then Save")
+    assert protected == "Open __GLOSSARY_TERM_0__, then __GLOSSARY_TERM_1__"
+    assert gm.apply_post_translation(protected, placeholders) == "Open arquivo, then salvar"
+
+    gm.add_term("Open", "Abrir", save=False)
+    assert gm.apply_pre_translation("Open")[0].startswith("__GLOSSARY_TERM_")
+
+    gate = SemanticQualityGate(glossary={"Excalibur": {"target": "Excalibur", "category": "item"}})
+    hits, violations = gate._glossary_check("Take the EXCALIBUR and SAVE", "Pegue a espada")
+    assert hits == ["SAVE", "Excalibur"]
+    assert violations == ["Excalibur->Excalibur"]
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import core.hybrid_translator as hybrid_module
+from core.hybrid_translator import HybridTranslator, TranslationMode
+from core.nllb_engine import nllb_language_code
+
+
+DRAFTS = {
+    "Open the door": "Abra a porta",
+    "Take the sword and run": "Take the sword and run",  # Igual ao original
+    "Where is the key?": "",  # Modelo local não respondeu
+    "Game over": "Fim de jogo",
+    "Talk to the old man": "Talk to the old man",
+}
+
+
+def _translator(monkeypatch, remote_ok=True):
+    monkeypatch.setattr(HybridTranslator, "_check_availability", lambda self: None)
+    translator = HybridTranslator(api_key="k")
+    translator.gemini_available = True
+    translator.ollama_available = True
+    translator.speculative_config["escalation_batch_size"] = 2
+    calls = []
+
+    def fake_ollama(texts, target_language, model=None):
+        return [DRAFTS[t] + "\n" for t in texts], True, None
+
+    def fake_gemini(texts, target_language):
+        calls.append(list(texts))
+        if not remote_ok:
+            return texts, False, "429 quota"
+        return [f"[remoto] {t}" for t in texts], True, None
+
+    translator._translate_with_ollama = fake_ollama
+    translator._translate_with_gemini = fake_gemini
+    return translator, calls
+
+
+def test_so_rascunhos_reprovados_vao_ao_remoto_em_lotes(monkeypatch):
+    translator, calls = _translator(monkeypatch)
+    texts = list(DRAFTS)
+    out, ok, err = translator.translate_batch(texts, mode=TranslationMode.SPECULATIVE)
+
+    assert ok and err is None
+    assert calls == [["Take the sword and run", "Where is the key?"], ["Talk to the old man"]]
+    assert out[0].strip() == "Abra a porta" and out[3].strip() == "Fim de jogo"
+    assert out[1] == "[remoto] Take the sword and run"
+    stats = translator.get_stats()
+    assert stats["speculative_drafted"] == 5 and stats["speculative_escalated"] == 3
+    assert stats["speculative_remote_calls"] == 2
+    assert stats["speculative_escalation_rate"] == 0.6
+
+
+def test_remoto_sem_quota_mantem_rascunho(monkeypatch):
+    translator, calls = _translator(monkeypatch, remote_ok=False)
+    out, ok, err = translator.translate_batch(list(DRAFTS), mode=TranslationMode.SPECULATIVE)
+
+    assert len(calls) == 1  # Quota esgotada: não tenta os lotes seguintes
+    assert out[1].strip() == "Take the sword and run"
+    assert out[2] == "Where is the key?"  # Sem rascunho: volta o original
+    assert not ok and "429" in err
+
+
+def test_sem_modelo_local_tudo_conta_como_escalado(monkeypatch):
+    translator, calls = _translator(monkeypatch)
+    translator.ollama_available = False
+    translator.speculative_config["draft_backend"] = "ollama"
+    out, ok, _ = translator.translate_batch(["Open the door", "Game over"], mode=TranslationMode.SPECULATIVE)
+
+    assert ok and calls == [["Open the door", "Game over"]]
+    assert translator.get_stats()["speculative_escalation_rate"] == 1.0
+
+
+def test_rascunho_nllb_usa_idioma_de_destino(monkeypatch):
+    seen = []
+
+    class FakeEngine:
+        def translate_batch(self, texts, tgt_lang=None):
+            seen.append(tgt_lang)
+            return [f"{tgt_lang}:{t}" for t in texts]
+
+    monkeypatch.setattr(hybrid_module, "get_nllb_engine", lambda: FakeEngine())
+    translator, _ = _translator(monkeypatch)
+    translator.ollama_available = False
+    translator.speculative_config["draft_backend"] = "nllb"
+
+    assert translator._draft_with_local_model(["Hi"], "Español") == ["spa_Latn:Hi"]
+    assert translator._draft_with_local_model(["Hi"], "pt-BR") == ["por_Latn:Hi"]
+    # Idioma sem código NLLB: sem rascunho (nem cai em português)
+    assert translator._draft_with_local_model(["Hi"], "Klingon") is None
+    assert seen == ["spa_Latn", "por_Latn"]
+    assert nllb_language_code("Português (Brasil)") == "por_Latn"
+    assert nllb_language_code("deu_Latn") == "deu_Latn"
+
+
+def test_ollama_preserva_texto_multi_linha(monkeypatch):
+    class FakeClient:
+        def __init__(self):
+            self.prompts = []
+
+        def generate(self, prompt, prefix=None, **kwargs):
+            self.prompts.append((prefix, prompt))
+            if prefix:  # bloco coalescido "id|||texto"
+                return "\n".join(
+                    f"{line.split('|||', 1)[0]}|||[pt] {line.split('|||', 1)[1]}"
+                    for line in prompt.splitlines() if "|||" in line
+                )
+            src = prompt.split("Texto: ", 1)[1].rsplit("\n", 1)[0]
+            return "\n".join(f"[pt] {line}" for line in src.splitlines())
+
+    client = FakeClient()
+    monkeypatch.setattr(hybrid_module, "get_ollama_client", lambda *a, **kw: client)
+    monkeypatch.setattr(HybridTranslator, "_check_availability", lambda self: None)
+    translator = HybridTranslator(api_key="k")
+    translator.ollama_available = True
+
+    out, ok, _ = translator._translate_with_ollama(["YES\nNO", "Open the door"], "pt-BR")
+
+    assert ok
+    assert out == ["[pt] YES\n[pt] NO\n", "[pt] Open the door\n"]
+    coalesced = [p for prefix, p in client.prompts if prefix]
+    assert coalesced and all("YES" not in p for p in coalesced)
@@ -0,0 +1,69 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from universal_kit.multi_compress import MultiCompress, _HashChainMatcher
+from universal_kit.multi_decompress import CompressionAlgorithm, MultiDecompress
+
+LZ_ALGORITHMS = [
+    CompressionAlgorithm.LZSS,
+    CompressionAlgorithm.LZ77,
+    CompressionAlgorithm.LZ10,
+    CompressionAlgorithm.LZ11,
+    CompressionAlgorithm.YAY0,
+    CompressionAlgorithm.YAZ0,
+]
+
+
+def _sample(size: int, alphabet_size: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    alphabet = bytes(rng.randrange(256) for _ in range(alphabet_size))
+    return bytes(rng.choice(alphabet) for _ in range(size))
+
+
+@pytest.mark.parametrize("alphabet_size", [2, 4, 32])
+def test_hash_chain_equivale_a_busca_exaustiva(alphabet_size):
+    data = _sample(1500, alphabet_size, seed=alphabet_size)
+    engine = MultiCompress()
+    matcher = _HashChainMatcher(data, window=700, min_len=3, max_len=18)
+
+    for pos in range(0, len(data), 7):
+        assert matcher.find(pos) == engine._find_longest_match(data, pos, 700, 3, 18)
+
+
+@pytest.mark.parametrize("algorithm", LZ_ALGORITHMS, ids=lambda a: a.value)
+def test_chain_depth_e_parse_otimo_mantem_roundtrip(algorithm):
+    data = b"A long text line for the hero. " * 40 + _sample(800, 8, seed=3)
+    engine = MultiCompress()
+    decoder = MultiDecompress()
+
+    greedy = engine.compress(data, algorithm)
+    shallow = engine.compress(data, algorithm, {"chain_depth": 4})
+    optimal = engine.compress(data, algorithm, {"parse": "optimal"})
+
+    for packed in (greedy, shallow, optimal):
+        assert packed.success, packed.error
+        assert decoder.decompress(packed.data, algorithm, packed.params).data == data
+    assert optimal.compressed_size <= greedy.compressed_size
+
+
+def test_budget_aciona_parse_otimo_quando_greedy_estoura():
+    rng = random.Random(11)
+    words = [b"HERO", b"SWORD", b"the", b"of", b"castle", b"GOLD", b"you", b"found"]
+    data = b" ".join(rng.choice(words) for _ in range(400))
+    engine = MultiCompress()
+    greedy = engine.compress(data, CompressionAlgorithm.YAZ0)
+    optimal = engine.compress(data, CompressionAlgorithm.YAZ0, {"parse": "optimal"})
+    assert optimal.compressed_size < greedy.compressed_size
+
+    budgeted = engine.compress(data, CompressionAlgorithm.YAZ0, {"budget": optimal.compressed_size})
+    assert budgeted.data == optimal.data
+
+    relaxed = engine.compress(data, CompressionAlgorithm.YAZ0, {"budget": greedy.compressed_size})
+    assert relaxed.data == greedy.data
@@ -0,0 +1,159 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from universal_kit.multi_compress import MultiCompress
+from universal_kit.multi_decompress import (
+    CompressionAlgorithm,
+    MultiDecompress,
+    _append_match,
+    _copy_match,
+)
+
+ROUNDTRIP_ALGORITHMS = [
+    CompressionAlgorithm.RLE,
+    CompressionAlgorithm.LZSS,
+    CompressionAlgorithm.LZ77,
+    CompressionAlgorithm.LZ10,
+    CompressionAlgorithm.LZ11,
+    CompressionAlgorithm.YAY0,
+    CompressionAlgorithm.YAZ0,
+]
+
+
+def _payloads():
+    rng = random.Random(2024)
+    block = bytes(rng.randrange(256) for _ in range(300))
+    return {
+        "texto": b"The quick brown fox jumps over the lazy dog. " * 20,
+        "zeros": bytes(700),
+        "aleatorio": bytes(rng.randrange(256) for _ in range(600)),
+        "misto": bytes(rng.choice(b"ABAB\x00\x00\xff") for _ in range(900)),
+        "repeticao_distante": block * 3,
+        "tilemap": bytes((i // 7) & 0xFF for i in range(2048)),
+    }
+
+
+PAYLOADS = _payloads()
+
+
+@pytest.mark.parametrize("algorithm", ROUNDTRIP_ALGORITHMS, ids=lambda a: a.value)
+@pytest.mark.parametrize("name", sorted(PAYLOADS))
+def test_roundtrip_multicompress(algorithm, name):
+    payload = PAYLOADS[name]
+    packed = MultiCompress().compress(payload, algorithm)
+    assert packed.success, packed.error
+
+    result = MultiDecompress().decompress(packed.data, algorithm, packed.params)
+    assert result.success, result.error
+    assert result.data == payload
+    assert result.decompressed_size == len(payload)
+
+
+def _reference_copy(output: bytearray, distance: int, length: int) -> None:
+    src = len(output) - distance
+    for _ in range(length):
+        if src < len(output):
+            output.append(output[src])
+            src += 1
+
+
+@pytest.mark.parametrize("distance,length", [(1, 18), (2, 7), (3, 3), (3, 10), (5, 4), (8, 8), (0, 4)])
+def test_copias_por_fatia_equivalem_ao_laco_byte_a_byte(distance, length):
+    seed = bytearray(b"ABCDEFGH")
+    expected = bytearray(seed)
+    _reference_copy(expected, distance, length)
+
+    appended = bytearray(seed)
+    _append_match(appended, distance, length)
+    assert appended == expected
+
+    if distance > 0:
+        buffer = bytearray(len(expected))
+        buffer[:len(seed)] = seed
+        end = _copy_match(buffer, len(seed), distance, length)
+        assert end == len(expected)
+        assert buffer == expected
+
+
+def test_cabecalho_com_tamanho_impossivel_falha_sem_decodificar():
+    engine = MultiDecompress()
+    lz10 = bytes([0x10]) + (0x100000).to_bytes(3, "little") + b"\x00" * 12
+    yaz0 = b"Yaz0" + (0x200000).to_bytes(4, "big") + bytes(8) + b"\xff" * 8
+
+    for data, algorithm in ((lz10, CompressionAlgorithm.LZ10), (yaz0, CompressionAlgorithm.YAZ0)):
+        result = engine.decompress(data, algorithm)
+        assert result.success is False
+        assert "exceeds stream capacity" in result.error
+
+
+def test_modo_strict_aborta_em_referencia_invalida():
+    # flag 0x80: primeiro token é referência para trás sem histórico
+    data = bytes([0x10]) + (4).to_bytes(3, "little") + bytes([0x80, 0x00, 0x05, 0x00]) + b"ABCDEFGH"
+    engine = MultiDecompress()
+
+    lenient = engine.decompress(data, CompressionAlgorithm.LZ10)
+    strict = engine.decompress(data, CompressionAlgorithm.LZ10, {"strict": True})
+
+    assert lenient.success is True
+    assert strict.success is False
+    assert "back-reference" in strict.error
+
+
+def test_lz11_deslocamento_com_byte_baixo_ff():
+    # disp = 0x1FF (offset 0x200): exige ((hi << 8) | lo) + 1, não (hi << 8) | (lo + 1)
+    history = bytes(random.Random(5).randrange(256) for _ in range(0x200))
+    payload = history + history[:4]
+    packed = MultiCompress().compress(payload, CompressionAlgorithm.LZ11)
+    result = MultiDecompress().decompress(packed.data, CompressionAlgorithm.LZ11)
+    assert result.success
+    assert result.data == payload
+
+
+def test_try_all_rejeita_lixo_na_primeira_referencia_invalida():
+    # LZ10 válido no cabeçalho, mas o primeiro token referencia histórico inexistente
+    data = bytes([0x10]) + (4).to_bytes(3, "little") + bytes([0x80, 0x00, 0x05, 0x00]) + b"ABCDEFGH"
+    engine = MultiDecompress()
+
+    results = engine.try_all(data, [CompressionAlgorithm.LZ10])
+    lenient = engine.try_all(data, [CompressionAlgorithm.LZ10], params={})
+
+    assert results == []
+    assert len(lenient) == 1
+
+
+@pytest.mark.parametrize("algorithm, fill", [
+    (CompressionAlgorithm.LZSS, 0x00),
+    (CompressionAlgorithm.LZ77, 0xFF),
+])
+def test_strict_aceita_stream_sem_cabecalho_com_padding(algorithm, fill):
+    # Stream real dentro de uma janela de 1024 bytes: o padding vira
+    # referência inválida, que encerra o stream mantendo a saída
+    payload = b"The quick brown fox jumps over the lazy dog. " * 8
+    packed = MultiCompress().compress(payload, algorithm).data
+    window = packed + bytes([fill]) * (1024 - len(packed))
+    engine = MultiDecompress()
+
+    strict = engine.decompress(window, algorithm, {"strict": True})
+    hunted = engine.try_all(window, [algorithm])
+
+    assert strict.success and strict.data == payload
+    assert len(hunted) == 1 and hunted[0].data == payload
+
+
+def test_strict_rejeita_saida_minuscula_sem_cabecalho():
+    # Dois literais e depois referência sem histórico: saída curta demais
+    data = bytes([0x03]) + b"AB" + bytes([0x00, 0x00]) + b"garbage-garbage"
+    engine = MultiDecompress()
+
+    strict = engine.decompress(data, CompressionAlgorithm.LZSS, {"strict": True})
+    relaxed = engine.decompress(data, CompressionAlgorithm.LZSS, {"strict": True, "min_output": 2, "min_ratio": 0})
+
+    assert not strict.success and "too small" in strict.error
+    assert relaxed.success and relaxed.data == b"AB"
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.nllb_engine import NLLBEngine, plan_batches
+
+
+def test_baldes_por_comprimento_respeitam_orcamento():
+    lengths = [3, 40, 5, 38, 4, 39, 6, 3]
+    batches = plan_batches(lengths, max_tokens=80, max_batch=4)
+
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 4
+        assert len(batch) * max(lengths[i] for i in batch) <= 80 or len(batch) == 1
+    # Longos juntos, curtos juntos: pouco padding
+    assert set(batches[0]) <= {1, 3, 5}
+    assert set(batches[-1]) <= {0, 2, 4, 6, 7}
+
+
+def _fake_engine(**kw):
+    engine = NLLBEngine(**kw)
+    engine._model = object()  # Já "carregado"
+    seen = []
+    engine._encode = lambda texts: [[1] * len(t.split()) for t in texts]
+
+    def generate(batch_ids, tgt_lang):
+        seen.append([len(ids) for ids in batch_ids])
+        return [f"{tgt_lang}:{len(ids)}" for ids in batch_ids]
+
+    engine._generate = generate
+    return engine, seen
+
+
+def test_traduz_em_ordem_com_dedupe_e_padding_dinamico():
+    engine, seen = _fake_engine(max_tokens_per_batch=12, max_batch_size=8)
+    texts = ["a b c d e f", "a", "", "a b", "a", "a b c d e f g h"]
+    out = engine.translate_many(texts)
+
+    assert out == ["por_Latn:6", "por_Latn:1", "", "por_Latn:2", "por_Latn:1", "por_Latn:8"]
+    assert engine.stats["generated"] == 4 and engine.stats["texts"] == 6
+    assert seen == [[8], [6, 2], [1]]
+    assert engine.padding_efficiency() == (8 + 6 + 2 + 1) / (8 + 2 * 6 + 1)
+
+
+def test_interface_de_engine_devolve_none_quando_igual():
+    engine, _ = _fake_engine()
+    engine._generate = lambda batch_ids, tgt_lang: ["Abrir"] * len(batch_ids)
+    assert engine.translate("Open") == "Abrir"
+    assert engine.translate_batch(["abrir", "Open"]) == [None, "Abrir"]
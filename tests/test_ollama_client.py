@@ -0,0 +1,88 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ollama_client import OllamaClient, OllamaCoalescer, format_id_lines, parse_id_lines
+from tools.bench_ollama_client import OllamaStubServer
+
+PREFIX = "Traduza cada linha.\nRetorne SOMENTE linhas no formato id|||traducao.\n\n"
+
+
+def _fast_stub(**kw):
+    return OllamaStubServer(request_latency=0.0, load_latency=0.0, prefill_per_token=0.0,
+                            decode_per_token=0.0, **kw)
+
+
+def test_formato_id_linhas():
+    block = format_id_lines([(0, "Yes"), (3, "No")])
+    assert parse_id_lines(block + "\nlixo\n 7 ||| ok ") == {0: "Yes", 3: "No", 7: "ok"}
+
+
+def test_sessao_quente_e_prefixo_em_cache():
+    with _fast_stub() as stub:
+        client = OllamaClient("m", base_url=stub.base_url, system="Regras fixas " * 20)
+        first = client.generate("0|||Open the door", prefix=PREFIX)
+        client.generate("0|||Close the door", prefix=PREFIX)
+        client.close()
+
+    assert first == "0|||[pt] Open the door"
+    assert stub.stats["connections"] == 1 and stub.stats["model_loads"] == 1
+    # Segunda requisição só avalia o trecho após o prefixo comum
+    assert stub.stats["cached_tokens"] > stub.stats["prompt_tokens"] / 2
+
+
+def test_coalesce_pedidos_concorrentes():
+    with _fast_stub() as stub:
+        client = OllamaClient("m", base_url=stub.base_url)
+        coalescer = OllamaCoalescer(client, PREFIX, max_items=8, max_wait=0.05)
+        texts = [f"Item {i}" for i in range(24)]
+        results = [None] * len(texts)
+
+        def worker(i):
+            results[i] = coalescer.translate(texts[i], timeout=10)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        coalescer.close()
+        client.close()
+
+    assert results == [f"[pt] {t}" for t in texts]
+    assert stub.stats["requests"] <= 6
+    assert coalescer.stats["items"] == 24
+
+
+def test_item_ausente_reenviado_sozinho():
+    dropped = []
+
+    def skip_once(text):
+        if text == "secret" and not dropped:
+            dropped.append(text)
+            return None
+        return f"[pt] {text}"
+
+    with OllamaStubServer(translate=skip_once, request_latency=0.0, load_latency=0.0,
+                          prefill_per_token=0.0, decode_per_token=0.0) as stub:
+        client = OllamaClient("m", base_url=stub.base_url)
+        coalescer = OllamaCoalescer(client, PREFIX, max_items=4, max_wait=0.05)
+        out = coalescer.translate_many(["a", "secret", "b"])
+        coalescer.close()
+        client.close()
+
+    assert out == ["[pt] a", "[pt] secret", "[pt] b"]
+    assert coalescer.stats["retried"] == 1 and stub.stats["requests"] == 2
+
+
+def test_texto_multi_linha_nao_e_coalescido():
+    coalescer = OllamaCoalescer(object(), PREFIX)
+    with pytest.raises(ValueError):
+        coalescer.submit("YES\nNO")
+    assert coalescer.stats["items"] == 0
@@ -0,0 +1,71 @@
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.pointer_index import PointerIndex
+
+
+def _find_all(data: bytes, pattern: bytes):
+    hits = []
+    pos = data.find(pattern)
+    while pos >= 0:
+        hits.append(pos)
+        pos = data.find(pattern, pos + 1)
+    return hits
+
+
+def test_sites_equivale_a_busca_linear_em_todos_os_modos():
+    rng = random.Random(3)
+    rom = bytearray(rng.randrange(4) for _ in range(2048))
+    index = PointerIndex(rom)
+
+    for size in (2, 3, 4):
+        for endian in ("little", "big"):
+            for value in (0, 1, 0x0100, 0x010203, 0x03020100):
+                if value >= (1 << (size * 8)):
+                    continue
+                expected = _find_all(bytes(rom), value.to_bytes(size, endian))
+                assert index.sites(value, size, endian) == expected
+
+
+def test_atualizacao_incremental_apos_reescrever_ponteiro():
+    rom = bytearray(b"\xFF" * 64)
+    rom[0x10:0x12] = (0x8020).to_bytes(2, "little")
+    index = PointerIndex(rom, sizes=(2,), endians=("little",))
+    assert index.sites(0x8020, 2, "little") == [0x10]
+
+    index.write_pointer(0x10, 0x8030, 2, "little")
+    assert index.sites(0x8020, 2, "little") == []
+    assert index.sites(0x8030, 2, "little") == [0x10]
+
+    # escrita externa informada via notify_write
+    rom[0x20:0x22] = (0x8030).to_bytes(2, "little")
+    index.notify_write(0x20, 2)
+    assert index.sites(0x8030, 2, "little") == [0x10, 0x20]
+    assert index.sites(0x8030, 2, "little", alignment=4) == [0x10, 0x20]
+    assert index.sites(0x8030, 2, "little", alignment=0x20) == [0x20]
+
+
+def test_sites_for_target_usa_mapa_inverso():
+    rom = bytearray(b"\x00" * 0x100)
+    rom[0x40:0x42] = (0x8080).to_bytes(2, "little")
+    rom[0x60:0x62] = (0x0080).to_bytes(2, "little")
+    index = PointerIndex(rom)
+
+    def lorom(value):
+        return value & 0x7FFF if value >= 0x8000 else None
+
+    calls = []
+
+    def mapper(value):
+        calls.append(value)
+        return lorom(value)
+
+    assert index.sites_for_target(0x80, 2, "little", mapper, "lorom") == [(0x40, 0x8080)]
+    first_calls = len(calls)
+    assert index.sites_for_target(0x80, 2, "little", mapper, "lorom") == [(0x40, 0x8080)]
+    assert len(calls) == first_calls
@@ -0,0 +1,72 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.pointer_scanner import PointerScanner
+
+np = pytest.importorskip("numpy")
+
+
+def _synthetic_rom(size: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.choice([0x00, 0xFF, rng.randrange(256)]) for _ in range(size))
+
+
+def _snapshot(scanner: PointerScanner):
+    pointers = [
+        (p.offset, p.value, p.size, p.endianness, p.target_offset, p.points_to_text, p.confidence)
+        for p in scanner.all_pointers
+    ]
+    tables = [(t.start_offset, len(t.pointers), t.confidence) for t in scanner.pointer_tables]
+    return pointers, tables
+
+
+def test_modo_vetorizado_equivale_ao_escalar(capsys):
+    rom = _synthetic_rom(4096)
+    regions = [{"offset": 0x100, "length": 0x80}, {"offset_dec": "0x400", "length": 40}]
+
+    scalar = PointerScanner(rom, regions, vectorized=False)
+    scalar.scan(pointer_sizes=[2, 3, 4], endianness_modes=["little", "big"])
+    vector = PointerScanner(bytearray(rom), regions, vectorized=True)
+    vector.scan(pointer_sizes=[2, 3, 4], endianness_modes=["little", "big"])
+
+    assert scalar.all_pointers
+    assert _snapshot(scalar) == _snapshot(vector)
+
+
+def test_scan_pointer_arrays_retorna_arrays_compactos():
+    rom = bytearray(b"\xFF" * 0x2000)
+    rom[0x1000:0x1040] = b"HELLO WORLD THIS IS TEXT " * 2 + b"ABCDEFGHIJKLMN"
+    rom[0x10:0x12] = (0x9000).to_bytes(2, "little")  # LoROM bank 0x01 -> 0x1000
+
+    scanner = PointerScanner(bytes(rom), [{"offset": 0x1000, "length": 0x40}], vectorized=True)
+    offsets, values, targets, to_text, confidences = scanner.scan_pointer_arrays(2, "little")
+
+    assert offsets.dtype == np.int64
+    hit = np.flatnonzero((offsets == 0x10) & (targets == 0x1000))
+    assert hit.size == 1
+    assert values[hit[0]] == 0x9000
+    assert bool(to_text[hit[0]]) is True
+    assert confidences[hit[0]] == pytest.approx(1.0)
+
+
+def test_sem_universal_kit_usa_set_de_offsets(monkeypatch, capsys):
+    import core.pointer_scanner as pointer_scanner_module
+
+    rom = _synthetic_rom(4096)
+    regions = [{"offset": 0x100, "length": 0x80}, {"offset_dec": "0x400", "length": 40}]
+    indexed = PointerScanner(rom, regions, vectorized=True)
+    indexed.scan(pointer_sizes=[2, 3], endianness_modes=["little", "big"])
+
+    monkeypatch.setattr(pointer_scanner_module, "TextRegionIndex", None)
+    for vectorized in (True, False):
+        fallback = PointerScanner(rom, regions, vectorized=vectorized)
+        assert isinstance(fallback.text_offsets, set)
+        fallback.scan(pointer_sizes=[2, 3], endianness_modes=["little", "big"])
+        assert _snapshot(fallback) == _snapshot(indexed)
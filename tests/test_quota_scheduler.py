@@ -0,0 +1,165 @@
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.batch_queue_manager import BatchQueueManager, Priority
+from core.quota_scheduler import BackendKey, QuotaScheduler
+
+
+class SimClock:
+    def __init__(self, start: float):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def _scheduler(keys, start="2026-03-10T22:00:00", **kw):
+    clock = SimClock(datetime.fromisoformat(start).replace(tzinfo=timezone.utc).timestamp())
+    sched = QuotaScheduler(keys, clock=clock, sleep=clock.sleep, reset_utc_offset_hours=0, **kw)
+    return sched, clock
+
+
+def test_roteia_pela_maior_folga_e_preve_janela_rpm():
+    sched, clock = _scheduler([
+        BackendKey("a", rpm=2, rpd=100),
+        BackendKey("b", rpm=4, rpd=100),
+    ])
+    start = clock.now
+    used = []
+    for _ in range(6):
+        lease = sched.acquire(Priority.HIGH)
+        used.append(lease.key.key_id)
+        sched.release(lease)
+        clock.now += 1
+
+    assert sorted(used) == ["a", "a", "b", "b", "b", "b"]
+    assert used[:2] == ["a", "b"]  # empate em 1.0, depois b tem mais folga
+    assert sched.acquire(Priority.HIGH) is None
+    assert sched.time_until_available(Priority.HIGH) == 60 - 6
+
+    lease = sched.acquire_wait(Priority.HIGH)
+    assert lease is not None and clock.now == start + 60
+
+
+def test_quota_diaria_preve_reset_e_cai_para_local():
+    sched, clock = _scheduler([
+        BackendKey("gemini#1", rpm=10, rpd=2),
+        BackendKey("ollama", backend="ollama", premium=False),
+    ])
+    for _ in range(2):
+        lease = sched.acquire(Priority.CRITICAL)
+        assert lease.key.key_id == "gemini#1"
+        sched.release(lease)
+
+    assert sched.predict_reset() == 2 * 3600
+    assert sched.time_until_available(Priority.HIGH, backends=["gemini"]) == 2 * 3600
+    # Premium esgotado por horas: diálogo vai para o Ollama
+    lease = sched.acquire(Priority.HIGH)
+    assert lease.key.key_id == "ollama"
+    sched.release(lease)
+
+    clock.now += 2 * 3600
+    assert sched.acquire(Priority.HIGH).key.key_id == "gemini#1"
+    assert sched.status()["gemini#1"]["day_used"] == 1
+
+
+def test_prioridade_baixa_fica_no_ollama_e_reserva_premium():
+    sched, clock = _scheduler([
+        BackendKey("gemini#1", rpm=60, rpd=10),
+        BackendKey("ollama", backend="ollama", premium=False),
+    ], premium_reserve=0.5)
+
+    busy = sched.acquire(Priority.LOW)
+    assert busy.key.key_id == "ollama"
+    assert sched.acquire(Priority.LOW) is None  # não usa premium para LOW
+    normal = sched.acquire(Priority.NORMAL)
+    assert normal.key.key_id == "gemini#1"  # Ollama ocupado, premium com folga
+    sched.release(normal)
+
+    sched.keys["gemini#1"].day_used = 5  # sobra só a reserva de alta prioridade
+    assert sched.acquire(Priority.NORMAL) is None
+    assert sched.acquire(Priority.HIGH).key.key_id == "gemini#1"
+    sched.release(busy)
+
+
+def test_erro_429_aplica_cooldown():
+    sched, clock = _scheduler([BackendKey("g", rpm=10, rpd=100)])
+    lease = sched.acquire(Priority.HIGH)
+    clock.now += 2
+    sched.release(lease, success=False, error="429 RESOURCE_EXHAUSTED")
+    assert sched.acquire(Priority.HIGH) is None
+    assert sched.time_until_available(Priority.HIGH) == 58
+
+
+def test_fila_envia_dialogos_ao_premium_e_resto_ao_ollama(tmp_path):
+    sched = QuotaScheduler([
+        BackendKey("gemini#1", rpm=1000, rpd=1000),
+        BackendKey("ollama", backend="ollama", premium=False),
+    ])
+    manager = BatchQueueManager(progress_file=str(tmp_path / "queue.json"))
+    for i in range(4):
+        manager.add_batch([f"dialog {i}"], priority=Priority.HIGH)
+        manager.add_batch([f"flavor {i}"], priority=Priority.LOW)
+
+    def make(name):
+        def translate(texts, key):
+            time.sleep(0.01)
+            return [f"{name}:{t}" for t in texts], True, None
+        return translate
+
+    manager.start_scheduled({"gemini": make("gemini"), "ollama": make("ollama")}, sched)
+    for t in manager.worker_threads:
+        t.join(timeout=10)
+
+    batches = manager.all_batches.values()
+    assert all(b.status == "completed" for b in batches)
+    for b in batches:
+        expected = "gemini#1" if b.priority == Priority.HIGH else "ollama"
+        assert b.metadata["backend"] == expected
+
+
+def test_hibrido_adia_lote_sem_quota_e_processa_na_proxima_janela(tmp_path, monkeypatch):
+    from core.hybrid_translator import HybridTranslator, TranslationMode
+
+    sched, clock = _scheduler([
+        BackendKey("gemini#1", rpm=10, rpd=1, api_key="k1"),
+        BackendKey("ollama", backend="ollama", premium=False),
+    ])
+    queue = BatchQueueManager(progress_file=str(tmp_path / "deferred.json"))
+    monkeypatch.setattr(HybridTranslator, "_check_availability", lambda self: None)
+    translator = HybridTranslator(api_key="k", quota_scheduler=sched, deferred_queue=queue)
+    translator.gemini_available = True
+    translator.ollama_available = True
+
+    gemini_calls, ollama_calls = [], []
+
+    def fake_gemini(texts, target_language, api_key=None):
+        gemini_calls.append((list(texts), api_key, clock.now))
+        return [f"[pt] {t}" for t in texts], True, None
+
+    translator._translate_with_gemini = fake_gemini
+    translator._translate_with_ollama = lambda *a, **kw: ollama_calls.append(a) or ([], True, None)
+
+    out, ok, _ = translator.translate_batch(["Hello"], mode=TranslationMode.AUTO)
+    assert ok and out == ["[pt] Hello"]
+
+    # Quota diária usada: adia em vez de cair para o Ollama
+    out, ok, err = translator.translate_batch(["Bye"], mode=TranslationMode.AUTO)
+    assert not ok and out == ["Bye"] and "adiado" in err
+    assert not ollama_calls and len(gemini_calls) == 1
+    assert translator.get_stats()["gemini_deferred_texts"] == 1
+
+    before = clock.now
+    translator.run_deferred()
+    batch = list(queue.all_batches.values())[0]
+    assert batch.status == "completed" and batch.translations == ["[pt] Bye"]
+    assert gemini_calls[-1][1] == "k1" and gemini_calls[-1][2] >= before + 2 * 3600
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.free_space_allocator import FreeSpaceIndex
+from core.relocation_planner import PackingItem, RelocationPlanner
+from core.sms_pointer_transform import PointerContext, reachable_offset_range
+from core.sms_relocation_v1 import RelocationConfig, ReinsertionItem, SMSRelocationEngine
+
+
+def test_maiores_primeiro_e_ejecao_por_banco():
+    # Buracos: 10 bytes @0x10 e 6 bytes @0x40
+    plan = RelocationPlanner([("rom", FreeSpaceIndex([(0x10, 0x1A), (0x40, 0x46)]))]).plan(
+        [PackingItem("a", 5, order=0), PackingItem("b", 10, order=1)]
+    )
+    assert plan.offset_of("b") == 0x10 and plan.offset_of("a") == 0x40
+
+    # Y (sem restricao) pega o buraco exato do banco 1; X so alcanca o banco 1
+    index = FreeSpaceIndex([(0x0100, 0x0109), (0x4100, 0x4108)])
+    items = [PackingItem("y", 8, order=0), PackingItem("x", 6, window=(0x4000, 0x8000), order=1)]
+    greedy = RelocationPlanner([("rom", index.copy())], local_search=False).plan(items)
+    assert greedy.reason_for("x") == "no_space_in_window"
+    plan = RelocationPlanner([("rom", index)]).plan(items)
+    assert plan.offset_of("x") == 0x4100 and plan.offset_of("y") == 0x0100
+    assert plan.unplaced == [] and plan.moves >= 1
+
+
+def test_expansao_minima_e_relatorio_do_que_nao_coube():
+    planner = RelocationPlanner(
+        [("rom", FreeSpaceIndex([(0x10, 0x20)]))],
+        expansion=(0x8000, 0x4000),
+        bank_size=0x4000,
+    )
+    plan = planner.plan([
+        PackingItem("cabe", 16, order=0),
+        PackingItem("expande", 20, order=1),
+        PackingItem("grande", 0x5000, order=2),
+        PackingItem("conflito", 4, window=(0, 0), order=3),
+    ])
+    assert plan.offset_of("cabe") == 0x10
+    assert plan.placements["expande"].pool == "expansion" and plan.expansion_bytes == 0x4000
+    assert {(e["uid"], e["reason"]) for e in plan.unplaced} == {
+        ("grande", "no_space"), ("conflito", "empty_pointer_window"),
+    }
+    assert plan.to_dict()["allocation_map"]["cabe"]["offset"] == "0x000010"
+
+    ctx = PointerContext(addressing_mode="BANKED_SLOT2", bank_addend=0x4000)
+    assert reachable_offset_range(ctx) == (0xC000, 0x10000)
+    assert reachable_offset_range(PointerContext(bank_addend=0x8000), 0x9234) == (0x8000, 0xC000)
+
+
+def test_motor_sms_planeja_o_lote():
+    rom = bytearray(0x400)
+    rom[0x100:0x10A] = b"\xFF" * 10
+    rom[0x200:0x206] = b"\xFF" * 6
+    for i, off in enumerate((0x20, 0x30)):
+        rom[0x10 + 2 * i:0x12 + 2 * i] = off.to_bytes(2, "little")
+    refs = [[{"ptr_offset": 0x10, "addressing_mode": "DIRECT"}], [{"ptr_offset": 0x12, "addressing_mode": "DIRECT"}]]
+    items = [
+        ReinsertionItem(1, 0x20, "A", "ABCD", 2, 0, "ascii", refs[0]),
+        ReinsertionItem(2, 0x30, "B", "ABCDEFGHI", 2, 0, "ascii", refs[1]),
+    ]
+    config = RelocationConfig(free_space_regions=[(0x100, 0x300)], fill_bytes=(0xFF,))
+    report = SMSRelocationEngine(bytes(rom), config).process_all(items)
+    assert report.failed_count == 0 and report.relocated_count == 2
+    assert {r.id: r.new_offset for r in report.results} == {1: 0x200, 2: 0x100}
+    assert report.relocation_plan["placed"] == 2
+
+    config.batch_planning = False
+    report = SMSRelocationEngine(bytes(rom), config).process_all(items)
+    assert report.failed_count == 1  # chegada gulosa: o menor ocupa o buraco grande
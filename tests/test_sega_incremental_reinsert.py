@@ -0,0 +1,126 @@
+import json
+import zlib
+from pathlib import Path
+
+from core.sega_reinserter import SegaReinserter
+
+
+def _setup(tmp_path: Path):
+    rom_path = tmp_path / "game.sms"
+    rom_path.write_bytes(b"\xFF" * 0x400)
+    entries = {
+        str(i): {
+            "offset": 0x200 + 0x10 * i,
+            "max_len": 5,
+            "category": "DIALOG",
+            "has_pointer": False,
+            "pointer_offsets": [],
+            "terminator": 0,
+            "encoding": "ascii",
+            "reinsertion_safe": True,
+        }
+        for i in (1, 2, 3)
+    }
+    mapping_path = tmp_path / "map.json"
+    mapping_path.write_text(json.dumps({"entries": entries}), encoding="utf-8")
+    return rom_path, mapping_path
+
+
+def _write_jsonl(path: Path, rom_path: Path, texts: dict) -> Path:
+    rom = rom_path.read_bytes()
+    crc = f"{zlib.crc32(rom) & 0xFFFFFFFF:08X}"
+    rows = [{"type": "meta", "rom_crc32": crc, "rom_size": len(rom), "ordering": "seq/rom_offset"}]
+    for i, text in texts.items():
+        rows.append({"id": i, "seq": i, "offset": f"0x{0x200 + 0x10 * i:06X}", "text_dst": text,
+                     "rom_crc32": crc, "rom_size": len(rom)})
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    return path
+
+
+def _reinsert(rom_path, mapping_path, jsonl, out, incremental):
+    wrapper = SegaReinserter(str(rom_path))
+    translations = wrapper.load_translations(str(jsonl))
+    ok, msg = wrapper.reinsert(translations, str(out), mapping_path=str(mapping_path),
+                               create_backup=False, incremental=incremental)
+    assert ok, msg
+    return msg, wrapper
+
+
+def test_incremental_repatcha_so_o_segmento_alterado(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("NEUROROM_ENABLE_DELTA", "0")
+    rom_path, mapping_path = _setup(tmp_path)
+    out = tmp_path / "patched.sms"
+    jsonl = tmp_path / "translated_fixed_ptbr.jsonl"
+
+    _write_jsonl(jsonl, rom_path, {1: "OLA", 2: "MUNDO", 3: "FIM"})
+    msg, _ = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "Reinserção incremental" not in msg
+    assert (tmp_path / "patched.sms.incremental.json").exists()
+
+    msg, _ = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "nenhum segmento alterado" in msg
+
+    _write_jsonl(jsonl, rom_path, {1: "OLA", 2: "TERRA", 3: "FIM"})
+    msg, wrapper = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "Reinserção incremental concluída" in msg and "segmentos=1" in msg
+    assert wrapper.stats["incremental_changed"] == 1
+
+    # Mesmo resultado de uma reinserção completa
+    full = tmp_path / "full.sms"
+    _reinsert(rom_path, mapping_path, jsonl, full, incremental=False)
+    assert out.read_bytes() == full.read_bytes()
+    assert out.read_bytes()[0x220:0x226] == b"TERRA\x00"
+
+
+def test_incremental_volta_ao_completo_quando_entradas_globais_mudam(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("NEUROROM_ENABLE_DELTA", "0")
+    rom_path, mapping_path = _setup(tmp_path)
+    out = tmp_path / "patched.sms"
+    jsonl = _write_jsonl(tmp_path / "translated_fixed_ptbr.jsonl", rom_path, {1: "OLA", 2: "MUNDO", 3: "FIM"})
+    _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+
+    data = json.loads(mapping_path.read_text(encoding="utf-8"))
+    data["entries"]["3"]["max_len"] = 6
+    mapping_path.write_text(json.dumps(data), encoding="utf-8")
+    _write_jsonl(jsonl, rom_path, {1: "OLA", 2: "TERRA", 3: "FIM"})
+    msg, _ = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "Reinserção incremental" not in msg
+
+    # Saída editada por fora: estado invalidado
+    out.write_bytes(out.read_bytes()[:-1] + b"\x00")
+    _write_jsonl(jsonl, rom_path, {1: "OLA", 2: "MUNDO", 3: "FIM"})
+    msg, _ = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "Reinserção incremental" not in msg
+
+
+def test_incremental_marca_relatorio_prova_e_qa_como_desatualizados(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("NEUROROM_ENABLE_DELTA", "0")
+    rom_path, mapping_path = _setup(tmp_path)
+    out = tmp_path / "patched.sms"
+    jsonl = _write_jsonl(tmp_path / "translated_fixed_ptbr.jsonl", rom_path, {1: "OLA", 2: "MUNDO", 3: "FIM"})
+    _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    full_crc = f"{zlib.crc32(out.read_bytes()) & 0xFFFFFFFF:08X}"
+    out_dir = tmp_path / "out"
+    report_path = out_dir / f"{full_crc}_reinsertion_report.json"
+    assert "stale" not in json.loads(report_path.read_text(encoding="utf-8"))
+
+    _write_jsonl(jsonl, rom_path, {1: "OLA", 2: "TERRA", 3: "FIM"})
+    msg, _ = _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    assert "Reinserção incremental concluída" in msg
+    new_crc = f"{zlib.crc32(out.read_bytes()) & 0xFFFFFFFF:08X}"
+
+    for name in ("reinsertion_report", "proof", "qa_final"):
+        data = json.loads((out_dir / f"{full_crc}_{name}.json").read_text(encoding="utf-8"))
+        assert data["stale"] is True
+        assert data["stale_info"]["output_crc32"] == new_crc
+        assert data["stale_info"]["changed_segments"] == ["2"]
+    report_txt = (out_dir / f"{full_crc}_report.txt").read_text(encoding="utf-8")
+    assert report_txt.startswith("[DESATUALIZADO]")
+
+    # Segunda rodada incremental acumula segmentos sem duplicar o cabeçalho
+    _write_jsonl(jsonl, rom_path, {1: "OI", 2: "TERRA", 3: "FIM"})
+    _reinsert(rom_path, mapping_path, jsonl, out, incremental=True)
+    data = json.loads(report_path.read_text(encoding="utf-8"))
+    assert data["stale_info"]["changed_segments"] == ["1", "2"]
+    report_txt = (out_dir / f"{full_crc}_report.txt").read_text(encoding="utf-8")
+    assert report_txt.count("[DESATUALIZADO]") == 1
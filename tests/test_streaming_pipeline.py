@@ -0,0 +1,152 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.streaming_pipeline import (
+    BoundedMemo,
+    StreamingJsonlPipeline,
+    batch_stage,
+    checkpoint_path_for,
+    map_stage,
+)
+import tools.translate_puretext_ollama_safe as puretext
+
+
+def _write_jsonl(path: Path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def _read_jsonl(path: Path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_estagios_preservam_ordem_e_descartam(tmp_path):
+    src = tmp_path / "in.jsonl"
+    _write_jsonl(src, [{"n": i} for i in range(100)])
+    out = tmp_path / "out.jsonl"
+
+    def double(batch):
+        for rec in batch:
+            rec.data["n2"] = rec.data["n"] * 2
+            yield rec
+
+    pipeline = StreamingJsonlPipeline(
+        src, out,
+        stages=[map_stage(lambda r: r if r.data["n"] % 3 else None), batch_stage(double, 7)],
+        queue_size=4,
+    )
+    summary = pipeline.run()
+
+    rows = _read_jsonl(out)
+    assert [r["n"] for r in rows] == [i for i in range(100) if i % 3]
+    assert all(r["n2"] == 2 * r["n"] for r in rows)
+    assert summary["records_out"] == len(rows)
+    assert not checkpoint_path_for(out).exists()
+
+
+def test_retoma_do_ultimo_registro_gravado(tmp_path):
+    src = tmp_path / "in.jsonl"
+    _write_jsonl(src, [{"n": i} for i in range(50)])
+    out = tmp_path / "out.jsonl"
+    seen = []
+
+    def crash_at_30(rec):
+        if rec.data["n"] == 30 and not seen:
+            seen.append(rec.seq)
+            raise RuntimeError("queda simulada")
+        return rec
+
+    def count(rec, state):
+        state["written"] = state.get("written", 0) + 1
+
+    def make():
+        return StreamingJsonlPipeline(src, out, stages=[map_stage(crash_at_30)],
+                                      checkpoint_every=5, on_record=count)
+
+    with pytest.raises(RuntimeError):
+        make().run()
+    ckpt = json.loads(checkpoint_path_for(out).read_text(encoding="utf-8"))
+    assert ckpt["records_out"] == 30 and not ckpt["complete"]
+
+    summary = make().run()
+    assert summary["resumed"] and summary["resumed_from"] == 30
+    assert [r["n"] for r in _read_jsonl(out)] == list(range(50))
+    assert summary["state"]["written"] == 50
+
+
+def test_memo_limitado():
+    memo = BoundedMemo(2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    memo.get("a")
+    memo.put("c", 3)
+    assert "a" in memo and "c" in memo and "b" not in memo and len(memo) == 2
+
+
+def _fake_ollama(prompt, model, timeout, temperature=0.1):
+    lines = []
+    for line in prompt.splitlines():
+        m = re.match(r"^(\d+)\|\|\|(.*)$", line)
+        if m:
+            lines.append(f"{m.group(1)}|||{m.group(2).replace('Hello', 'Ola').replace('world', 'mundo')}")
+    return "\n".join(lines)
+
+
+def test_puretext_streaming_igual_ao_modo_em_lote(tmp_path, monkeypatch):
+    monkeypatch.setattr(puretext, "_ollama_generate", _fake_ollama)
+    rows = [{"type": "meta", "rom_crc32": "DEADBEEF", "rom_size": 1024}]
+    for i in range(40):
+        text = "Hello world" if i % 4 else f"Hello to the world of item {i}"
+        rows.append({"id": i, "seq": i, "rom_offset": 0x100 + i * 16, "text_src": text,
+                     "reinsertion_safe": True, "max_len_bytes": 40})
+    pure = tmp_path / "DEADBEEF_pure_text.jsonl"
+    _write_jsonl(pure, rows)
+    fb = {"rom_crc32": "DEADBEEF", "rom_size": 1024}
+
+    batch_out = tmp_path / "batch.jsonl"
+    cand_rows, unique, _scan, _meta = puretext.collect_candidates(pure, max_unique=1500)
+    translations, _ = puretext.build_translations(unique, model="m", timeout=5, batch_size=8)
+    chain_by_id, _ = puretext.build_chain_translations(cand_rows, translations, model="m", timeout=5)
+    batch_metrics = puretext.apply_translations(pure, batch_out, translations, chain_by_id, fb)
+
+    stream_out = tmp_path / "stream.jsonl"
+    streamed = puretext.run_streaming(pure, stream_out, model="m", timeout=5, batch_size=8,
+                                      max_unique=1500, fallback_meta=fb, window=1000)
+
+    strip = lambda rs: [{k: v for k, v in r.items() if k != "generated_at"} for r in rs]
+    assert strip(_read_jsonl(stream_out)) == strip(_read_jsonl(batch_out))
+    assert streamed["output"]["text_changed"] == batch_metrics["text_changed"] > 0
+    assert streamed["candidate_scan"]["candidate_items"] == 40
+
+
+def test_auto_delta_streaming_igual_ao_modo_em_memoria(tmp_path, monkeypatch):
+    import tools.auto_delta_retranslate_jsonl as auto_delta
+
+    def fake_batch(pairs, model, timeout):
+        return {idx: txt.replace("Hello", "Ola").replace("world", "mundo") for idx, txt in pairs}
+
+    monkeypatch.setattr(auto_delta, "ollama_translate_batch", fake_batch)
+    rows = [{"type": "meta", "rom_crc32": "DEADBEEF"}]
+    for i in range(30):
+        text = "Hello world" if i % 3 else f"Hello brave world number {i}"
+        rows.append({"id": i, "text_src": text, "text_dst": text, "max_len_bytes": 40})
+    src = tmp_path / "in.jsonl"
+    _write_jsonl(src, rows)
+
+    mem_out, stream_out = tmp_path / "mem.jsonl", tmp_path / "stream.jsonl"
+    mem = auto_delta.run_in_memory(src, mem_out, model="m", timeout=5, batch_size=4, max_items=2000)
+    streamed = auto_delta.run_streaming(src, stream_out, model="m", timeout=5, batch_size=4,
+                                        max_items=2000, window=7)
+
+    strip = lambda rs: [{k: v for k, v in r.items() if k != "generated_at"} for r in rs]
+    assert strip(_read_jsonl(stream_out)) == strip(_read_jsonl(mem_out))
+    for key in ("rows_total", "targets_total", "applied_changed", "blocked_fit"):
+        assert streamed[key] == mem[key]
+    assert mem["applied_changed"] > 0
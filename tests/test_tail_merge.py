@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.console_memory_model import ConsoleMemoryModel
+from core.relocation_manager import RelocationManager
+from core.sms_relocation_v1 import RelocationConfig, ReinsertionItem, SMSRelocationEngine
+from core.tail_merge import plan_tail_merge
+
+
+def test_sufixo_completo_com_terminador():
+    merges = plan_tail_merge({
+        "curto": b"obrigado.\x00",
+        "longo": b"Muito obrigado.\x00",
+        "caixa": b"Obrigado.\x00",
+        "dup": b"obrigado.\x00",
+        "sem_term": b"obrigado.",
+        "fixo": b"do.\x00",
+    }, pinned={"fixo"})
+    assert merges == {"curto": ("longo", 6), "dup": ("longo", 6)}
+
+
+def test_motor_sms_compartilha_bytes_entre_strings():
+    rom = bytearray(0x400)
+    rom[0x200:0x300] = b"\xFF" * 0x100
+    texts = {1: (0x40, "HELLO THERE!"), 2: (0x50, "THERE!"), 3: (0x60, "URE!"), 4: (0x70, "SURE!")}
+    items = []
+    for i, (uid, (off, text)) in enumerate(texts.items()):
+        rom[0x10 + 2 * i:0x12 + 2 * i] = off.to_bytes(2, "little")
+        max_len = 8 if uid == 4 else 2  # o 4 cabe no lugar e vira host fixo
+        items.append(ReinsertionItem(uid, off, "x", text, max_len, 0, "ascii",
+                                     [{"ptr_offset": 0x10 + 2 * i, "addressing_mode": "DIRECT"}]))
+    rom[0x70:0x78] = b"\x00" * 8
+
+    config = RelocationConfig(free_space_regions=[(0x200, 0x300)], fill_bytes=(0xFF,))
+    engine = SMSRelocationEngine(bytes(rom), config)
+    report = engine.process_all(items)
+    out = engine.get_modified_rom()
+
+    assert report.failed_count == 0
+    new = {r.id: r.new_offset for r in report.results}
+    assert new[2] == new[1] + 6 and new[3] == 0x71
+    assert out[new[1]:new[1] + 13] == b"HELLO THERE!\x00"
+    assert int.from_bytes(out[0x12:0x14], "little") == new[2]
+    assert int.from_bytes(out[0x14:0x16], "little") == 0x71
+    assert report.bytes_relocated == 13
+    assert report.relocation_plan["tail_merge_bytes_saved"] == 7 + 5
+
+    config.tail_merge = False
+    report = SMSRelocationEngine(bytes(rom), config).process_all(items)
+    assert report.bytes_relocated == 13 + 7 + 5
+
+
+def test_relocation_manager_reaproveita_sufixo_ja_realocado():
+    rom = bytearray(b"\xFF" * 0x200)
+    rom[0x40:0x44] = b"OLD\x00"
+    rom[0x48:0x4C] = b"OL2\x00"
+    rom[0x10:0x14] = (0x40).to_bytes(4, "little")
+    rom[0x14:0x18] = (0x48).to_bytes(4, "little")
+
+    manager = RelocationManager(ConsoleMemoryModel("GBA"))
+    first = manager.relocate(rom, old_offset=0x40, new_bytes=b"Muito obrigado.\x00")
+    second = manager.relocate(rom, old_offset=0x48, new_bytes=b"obrigado.\x00")
+
+    assert first["relocated"] and not first["tail_merged"]
+    assert second["relocated"] and second["tail_merged"] and second["bytes_written"] == 0
+    assert second["new_offset"] == first["new_offset"] + 6
+    assert int.from_bytes(rom[0x14:0x18], "little") == second["new_offset"]
+    assert manager.get_tail_index(rom).bytes_saved == 10
+
+
+def test_host_realocado_de_novo_realoja_guest():
+    rom = bytearray(b"\xFF" * 0x200)
+    rom[0x40:0x44] = b"OLD\x00"
+    rom[0x48:0x4C] = b"OL2\x00"
+    rom[0x10:0x14] = (0x40).to_bytes(4, "little")
+    rom[0x30:0x34] = (0x48).to_bytes(4, "little")
+
+    manager = RelocationManager(ConsoleMemoryModel("GBA"))
+    host = manager.relocate(rom, old_offset=0x40, new_bytes=b"Muito obrigado.\x00")
+    guest = manager.relocate(rom, old_offset=0x48, new_bytes=b"obrigado.\x00")
+    moved = manager.relocate(rom, old_offset=host["new_offset"], new_bytes=b"Valeu demais, amigo.\x00")
+
+    assert guest["tail_merged"] and moved["relocated"] and moved["guests_rehomed"] == 1
+    host_ptr = int.from_bytes(rom[0x10:0x14], "little")
+    guest_ptr = int.from_bytes(rom[0x30:0x34], "little")
+    assert rom[host_ptr:host_ptr + 21] == b"Valeu demais, amigo.\x00"
+    assert rom[guest_ptr:guest_ptr + 10] == b"obrigado.\x00"
+    # O host antigo so e apagado depois que o guest saiu de dentro dele
+    assert rom[host["new_offset"]:host["new_offset"] + 21] == b"\xFF" * 21
+
+
+def test_guest_realocado_nao_apaga_bytes_do_host():
+    rom = bytearray(b"\xFF" * 0x200)
+    rom[0x40:0x44] = b"OLD\x00"
+    rom[0x48:0x4C] = b"OL2\x00"
+    rom[0x10:0x14] = (0x40).to_bytes(4, "little")
+    rom[0x30:0x34] = (0x48).to_bytes(4, "little")
+
+    manager = RelocationManager(ConsoleMemoryModel("GBA"))
+    host = manager.relocate(rom, old_offset=0x40, new_bytes=b"Muito obrigado.\x00")
+    guest = manager.relocate(rom, old_offset=0x48, new_bytes=b"obrigado.\x00")
+    manager.relocate(rom, old_offset=guest["new_offset"], new_bytes=b"Valeu!\x00")
+
+    assert rom[host["new_offset"]:host["new_offset"] + 16] == b"Muito obrigado.\x00"
+    guest_ptr = int.from_bytes(rom[0x30:0x34], "little")
+    assert rom[guest_ptr:guest_ptr + 7] == b"Valeu!\x00"
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.pointer_scanner import PointerScanner
+from universal_kit.endian_pointer_hunter import EndianPointerHunter
+from universal_kit.text_region_index import TextRegionIndex
+
+
+def test_indice_responde_pertinencia_e_regiao_com_overlap():
+    index = TextRegionIndex([(0x10, 5), (0x12, 0x14), (0x100, 1), (0x200, 0)])
+
+    assert len(index) == 3
+    assert 0x0F not in index
+    assert index.contains(0x10)
+    assert index.region_index(0x10) == 0
+    # 0x14 está nas duas primeiras; retorna a que vai mais longe
+    assert index.region_index(0x14) == 1
+    assert index.region_at(0x20) == (0x12, 0x26)
+    assert index.region_at(0x26) is None
+    assert index.region_index(0x100) == 2
+    assert 0x200 not in index
+    assert index.total_bytes == (0x26 - 0x10) + 1
+
+
+def test_scanner_e_hunter_usam_indice_sem_expandir_bytes():
+    regions = [{"offset": 0, "length": 4 * 1024 * 1024}]
+
+    scanner = PointerScanner(b"\xFF" * 64, [{"offset_dec": "0x20", "length": 8}])
+    assert isinstance(scanner.text_index, TextRegionIndex)
+    assert 0x20 in scanner.text_offsets and 0x28 not in scanner.text_offsets
+
+    hunter = EndianPointerHunter(b"\xFF" * 64)
+    index = hunter._build_text_index(regions)
+    assert len(index) == 1
+    assert index.contains(4 * 1024 * 1024 - 1)
+    assert not index.contains(4 * 1024 * 1024)
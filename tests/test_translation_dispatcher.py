@@ -0,0 +1,146 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.translation_dispatcher import (
+    BackendLimits,
+    TranslationDispatcher,
+    _RateBudget,
+    dispatch_call,
+    get_dispatcher,
+    limits_for,
+)
+
+
+def _slow_upper(max_seen):
+    lock = threading.Lock()
+    state = {"active": 0}
+    rng = random.Random(3)
+
+    def call(text, session):
+        with lock:
+            state["active"] += 1
+            max_seen.append(state["active"])
+        time.sleep(rng.uniform(0.0, 0.01))
+        with lock:
+            state["active"] -= 1
+        return text.upper()
+
+    return call
+
+
+def test_resultados_em_ordem_e_limite_de_concorrencia():
+    seen = []
+    dispatcher = TranslationDispatcher()
+    dispatcher.register_backend("fake", _slow_upper(seen), BackendLimits(max_concurrency=3))
+    texts = [f"line {i}" for i in range(40)]
+
+    streamed = []
+    results = dispatcher.run("fake", texts, on_result=lambda r: streamed.append(r.index))
+    dispatcher.close()
+
+    assert [r.result for r in results] == [t.upper() for t in texts]
+    assert streamed == list(range(40))
+    assert max(seen) <= 3
+
+
+def test_retentativas_e_falha_final():
+    calls = {}
+
+    def flaky(text, session):
+        calls[text] = calls.get(text, 0) + 1
+        if text == "never" or calls[text] < 2:
+            raise ConnectionError("boom")
+        return text[::-1]
+
+    dispatcher = TranslationDispatcher()
+    dispatcher.register_backend("flaky", flaky, BackendLimits(max_retries=2, backoff_base=0.001))
+    ok, bad = dispatcher.run("flaky", ["abc", "never"])
+    dispatcher.close()
+
+    assert ok.result == "cba" and ok.attempts == 2
+    assert not bad.ok and bad.attempts == 3 and "boom" in bad.error
+
+
+def test_stream_assincrono_e_run_dentro_de_loop():
+    dispatcher = TranslationDispatcher()
+    dispatcher.register_backend("echo", lambda text, session: text, BackendLimits(max_concurrency=2))
+
+    async def consume():
+        got = [r.result async for r in dispatcher.stream("echo", ["a", "b", "c"])]
+        with pytest.raises(RuntimeError):
+            dispatcher.run("echo", ["x"])
+        return got
+
+    assert asyncio.run(consume()) == ["a", "b", "c"]
+    dispatcher.close()
+
+
+def test_orcamento_rpm_espaca_requisicoes():
+    budget = _RateBudget(rpm=600, tpm=None)  # 0.1 s por requisição
+    delays = [budget.reserve(1) for _ in range(4)]
+    assert delays[0] == 0.0
+    assert delays[3] == pytest.approx(0.3, abs=0.02)
+
+    tokens = _RateBudget(rpm=None, tpm=6000)  # 0.01 s por token
+    assert tokens.reserve(50) == 0.0
+    assert tokens.reserve(1) == pytest.approx(0.5, abs=0.02)
+
+
+def test_dispatch_call_usa_backend_compartilhado_com_limites_padrao():
+    assert limits_for("gemini").rpm == 15 and limits_for("ollama").max_concurrency == 1
+    assert limits_for("desconhecido") == BackendLimits()
+
+    sessions = []
+    assert dispatch_call("test-shared", lambda session: sessions.append(session) or "ok") == "ok"
+    assert dispatch_call("test-shared", lambda session: sessions.append(session) or "ok2") == "ok2"
+    # Mesmo pool HTTP nas duas chamadas
+    assert sessions[0] is sessions[1]
+    assert get_dispatcher().backend_stats("test-shared")["requests"] == 2
+
+    def boom(session):
+        raise TimeoutError("lento")
+
+    with pytest.raises(TimeoutError):
+        dispatch_call("test-shared", boom)
+
+
+def test_ensure_backend_avisa_limites_conflitantes(caplog):
+    dispatcher = TranslationDispatcher()
+    try:
+        dispatcher.ensure_backend("ollama", lambda item, session: item)
+        with caplog.at_level("WARNING", logger="core.translation_dispatcher"):
+            dispatcher.ensure_backend("ollama", lambda item, session: item, BackendLimits(max_concurrency=4))
+        assert "limites pedidos ignorados" in caplog.text
+        assert dispatcher._backend("ollama").limits == limits_for("ollama")
+
+        # Mesmos limites do registro vigente: sem aviso
+        caplog.clear()
+        with caplog.at_level("WARNING", logger="core.translation_dispatcher"):
+            dispatcher.ensure_backend("ollama", lambda item, session: item, limits_for("ollama"))
+        assert caplog.text == ""
+    finally:
+        dispatcher.close()
+
+
+def test_ensure_backend_update_limits_substitui_limites():
+    dispatcher = TranslationDispatcher()
+    try:
+        dispatcher.ensure_backend("ollama", lambda item, session: item)
+        assert dispatcher.run("ollama", ["a"])[0].result == "a"
+        novos = BackendLimits(max_concurrency=4, max_retries=0)
+        dispatcher.ensure_backend("ollama", lambda item, session: item.upper(), novos, update_limits=True)
+        assert dispatcher._backend("ollama").limits == novos
+        assert dispatcher.run("ollama", ["b"])[0].result == "B"
+        assert dispatcher.backend_stats("ollama")["requests"] == 2
+    finally:
+        dispatcher.close()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import sys
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.translation_memory import TranslationMemory, open_for_json_cache, source_key
+from core.pc_translation_cache import TranslationCache
+from core.translation_optimizer import TranslationOptimizer
+
+
+def test_chave_exata_e_dimensoes_da_chave(tmp_path):
+    tm = TranslationMemory(tmp_path / "tm.sqlite3")
+    tm.put("You got the SWORD!", "Você pegou a ESPADA!", model="llama")
+    tm.put("YES\nNO", "SIM\nNÃO", model="llama")
+
+    # Quebras de linha, espaços internos e bordas fazem parte da chave
+    assert source_key("You got  the SWORD!") != source_key("You got the SWORD!")
+    assert source_key(" You got the SWORD!") != source_key("You got the SWORD!")
+    assert source_key("Cafe\u0301") == source_key("Café")
+    assert tm.get("YES\nNO", model="llama") == "SIM\nNÃO"
+    assert tm.get("YES NO", model="llama") is None
+    assert tm.get(" You got the SWORD!", model="llama") is None
+    assert tm.get("You got the SWORD!", model="llama") == "Você pegou a ESPADA!"
+    assert tm.get("You got the SWORD!", model="other") is None
+    assert tm.get("You got the SWORD!", model="llama", glossary_version="2") is None
+    assert tm.get("You got the SWORD!", target_lang="es", model="llama") is None
+
+
+def test_get_put_em_lote_e_eviccao_lru(tmp_path):
+    tm = TranslationMemory(tmp_path / "tm.sqlite3")
+    texts = [f"Line {i}" for i in range(50)]
+    assert tm.put_many((t, t.upper()) for t in texts) == 50
+    assert tm.get_many(texts + ["missing"]) == {t: t.upper() for t in texts}
+
+    tm.get_many(texts[:5])
+    tm.flush()
+    # Deixa as 5 primeiras como as mais recentes
+    conn = tm._conn()
+    with conn:
+        conn.execute("UPDATE tm_entries SET last_used = 0 WHERE source NOT IN (?, ?, ?, ?, ?)", texts[:5])
+    assert tm.evict(5) == 45
+    assert sorted(tm.get_many(texts)) == sorted(texts[:5])
+
+
+def test_escritores_concorrentes(tmp_path):
+    tm = TranslationMemory(tmp_path / "tm.sqlite3")
+
+    def worker(n):
+        for i in range(40):
+            tm.put(f"w{n}-{i}", f"t{n}-{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tm) == 240
+    tm.close()
+
+
+def test_importa_formatos_json_antigos(tmp_path):
+    flat = tmp_path / "flat.json"
+    flat.write_text(json.dumps({"Hello": "Olá"}), encoding="utf-8")
+    hashed = tmp_path / "hashed.json"
+    md5 = hashlib.md5(b"Sword").hexdigest()
+    hashed.write_text(json.dumps({md5: "Espada"}), encoding="utf-8")
+    pc = tmp_path / "pc.json"
+    pc.write_text(json.dumps({
+        "metadata": {"version": "1.0"},
+        "translations": {"x": {"original": "Gold", "translated": "Ouro",
+                               "target_language": "Portuguese (Brazil)", "hits": 3}},
+    }), encoding="utf-8")
+
+    tm = TranslationMemory(tmp_path / "tm.sqlite3")
+    assert tm.import_json(flat) == 1
+    assert tm.import_json(flat) == 0  # só uma vez por arquivo
+    assert tm.import_json(hashed) == 1
+    assert tm.import_json(pc) == 1
+
+    assert tm.get("Hello") == "Olá"
+    assert tm.get("Sword", key=md5) == "Espada"
+    assert tm.get("Gold", target_lang="Portuguese (Brazil)") == "Ouro"
+
+
+def test_wrappers_pc_cache_e_optimizer(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUROROM_TM_DB", str(tmp_path / "shared.sqlite3"))
+    cache_json = tmp_path / "translation_cache.json"
+    cache = TranslationCache(str(cache_json))
+    cache.set_batch(["Hero", "Castle"], ["Herói", "Castelo"])
+    cached, uncached = cache.get_batch(["Hero", "Sword", "Castle"])
+    assert cached == {0: "Herói", 2: "Castelo"}
+    assert uncached == [(1, "Sword")]
+    assert cache.get_stats()["total_entries"] == 2
+
+    opt_json = tmp_path / "opt_cache.json"
+    optimizer = TranslationOptimizer(cache_file=str(opt_json))
+    lines = ["The hero found 5 gold coins", "Open the castle gate now"]
+    unique, mapping = optimizer.optimize_text_list(lines)
+    optimizer.reconstruct_translations(["O herói achou 5 moedas", "Abra o portão"], lines, mapping)
+    optimizer.save_cache()
+
+    again = TranslationOptimizer(cache_file=str(opt_json))
+    unique, mapping = again.optimize_text_list(lines)
+    assert unique == []
+    assert again.reconstruct_translations([], lines, mapping) == ["O herói achou 5 moedas", "Abra o portão"]
+    assert len(again.cache) == 4  # banco compartilhado: 2 do pc_cache + 2 do optimizer
+    assert cache.tm.db_path == again.cache.db_path == tmp_path / "shared.sqlite3"
+    assert not opt_json.with_suffix(".sqlite3").exists()
+
+
+def test_todos_os_json_migram_para_um_banco(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUROROM_TM_DB", str(tmp_path / "cache" / "tm.sqlite3"))
+    engine_json = tmp_path / "engine_cache.json"
+    engine_json.write_text(json.dumps({"Hello": "Olá"}), encoding="utf-8")
+    parallel_json = tmp_path / "parallel_cache.json"
+    parallel_json.write_text(json.dumps({"Sword": "Espada"}), encoding="utf-8")
+    # Banco ao lado do JSON criado por versão anterior
+    legacy = TranslationMemory(tmp_path / "old_cache.sqlite3")
+    legacy.put("Gold", "Ouro")
+    legacy.close()
+
+    first = open_for_json_cache(engine_json)
+    second = open_for_json_cache(parallel_json)
+    third = open_for_json_cache(tmp_path / "old_cache.json")
+
+    assert first.db_path == second.db_path == third.db_path == tmp_path / "cache" / "tm.sqlite3"
+    assert not engine_json.with_suffix(".sqlite3").exists()
+    for tm in (first, second, third):
+        assert tm.get("Hello") == "Olá"
+        assert tm.get("Sword") == "Espada"
+        assert tm.get("Gold") == "Ouro"
+    assert third.import_db(tmp_path / "old_cache.sqlite3") == 0  # só uma vez
+
+
+def test_translation_engine_compartilha_cache_entre_modos(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # translator_debug.log é criado no import
+    import core.translation_engine as engine_module
+
+    legacy = tmp_path / "cache_translations.json"
+    legacy.write_text(json.dumps({"Open the door": "Abra a porta"}), encoding="utf-8")
+    monkeypatch.setenv("NEUROROM_TM_DB", str(tmp_path / "tm.sqlite3"))
+    monkeypatch.setattr(engine_module.Config, "CACHE_FILE", str(legacy))
+
+    # O modo que migra o JSON não decide onde as entradas ficam
+    monkeypatch.setattr(engine_module.Config, "MODE", "gemini")
+    first = engine_module.TranslationCache()
+    monkeypatch.setattr(engine_module.Config, "MODE", "nllb")
+    second = engine_module.TranslationCache()
+
+    assert first.get("Open the door") == "Abra a porta"
+    assert second.get("Open the door") == "Abra a porta"
+    first.tm.close()
+    second.tm.close()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opcoes de linha de comando do cache de analise estatica (scripts de lote).
+
+Os lotes so repassam a configuracao aos subprocessos via ambiente; por isso
+este modulo nao importa utils.analysis_cache (o __init__ de utils carrega
+PyQt6/requests). Os nomes das variaveis sao os de utils/analysis_cache.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+
+CACHE_DIR_ENV = "NEUROROM_ANALYSIS_CACHE_DIR"
+CACHE_ENABLED_ENV = "NEUROROM_ANALYSIS_CACHE"
+
+
+def add_analysis_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adiciona --analysis-cache-dir e --no-analysis-cache ao parser."""
+    parser.add_argument(
+        "--analysis-cache-dir",
+        default=None,
+        help="Diretorio do cache de analise estatica por ROM (padrao: ~/.cache/neurorom/analysis).",
+    )
+    parser.add_argument(
+        "--no-analysis-cache",
+        action="store_true",
+        help="Desativa o cache de analise estatica (reanalisa cada ROM).",
+    )
+
+
+def apply_analysis_cache_arguments(args: argparse.Namespace) -> None:
+    """Exporta as opcoes no ambiente (subprocessos herdam a configuracao)."""
+    if args.analysis_cache_dir:
+        os.environ[CACHE_DIR_ENV] = str(Path(args.analysis_cache_dir).expanduser().resolve())
+    if args.no_analysis_cache:
+        os.environ[CACHE_ENABLED_ENV] = "0"
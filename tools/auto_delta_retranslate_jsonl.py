@@ -14,6 +14,8 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
+import time
 import unicodedata
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +23,26 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CORE_DIR = PROJECT_ROOT / "core"
+if str(CORE_DIR) not in sys.path:
+    sys.path.insert(0, str(CORE_DIR))
+
+try:
+    from adaptive_batcher import AdaptiveBatcher
+except Exception:
+    AdaptiveBatcher = None
+
+try:
+    from streaming_pipeline import BoundedMemo, StreamingJsonlPipeline, batch_stage
+except Exception:
+    StreamingJsonlPipeline = None
+
+try:
+    from ollama_client import get_ollama_client
+except Exception:
+    get_ollama_client = None
+
 
 TOKEN_RE = re.compile(r"(\[[^\]]+\]|\{[^}]+\}|<[^>]+>|__PROTECTED__|@[A-Z0-9_]+)")
 WORD_RE = re.compile(r"[A-Za-z']+")
@@ -658,33 +680,41 @@ def lexical_fallback_pt(text: str) -> str:
     return out
 
 
+OLLAMA_BATCH_PREFIX = (
+    "Traduza do ingles para portugues brasileiro.\n"
+    "Mantenha placeholders (__TOK0__, etc.) exatamente.\n"
+    "Nao deixe frases em ingles.\n"
+    "Retorne somente linhas no formato id|||traducao.\n\n"
+)
+
+
 def ollama_translate_batch(
     pairs: List[Tuple[int, str]],
     model: str,
     timeout: int,
 ) -> Dict[int, str]:
     lines = [f"{idx}|||{txt}" for idx, txt in pairs]
-    prompt = (
-        "Traduza do ingles para portugues brasileiro.\n"
-        "Mantenha placeholders (__TOK0__, etc.) exatamente.\n"
-        "Nao deixe frases em ingles.\n"
-        "Retorne somente linhas no formato id|||traducao.\n\n"
-        + "\n".join(lines)
-    )
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": 0.1},
-    }
-    r = requests.post(
-        "http://127.0.0.1:11434/api/generate",
-        json=payload,
-        timeout=max(30, int(timeout)),
-    )
-    r.raise_for_status()
-    data = r.json()
-    raw = str(data.get("response", "") or "")
+    if get_ollama_client is not None:
+        # Instrucoes fixas como prefixo (KV cache do servidor) em sessao quente
+        raw = get_ollama_client(model).generate(
+            "\n".join(lines), prefix=OLLAMA_BATCH_PREFIX,
+            timeout=max(30, int(timeout)), temperature=0.1,
+        )
+    else:
+        payload = {
+            "model": model,
+            "prompt": OLLAMA_BATCH_PREFIX + "\n".join(lines),
+            "stream": False,
+            "options": {"temperature": 0.1},
+        }
+        r = requests.post(
+            "http://127.0.0.1:11434/api/generate",
+            json=payload,
+            timeout=max(30, int(timeout)),
+        )
+        r.raise_for_status()
+        data = r.json()
+        raw = str(data.get("response", "") or "")
 
     out: Dict[int, str] = {}
     for ln in raw.splitlines():
@@ -708,72 +738,11 @@ def parse_max_len(v: Any) -> Optional[int]:
     return None
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="Auto delta retranslate para reduzir unchanged/suspicious.")
-    ap.add_argument("--in-jsonl", required=True)
-    ap.add_argument("--out-jsonl", required=True)
-    ap.add_argument("--model", default="llama3.2:latest")
-    ap.add_argument("--timeout", type=int, default=120)
-    ap.add_argument("--batch-size", type=int, default=16)
-    ap.add_argument("--max-items", type=int, default=2000)
-    args = ap.parse_args()
-
-    in_jsonl = Path(args.in_jsonl).expanduser().resolve()
-    out_jsonl = Path(args.out_jsonl).expanduser().resolve()
-    if not in_jsonl.exists():
-        raise SystemExit(f"[ERRO] in-jsonl nao encontrado: {in_jsonl}")
-
-    rows: List[Dict[str, Any]] = []
-    meta: Optional[Dict[str, Any]] = None
-    candidates: List[Tuple[int, Dict[str, Any], str]] = []
-    by_src: Dict[str, List[int]] = {}
-
-    for obj in iter_jsonl(in_jsonl):
-        if obj.get("type") == "meta":
-            meta = dict(obj)
-            continue
-        row = dict(obj)
-        idx = len(rows)
-        rows.append(row)
-
-        src = str(row.get("text_src", ""))
-        dst = str(row.get("text_dst", src))
-        src_norm = normalize_ascii(src)
-        max_len = parse_max_len(row.get("max_len_bytes"))
-        is_translatable = is_translatable_candidate(src)
-        unresolved = is_translatable and ((dst == src) or looks_suspicious_non_pt(dst))
-        forced_dst = choose_forced_override(src_norm, max_len) or choose_forced_override(src, max_len)
-        needs_forced = bool(forced_dst and normalize_ascii(dst) != normalize_ascii(forced_dst))
-        needs_ortho = needs_orthographic_cleanup(src, dst, max_len)
-        if not unresolved and not needs_forced and not needs_ortho:
-            continue
-        if len(candidates) >= int(args.max_items):
-            continue
-
-        protected, mapping = protect_tokens(src)
-        cobj = {
-            "row_index": idx,
-            "src": src,
-            "dst": dst,
-            "protected": protected,
-            "mapping": mapping,
-            "max_len": max_len,
-            "forced_dst": forced_dst,
-            "needs_forced": needs_forced,
-            "needs_ortho": needs_ortho,
-            "unresolved": unresolved,
-            "is_translatable": is_translatable,
-        }
-        candidates.append((idx, cobj, src))
-        if unresolved:
-            by_src.setdefault(src, []).append(idx)
-
-    unique_src = list(by_src.keys())
-    trans_by_src: Dict[str, str] = {}
-    metrics = {
-        "rows_total": len(rows),
-        "targets_total": len(candidates),
-        "targets_unique_src": len(unique_src),
+def new_metrics() -> Dict[str, Any]:
+    return {
+        "rows_total": 0,
+        "targets_total": 0,
+        "targets_unique_src": 0,
         "translated_ok": 0,
         "translated_fail": 0,
         "applied_changed": 0,
@@ -787,23 +756,76 @@ def main() -> int:
         "lexical_fallback_used": 0,
     }
 
-    # Traduz por src unico.
+
+def classify_row(row: Dict[str, Any], idx: int) -> Optional[Dict[str, Any]]:
+    """Alvo de retraducao/override/limpeza para uma linha, ou None."""
+    src = str(row.get("text_src", ""))
+    dst = str(row.get("text_dst", src))
+    src_norm = normalize_ascii(src)
+    max_len = parse_max_len(row.get("max_len_bytes"))
+    is_translatable = is_translatable_candidate(src)
+    unresolved = is_translatable and ((dst == src) or looks_suspicious_non_pt(dst))
+    forced_dst = choose_forced_override(src_norm, max_len) or choose_forced_override(src, max_len)
+    needs_forced = bool(forced_dst and normalize_ascii(dst) != normalize_ascii(forced_dst))
+    needs_ortho = needs_orthographic_cleanup(src, dst, max_len)
+    if not unresolved and not needs_forced and not needs_ortho:
+        return None
+
+    protected, mapping = protect_tokens(src)
+    return {
+        "row_index": idx,
+        "src": src,
+        "dst": dst,
+        "protected": protected,
+        "mapping": mapping,
+        "max_len": max_len,
+        "forced_dst": forced_dst,
+        "needs_forced": needs_forced,
+        "needs_ortho": needs_ortho,
+        "unresolved": unresolved,
+        "is_translatable": is_translatable,
+    }
+
+
+def translate_sources(
+    unique_src: List[str],
+    model: str,
+    timeout: int,
+    batch_size: int,
+    metrics: Dict[str, Any],
+    batcher: Optional[Any] = None,
+) -> Dict[str, str]:
+    """Traduz srcs unicos em lotes (fixos, ou do batcher adaptativo se informado)."""
+    trans_by_src: Dict[str, str] = {}
     protected_unique: List[Tuple[str, str, Dict[str, str]]] = []
     for src in unique_src:
         p, m = protect_tokens(src)
         protected_unique.append((src, p, m))
 
-    batch_size = max(1, int(args.batch_size))
-    for i in range(0, len(protected_unique), batch_size):
-        batch = protected_unique[i : i + batch_size]
+    if batcher is not None:
+        batches = batcher.iter_batches(protected_unique, key=lambda x: x[1])
+    else:
+        batch_size = max(1, int(batch_size) or 16)
+        batches = (protected_unique[i : i + batch_size] for i in range(0, len(protected_unique), batch_size))
+
+    i = 0
+    for batch in batches:
         pairs = [(i + j, txt) for j, (_, txt, _) in enumerate(batch)]
+        i += len(batch)
+        started = time.monotonic()
         try:
-            got = ollama_translate_batch(pairs, model=args.model, timeout=int(args.timeout))
+            got = ollama_translate_batch(pairs, model=model, timeout=int(timeout))
         except Exception:
+            if batcher is not None:
+                batcher.record(len(batch), time.monotonic() - started, ok=False)
             for src, _, _ in batch:
                 trans_by_src[src] = src
                 metrics["translated_fail"] += 1
             continue
+        if batcher is not None:
+            # Resposta que perdeu ids (lote grande demais) conta como falha de parse
+            mapped = sum(1 for rid, _ in pairs if got.get(rid))
+            batcher.record(len(batch), time.monotonic() - started, ok=mapped >= len(pairs) * 0.9)
 
         for rid, (src, _, mapping) in zip([x[0] for x in pairs], batch):
             raw = got.get(rid, "")
@@ -827,70 +849,279 @@ def main() -> int:
                 metrics["translated_ok"] += 1
             else:
                 metrics["translated_fail"] += 1
+    return trans_by_src
+
+
+def apply_row(row: Dict[str, Any], cobj: Dict[str, Any], trans_by_src: Dict[str, str],
+              metrics: Dict[str, Any]) -> None:
+    """Aplica o patch de um alvo na linha (in-place) se passar nos gates."""
+    src = cobj["src"]
+    forced_dst = cobj.get("forced_dst")
+    needs_forced = bool(cobj.get("needs_forced"))
+    needs_ortho = bool(cobj.get("needs_ortho"))
+    if needs_forced:
+        metrics["forced_targets_total"] += 1
+    if needs_ortho:
+        metrics["ortho_targets_total"] += 1
+    if forced_dst:
+        dst = str(forced_dst)
+    else:
+        src_norm = normalize_ascii(src)
+        dst = (
+            MANUAL_OVERRIDES.get(src_norm)
+            or MANUAL_OVERRIDES.get(src)
+            or trans_by_src.get(src, str(cobj.get("dst", src)))
+        )
+    max_len = cobj.get("max_len")
+    dst = normalize_ascii(dst)
+    if (dst == src) or looks_suspicious_non_pt(dst):
+        forced = lexical_fallback_pt(src)
+        if forced and forced != src:
+            dst = forced
+    dst_before_ortho = dst
+    apply_cleanup = bool(cobj.get("is_translatable")) or needs_forced or needs_ortho
+    if apply_cleanup:
+        dst = apply_orthographic_cleanup(src, dst, max_len)
+        dst = compact_to_fit(dst, max_len)
+
+    if not placeholders_preserved(src, dst):
+        metrics["blocked_placeholder"] += 1
+        return
+    if not can_fit_ascii(dst, max_len):
+        metrics["blocked_fit"] += 1
+        return
+    try:
+        dst.encode("ascii", errors="strict")
+    except UnicodeEncodeError:
+        metrics["blocked_non_ascii"] += 1
+        return
+    if dst == src:
+        return
+
+    row["text_dst"] = dst
+    row["translation_status"] = "OK"
+    row.pop("translation_block_reason", None)
+    metrics["applied_changed"] += 1
+    if needs_forced:
+        metrics["forced_applied"] += 1
+    if needs_ortho and normalize_ascii(dst) != normalize_ascii(dst_before_ortho):
+        metrics["ortho_applied"] += 1
+
+
+def _delta_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
+    m = dict(meta)
+    m["stage"] = "translated_fixed_ptbr_auto_delta"
+    m["generated_at"] = datetime.now().isoformat(timespec="seconds")
+    return m
+
+
+def run_streaming(
+    in_jsonl: Path,
+    out_jsonl: Path,
+    model: str,
+    timeout: int,
+    batch_size: int,
+    max_items: int,
+    window: int = 512,
+    memo_size: int = 50_000,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Versao em streaming: leitura -> alvo -> dedupe+traducao por janela ->
+    gates -> escrita, com checkpoint/retomada. O meta sai na posicao em que
+    aparece na entrada (normalmente a primeira linha).
+    """
+    if StreamingJsonlPipeline is None:
+        raise RuntimeError("core/streaming_pipeline.py indisponivel")
+
+    memo = BoundedMemo(memo_size)
+    batcher = None
+    if int(batch_size) <= 0 and AdaptiveBatcher is not None:
+        batcher = AdaptiveBatcher(model=model, initial_size=16, max_size=128)
+    pipeline: Optional[StreamingJsonlPipeline] = None
+
+    def _targets(records):
+        counters = dict(pipeline.state.get("metrics") or new_metrics())
+        for rec in records:
+            if rec.data.get("type") == "meta":
+                rec.meta["is_meta"] = True
+            else:
+                counters["rows_total"] += 1
+                cobj = classify_row(rec.data, counters["rows_total"] - 1)
+                if cobj is not None and counters["targets_total"] < int(max_items):
+                    counters["targets_total"] += 1
+                    rec.meta["cobj"] = cobj
+            rec.meta["counters"] = dict(counters)
+            yield rec
+
+    translate_counters: Dict[str, Any] = {}
+
+    def _translate_window(window_records):
+        if not translate_counters:
+            committed = pipeline.state.get("metrics") or new_metrics()
+            for key in ("targets_unique_src", "translated_ok", "translated_fail", "lexical_fallback_used"):
+                translate_counters[key] = int(committed.get(key, 0))
+        pending: List[str] = []
+        for rec in window_records:
+            cobj = rec.meta.get("cobj")
+            if cobj and cobj["unresolved"] and cobj["src"] not in memo and cobj["src"] not in pending:
+                pending.append(cobj["src"])
+        if pending:
+            translate_counters["targets_unique_src"] += len(pending)
+            got = translate_sources(pending, model, timeout, batch_size, translate_counters, batcher)
+            for src, dst in got.items():
+                memo.put(src, dst)
+        by_src = {}
+        for rec in window_records:
+            cobj = rec.meta.get("cobj")
+            if cobj and cobj["src"] in memo:
+                by_src[cobj["src"]] = memo.get(cobj["src"])
+        snapshot = dict(translate_counters)
+        for rec in window_records:
+            rec.meta["by_src"] = by_src
+            rec.meta["translate"] = snapshot
+            yield rec
+
+    apply_counters: Dict[str, Any] = {}
+
+    def _apply(records):
+        if not apply_counters:
+            committed = pipeline.state.get("metrics") or new_metrics()
+            for key in ("applied_changed", "forced_targets_total", "forced_applied", "ortho_targets_total",
+                        "ortho_applied", "blocked_fit", "blocked_placeholder", "blocked_non_ascii"):
+                apply_counters[key] = int(committed.get(key, 0))
+        for rec in records:
+            if rec.meta.get("is_meta"):
+                rec.data = _delta_meta(rec.data)
+            elif rec.meta.get("cobj"):
+                apply_row(rec.data, rec.meta["cobj"], rec.meta["by_src"], apply_counters)
+            rec.meta["apply"] = dict(apply_counters)
+            yield rec
+
+    def _on_record(rec, state):
+        metrics = dict(rec.meta["counters"])
+        metrics.update(rec.meta["translate"])
+        metrics.update(rec.meta["apply"])
+        state["metrics"] = metrics
+
+    pipeline = StreamingJsonlPipeline(
+        in_jsonl,
+        out_jsonl,
+        stages=[_targets, batch_stage(_translate_window, window), _apply],
+        queue_size=max(64, window),
+        resume=resume,
+        on_record=_on_record,
+    )
+    summary = pipeline.run()
+    if summary["resumed"]:
+        print(f"[RESUME] Retomado a partir do registro {summary['resumed_from']}")
+    metrics = new_metrics()
+    metrics.update(summary["state"].get("metrics") or {})
+    if batcher is not None:
+        metrics["adaptive_batch"] = batcher.stats()
+    return metrics
+
+
+def run_in_memory(
+    in_jsonl: Path,
+    out_jsonl: Path,
+    model: str,
+    timeout: int,
+    batch_size: int,
+    max_items: int,
+) -> Dict[str, Any]:
+    """Fluxo original: carrega tudo, traduz srcs unicos do arquivo inteiro e grava."""
+    rows: List[Dict[str, Any]] = []
+    meta: Optional[Dict[str, Any]] = None
+    candidates: List[Tuple[int, Dict[str, Any], str]] = []
+    by_src: Dict[str, List[int]] = {}
 
-    # Aplica patch.
-    for idx, cobj, src in candidates:
-        row = rows[idx]
-        forced_dst = cobj.get("forced_dst")
-        needs_forced = bool(cobj.get("needs_forced"))
-        needs_ortho = bool(cobj.get("needs_ortho"))
-        if needs_forced:
-            metrics["forced_targets_total"] += 1
-        if needs_ortho:
-            metrics["ortho_targets_total"] += 1
-        if forced_dst:
-            dst = str(forced_dst)
-        else:
-            src_norm = normalize_ascii(src)
-            dst = (
-                MANUAL_OVERRIDES.get(src_norm)
-                or MANUAL_OVERRIDES.get(src)
-                or trans_by_src.get(src, str(cobj.get("dst", src)))
-            )
-        max_len = cobj.get("max_len")
-        dst = normalize_ascii(dst)
-        if (dst == src) or looks_suspicious_non_pt(dst):
-            forced = lexical_fallback_pt(src)
-            if forced and forced != src:
-                dst = forced
-        dst_before_ortho = dst
-        apply_cleanup = bool(cobj.get("is_translatable")) or needs_forced or needs_ortho
-        if apply_cleanup:
-            dst = apply_orthographic_cleanup(src, dst, max_len)
-            dst = compact_to_fit(dst, max_len)
-
-        if not placeholders_preserved(src, dst):
-            metrics["blocked_placeholder"] += 1
-            continue
-        if not can_fit_ascii(dst, max_len):
-            metrics["blocked_fit"] += 1
+    for obj in iter_jsonl(in_jsonl):
+        if obj.get("type") == "meta":
+            meta = dict(obj)
             continue
-        try:
-            dst.encode("ascii", errors="strict")
-        except UnicodeEncodeError:
-            metrics["blocked_non_ascii"] += 1
+        row = dict(obj)
+        idx = len(rows)
+        rows.append(row)
+
+        cobj = classify_row(row, idx)
+        if cobj is None:
             continue
-        if dst == src:
+        if len(candidates) >= int(max_items):
             continue
+        candidates.append((idx, cobj, cobj["src"]))
+        if cobj["unresolved"]:
+            by_src.setdefault(cobj["src"], []).append(idx)
 
-        row["text_dst"] = dst
-        row["translation_status"] = "OK"
-        row.pop("translation_block_reason", None)
-        metrics["applied_changed"] += 1
-        if needs_forced:
-            metrics["forced_applied"] += 1
-        if needs_ortho and normalize_ascii(dst) != normalize_ascii(dst_before_ortho):
-            metrics["ortho_applied"] += 1
+    unique_src = list(by_src.keys())
+    metrics = new_metrics()
+    metrics["rows_total"] = len(rows)
+    metrics["targets_total"] = len(candidates)
+    metrics["targets_unique_src"] = len(unique_src)
+
+    # Traduz por src unico.
+    batcher = None
+    if int(batch_size) <= 0 and AdaptiveBatcher is not None:
+        batcher = AdaptiveBatcher(model=model, initial_size=16, max_size=128)
+    trans_by_src = translate_sources(unique_src, model, timeout, batch_size, metrics, batcher)
+    if batcher is not None:
+        metrics["adaptive_batch"] = batcher.stats()
+
+    # Aplica patch.
+    for idx, cobj, src in candidates:
+        apply_row(rows[idx], cobj, trans_by_src, metrics)
 
     out_jsonl.parent.mkdir(parents=True, exist_ok=True)
     with out_jsonl.open("w", encoding="utf-8", newline="\n") as f:
         if meta is not None:
-            m = dict(meta)
-            m["stage"] = "translated_fixed_ptbr_auto_delta"
-            m["generated_at"] = datetime.now().isoformat(timespec="seconds")
-            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+            f.write(json.dumps(_delta_meta(meta), ensure_ascii=False) + "\n")
         for row in rows:
             f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return metrics
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Auto delta retranslate para reduzir unchanged/suspicious.")
+    ap.add_argument("--in-jsonl", required=True)
+    ap.add_argument("--out-jsonl", required=True)
+    ap.add_argument("--model", default="llama3.2:latest")
+    ap.add_argument("--timeout", type=int, default=120)
+    ap.add_argument("--batch-size", type=int, default=16, help="Itens por lote (0 = adaptativo por tokens/latencia)")
+    ap.add_argument("--max-items", type=int, default=2000)
+    ap.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipeline em streaming (memoria limitada + checkpoint/retomada) para JSONL grandes",
+    )
+    ap.add_argument("--stream-window", type=int, default=512, help="Linhas por janela de traducao no --stream")
+    ap.add_argument("--no-resume", action="store_true", help="Ignora checkpoint anterior no --stream")
+    args = ap.parse_args()
+
+    in_jsonl = Path(args.in_jsonl).expanduser().resolve()
+    out_jsonl = Path(args.out_jsonl).expanduser().resolve()
+    if not in_jsonl.exists():
+        raise SystemExit(f"[ERRO] in-jsonl nao encontrado: {in_jsonl}")
+
+    if args.stream:
+        metrics = run_streaming(
+            in_jsonl,
+            out_jsonl,
+            model=args.model,
+            timeout=int(args.timeout),
+            batch_size=int(args.batch_size),
+            max_items=int(args.max_items),
+            window=max(1, int(args.stream_window)),
+            resume=not args.no_resume,
+        )
+    else:
+        metrics = run_in_memory(
+            in_jsonl,
+            out_jsonl,
+            model=args.model,
+            timeout=int(args.timeout),
+            batch_size=int(args.batch_size),
+            max_items=int(args.max_items),
+        )
 
     report_path = out_jsonl.with_name(out_jsonl.stem + "_auto_delta_report.txt")
     proof_path = out_jsonl.with_name(out_jsonl.stem + "_auto_delta_proof.json")
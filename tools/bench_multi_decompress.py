@@ -0,0 +1,87 @@
+# tools/bench_multi_decompress.py
+# Micro-benchmark do MultiDecompress: tempo de descompressão por algoritmo
+# em blocos sintéticos comprimidos pelo MultiCompress (com verificação round-trip).
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from universal_kit.multi_compress import MultiCompress  # noqa: E402
+from universal_kit.multi_decompress import CompressionAlgorithm, MultiDecompress  # noqa: E402
+
+DEFAULT_ALGORITHMS = "RLE,LZSS,LZ77,LZ10,LZ11,Yay0,Yaz0"
+
+
+def build_payload(size: int, kind: str, seed: int) -> bytes:
+    """
+    Gera bloco sintético:
+    - text: frases repetidas (muitas referências longas)
+    - tiles: sequência de tiles de 32 bytes (padrões curtos e repetidos)
+    - mixed: texto entremeado com bytes aleatórios
+    """
+    rng = random.Random(seed)
+    if kind == "tiles":
+        tiles = [bytes(rng.choice((0x00, 0x11, 0x22, rng.randrange(256))) for _ in range(32))
+                 for _ in range(16)]
+        out = bytearray()
+        while len(out) < size:
+            out += rng.choice(tiles)
+        return bytes(out[:size])
+    words = [b"HERO", b"SWORD", b"the", b"of", b"castle", b"GOLD", b"you", b"found"]
+    out = bytearray()
+    while len(out) < size:
+        out += rng.choice(words) + b" "
+        if kind == "mixed" and rng.random() < 0.2:
+            out += bytes(rng.randrange(256) for _ in range(rng.randrange(1, 6)))
+    return bytes(out[:size])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes-kb", default="4,32,128", help="Tamanhos dos blocos em KB")
+    ap.add_argument("--kind", default="text", choices=["text", "tiles", "mixed"])
+    ap.add_argument("--algorithms", default=DEFAULT_ALGORITHMS,
+                    help="Algoritmos (valores de CompressionAlgorithm)")
+    ap.add_argument("--repeat", type=int, default=5, help="Repetições por medição (usa a melhor)")
+    ap.add_argument("--seed", type=int, default=1234)
+    args = ap.parse_args()
+
+    sizes = [int(x) for x in args.sizes_kb.split(",") if x.strip()]
+    algorithms = [CompressionAlgorithm(x.strip()) for x in args.algorithms.split(",") if x.strip()]
+    compressor = MultiCompress()
+    decompressor = MultiDecompress()
+
+    print(f"{'bloco':>7} | {'algoritmo':<9} | {'comprimido':>10} | {'tempo (ms)':>10} | {'MB/s':>8}")
+    print("-" * 58)
+    for size_kb in sizes:
+        payload = build_payload(size_kb * 1024, args.kind, args.seed)
+        for algo in algorithms:
+            packed = compressor.compress(payload, algo)
+            if not packed.success:
+                print(f"{size_kb:>5}KB | {algo.value:<9} | [ERRO] {packed.error}")
+                continue
+
+            best = float("inf")
+            result = None
+            for _ in range(max(1, args.repeat)):
+                start = time.perf_counter()
+                result = decompressor.decompress(packed.data, algo, packed.params)
+                best = min(best, time.perf_counter() - start)
+
+            if result is None or not result.success or result.data != payload:
+                print(f"{size_kb:>5}KB | {algo.value:<9} | [ERRO] round-trip divergente")
+                return 1
+            throughput = (len(payload) / (1024 * 1024)) / best if best > 0 else float("inf")
+            print(f"{size_kb:>5}KB | {algo.value:<9} | {len(packed.data):>10} | "
+                  f"{best * 1000:>10.2f} | {throughput:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+# tools/bench_ollama_client.py
+# Servidor Ollama simulado (stub local) + benchmark offline: uma requisição
+# por texto (requests.post) vs OllamaClient com sessão quente e coalescência.
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+_ID_LINE_RE = re.compile(r"^(\d+)\|\|\|(.*)$")
+
+
+def fake_translate(text: str) -> str:
+    """Tradução determinística do stub."""
+    return f"[pt] {text.strip()}"
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1 if text else 0
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class OllamaStubServer:
+    """
+    Imita /api/generate e /api/tags do Ollama com custo simulado:
+    - carga do modelo (primeira vez, keep_alive=0 ou options diferentes)
+    - prefill por token do prompt fora do prefixo em cache (por modelo)
+    - geração por token de saída + overhead fixo por requisição
+    Requisições são atendidas uma por vez (OLLAMA_NUM_PARALLEL=1).
+
+    Uso:
+        with OllamaStubServer() as stub:
+            client = OllamaClient("m", base_url=stub.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        translate: Callable[[str], str] = fake_translate,
+        request_latency: float = 0.01,
+        load_latency: float = 0.2,
+        prefill_per_token: float = 0.0002,
+        decode_per_token: float = 0.001,
+    ):
+        self.translate = translate
+        self.request_latency = request_latency
+        self.load_latency = load_latency
+        self.prefill_per_token = prefill_per_token
+        self.decode_per_token = decode_per_token
+
+        self._gpu = threading.Lock()
+        self._loaded: Dict[str, Any] = {}       # modelo -> options carregadas
+        self._kv_prompt: Dict[str, str] = {}    # modelo -> último prompt (KV cache)
+        self.stats = {"requests": 0, "connections": 0, "model_loads": 0,
+                      "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+        self._stats_lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._stats_lock:
+                    stub.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, code: int, obj: Dict[str, Any]):
+                data = json.dumps(obj).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._reply(200, {"models": [{"name": m} for m in stub._loaded]})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._reply(400, {"error": "invalid json"})
+                    return
+                if self.path != "/api/generate":
+                    self._reply(404, {"error": "not found"})
+                    return
+                self._reply(200, stub._generate(payload))
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _respond(self, prompt: str) -> str:
+        id_lines = [m for m in (_ID_LINE_RE.match(ln.strip()) for ln in prompt.splitlines()) if m]
+        if id_lines:
+            # translate() -> None simula o modelo pulando a linha
+            out = ((m.group(1), self.translate(m.group(2))) for m in id_lines)
+            return "\n".join(f"{idx}|||{txt}" for idx, txt in out if txt is not None)
+        lines = [ln for ln in prompt.splitlines() if ln.strip()]
+        last = lines[-1] if lines else ""
+        for ln in reversed(lines):
+            if re.match(r"^(Texto|Text|English):", ln):
+                last = ln.split(":", 1)[1]
+                break
+        return self.translate(last) or ""
+
+    def _generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        model = str(payload.get("model") or "")
+        options = payload.get("options") or {}
+        prompt = str(payload.get("prompt") or "")
+        full = f"{payload.get('system') or ''}\n{prompt}"
+        with self._gpu:
+            cost = self.request_latency
+            if model not in self._loaded or self._loaded[model] != options:
+                cost += self.load_latency
+                self._loaded[model] = options
+                self._kv_prompt.pop(model, None)
+                with self._stats_lock:
+                    self.stats["model_loads"] += 1
+            response = self._respond(prompt) if prompt else ""
+            cached = _tokens(full[:_common_prefix_len(full, self._kv_prompt.get(model, ""))])
+            total = _tokens(full) if prompt else 0
+            evaluated = max(0, total - cached)
+            out_tokens = _tokens(response)
+            cost += evaluated * self.prefill_per_token + out_tokens * self.decode_per_token
+            time.sleep(cost)
+            if prompt:
+                self._kv_prompt[model] = full
+            if payload.get("keep_alive") in (0, "0", "0s"):
+                self._loaded.pop(model, None)
+                self._kv_prompt.pop(model, None)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += evaluated
+            self.stats["cached_tokens"] += min(cached, total)
+            self.stats["output_tokens"] += out_tokens
+        return {"model": model, "response": response, "done": True,
+                "prompt_eval_count": evaluated, "eval_count": out_tokens}
+
+    def start(self) -> "OllamaStubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="ollama-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+BENCH_SYSTEM = "Voce e tradutor profissional de jogos retro. Responda apenas em portugues brasileiro."
+BENCH_SINGLE_PREFIX = "Traduza para portugues brasileiro natural e curto.\n- Retorne SOMENTE a traducao.\n"
+BENCH_ID_PREFIX = (
+    "Traduza do ingles para portugues brasileiro.\n"
+    "Retorne SOMENTE linhas no formato id|||traducao.\n\n"
+)
+
+
+def bench_naive(base_url: str, texts, workers: int) -> float:
+    import requests
+
+    def one(text):
+        r = requests.post(f"{base_url}/api/generate", json={
+            "model": "bench", "system": BENCH_SYSTEM, "stream": False,
+            "prompt": f"{BENCH_SINGLE_PREFIX}Texto: {text}\nTradução:",
+        }, timeout=60)
+        return r.json()["response"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, texts))
+    return time.perf_counter() - start
+
+
+def bench_client(base_url: str, texts, workers: int, max_items: int) -> float:
+    from core.ollama_client import OllamaClient, OllamaCoalescer
+
+    client = OllamaClient("bench", base_url=base_url, system=BENCH_SYSTEM)
+    coalescer = OllamaCoalescer(client, BENCH_ID_PREFIX, max_items=max_items, max_wait=0.005)
+    client.warm()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(coalescer.translate, texts))
+    elapsed = time.perf_counter() - start
+    coalescer.close()
+    client.close()
+    return elapsed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--serve", action="store_true", help="Só sobe o stub e fica ouvindo")
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--texts", type=int, default=200, help="Strings curtas no benchmark")
+    ap.add_argument("--workers", type=int, default=8, help="Threads chamadoras")
+    ap.add_argument("--max-items", type=int, default=16, help="Itens por prompt coalescido")
+    args = ap.parse_args()
+
+    if args.serve:
+        stub = OllamaStubServer(port=args.port or 11434)
+        print(f"stub Ollama em {stub.base_url} (Ctrl+C para sair)")
+        try:
+            stub.httpd.serve_forever()
+        except KeyboardInterrupt:
+            stub.stop()
+        return 0
+
+    texts = [f"Menu label number {i}" for i in range(args.texts)]
+    print(f"{'modo':<22} {'tempo(s)':>9} {'strings/s':>10} {'reqs':>6} {'conns':>6} {'tok_prompt':>11}")
+    for name in ("requisicao_por_texto", "cliente_coalescido"):
+        with OllamaStubServer(port=args.port) as stub:
+            if name == "requisicao_por_texto":
+                elapsed = bench_naive(stub.base_url, texts, args.workers)
+            else:
+                elapsed = bench_client(stub.base_url, texts, args.workers, args.max_items)
+            s = stub.stats
+            print(f"{name:<22} {elapsed:>9.3f} {len(texts) / elapsed:>10.1f} "
+                  f"{s['requests']:>6} {s['connections']:>6} {s['prompt_tokens']:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -21,6 +21,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    from analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+except ImportError:  # python -m tools.<script>
+    from tools.analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+
 
 ROM_EXTS = {".nes", ".sms", ".gg", ".md", ".gen", ".smd", ".smc", ".sfc", ".gba", ".bin", ".z64", ".n64", ".v64"}
 
@@ -476,7 +481,9 @@ def main() -> int:
         action="store_true",
         help="Quando faltar {CRC}_pure_text.jsonl, tenta gerar automaticamente via universal_translator",
     )
+    add_analysis_cache_arguments(ap)
     args = ap.parse_args()
+    apply_analysis_cache_arguments(args)
 
     roms_root = Path(args.roms_root).expanduser().resolve() if args.roms_root else (Path(__file__).resolve().parents[1] / "ROMs")
     if not roms_root.exists():
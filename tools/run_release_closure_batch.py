@@ -21,6 +21,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+try:
+    from analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+except ImportError:  # python -m tools.<script>
+    from tools.analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CORE_DIR = PROJECT_ROOT / "core"
@@ -760,6 +765,11 @@ def main() -> int:
     ap.add_argument("--allow-last-resort-truncate", action="store_true")
     ap.add_argument("--force-translate", action="store_true", help="Regera translated_jsonl mesmo se ja existir")
     ap.add_argument("--skip-auto-delta", action="store_true", help="Nao roda auto-delta patch no batch.")
+    ap.add_argument(
+        "--adaptive-batch",
+        action="store_true",
+        help="Auto-delta com lotes adaptativos (tokens + latencia) em vez de --batch-size fixo.",
+    )
     ap.add_argument(
         "--require-manual-emulator",
         action="store_true",
@@ -770,7 +780,9 @@ def main() -> int:
         default=None,
         help="JSON opcional com PASS/FAIL manual por CRC (ex.: ROMs/emulator_smoke_results.json)",
     )
+    add_analysis_cache_arguments(ap)
     args = ap.parse_args()
+    apply_analysis_cache_arguments(args)
 
     roms_root = Path(args.roms_root).expanduser().resolve() if args.roms_root else (PROJECT_ROOT / "ROMs")
     if not roms_root.exists():
@@ -916,7 +928,7 @@ def main() -> int:
                 in_jsonl=Path(translated_path),
                 model=args.model,
                 timeout_s=max(60, int(args.timeout)),
-                batch_size=max(1, int(args.batch_size)),
+                batch_size=0 if args.adaptive_batch else max(1, int(args.batch_size)),
             )
         row["auto_delta_patch_info"] = auto_delta_info
         if auto_delta_info.get("ok") and auto_delta_info.get("out_jsonl"):
@@ -15,6 +15,11 @@ from pathlib import Path
 import subprocess
 from typing import Dict
 
+try:
+    from analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+except ImportError:  # python -m tools.<script>
+    from tools.analysis_cache_cli import add_analysis_cache_arguments, apply_analysis_cache_arguments
+
 ROM_EXTS_BY_CONSOLE = {
     "master system": {".sms", ".sg", ".gg"},
     "nintendinho": {".nes"},
@@ -157,7 +162,9 @@ def main() -> int:
         default=0,
         help="Limitar numero de ROMs (0 = sem limite).",
     )
+    add_analysis_cache_arguments(parser)
     args = parser.parse_args()
+    apply_analysis_cache_arguments(args)
 
     config_path = Path(args.config)
     if not config_path.exists():
@@ -9,6 +9,8 @@ Objetivo:
 - Preserva placeholders/tokens
 - Nao excede max_len_bytes (fallback para texto original)
 - Gera report/proof com metricas reais
+- Modo --stream: pipeline em estagios com memoria limitada e retomada
+  por checkpoint (extracoes PS1/N64 grandes)
 """
 
 from __future__ import annotations
@@ -16,6 +18,7 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 import unicodedata
 from datetime import datetime
 from pathlib import Path
@@ -23,6 +26,21 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CORE_DIR = PROJECT_ROOT / "core"
+if str(CORE_DIR) not in sys.path:
+    sys.path.insert(0, str(CORE_DIR))
+
+try:
+    from streaming_pipeline import BoundedMemo, StreamingJsonlPipeline, batch_stage, map_stage
+except Exception:
+    StreamingJsonlPipeline = None
+
+try:
+    from ollama_client import get_ollama_client
+except Exception:
+    get_ollama_client = None
+
 
 HEX_TOKEN_RE = re.compile(r"\[[0-9A-Fa-f]{2}\]")
 GENERIC_TOKEN_RE = re.compile(
@@ -634,6 +652,10 @@ def _ollama_generate(
     timeout: int,
     temperature: float = 0.0,
 ) -> str:
+    # Sessao quente por modelo (keep-alive HTTP + keep_alive do modelo); os
+    # prompts abrem com as instrucoes fixas, reaproveitando o KV cache.
+    if get_ollama_client is not None:
+        return get_ollama_client(model).generate(prompt, timeout=timeout, temperature=temperature)
     payload = {
         "model": model,
         "prompt": prompt,
@@ -904,13 +926,8 @@ def build_chain_translations(
     return chain_by_id, metrics
 
 
-def collect_candidates(
-    pure_jsonl: Path,
-    max_unique: int,
-) -> Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, Any], Dict[str, Any]]:
-    unique_candidates: Dict[str, str] = {}
-    candidate_rows: List[Dict[str, Any]] = []
-    stats = {
+def new_candidate_stats() -> Dict[str, Any]:
+    return {
         "items_total": 0,
         "safe_items": 0,
         "review_fragment_items": 0,
@@ -919,6 +936,66 @@ def collect_candidates(
         "candidate_unique": 0,
         "candidate_truncated_by_cap": 0,
     }
+
+
+def classify_candidate(obj: Dict[str, Any], stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Filtro por item (nao-meta): retorna a linha candidata ou None, contando em stats."""
+    stats["items_total"] += 1
+    src = str(obj.get("text_src", ""))
+    blocked_unmapped, _ratio, _unmapped_count, _glyph_count = _is_unmapped_glyph_blocked(obj, src)
+    if blocked_unmapped:
+        stats["blocked_unmapped_glyphs"] += 1
+        return None
+
+    safe_mode = bool(obj.get("reinsertion_safe", False))
+    allow_review_fragment = False
+    if safe_mode:
+        stats["safe_items"] += 1
+        if bool(obj.get("needs_review", False)):
+            return None
+        rv = obj.get("review_flags")
+        if isinstance(rv, list) and len(rv) > 0:
+            return None
+    else:
+        allow_review_fragment = _allow_review_fragment_candidate(obj)
+        if not allow_review_fragment:
+            return None
+        stats["review_fragment_items"] += 1
+
+    ok, cleaned = is_candidate(src)
+    if not ok:
+        return None
+    stats["candidate_items"] += 1
+    item_id = parse_optional_int(obj.get("id"))
+    if item_id is None:
+        item_id = int(stats["items_total"])
+    seq_val = parse_optional_int(obj.get("seq"))
+    if seq_val is None:
+        seq_val = int(stats["candidate_items"] - 1)
+    off_val = parse_optional_int(obj.get("rom_offset", obj.get("offset")))
+    if off_val is None:
+        off_val = 0
+    max_len = parse_optional_int(obj.get("max_len_bytes"))
+    if max_len is None:
+        max_len = parse_optional_int(obj.get("max_len"))
+    return {
+        "id": int(item_id),
+        "seq": int(seq_val),
+        "offset_int": int(off_val),
+        "text_src": src,
+        "cleaned": cleaned,
+        "max_len_bytes": int(max_len) if max_len is not None else None,
+        "allow_review_fragment": bool(allow_review_fragment),
+    }
+
+
+def collect_candidates(
+    pure_jsonl: Path,
+    max_unique: int,
+) -> Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, Any], Dict[str, Any]]:
+    unique_candidates: Dict[str, str] = {}
+    candidate_rows: List[Dict[str, Any]] = []
+    stats = new_candidate_stats()
     meta: Dict[str, Any] = {}
 
     for obj in iter_jsonl(pure_jsonl):
@@ -926,60 +1003,16 @@ def collect_candidates(
             meta = obj
             continue
 
-        stats["items_total"] += 1
-        src = str(obj.get("text_src", ""))
-        blocked_unmapped, _ratio, _unmapped_count, _glyph_count = _is_unmapped_glyph_blocked(obj, src)
-        if blocked_unmapped:
-            stats["blocked_unmapped_glyphs"] += 1
+        row = classify_candidate(obj, stats)
+        if row is None:
             continue
-
-        safe_mode = bool(obj.get("reinsertion_safe", False))
-        allow_review_fragment = False
-        if safe_mode:
-            stats["safe_items"] += 1
-            if bool(obj.get("needs_review", False)):
-                continue
-            rv = obj.get("review_flags")
-            if isinstance(rv, list) and len(rv) > 0:
-                continue
-        else:
-            allow_review_fragment = _allow_review_fragment_candidate(obj)
-            if not allow_review_fragment:
-                continue
-            stats["review_fragment_items"] += 1
-
-        ok, cleaned = is_candidate(src)
-        if not ok:
-            continue
-        stats["candidate_items"] += 1
-        item_id = parse_optional_int(obj.get("id"))
-        if item_id is None:
-            item_id = int(stats["items_total"])
-        seq_val = parse_optional_int(obj.get("seq"))
-        if seq_val is None:
-            seq_val = int(stats["candidate_items"] - 1)
-        off_val = parse_optional_int(obj.get("rom_offset", obj.get("offset")))
-        if off_val is None:
-            off_val = 0
-        max_len = parse_optional_int(obj.get("max_len_bytes"))
-        if max_len is None:
-            max_len = parse_optional_int(obj.get("max_len"))
-        candidate_rows.append(
-            {
-                "id": int(item_id),
-                "seq": int(seq_val),
-                "offset_int": int(off_val),
-                "text_src": src,
-                "cleaned": cleaned,
-                "max_len_bytes": int(max_len) if max_len is not None else None,
-                "allow_review_fragment": bool(allow_review_fragment),
-            }
-        )
+        candidate_rows.append(row)
+        src = row["text_src"]
         if src not in unique_candidates:
             if len(unique_candidates) >= max_unique:
                 stats["candidate_truncated_by_cap"] += 1
                 continue
-            unique_candidates[src] = cleaned
+            unique_candidates[src] = row["cleaned"]
 
     stats["candidate_unique"] = len(unique_candidates)
     return candidate_rows, unique_candidates, stats, meta
@@ -1090,16 +1123,8 @@ def build_translations(
     return translated, metrics
 
 
-def apply_translations(
-    pure_jsonl: Path,
-    out_jsonl: Path,
-    translated_by_src: Dict[str, str],
-    translated_by_id: Optional[Dict[int, str]] = None,
-    fallback_meta: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    out_jsonl.parent.mkdir(parents=True, exist_ok=True)
-
-    m = {
+def new_output_metrics() -> Dict[str, Any]:
+    return {
         "items_total": 0,
         "meta_written": False,
         "text_changed": 0,
@@ -1113,6 +1138,161 @@ def apply_translations(
         "chain_overrides_used": 0,
     }
 
+
+def _cmp_norm(s: str) -> str:
+    t = ICON_RE.sub(" ", s or "")
+    t = re.sub(r"\s+", " ", t).strip().lower()
+    return t
+
+
+def synth_translated_meta(fb: Dict[str, Any], pure_jsonl: Path) -> Dict[str, Any]:
+    """Header/meta sintetico quando a entrada nao tem meta (trava CRC/SIZE na reinsercao)."""
+    return {
+        "type": "meta",
+        "schema": "neurorom.translated_jsonl.v1",
+        "rom_crc32": str(fb.get("rom_crc32") or "").upper() or None,
+        "rom_size": fb.get("rom_size"),
+        "stage": "translated_fixed_ptbr",
+        "ordering": "seq/rom_offset",
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "source_pure_jsonl": str(pure_jsonl),
+        "generated_from_missing_meta": True,
+    }
+
+
+def finalize_meta(obj: Dict[str, Any], fb: Dict[str, Any]) -> Dict[str, Any]:
+    meta = dict(obj)
+    if not meta.get("rom_crc32"):
+        meta["rom_crc32"] = str(fb.get("rom_crc32") or "").upper() or None
+    if meta.get("rom_size") in (None, "", 0):
+        meta["rom_size"] = fb.get("rom_size")
+    meta["stage"] = "translated_fixed_ptbr"
+    meta["ordering"] = "seq/rom_offset"
+    meta["generated_at"] = datetime.now().isoformat(timespec="seconds")
+    return meta
+
+
+def finalize_row(
+    obj: Dict[str, Any],
+    translated_by_src: Dict[str, str],
+    translated_by_id: Optional[Dict[int, str]],
+    m: Dict[str, Any],
+) -> Dict[str, Any]:
+    """QA final de um item: aplica traducao candidata ou bloqueia, contando em m."""
+    m["items_total"] += 1
+    src = str(obj.get("text_src", ""))
+    item_id = parse_optional_int(obj.get("id"))
+    blocked_unmapped, unmapped_ratio, unmapped_count, glyph_count = _is_unmapped_glyph_blocked(
+        obj, src
+    )
+    has_candidate_translation = False
+    dst_candidate = src
+    if not blocked_unmapped:
+        if (
+            isinstance(translated_by_id, dict)
+            and item_id is not None
+            and int(item_id) in translated_by_id
+        ):
+            dst_candidate = translated_by_id[int(item_id)]
+            has_candidate_translation = True
+            m["chain_overrides_used"] += 1
+        elif src in translated_by_src:
+            has_candidate_translation = True
+            dst_candidate = translated_by_src.get(src, src)
+    dst_candidate = normalize_ascii(dst_candidate)
+    dst_candidate = re.sub(r"\s+", " ", dst_candidate).strip()
+    max_len = obj.get("max_len_bytes")
+    if isinstance(max_len, str) and max_len.isdigit():
+        max_len = int(max_len)
+    if not isinstance(max_len, int):
+        max_len = None
+
+    status = "UNCHANGED"
+    block_reason = None
+    final_dst = src
+
+    if blocked_unmapped:
+        status = "BLOCKED"
+        block_reason = "UNMAPPED_GLYPHS"
+        final_dst = src
+        m["blocked_unmapped_glyphs"] += 1
+    elif has_candidate_translation:
+        status = "OK"
+        final_dst = dst_candidate
+        final_dst = apply_orthographic_cleanup(src, final_dst, max_len)
+
+        if not placeholders_preserved(src, final_dst):
+            status = "BLOCKED"
+            block_reason = "PLACEHOLDER_FAIL"
+            final_dst = src
+            m["blocked_placeholder"] += 1
+        else:
+            final_dst, used_truncate = compact_translation_to_fit(final_dst, max_len)
+            if used_truncate:
+                m["truncated_last_resort"] += 1
+            if has_excessive_consonant_clipping(final_dst):
+                status = "BLOCKED"
+                block_reason = "QUALITY_CLIPPED_TEXT"
+                final_dst = src
+                m["blocked_quality"] += 1
+            elif not can_fit_ascii(final_dst, max_len):
+                status = "BLOCKED"
+                block_reason = "TOO_LONG_FOR_MAX_LEN_BYTES"
+                final_dst = src
+                m["blocked_too_long"] += 1
+            else:
+                try:
+                    final_dst.encode("ascii", errors="strict")
+                except UnicodeEncodeError:
+                    status = "BLOCKED"
+                    block_reason = "NON_ASCII_AFTER_NORMALIZATION"
+                    final_dst = src
+                    m["blocked_non_ascii"] += 1
+                else:
+                    if _cmp_norm(final_dst) == _cmp_norm(src):
+                        final_dst = src
+                        status = "UNCHANGED"
+                    elif final_dst == src:
+                        status = "UNCHANGED"
+                    else:
+                        status = "OK"
+
+    obj["text_dst"] = final_dst
+    obj["translation_status"] = status
+    if blocked_unmapped:
+        obj["needs_review"] = True
+        review_flags = _normalized_review_flags(obj)
+        if "UNMAPPED_GLYPHS" not in review_flags:
+            review_flags.append("UNMAPPED_GLYPHS")
+        obj["review_flags"] = review_flags
+    if blocked_unmapped or unmapped_count > 0:
+        obj["unmapped_ratio"] = float(round(unmapped_ratio, 4))
+        obj["unmapped_glyph_count"] = int(unmapped_count)
+        obj["glyph_count"] = int(glyph_count)
+    if block_reason:
+        obj["translation_block_reason"] = block_reason
+    else:
+        obj.pop("translation_block_reason", None)
+
+    if final_dst != src:
+        m["text_changed"] += 1
+    else:
+        m["text_unchanged"] += 1
+
+    return obj
+
+
+def apply_translations(
+    pure_jsonl: Path,
+    out_jsonl: Path,
+    translated_by_src: Dict[str, str],
+    translated_by_id: Optional[Dict[int, str]] = None,
+    fallback_meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    out_jsonl.parent.mkdir(parents=True, exist_ok=True)
+
+    m = new_output_metrics()
+
     source_meta: Optional[Dict[str, Any]] = None
     for meta_obj in iter_jsonl(pure_jsonl):
         if meta_obj.get("type") == "meta":
@@ -1124,25 +1304,9 @@ def apply_translations(
     with pure_jsonl.open("r", encoding="utf-8", errors="replace") as fin, out_jsonl.open(
         "w", encoding="utf-8", newline="\n"
     ) as fout:
-        def _cmp_norm(s: str) -> str:
-            t = ICON_RE.sub(" ", s or "")
-            t = re.sub(r"\s+", " ", t).strip().lower()
-            return t
-
         # Sempre garante um header/meta para trava CRC/SIZE na reinsercao.
         if source_meta is None:
-            synth = {
-                "type": "meta",
-                "schema": "neurorom.translated_jsonl.v1",
-                "rom_crc32": str(fb.get("rom_crc32") or "").upper() or None,
-                "rom_size": fb.get("rom_size"),
-                "stage": "translated_fixed_ptbr",
-                "ordering": "seq/rom_offset",
-                "generated_at": datetime.now().isoformat(timespec="seconds"),
-                "source_pure_jsonl": str(pure_jsonl),
-                "generated_from_missing_meta": True,
-            }
-            fout.write(json.dumps(synth, ensure_ascii=False) + "\n")
+            fout.write(json.dumps(synth_translated_meta(fb, pure_jsonl), ensure_ascii=False) + "\n")
             m["meta_written"] = True
 
         for line in fin:
@@ -1157,121 +1321,157 @@ def apply_translations(
                 continue
 
             if obj.get("type") == "meta":
-                meta = dict(obj)
-                if not meta.get("rom_crc32"):
-                    meta["rom_crc32"] = str(fb.get("rom_crc32") or "").upper() or None
-                if meta.get("rom_size") in (None, "", 0):
-                    meta["rom_size"] = fb.get("rom_size")
-                meta["stage"] = "translated_fixed_ptbr"
-                meta["ordering"] = "seq/rom_offset"
-                meta["generated_at"] = datetime.now().isoformat(timespec="seconds")
-                fout.write(json.dumps(meta, ensure_ascii=False) + "\n")
+                fout.write(json.dumps(finalize_meta(obj, fb), ensure_ascii=False) + "\n")
                 m["meta_written"] = True
                 continue
 
-            m["items_total"] += 1
-            src = str(obj.get("text_src", ""))
-            item_id = parse_optional_int(obj.get("id"))
-            blocked_unmapped, unmapped_ratio, unmapped_count, glyph_count = _is_unmapped_glyph_blocked(
-                obj, src
-            )
-            has_candidate_translation = False
-            dst_candidate = src
-            if not blocked_unmapped:
-                if (
-                    isinstance(translated_by_id, dict)
-                    and item_id is not None
-                    and int(item_id) in translated_by_id
-                ):
-                    dst_candidate = translated_by_id[int(item_id)]
-                    has_candidate_translation = True
-                    m["chain_overrides_used"] += 1
-                elif src in translated_by_src:
-                    has_candidate_translation = True
-                    dst_candidate = translated_by_src.get(src, src)
-            dst_candidate = normalize_ascii(dst_candidate)
-            dst_candidate = re.sub(r"\s+", " ", dst_candidate).strip()
-            max_len = obj.get("max_len_bytes")
-            if isinstance(max_len, str) and max_len.isdigit():
-                max_len = int(max_len)
-            if not isinstance(max_len, int):
-                max_len = None
+            obj = finalize_row(obj, translated_by_src, translated_by_id, m)
+            fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
-            status = "UNCHANGED"
-            block_reason = None
-            final_dst = src
+    return m
 
-            if blocked_unmapped:
-                status = "BLOCKED"
-                block_reason = "UNMAPPED_GLYPHS"
-                final_dst = src
-                m["blocked_unmapped_glyphs"] += 1
-            elif has_candidate_translation:
-                status = "OK"
-                final_dst = dst_candidate
-                final_dst = apply_orthographic_cleanup(src, final_dst, max_len)
 
-                if not placeholders_preserved(src, final_dst):
-                    status = "BLOCKED"
-                    block_reason = "PLACEHOLDER_FAIL"
-                    final_dst = src
-                    m["blocked_placeholder"] += 1
-                else:
-                    final_dst, used_truncate = compact_translation_to_fit(final_dst, max_len)
-                    if used_truncate:
-                        m["truncated_last_resort"] += 1
-                    if has_excessive_consonant_clipping(final_dst):
-                        status = "BLOCKED"
-                        block_reason = "QUALITY_CLIPPED_TEXT"
-                        final_dst = src
-                        m["blocked_quality"] += 1
-                    elif not can_fit_ascii(final_dst, max_len):
-                        status = "BLOCKED"
-                        block_reason = "TOO_LONG_FOR_MAX_LEN_BYTES"
-                        final_dst = src
-                        m["blocked_too_long"] += 1
-                    else:
-                        try:
-                            final_dst.encode("ascii", errors="strict")
-                        except UnicodeEncodeError:
-                            status = "BLOCKED"
-                            block_reason = "NON_ASCII_AFTER_NORMALIZATION"
-                            final_dst = src
-                            m["blocked_non_ascii"] += 1
-                        else:
-                            if _cmp_norm(final_dst) == _cmp_norm(src):
-                                final_dst = src
-                                status = "UNCHANGED"
-                            elif final_dst == src:
-                                status = "UNCHANGED"
-                            else:
-                                status = "OK"
-
-            obj["text_dst"] = final_dst
-            obj["translation_status"] = status
-            if blocked_unmapped:
-                obj["needs_review"] = True
-                review_flags = _normalized_review_flags(obj)
-                if "UNMAPPED_GLYPHS" not in review_flags:
-                    review_flags.append("UNMAPPED_GLYPHS")
-                obj["review_flags"] = review_flags
-            if blocked_unmapped or unmapped_count > 0:
-                obj["unmapped_ratio"] = float(round(unmapped_ratio, 4))
-                obj["unmapped_glyph_count"] = int(unmapped_count)
-                obj["glyph_count"] = int(glyph_count)
-            if block_reason:
-                obj["translation_block_reason"] = block_reason
-            else:
-                obj.pop("translation_block_reason", None)
+def _sum_metrics(total: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    for key, value in delta.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            total[key] = value
+        else:
+            total[key] = total.get(key, 0) + value
 
-            if final_dst != src:
-                m["text_changed"] += 1
-            else:
-                m["text_unchanged"] += 1
 
-            fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+def run_streaming(
+    pure_jsonl: Path,
+    out_jsonl: Path,
+    model: str,
+    timeout: int,
+    batch_size: int,
+    max_unique: int,
+    fallback_meta: Dict[str, Any],
+    window: int = 512,
+    memo_size: int = 50_000,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Mesmo fluxo de collect_candidates -> build_translations ->
+    build_chain_translations -> apply_translations, em streaming:
+    leitura -> filtro -> dedupe+traducao por janela -> QA -> escrita.
 
-    return m
+    Dedupe entre janelas via memo LRU limitado; chains nao atravessam
+    janelas. Metricas sao persistidas no checkpoint junto com o offset.
+    """
+    if StreamingJsonlPipeline is None:
+        raise RuntimeError("core/streaming_pipeline.py indisponivel")
+
+    fb = fallback_meta if isinstance(fallback_meta, dict) else {}
+    memo = BoundedMemo(memo_size)
+    pipeline: Optional[StreamingJsonlPipeline] = None
+
+    def _committed(key: str, factory) -> Dict[str, Any]:
+        return dict(pipeline.state.get(key) or factory())
+
+    def _filter(records):
+        scan = _committed("candidate_scan", new_candidate_stats)
+        for rec in records:
+            if rec.data.get("type") == "meta":
+                rec.meta["is_meta"] = True
+            else:
+                rec.meta["cand"] = classify_candidate(rec.data, scan)
+            rec.meta["scan"] = dict(scan)
+            yield rec
+
+    translate_totals: Dict[str, Any] = {}
+
+    def _translate_window(window_records):
+        if not translate_totals:
+            translate_totals.update(_committed("translate", lambda: {
+                "ollama": {}, "chain": {"enabled": True}, "unique_sent": 0, "truncated_by_cap": 0,
+            }))
+        rows = [r.meta["cand"] for r in window_records if r.meta.get("cand")]
+        pending: Dict[str, str] = {}
+        for row in rows:
+            src = row["text_src"]
+            if src in memo or src in pending:
+                continue
+            if translate_totals["unique_sent"] >= max_unique:
+                translate_totals["truncated_by_cap"] += 1
+                continue
+            pending[src] = row["cleaned"]
+            translate_totals["unique_sent"] += 1
+        if pending:
+            got, om = build_translations(pending, model=model, timeout=timeout, batch_size=batch_size)
+            for src, dst in got.items():
+                memo.put(src, dst)
+            _sum_metrics(translate_totals["ollama"], om)
+        by_src = {row["text_src"]: memo.get(row["text_src"]) for row in rows if row["text_src"] in memo}
+        chain_by_id: Dict[int, str] = {}
+        if rows:
+            chain_by_id, cm = build_chain_translations(
+                candidate_rows=rows, translated_by_src=by_src, model=model, timeout=timeout
+            )
+            _sum_metrics(translate_totals["chain"], cm)
+        snapshot = json.loads(json.dumps(translate_totals))
+        for rec in window_records:
+            rec.meta["by_src"] = by_src
+            rec.meta["chain"] = chain_by_id
+            rec.meta["translate"] = snapshot
+            yield rec
+
+    def _qa(records):
+        m = _committed("output", new_output_metrics)
+        for rec in records:
+            if rec.meta.get("is_meta"):
+                rec.data = finalize_meta(rec.data, fb)
+                m["meta_written"] = True
+            else:
+                rec.data = finalize_row(rec.data, rec.meta["by_src"], rec.meta["chain"], m)
+                if rec.seq == 0:
+                    rec.data = [synth_translated_meta(fb, pure_jsonl), rec.data]
+                    m["meta_written"] = True
+            rec.meta["output"] = dict(m)
+            yield rec
+
+    def _on_record(rec, state):
+        state["candidate_scan"] = rec.meta["scan"]
+        state["translate"] = rec.meta["translate"]
+        state["output"] = rec.meta["output"]
+
+    def _encode(data) -> str:
+        if isinstance(data, list):
+            return "\n".join(json.dumps(o, ensure_ascii=False) for o in data)
+        return json.dumps(data, ensure_ascii=False)
+
+    pipeline = StreamingJsonlPipeline(
+        pure_jsonl,
+        out_jsonl,
+        stages=[_filter, batch_stage(_translate_window, window), _qa],
+        queue_size=max(64, window),
+        resume=resume,
+        encode=_encode,
+        on_record=_on_record,
+    )
+    summary = pipeline.run()
+    if summary["resumed"]:
+        print(f"[RESUME] Retomado a partir do registro {summary['resumed_from']}")
+
+    state = summary["state"]
+    translate = state.get("translate") or {}
+    scan = dict(state.get("candidate_scan") or new_candidate_stats())
+    scan["candidate_unique"] = int(translate.get("unique_sent", 0))
+    scan["candidate_truncated_by_cap"] = int(translate.get("truncated_by_cap", 0))
+    ollama = {"candidate_unique": 0, "translated_ok": 0, "translated_fail": 0,
+              "translated_lexical_fallback": 0, "batches_total": 0, "batches_fail": 0}
+    ollama.update(translate.get("ollama") or {})
+    chain = {"enabled": True, "groups_total": 0, "groups_ok": 0, "groups_fail": 0,
+             "items_input": 0, "items_translated": 0}
+    chain.update(translate.get("chain") or {})
+    output = dict(state.get("output") or new_output_metrics())
+    return {
+        "candidate_scan": scan,
+        "ollama": ollama,
+        "chain": chain,
+        "output": output,
+        "stream": {"window": int(window), "records": summary["records_out"], "resumed": summary["resumed"]},
+    }
 
 
 def write_report_and_proof(
@@ -1344,6 +1544,13 @@ def main() -> int:
         default=1500,
         help="Limite de textos unicos candidatos para traduzir",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipeline em streaming (memoria limitada + checkpoint/retomada) para JSONL grandes",
+    )
+    parser.add_argument("--stream-window", type=int, default=512, help="Itens por janela de traducao no --stream")
+    parser.add_argument("--no-resume", action="store_true", help="Ignora checkpoint anterior no --stream")
     args = parser.parse_args()
 
     pure_jsonl = Path(args.pure_jsonl).expanduser().resolve()
@@ -1353,37 +1560,62 @@ def main() -> int:
     if not pure_jsonl.exists():
         raise SystemExit(f"[ERRO] pure_jsonl nao encontrado: {pure_jsonl}")
 
-    candidate_rows, unique_candidates, scan_stats, meta = collect_candidates(
-        pure_jsonl=pure_jsonl,
-        max_unique=int(args.max_unique_candidates),
-    )
-    translations, ollama_metrics = build_translations(
-        unique_candidates=unique_candidates,
-        model=args.model,
-        timeout=int(args.timeout),
-        batch_size=max(1, int(args.batch_size)),
-    )
-    chain_by_id, chain_metrics = build_chain_translations(
-        candidate_rows=candidate_rows,
-        translated_by_src=translations,
-        model=args.model,
-        timeout=int(args.timeout),
-    )
+    if args.stream:
+        meta = {}
+        for obj in iter_jsonl(pure_jsonl):
+            if obj.get("type") == "meta":
+                meta = obj
+            break
+        effective_crc = str(args.rom_crc32 or meta.get("rom_crc32") or pure_jsonl.stem.split("_")[0]).upper()
+        effective_rom_size = args.rom_size if args.rom_size is not None else meta.get("rom_size")
+        translated_path = out_dir / f"{effective_crc}_translated_fixed_ptbr.jsonl"
+        streamed = run_streaming(
+            pure_jsonl=pure_jsonl,
+            out_jsonl=translated_path,
+            model=args.model,
+            timeout=int(args.timeout),
+            batch_size=max(1, int(args.batch_size)),
+            max_unique=int(args.max_unique_candidates),
+            fallback_meta={"rom_crc32": effective_crc, "rom_size": effective_rom_size},
+            window=max(1, int(args.stream_window)),
+            resume=not args.no_resume,
+        )
+        scan_stats = streamed["candidate_scan"]
+        ollama_metrics = streamed["ollama"]
+        chain_metrics = streamed["chain"]
+        output_metrics = streamed["output"]
+    else:
+        candidate_rows, unique_candidates, scan_stats, meta = collect_candidates(
+            pure_jsonl=pure_jsonl,
+            max_unique=int(args.max_unique_candidates),
+        )
+        translations, ollama_metrics = build_translations(
+            unique_candidates=unique_candidates,
+            model=args.model,
+            timeout=int(args.timeout),
+            batch_size=max(1, int(args.batch_size)),
+        )
+        chain_by_id, chain_metrics = build_chain_translations(
+            candidate_rows=candidate_rows,
+            translated_by_src=translations,
+            model=args.model,
+            timeout=int(args.timeout),
+        )
 
-    effective_crc = str(args.rom_crc32 or meta.get("rom_crc32") or pure_jsonl.stem.split("_")[0]).upper()
-    effective_rom_size = args.rom_size if args.rom_size is not None else meta.get("rom_size")
-    translated_path = out_dir / f"{effective_crc}_translated_fixed_ptbr.jsonl"
-
-    output_metrics = apply_translations(
-        pure_jsonl=pure_jsonl,
-        out_jsonl=translated_path,
-        translated_by_src=translations,
-        translated_by_id=chain_by_id,
-        fallback_meta={
-            "rom_crc32": effective_crc,
-            "rom_size": effective_rom_size,
-        },
-    )
+        effective_crc = str(args.rom_crc32 or meta.get("rom_crc32") or pure_jsonl.stem.split("_")[0]).upper()
+        effective_rom_size = args.rom_size if args.rom_size is not None else meta.get("rom_size")
+        translated_path = out_dir / f"{effective_crc}_translated_fixed_ptbr.jsonl"
+
+        output_metrics = apply_translations(
+            pure_jsonl=pure_jsonl,
+            out_jsonl=translated_path,
+            translated_by_src=translations,
+            translated_by_id=chain_by_id,
+            fallback_meta={
+                "rom_crc32": effective_crc,
+                "rom_size": effective_rom_size,
+            },
+        )
 
     report_path = out_dir / f"{effective_crc}_translation_stage2_report.txt"
     proof_path = out_dir / f"{effective_crc}_translation_stage2_proof.json"
@@ -10,6 +10,8 @@ Provides universal extraction tools that work across all consoles:
 - AutoCharTableSolver: Automatic character table discovery
 - ScriptOpcodeMiner: Script command detection
 - ContainerExtractor: Archive/filesystem extraction
+- TextRegionIndex: Sorted interval index for known text regions
+- EntropyMap: Shared sliding-window entropy service (cached per ROM)
 ================================================================================
 """
 
@@ -32,6 +34,8 @@ from .auto_char_table_solver import AutoCharTableSolver, CharTableHypothesis
 from .script_opcode_miner import ScriptOpcodeMiner, OpcodePattern
 from .compression_hunter import CompressionHunter
 from .container_extractor import ContainerExtractor
+from .text_region_index import TextRegionIndex
+from .entropy_map import EntropyMap
 
 __all__ = [
     'EndianPointerHunter',
@@ -49,4 +53,6 @@ __all__ = [
     'OpcodePattern',
     'CompressionHunter',
     'ContainerExtractor',
+    'TextRegionIndex',
+    'EntropyMap',
 ]
@@ -14,6 +14,7 @@ import struct
 import math
 
 from .multi_decompress import MultiDecompress, DecompressResult, CompressionAlgorithm
+from .entropy_map import EntropyMap
 
 
 @dataclass
@@ -57,11 +58,22 @@ class CompressionHunter:
         0x11: CompressionAlgorithm.LZ11,
     }
 
-    def __init__(self, rom_data: bytes):
+    def __init__(self, rom_data: bytes, rom_key: Optional[str] = None,
+                 rom_path: Optional[str] = None):
+        """
+        Args:
+            rom_data: ROM data to scan
+            rom_key: ROM identity for this run (e.g. SHA-256), shares the
+                EntropyMap with the other stages
+            rom_path: ROM file (path/size/mtime identity when no rom_key)
+        """
         self.rom_data = rom_data
+        self.rom_key = rom_key
+        self.rom_path = rom_path
         self.decompressor = MultiDecompress()
         self._candidates: List[CompressedCandidate] = []
         self._decompressed_cache: Dict[int, DecompressResult] = {}
+        self._entropy_map: Optional[EntropyMap] = None
 
     def hunt(self,
              algorithms: Optional[List[CompressionAlgorithm]] = None,
@@ -181,10 +193,11 @@ class CompressionHunter:
         """Scan for high-entropy regions (potentially compressed)."""
         candidates = []
 
-        for offset in range(start, end - block_size, block_size):
-            block = self.rom_data[offset:offset + block_size]
-            entropy = self._calculate_entropy(block)
-
+        # Full blocks starting before end - block_size (shared under rom_key/rom_path)
+        if self._entropy_map is None:
+            self._entropy_map = EntropyMap.for_rom(self.rom_data, key=self.rom_key, path=self.rom_path)
+        windows = self._entropy_map.windows(block_size, start=start, end=end - 1)
+        for offset, entropy in windows:
             # High entropy suggests compression
             if 6.5 <= entropy <= 8.0:
                 # Could be LZSS or RLE
@@ -244,7 +257,9 @@ class CompressionHunter:
 
         data = self.rom_data[candidate.offset:candidate.offset + candidate.size]
 
-        result = self.decompressor.decompress(data, candidate.algorithm)
+        # Candidates are speculative: stop at the first invalid back-reference
+        # and reject output that is too small or does not expand
+        result = self.decompressor.decompress(data, candidate.algorithm, {'strict': True})
 
         if result.success:
             self._decompressed_cache[candidate.offset] = result
@@ -318,7 +333,8 @@ class CompressionHunter:
 
 
 def hunt_compression(rom_data: bytes,
-                     algorithms: Optional[List[CompressionAlgorithm]] = None
+                     algorithms: Optional[List[CompressionAlgorithm]] = None,
+                     rom_key: Optional[str] = None
                      ) -> List[CompressedCandidate]:
     """
     Convenience function to hunt for compressed data.
@@ -326,9 +342,10 @@ def hunt_compression(rom_data: bytes,
     Args:
         rom_data: ROM data to scan
         algorithms: Optional list of algorithms to look for
+        rom_key: ROM identity shared with the other stages of the run
 
     Returns:
         List of CompressedCandidate
     """
-    hunter = CompressionHunter(rom_data)
+    hunter = CompressionHunter(rom_data, rom_key=rom_key)
     return hunter.hunt(algorithms)
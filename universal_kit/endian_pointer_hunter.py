@@ -13,10 +13,12 @@ Extends the core pointer_scanner with:
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from enum import Enum
 import struct
 
+from .text_region_index import TextRegionIndex
+
 
 class PointerSize(Enum):
     """Pointer sizes in bytes."""
@@ -136,8 +138,8 @@ class EndianPointerHunter:
         sizes = pointer_sizes or self.pointer_sizes
         endians = endianness_modes or self.endianness_modes
 
-        # Build text offset set for fast lookup
-        text_offsets = self._build_text_offset_set(text_regions)
+        # Build sorted interval index for O(log n) lookup
+        text_index = self._build_text_index(text_regions)
 
         # Collect all candidates
         all_candidates: List[PointerCandidate] = []
@@ -148,7 +150,7 @@ class EndianPointerHunter:
         for size in sizes:
             for endian in endians:
                 candidates = self._scan_pointers(
-                    size, endian, start, end, text_offsets, address_mapper
+                    size, endian, start, end, text_index, address_mapper
                 )
                 all_candidates.extend(candidates)
 
@@ -163,27 +165,25 @@ class EndianPointerHunter:
 
         return valid_tables
 
-    def _build_text_offset_set(self, text_regions: Optional[List[Dict]]) -> Set[int]:
-        """Build set of offsets that are known to contain text."""
-        offsets = set()
-        if not text_regions:
-            return offsets
-
-        for region in text_regions:
-            start = region.get('offset', region.get('start', 0))
-            if isinstance(start, str):
-                start = int(start, 16) if start.startswith('0x') else int(start)
-            length = region.get('length', region.get('size', 64))
-            offsets.update(range(start, start + length))
+    def _build_text_index(self, text_regions: Optional[List[Dict]]) -> TextRegionIndex:
+        """Build interval index of regions that are known to contain text."""
+        return TextRegionIndex.from_regions(text_regions, self._parse_text_region)
 
-        return offsets
+    @staticmethod
+    def _parse_text_region(region: Dict) -> Tuple[int, int]:
+        """Extract (start, length) from a text region dict."""
+        start = region.get('offset', region.get('start', 0))
+        if isinstance(start, str):
+            start = int(start, 16) if start.startswith('0x') else int(start)
+        length = region.get('length', region.get('size', 64))
+        return start, length
 
     def _scan_pointers(self,
                        size: PointerSize,
                        endian: Endianness,
                        start: int,
                        end: int,
-                       text_offsets: Set[int],
+                       text_index: TextRegionIndex,
                        address_mapper: Optional[Callable[[int], int]]
                        ) -> List[PointerCandidate]:
         """Scan for pointers of specific size and endianness."""
@@ -202,7 +202,7 @@ class EndianPointerHunter:
                 continue
 
             # Check if points to text
-            points_to_text = target_offset in text_offsets
+            points_to_text = text_index.contains(target_offset)
             text_score = 0.0
 
             if not points_to_text and self.plugin:
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+ENTROPY MAP - Shared Sliding-Window Shannon Entropy Service
+================================================================================
+One entropy service per ROM, shared by every detector in a pipeline run:
+- windows(block_size, stride): rolling byte histograms, computed in one
+  pass (NumPy: per-sub-block histograms + cumulative sums; pure Python:
+  incremental counts) for any block size and stride
+- region(start, end): entropy of an arbitrary byte range
+- find_regions(block_size, low, high): merged runs of windows whose
+  entropy falls inside [low, high]
+
+Each (block_size, stride, range) result is memoized. EntropyMap.for_rom
+shares those memoized maps between instances under a cheap ROM identity
+(path + size + mtime, or a key the caller already has); only the computed
+maps are kept in the shared cache, never the ROM bytes. Shared maps also
+keep one base map (NumPy): byte histograms of fixed base blocks over the
+whole ROM, from which every aligned block size and stride is derived
+without rereading the ROM.
+================================================================================
+"""
+
+import math
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+# Max ROMs whose computed maps are kept alive by EntropyMap.for_rom
+SHARED_CACHE_SIZE = 4
+
+# Histogram cells per NumPy chunk (bounds peak memory on large ROMs)
+CHUNK_CELLS = 1 << 21
+
+# Base map granularity: doubled until the uint16 histograms fit the budget
+BASE_BLOCK = 256
+BASE_MAP_BYTES = 16 << 20
+
+
+def rom_key(path: str) -> str:
+    """Cheap ROM identity: absolute path + size + mtime (no hashing)."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def _plogp_table(total: int) -> List[float]:
+    """-p*log2(p) for p = c/total, c in [0, total]."""
+    table = [0.0] * (total + 1)
+    for count in range(1, total + 1):
+        p = count / total
+        table[count] = -p * math.log2(p)
+    return table
+
+
+class EntropyMap:
+    """
+    Sliding-window Shannon entropy (0-8 bits) over an immutable ROM snapshot.
+
+    Entropy values match the Counter-based per-block formula used by the
+    detectors up to floating-point summation order.
+    """
+
+    # key -> (ROM size, memoized windows, base maps); ROM bytes are not retained
+    _shared: "OrderedDict[str, Tuple[int, Dict, Dict]]" = OrderedDict()
+
+    def __init__(self, rom_data: bytes, key: Optional[str] = None,
+                 windows: Optional[Dict] = None, base_maps: Optional[Dict] = None):
+        """
+        Args:
+            rom_data: ROM bytes (referenced, not copied; must not change
+                while the map is in use)
+            key: ROM identity the memoized maps are shared under, if any
+            windows: Memo dict to share (see for_rom)
+            base_maps: Base histogram dict to share (see for_rom); the base
+                map is only built for shared maps
+        """
+        if not isinstance(rom_data, (bytes, bytearray, memoryview)):
+            rom_data = bytes(rom_data)
+        self.data = rom_data
+        self.key = key
+        self._array = np.frombuffer(self.data, dtype=np.uint8) if np is not None else None
+        self._windows: Dict[Tuple[int, int, int, int, int], List[Tuple[int, float]]] = (
+            windows if windows is not None else {}
+        )
+        self._base_maps = base_maps
+        self._tables: Dict[int, List[float]] = {}
+        self.stats = {"window_scans": 0, "cache_hits": 0, "base_scans": 0}
+
+    @classmethod
+    def for_rom(cls, rom_data: bytes, key: Optional[str] = None,
+                path: Optional[str] = None) -> "EntropyMap":
+        """
+        EntropyMap over rom_data reusing maps already computed for this ROM.
+
+        Args:
+            rom_data: ROM bytes (not copied or hashed)
+            key: ROM identity from the caller (e.g. a SHA-256 it already has)
+            path: ROM file; key defaults to rom_key(path)
+
+        Returns:
+            EntropyMap sharing memoized maps under key; without key or path
+            the maps are memoized on the returned instance only
+        """
+        if key is None and path is not None:
+            key = rom_key(path)
+        if key is None:
+            return cls(rom_data)
+        entry = cls._shared.get(key)
+        if entry is None or entry[0] != len(rom_data):
+            entry = (len(rom_data), {}, {})
+            cls._shared[key] = entry
+        cls._shared.move_to_end(key)
+        while len(cls._shared) > SHARED_CACHE_SIZE:
+            cls._shared.popitem(last=False)
+        return cls(rom_data, key=key, windows=entry[1], base_maps=entry[2])
+
+    @classmethod
+    def clear_shared(cls) -> None:
+        """Drops all shared maps."""
+        cls._shared.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def region(self, start: int, end: int) -> float:
+        """Entropy of data[start:end] (0.0 for an empty range)."""
+        start = max(0, int(start))
+        end = min(len(self.data), int(end))
+        length = end - start
+        if length <= 0:
+            return 0.0
+        if self._array is not None:
+            counts = np.bincount(self._array[start:end], minlength=256)
+            counts = counts[counts > 0].astype(np.float64) / length
+            return float(-(counts * np.log2(counts)).sum())
+        counts = [0] * 256
+        for byte in self.data[start:end]:
+            counts[byte] += 1
+        table = self._table(length)
+        return sum(table[c] for c in counts if c)
+
+    def windows(
+        self,
+        block_size: int,
+        stride: Optional[int] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+        min_length: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Entropy of data[s:min(s + block_size, end)] for s in range(start, end, stride).
+
+        Args:
+            block_size: Window length in bytes
+            stride: Step between window starts (default: block_size)
+            start: First window start
+            end: Exclusive end of the scanned range (default: ROM size)
+            min_length: Skip windows shorter than this (default: block_size,
+                i.e. only full windows)
+
+        Returns:
+            List of (offset, entropy)
+        """
+        block_size = int(block_size)
+        if block_size <= 0:
+            raise ValueError(f"block_size must be positive: {block_size}")
+        stride = int(stride or block_size)
+        if stride <= 0:
+            raise ValueError(f"stride must be positive: {stride}")
+        start = max(0, int(start))
+        end = len(self.data) if end is None else min(len(self.data), int(end))
+        min_length = block_size if min_length is None else max(1, min(int(min_length), block_size))
+
+        key = (block_size, stride, start, end, min_length)
+        cached = self._windows.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        self.stats["window_scans"] += 1
+
+        result: List[Tuple[int, float]] = []
+        full_count = 0
+        if end - start >= block_size:
+            full_count = (end - start - block_size) // stride + 1
+        if full_count:
+            if self._array is not None:
+                entropies = self._full_windows_numpy(block_size, stride, start, full_count)
+            else:
+                entropies = self._full_windows_python(block_size, stride, start, full_count)
+            result.extend(zip(range(start, start + full_count * stride, stride), entropies))
+
+        # Partial windows at the end of the range
+        for offset in range(start + full_count * stride, end, stride):
+            if end - offset < min_length:
+                break
+            result.append((offset, self.region(offset, end)))
+
+        self._windows[key] = result
+        return result
+
+    def find_regions(
+        self,
+        block_size: int,
+        low: float,
+        high: float,
+        stride: Optional[int] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        Merged [start, end) ranges covered by windows with low <= entropy <= high.
+
+        Overlapping or adjacent qualifying windows are merged into one range.
+        """
+        merged: List[Tuple[int, int]] = []
+        for offset, entropy in self.windows(block_size, stride, start, end):
+            if not (low <= entropy <= high):
+                continue
+            window_end = offset + block_size
+            if merged and offset <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], window_end))
+            else:
+                merged.append((offset, window_end))
+        return merged
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _table(self, total: int) -> List[float]:
+        table = self._tables.get(total)
+        if table is None:
+            table = _plogp_table(total)
+            self._tables[total] = table
+        return table
+
+    def _base_map(self):
+        """
+        (base, histograms) of the whole ROM in base-sized blocks, built once
+        per shared identity; None for private maps or oversized ROMs.
+        """
+        if self._base_maps is None:
+            return None
+        base = BASE_BLOCK
+        while (len(self.data) // base) * 512 > BASE_MAP_BYTES:
+            base *= 2
+        if base > 0x8000:  # uint16 counts
+            return None
+        hist = self._base_maps.get(base)
+        if hist is None:
+            self.stats["base_scans"] += 1
+            n_blocks = len(self.data) // base
+            hist = np.empty((n_blocks, 256), dtype=np.uint16)
+            step = max(1, CHUNK_CELLS // base)
+            for first in range(0, n_blocks, step):
+                n_sub = min(step, n_blocks - first)
+                hist[first:first + n_sub] = self._histograms(first * base, base, n_sub)
+            self._base_maps[base] = hist
+        return base, hist
+
+    def _histograms(self, offset: int, sub: int, n_sub: int):
+        """Byte histograms of n_sub consecutive sub-blocks starting at offset."""
+        segment = self._array[offset:offset + n_sub * sub].reshape(n_sub, sub).astype(np.int32)
+        segment += (np.arange(n_sub, dtype=np.int32) * 256)[:, None]
+        return np.bincount(segment.ravel(), minlength=n_sub * 256).reshape(n_sub, 256)
+
+    def _full_windows_numpy(self, block_size: int, stride: int, start: int, count: int) -> List[float]:
+        """
+        Windows share sub-blocks of gcd(block_size, stride) bytes: one
+        histogram per sub-block, cumulative sums give every window's counts.
+        Aligned windows of shared maps read their sub-blocks from the base map.
+        """
+        sub = math.gcd(block_size, stride)
+        base_hist = None
+        based = self._base_map()
+        if based is not None and sub % based[0] == 0 and start % based[0] == 0:
+            sub, base_hist = based
+        sub_per_window = block_size // sub
+        sub_per_stride = stride // sub
+        table = np.asarray(self._table(block_size), dtype=np.float64)
+
+        per_chunk = max(1, min(count, (CHUNK_CELLS // 256) * sub // stride))
+        out: List[float] = []
+        for first in range(0, count, per_chunk):
+            n_windows = min(per_chunk, count - first)
+            base = start + first * stride
+            n_sub = ((n_windows - 1) * stride + block_size) // sub
+            if base_hist is not None:
+                hist = base_hist[base // sub:base // sub + n_sub].astype(np.int32)
+            else:
+                hist = self._histograms(base, sub, n_sub)
+
+            idx = np.arange(n_windows, dtype=np.int64) * sub_per_stride
+            if sub_per_window <= 4:
+                # Few sub-blocks per window: direct sums beat a cumulative pass
+                counts = hist[idx]
+                for j in range(1, sub_per_window):
+                    counts = counts + hist[idx + j]
+            else:
+                cumulative = np.zeros((n_sub + 1, 256), dtype=np.int32)
+                np.cumsum(hist, axis=0, out=cumulative[1:])
+                counts = cumulative[idx + sub_per_window] - cumulative[idx]
+            out.extend(table[counts].sum(axis=1).tolist())
+        return out
+
+    def _full_windows_python(self, block_size: int, stride: int, start: int, count: int) -> List[float]:
+        """Incremental histogram: each byte enters and leaves the window once."""
+        data = self.data
+        table = self._table(block_size)
+        counts = [0] * 256
+        for byte in data[start:start + block_size]:
+            counts[byte] += 1
+        out = [sum(table[c] for c in counts if c)]
+
+        for k in range(1, count):
+            old = start + (k - 1) * stride
+            new = start + k * stride
+            if stride >= block_size:
+                counts = [0] * 256
+                for byte in data[new:new + block_size]:
+                    counts[byte] += 1
+            else:
+                for byte in data[old:new]:
+                    counts[byte] -= 1
+                for byte in data[old + block_size:new + block_size]:
+                    counts[byte] += 1
+            out.append(sum(table[c] for c in counts if c))
+        return out
@@ -11,18 +11,41 @@ Provides compression for common formats used by the decompressor counterpart:
 - Yay0 / Yaz0 (Nintendo block formats)
 
 Goal: safe recompression with deterministic output and round-trip validation.
+
+LZ matches come from a hash-chain finder (exact 3-byte keys). With the
+default unlimited chain depth it returns the same matches as an exhaustive
+backward search, so output is byte-identical to the original greedy
+compressor. Optional params:
+- chain_depth: max candidates visited per position (0 = unlimited)
+- parse: "greedy" (default) or "optimal" (minimum-cost token parse)
+- budget: target compressed size; if greedy output exceeds it, an
+  optimal parse is tried and the smaller stream is returned
 ===============================================================================
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from enum import Enum
 import struct
 
 from .multi_decompress import CompressionAlgorithm
 
+DEFAULT_CHAIN_DEPTH = 0  # 0 = unlimited (identical to exhaustive search)
+
+# (offset, length) tokens; offset 0 marks a literal byte
+Token = Tuple[int, int]
+
+_LZ_ALGORITHMS = {
+    CompressionAlgorithm.LZSS,
+    CompressionAlgorithm.LZ77,
+    CompressionAlgorithm.LZ10,
+    CompressionAlgorithm.LZ11,
+    CompressionAlgorithm.YAY0,
+    CompressionAlgorithm.YAZ0,
+}
+
 
 @dataclass
 class CompressResult:
@@ -44,6 +67,80 @@ class CompressResult:
         return float(self.compressed_size) / float(self.original_size)
 
 
+class _HashChainMatcher:
+    """
+    Hash-chain longest-match finder over a fixed input buffer.
+
+    Positions are keyed by their first `key_len` bytes (exact key, no
+    collisions) and linked newest-to-oldest. find() must be called with
+    non-decreasing positions; skipped positions are inserted lazily.
+    Candidates are visited closest-first and only a strictly longer match
+    replaces the best one, matching the tie-breaking of the exhaustive
+    backward search.
+    """
+
+    def __init__(self, data: bytes, window: int, min_len: int, max_len: int,
+                 chain_depth: int = DEFAULT_CHAIN_DEPTH):
+        self.data = data
+        self.n = len(data)
+        self.window = int(window)
+        self.min_len = int(min_len)
+        self.max_len = int(max_len)
+        self.chain_depth = max(0, int(chain_depth))
+        self.key_len = max(1, min(3, self.min_len))
+        self._head: Dict[bytes, int] = {}
+        self._prev: List[int] = [-1] * self.n
+        self._inserted = 0
+
+    def _insert_until(self, pos: int) -> None:
+        data = self.data
+        head = self._head
+        prev = self._prev
+        k = self.key_len
+        stop = min(pos, self.n - k + 1)
+        for p in range(self._inserted, stop):
+            key = data[p:p + k]
+            prev[p] = head.get(key, -1)
+            head[key] = p
+        if stop > self._inserted:
+            self._inserted = stop
+
+    def find(self, pos: int) -> Tuple[int, int]:
+        """Returns (offset, length); (0, 0) when no match >= min_len exists."""
+        if pos <= 0:
+            return (0, 0)
+        self._insert_until(pos)
+        data = self.data
+        limit = min(self.max_len, self.n - pos)
+        if limit < self.min_len or limit < self.key_len:
+            return (0, 0)
+
+        start = max(0, pos - self.window)
+        cand = self._head.get(data[pos:pos + self.key_len], -1)
+        depth = self.chain_depth
+        visited = 0
+        best_len = 0
+        best_off = 0
+        prev = self._prev
+
+        while cand >= start:
+            # Only a strictly longer match can win: check the deciding byte first
+            if best_len == 0 or data[cand + best_len] == data[pos + best_len]:
+                length = 0
+                while length < limit and data[cand + length] == data[pos + length]:
+                    length += 1
+                if length > best_len and length >= self.min_len:
+                    best_len = length
+                    best_off = pos - cand
+                    if best_len == limit:
+                        break
+            visited += 1
+            if depth and visited >= depth:
+                break
+            cand = prev[cand]
+        return (best_off, best_len)
+
+
 class MultiCompress:
     """Multi-algorithm compressor used for recompression workflows."""
 
@@ -72,8 +169,21 @@ class MultiCompress:
                 original_size=len(data or b""),
                 error=f"Unsupported algorithm: {algorithm.value}",
             )
+        params = params or {}
         try:
-            return self._algorithms[algorithm](data or b"", params or {})
+            result = self._algorithms[algorithm](data or b"", params)
+            budget = params.get("budget")
+            if (
+                budget is not None
+                and result.success
+                and algorithm in _LZ_ALGORITHMS
+                and result.compressed_size > int(budget)
+                and str(params.get("parse", "greedy")).lower() != "optimal"
+            ):
+                optimal = self._algorithms[algorithm](data or b"", dict(params, parse="optimal"))
+                if optimal.success and optimal.compressed_size < result.compressed_size:
+                    result = optimal
+            return result
         except Exception as e:
             return CompressResult(
                 success=False,
@@ -94,7 +204,12 @@ class MultiCompress:
         min_len: int,
         max_len: int,
     ) -> Tuple[int, int]:
-        """Returns (offset, length) using backward greedy search."""
+        """
+        Returns (offset, length) using exhaustive backward search.
+
+        Reference implementation (O(window) per call); compressors use
+        _HashChainMatcher via _parse_tokens, which returns the same matches.
+        """
         if pos <= 0:
             return (0, 0)
         start = max(0, pos - window)
@@ -117,6 +232,74 @@ class MultiCompress:
                     break
         return (best_off, best_len)
 
+    def _parse_tokens(
+        self,
+        data: bytes,
+        params: Dict[str, Any],
+        window: int,
+        min_len: int,
+        max_len: int,
+        max_offset: int,
+        literal_cost: int,
+        ref_cost: Callable[[int], int],
+    ) -> List[Token]:
+        """
+        Split data into literal/reference tokens.
+
+        Greedy parse takes the longest match at each position (original
+        behaviour). Optimal parse minimises the total encoded size in bits
+        given the format costs; every length up to the longest match at a
+        position is reachable with the same offset.
+        """
+        n = len(data)
+        matcher = _HashChainMatcher(
+            data,
+            min(int(window), int(max_offset)),
+            min_len,
+            max_len,
+            chain_depth=int(params.get("chain_depth", DEFAULT_CHAIN_DEPTH) or 0),
+        )
+        tokens: List[Token] = []
+
+        if str(params.get("parse", "greedy")).lower() != "optimal":
+            pos = 0
+            while pos < n:
+                off, mlen = matcher.find(pos)
+                if mlen >= min_len and 1 <= off <= max_offset:
+                    tokens.append((off, mlen))
+                    pos += mlen
+                else:
+                    tokens.append((0, 1))
+                    pos += 1
+            return tokens
+
+        matches = [matcher.find(pos) for pos in range(n)]
+        cost = [0] * (n + 1)
+        choice = [0] * n  # 0 = literal, otherwise reference length
+        for pos in range(n - 1, -1, -1):
+            best = literal_cost + cost[pos + 1]
+            pick = 0
+            off, mlen = matches[pos]
+            if mlen >= min_len and 1 <= off <= max_offset:
+                for length in range(min_len, mlen + 1):
+                    c = ref_cost(length) + cost[pos + length]
+                    if c <= best:
+                        best = c
+                        pick = length
+            cost[pos] = best
+            choice[pos] = pick
+
+        pos = 0
+        while pos < n:
+            length = choice[pos]
+            if length == 0:
+                tokens.append((0, 1))
+                pos += 1
+            else:
+                tokens.append((matches[pos][0], length))
+                pos += length
+        return tokens
+
     # ------------------------------------------------------------------
     # RLE
     # ------------------------------------------------------------------
@@ -211,17 +394,18 @@ class MultiCompress:
         out = bytearray()
         pos = 0
         n = len(data)
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 0xFFF,
+            literal_cost=9, ref_cost=lambda _length: 17,
+        )
 
-        while pos < n:
+        for group in range(0, len(tokens), 8):
             flag_pos = len(out)
             out.append(0x00)
             flags = 0
 
-            for bit in range(8):
-                if pos >= n:
-                    break
-                off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-                if mlen >= min_len and 1 <= off <= 0xFFF:
+            for bit, (off, mlen) in enumerate(tokens[group:group + 8]):
+                if off:
                     ref_low = off & 0xFF
                     ref_high = ((off >> 8) & 0x0F) << 4
                     ref_high |= (mlen - 3) & 0x0F
@@ -267,10 +451,13 @@ class MultiCompress:
         out = bytearray()
         pos = 0
         n = len(data)
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 0xFFF,
+            literal_cost=24, ref_cost=lambda _length: 16,
+        )
 
-        while pos < n:
-            off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-            if mlen >= min_len and 1 <= off <= 0xFFF:
+        for off, mlen in tokens:
+            if off:
                 lo = off & 0xFF
                 hi = ((off >> 8) & 0x0F) << 4
                 hi |= (mlen & 0x0F)
@@ -318,16 +505,18 @@ class MultiCompress:
 
         pos = 0
         n = len(data)
-        while pos < n:
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 4096,
+            literal_cost=9, ref_cost=lambda _length: 17,
+        )
+        for group in range(0, len(tokens), 8):
             flag_pos = len(out)
             out.append(0x00)
             flags = 0
 
-            for bit in range(7, -1, -1):  # MSB first
-                if pos >= n:
-                    break
-                off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-                if mlen >= min_len and 1 <= off <= 4096:
+            for index, (off, mlen) in enumerate(tokens[group:group + 8]):
+                bit = 7 - index  # MSB first
+                if off:
                     ref = (((mlen - 3) & 0xF) << 12) | ((off - 1) & 0xFFF)
                     out.append((ref >> 8) & 0xFF)
                     out.append(ref & 0xFF)
@@ -369,16 +558,18 @@ class MultiCompress:
 
         pos = 0
         n = len(data)
-        while pos < n:
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 4096,
+            literal_cost=9, ref_cost=lambda _length: 17,
+        )
+        for group in range(0, len(tokens), 8):
             flag_pos = len(out)
             out.append(0x00)
             flags = 0
 
-            for bit in range(7, -1, -1):
-                if pos >= n:
-                    break
-                off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-                if mlen >= min_len and 1 <= off <= 4096:
+            for index, (off, mlen) in enumerate(tokens[group:group + 8]):
+                bit = 7 - index
+                if off:
                     # short form:
                     # b1 high nibble = indicator (count => length=indicator+1)
                     # b1 low nibble + b2 => offset-1
@@ -426,16 +617,18 @@ class MultiCompress:
 
         pos = 0
         n = len(data)
-        while pos < n:
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 0x1000,
+            literal_cost=9, ref_cost=lambda length: 25 if length >= 0x12 else 17,
+        )
+        for group in range(0, len(tokens), 8):
             code_pos = len(out)
             out.append(0)
             code = 0
 
-            for bit in range(7, -1, -1):
-                if pos >= n:
-                    break
-                off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-                if mlen >= min_len and 1 <= off <= 0x1000:
+            for index, (off, mlen) in enumerate(tokens[group:group + 8]):
+                bit = 7 - index
+                if off:
                     disp = (off - 1) & 0xFFF
                     if mlen >= 0x12:
                         b1 = ((0 & 0xF) << 4) | ((disp >> 8) & 0x0F)
@@ -483,9 +676,12 @@ class MultiCompress:
 
         pos = 0
         n = len(data)
-        while pos < n:
-            off, mlen = self._find_longest_match(data, pos, window, min_len, max_len)
-            if mlen >= min_len and 1 <= off <= 0x1000:
+        tokens = self._parse_tokens(
+            data, params, window, min_len, max_len, 0x1000,
+            literal_cost=9, ref_cost=lambda length: 25 if length >= 0x12 else 17,
+        )
+        for off, mlen in tokens:
+            if off:
                 # compressed token
                 code_bits.append(0)
                 disp = (off - 1) & 0x0FFF
@@ -10,6 +10,15 @@ Provides decompression for common ROM compression algorithms:
 - Yay0/Yaz0 (N64/GameCube)
 
 Each algorithm includes parametric variants for different implementations.
+
+LZ-family decoders copy back-references with slice operations (pattern
+repetition for overlapping copies) and decode into a preallocated buffer
+when the header declares the output size. Headers declaring more output
+than the stream could possibly produce are rejected before decoding.
+
+In strict mode (speculative hunting) an invalid back-reference ends the
+stream and the output decoded so far is kept; headerless results are then
+rejected when they are too small or do not expand the consumed input.
 ================================================================================
 """
 
@@ -19,6 +28,73 @@ from enum import Enum
 import struct
 
 
+# Upper bound of output bytes per input byte for each header format
+# (longest match / smallest token). Used to reject impossible headers.
+MAX_EXPANSION = {
+    "LZ10": 9,        # 2-byte token -> up to 18 bytes
+    "LZ11": 16452,    # 4-byte token -> up to 0x10110 bytes
+    "YAY0": 137,      # 2-byte link + 1 chunk byte -> up to 273 bytes
+    "YAZ0": 91,       # 3-byte token -> up to 273 bytes
+}
+
+# Strict-mode acceptance for headerless streams (override with the
+# 'min_output' / 'min_ratio' params)
+STRICT_MIN_OUTPUT = 16
+STRICT_MIN_RATIO = 1.0
+
+
+def _append_match(output: bytearray, distance: int, length: int) -> None:
+    """
+    Append `length` bytes copied from `distance` bytes back.
+
+    Equivalent to the byte-by-byte loop ``output.append(output[src])``,
+    including overlapping copies (distance < length) which repeat the
+    last `distance` bytes. distance <= 0 copies nothing.
+    """
+    if distance <= 0 or length <= 0:
+        return
+    src = len(output) - distance
+    if distance >= length:
+        output += output[src:src + length]
+    else:
+        pattern = output[src:]
+        output += (pattern * (length // distance + 1))[:length]
+
+
+def _copy_match(output: bytearray, out_pos: int, distance: int, length: int) -> int:
+    """
+    Preallocated-buffer variant of _append_match.
+
+    Writes `length` bytes at out_pos copied from out_pos - distance and
+    returns the new write position. The caller caps `length` to the
+    remaining buffer size.
+    """
+    src = out_pos - distance
+    end = out_pos + length
+    if distance >= length:
+        output[out_pos:end] = output[src:src + length]
+    else:
+        pattern = output[src:out_pos]
+        output[out_pos:end] = (pattern * (length // distance + 1))[:length]
+    return end
+
+
+def _strict_rejection(out_size: int, consumed: int, params: Dict[str, Any]) -> str:
+    """Reason to reject a strict headerless result ("" when acceptable)."""
+    min_output = params.get('min_output', STRICT_MIN_OUTPUT)
+    min_ratio = params.get('min_ratio', STRICT_MIN_RATIO)
+    if out_size < min_output:
+        return f"Output too small: {out_size} < {min_output} bytes"
+    if consumed and out_size / consumed < min_ratio:
+        return f"Expansion ratio {out_size / consumed:.2f} below {min_ratio}"
+    return ""
+
+
+def _declared_size_feasible(decomp_size: int, payload_size: int, fmt: str) -> bool:
+    """False when the header declares more output than the payload can produce."""
+    return decomp_size <= max(0, payload_size) * MAX_EXPANSION[fmt]
+
+
 class CompressionAlgorithm(Enum):
     """Supported compression algorithms."""
     RLE = "RLE"
@@ -79,7 +155,11 @@ class MultiDecompress:
         Args:
             data: Compressed data
             algorithm: Algorithm to use
-            params: Optional algorithm-specific parameters
+            params: Optional algorithm-specific parameters. LZ decoders
+                accept 'strict': True to end the stream at the first invalid
+                back-reference (instead of skipping to the next flag byte);
+                headerless LZSS/LZ77 results must then reach 'min_output'
+                bytes and a 'min_ratio' expansion.
 
         Returns:
             DecompressResult with decompressed data
@@ -101,7 +181,8 @@ class MultiDecompress:
             )
 
     def try_all(self, data: bytes,
-                algorithms: Optional[List[CompressionAlgorithm]] = None
+                algorithms: Optional[List[CompressionAlgorithm]] = None,
+                params: Optional[Dict[str, Any]] = None
                 ) -> List[DecompressResult]:
         """
         Try all algorithms and return successful results.
@@ -109,15 +190,19 @@ class MultiDecompress:
         Args:
             data: Potentially compressed data
             algorithms: Optional list of algorithms to try
+            params: Parameters passed to every decoder. Defaults to
+                {'strict': True}: decoding stops at the first invalid
+                back-reference and garbage is rejected by output size/ratio.
 
         Returns:
             List of successful DecompressResult sorted by confidence
         """
         to_try = algorithms or list(self._algorithms.keys())
+        params = {'strict': True} if params is None else params
         results = []
 
         for algo in to_try:
-            result = self.decompress(data, algo)
+            result = self.decompress(data, algo, params)
             if result.success and result.decompressed_size > 0:
                 results.append(result)
 
@@ -296,16 +381,19 @@ class MultiDecompress:
 
         output = bytearray()
         pos = 0
+        n = len(data)
         window_size = params.get('window_size', 4096)
         max_output = params.get('max_output', 1024 * 1024)
+        strict = bool(params.get('strict', False))
+        ended = False
 
         try:
-            while pos < len(data) and len(output) < max_output:
+            while not ended and pos < n and len(output) < max_output:
                 flags = data[pos]
                 pos += 1
 
                 for bit in range(8):
-                    if pos >= len(data) or len(output) >= max_output:
+                    if pos >= n or len(output) >= max_output:
                         break
 
                     if flags & (1 << bit):
@@ -314,7 +402,7 @@ class MultiDecompress:
                         pos += 1
                     else:
                         # Reference: offset + length
-                        if pos + 2 > len(data):
+                        if pos + 2 > n:
                             break
 
                         ref_low = data[pos]
@@ -332,14 +420,10 @@ class MultiDecompress:
                         src_pos = len(output) - offset
                         if src_pos < 0:
                             # Invalid reference, likely end of data
+                            ended = strict
                             break
 
-                        for _ in range(length):
-                            if src_pos < len(output):
-                                output.append(output[src_pos])
-                                src_pos += 1
-                            else:
-                                break
+                        _append_match(output, offset, length)
 
             if len(output) == 0:
                 return DecompressResult(
@@ -348,6 +432,16 @@ class MultiDecompress:
                     error="No output produced"
                 )
 
+            rejection = _strict_rejection(len(output), pos, params) if strict else ""
+            if rejection:
+                return DecompressResult(
+                    success=False,
+                    algorithm=CompressionAlgorithm.LZSS,
+                    original_size=pos,
+                    decompressed_size=len(output),
+                    error=rejection
+                )
+
             confidence = min(1.0, len(output) / (pos + 1) * 0.7)
 
             return DecompressResult(
@@ -386,18 +480,20 @@ class MultiDecompress:
 
         output = bytearray()
         pos = 0
+        n = len(data)
         window_size = params.get('window_size', 4096)
         max_output = params.get('max_output', 1024 * 1024)
+        strict = bool(params.get('strict', False))
 
         try:
-            while pos + 2 < len(data) and len(output) < max_output:
+            while pos + 2 < n and len(output) < max_output:
                 offset = data[pos] | ((data[pos + 1] & 0xF0) << 4)
                 length = data[pos + 1] & 0x0F
                 pos += 2
 
                 if length == 0:
                     # Literal byte
-                    if pos >= len(data):
+                    if pos >= n:
                         break
                     output.append(data[pos])
                     pos += 1
@@ -405,11 +501,19 @@ class MultiDecompress:
                     # Copy from window
                     src = len(output) - offset
                     if src < 0:
+                        # Invalid reference: end of stream
                         break
-                    for _ in range(length):
-                        if src < len(output):
-                            output.append(output[src])
-                            src += 1
+                    _append_match(output, offset, length)
+
+            rejection = _strict_rejection(len(output), pos, params) if strict else ""
+            if rejection:
+                return DecompressResult(
+                    success=False,
+                    algorithm=CompressionAlgorithm.LZ77,
+                    original_size=pos,
+                    decompressed_size=len(output),
+                    error=rejection
+                )
 
             confidence = 0.5 if len(output) > len(data) else 0.3
 
@@ -454,22 +558,32 @@ class MultiDecompress:
                 algorithm=CompressionAlgorithm.LZ10,
                 error=f"Invalid decompressed size: {decomp_size}"
             )
+        if not _declared_size_feasible(decomp_size, len(data) - 4, "LZ10"):
+            return DecompressResult(
+                success=False,
+                algorithm=CompressionAlgorithm.LZ10,
+                error=f"Decompressed size {decomp_size} exceeds stream capacity"
+            )
 
-        output = bytearray()
+        n = len(data)
+        strict = bool(params.get('strict', False))
+        ended = False
+        output = bytearray(decomp_size)
+        out_pos = 0
         pos = 4
 
         try:
-            while len(output) < decomp_size and pos < len(data):
+            while not ended and out_pos < decomp_size and pos < n:
                 flags = data[pos]
                 pos += 1
 
                 for bit in range(7, -1, -1):  # MSB first
-                    if len(output) >= decomp_size or pos >= len(data):
+                    if out_pos >= decomp_size or pos >= n:
                         break
 
                     if flags & (1 << bit):
                         # Reference
-                        if pos + 2 > len(data):
+                        if pos + 2 > n:
                             break
 
                         ref = (data[pos] << 8) | data[pos + 1]
@@ -478,31 +592,29 @@ class MultiDecompress:
                         length = ((ref >> 12) & 0xF) + 3
                         offset = (ref & 0xFFF) + 1
 
-                        src = len(output) - offset
-                        if src < 0:
+                        if offset > out_pos:
+                            ended = strict
                             break
 
-                        for _ in range(length):
-                            if len(output) >= decomp_size:
-                                break
-                            if src < len(output):
-                                output.append(output[src])
-                                src += 1
+                        out_pos = _copy_match(output, out_pos, offset,
+                                              min(length, decomp_size - out_pos))
                     else:
                         # Literal
-                        output.append(data[pos])
+                        output[out_pos] = data[pos]
+                        out_pos += 1
                         pos += 1
 
-            success = len(output) == decomp_size
+            success = out_pos == decomp_size
             confidence = 0.9 if success else 0.5
 
             return DecompressResult(
                 success=success,
                 algorithm=CompressionAlgorithm.LZ10,
-                data=bytes(output),
+                data=bytes(output[:out_pos]),
                 original_size=pos,
-                decompressed_size=len(output),
+                decompressed_size=out_pos,
                 confidence=confidence,
+                error="Invalid back-reference before expected size" if ended else "",
                 params={"expected_size": decomp_size}
             )
 
@@ -537,74 +649,82 @@ class MultiDecompress:
                 algorithm=CompressionAlgorithm.LZ11,
                 error=f"Invalid decompressed size: {decomp_size}"
             )
+        if not _declared_size_feasible(decomp_size, len(data) - 4, "LZ11"):
+            return DecompressResult(
+                success=False,
+                algorithm=CompressionAlgorithm.LZ11,
+                error=f"Decompressed size {decomp_size} exceeds stream capacity"
+            )
 
-        output = bytearray()
+        n = len(data)
+        strict = bool(params.get('strict', False))
+        ended = False
+        output = bytearray(decomp_size)
+        out_pos = 0
         pos = 4
 
         try:
-            while len(output) < decomp_size and pos < len(data):
+            while not ended and out_pos < decomp_size and pos < n:
                 flags = data[pos]
                 pos += 1
 
                 for bit in range(7, -1, -1):
-                    if len(output) >= decomp_size or pos >= len(data):
+                    if out_pos >= decomp_size or pos >= n:
                         break
 
                     if flags & (1 << bit):
                         # Reference with extended length
-                        if pos >= len(data):
+                        if pos >= n:
                             break
 
                         indicator = data[pos] >> 4
 
                         if indicator == 0:
                             # 8-bit length
-                            if pos + 3 > len(data):
+                            if pos + 3 > n:
                                 break
-                            length = ((data[pos] & 0xF) << 4) | (data[pos + 1] >> 4) + 0x11
-                            offset = ((data[pos + 1] & 0xF) << 8) | data[pos + 2] + 1
+                            length = (((data[pos] & 0xF) << 4) | (data[pos + 1] >> 4)) + 0x11
+                            offset = (((data[pos + 1] & 0xF) << 8) | data[pos + 2]) + 1
                             pos += 3
                         elif indicator == 1:
                             # 16-bit length
-                            if pos + 4 > len(data):
+                            if pos + 4 > n:
                                 break
                             length = (((data[pos] & 0xF) << 12) |
                                      (data[pos + 1] << 4) |
                                      (data[pos + 2] >> 4)) + 0x111
-                            offset = ((data[pos + 2] & 0xF) << 8) | data[pos + 3] + 1
+                            offset = (((data[pos + 2] & 0xF) << 8) | data[pos + 3]) + 1
                             pos += 4
                         else:
                             # 4-bit length
-                            if pos + 2 > len(data):
+                            if pos + 2 > n:
                                 break
                             length = indicator + 1
-                            offset = ((data[pos] & 0xF) << 8) | data[pos + 1] + 1
+                            offset = (((data[pos] & 0xF) << 8) | data[pos + 1]) + 1
                             pos += 2
 
-                        src = len(output) - offset
-                        if src < 0:
+                        if offset > out_pos:
+                            ended = strict
                             break
 
-                        for _ in range(length):
-                            if len(output) >= decomp_size:
-                                break
-                            if src < len(output):
-                                output.append(output[src])
-                                src += 1
+                        out_pos = _copy_match(output, out_pos, offset,
+                                              min(length, decomp_size - out_pos))
                     else:
-                        output.append(data[pos])
+                        output[out_pos] = data[pos]
+                        out_pos += 1
                         pos += 1
 
-            success = len(output) == decomp_size
+            success = out_pos == decomp_size
             confidence = 0.9 if success else 0.5
 
             return DecompressResult(
                 success=success,
                 algorithm=CompressionAlgorithm.LZ11,
-                data=bytes(output),
+                data=bytes(output[:out_pos]),
                 original_size=pos,
-                decompressed_size=len(output),
+                decompressed_size=out_pos,
                 confidence=confidence,
+                error="Invalid back-reference before expected size" if ended else "",
                 params={"expected_size": decomp_size}
             )
 
@@ -642,8 +762,16 @@ class MultiDecompress:
                 algorithm=CompressionAlgorithm.YAY0,
                 error=f"Invalid decompressed size: {decomp_size}"
             )
+        if not _declared_size_feasible(decomp_size, len(data) - 16, "YAY0"):
+            return DecompressResult(
+                success=False,
+                algorithm=CompressionAlgorithm.YAY0,
+                error=f"Decompressed size {decomp_size} exceeds stream capacity"
+            )
 
-        output = bytearray()
+        n = len(data)
+        output = bytearray(decomp_size)
+        out_pos = 0
         code_pos = 16
         link_pos = link_offset
         chunk_pos = chunk_offset
@@ -651,25 +779,26 @@ class MultiDecompress:
         code = 0
 
         try:
-            while len(output) < decomp_size:
+            while out_pos < decomp_size:
                 if bits_left == 0:
-                    if code_pos + 4 > len(data):
+                    if code_pos + 4 > n:
                         break
-                    code = struct.unpack('>I', data[code_pos:code_pos + 4])[0]
+                    code = int.from_bytes(data[code_pos:code_pos + 4], 'big')
                     code_pos += 4
                     bits_left = 32
 
                 if code & 0x80000000:
                     # Literal byte from chunk data
-                    if chunk_pos >= len(data):
+                    if chunk_pos >= n:
                         break
-                    output.append(data[chunk_pos])
+                    output[out_pos] = data[chunk_pos]
+                    out_pos += 1
                     chunk_pos += 1
                 else:
                     # Copy from link data
-                    if link_pos + 2 > len(data):
+                    if link_pos + 2 > n:
                         break
-                    link = struct.unpack('>H', data[link_pos:link_pos + 2])[0]
+                    link = (data[link_pos] << 8) | data[link_pos + 1]
                     link_pos += 2
 
                     offset = (link & 0xFFF) + 1
@@ -677,36 +806,31 @@ class MultiDecompress:
 
                     if count == 0:
                         # Extended count from chunk data
-                        if chunk_pos >= len(data):
+                        if chunk_pos >= n:
                             break
                         count = data[chunk_pos] + 0x12
                         chunk_pos += 1
                     else:
                         count += 2
 
-                    src = len(output) - offset
-                    if src < 0:
+                    if offset > out_pos:
                         break
 
-                    for _ in range(count):
-                        if len(output) >= decomp_size:
-                            break
-                        if src < len(output):
-                            output.append(output[src])
-                            src += 1
+                    out_pos = _copy_match(output, out_pos, offset,
+                                          min(count, decomp_size - out_pos))
 
                 code <<= 1
                 bits_left -= 1
 
-            success = len(output) == decomp_size
+            success = out_pos == decomp_size
             confidence = 0.95 if success else 0.6
 
             return DecompressResult(
                 success=success,
                 algorithm=CompressionAlgorithm.YAY0,
-                data=bytes(output),
+                data=bytes(output[:out_pos]),
                 original_size=len(data),
-                decompressed_size=len(output),
+                decompressed_size=out_pos,
                 confidence=confidence,
                 params={"expected_size": decomp_size}
             )
@@ -742,14 +866,22 @@ class MultiDecompress:
                 algorithm=CompressionAlgorithm.YAZ0,
                 error=f"Invalid decompressed size: {decomp_size}"
             )
+        if not _declared_size_feasible(decomp_size, len(data) - 16, "YAZ0"):
+            return DecompressResult(
+                success=False,
+                algorithm=CompressionAlgorithm.YAZ0,
+                error=f"Decompressed size {decomp_size} exceeds stream capacity"
+            )
 
-        output = bytearray()
+        n = len(data)
+        output = bytearray(decomp_size)
+        out_pos = 0
         pos = 16
         bits_left = 0
         code = 0
 
         try:
-            while len(output) < decomp_size and pos < len(data):
+            while out_pos < decomp_size and pos < n:
                 if bits_left == 0:
                     code = data[pos]
                     pos += 1
@@ -757,13 +889,14 @@ class MultiDecompress:
 
                 if code & 0x80:
                     # Literal byte
-                    if pos >= len(data):
+                    if pos >= n:
                         break
-                    output.append(data[pos])
+                    output[out_pos] = data[pos]
+                    out_pos += 1
                     pos += 1
                 else:
                     # Reference
-                    if pos + 2 > len(data):
+                    if pos + 2 > n:
                         break
 
                     b1 = data[pos]
@@ -776,36 +909,31 @@ class MultiDecompress:
                     count = b1 >> 4
                     if count == 0:
                         # Extended count
-                        if pos >= len(data):
+                        if pos >= n:
                             break
                         count = data[pos] + 0x12
                         pos += 1
                     else:
                         count += 2
 
-                    src = len(output) - offset
-                    if src < 0:
+                    if offset > out_pos:
                         break
 
-                    for _ in range(count):
-                        if len(output) >= decomp_size:
-                            break
-                        if src < len(output):
-                            output.append(output[src])
-                            src += 1
+                    out_pos = _copy_match(output, out_pos, offset,
+                                          min(count, decomp_size - out_pos))
 
                 code <<= 1
                 bits_left -= 1
 
-            success = len(output) == decomp_size
+            success = out_pos == decomp_size
             confidence = 0.95 if success else 0.6
 
             return DecompressResult(
                 success=success,
                 algorithm=CompressionAlgorithm.YAZ0,
-                data=bytes(output),
+                data=bytes(output[:out_pos]),
                 original_size=len(data),
-                decompressed_size=len(output),
+                decompressed_size=out_pos,
                 confidence=confidence,
                 params={"expected_size": decomp_size}
             )
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+TEXT REGION INDEX - Sorted Interval Index for Known Text Regions
+================================================================================
+Replaces per-byte offset sets (set.update(range(start, end))) with sorted
+interval arrays queried by bisect:
+- contains(offset): O(log n) "target falls inside a text region?"
+- region_index(offset) / region_at(offset): O(log n) "which region?"
+- contains_array(offsets): vectorized membership via NumPy (optional)
+
+Memory is O(number of regions) instead of O(total text bytes).
+Shared by core.pointer_scanner and EndianPointerHunter.
+================================================================================
+"""
+
+from bisect import bisect_right
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+class TextRegionIndex:
+    """
+    Immutable index over half-open [start, end) text regions.
+
+    Regions may overlap. Membership queries use the merged interval list;
+    "which region" queries use the original regions sorted by start plus a
+    prefix-max of ends, so the answer is always a region that really
+    contains the offset.
+    """
+
+    def __init__(self, spans: Iterable[Tuple[int, int]] = ()):
+        """
+        Args:
+            spans: Iterable of (start, length) pairs, in caller order.
+                Regions with length <= 0 are ignored.
+        """
+        regions: List[Tuple[int, int, int]] = []
+        for order, (start, length) in enumerate(spans):
+            start = int(start)
+            length = int(length)
+            if length <= 0:
+                continue
+            regions.append((start, start + length, order))
+        regions.sort()
+
+        self._starts: List[int] = [r[0] for r in regions]
+        self._ends: List[int] = [r[1] for r in regions]
+        self._orders: List[int] = [r[2] for r in regions]
+
+        # For each position i, index j <= i with the largest end (handles overlaps)
+        self._max_end_idx: List[int] = []
+        best = -1
+        for i, end in enumerate(self._ends):
+            if best < 0 or end > self._ends[best]:
+                best = i
+            self._max_end_idx.append(best)
+
+        # Merged intervals for membership queries
+        merged_starts: List[int] = []
+        merged_ends: List[int] = []
+        for start, end in zip(self._starts, self._ends):
+            if merged_ends and start <= merged_ends[-1]:
+                if end > merged_ends[-1]:
+                    merged_ends[-1] = end
+            else:
+                merged_starts.append(start)
+                merged_ends.append(end)
+        self._merged_starts = merged_starts
+        self._merged_ends = merged_ends
+
+    @classmethod
+    def from_regions(cls, regions: Optional[Sequence[Any]],
+                     parse_region) -> "TextRegionIndex":
+        """
+        Build an index from region dicts using a caller-provided parser.
+
+        Args:
+            regions: Region descriptors (dicts, tuples...)
+            parse_region: Callable returning (start, length) for one region
+
+        Returns:
+            TextRegionIndex
+        """
+        return cls(parse_region(region) for region in (regions or []))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __contains__(self, offset: int) -> bool:
+        return self.contains(offset)
+
+    @property
+    def total_bytes(self) -> int:
+        """Number of distinct bytes covered by the regions."""
+        return sum(e - s for s, e in zip(self._merged_starts, self._merged_ends))
+
+    def contains(self, offset: int) -> bool:
+        """True if offset falls inside any region."""
+        i = bisect_right(self._merged_starts, offset) - 1
+        return i >= 0 and offset < self._merged_ends[i]
+
+    def region_index(self, offset: int) -> Optional[int]:
+        """
+        Position (in the original input order) of a region containing offset.
+
+        When regions overlap, returns the containing region that reaches
+        furthest past offset.
+        """
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0:
+            return None
+        j = self._max_end_idx[i]
+        if offset < self._ends[j]:
+            return self._orders[j]
+        return None
+
+    def region_at(self, offset: int) -> Optional[Tuple[int, int]]:
+        """(start, end) of a region containing offset, or None."""
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0:
+            return None
+        j = self._max_end_idx[i]
+        if offset < self._ends[j]:
+            return self._starts[j], self._ends[j]
+        return None
+
+    def contains_array(self, offsets):
+        """
+        Vectorized membership test (requires NumPy).
+
+        Args:
+            offsets: Array-like of integer offsets
+
+        Returns:
+            Boolean NumPy array with the same shape as offsets
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for TextRegionIndex.contains_array.")
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if not self._merged_starts:
+            return np.zeros(offsets.shape, dtype=bool)
+        starts = np.asarray(self._merged_starts, dtype=np.int64)
+        ends = np.asarray(self._merged_ends, dtype=np.int64)
+        idx = np.searchsorted(starts, offsets, side='right') - 1
+        valid = idx >= 0
+        result = np.zeros(offsets.shape, dtype=bool)
+        result[valid] = offsets[valid] < ends[idx[valid]]
+        return result
@@ -0,0 +1,271 @@
+"""Cache persistente de análise estática por ROM (chave: SHA-256 + versão + parâmetros).
+
+Cada artefato (análise estrutural, regiões comprimidas, candidatos de texto,
+charsets, tabelas de ponteiros...) é gravado em disco num arquivo binário
+compacto:
+
+    MAGIC (4) | formato u16 | crc32 do payload u32 | zlib(JSON(payload))
+
+O diretório é compartilhado, então o formato não executa código ao ler (nada
+de pickle): o JSON é marcado para bytes (base64), tuplas, conjuntos e dicts
+com chaves não-string, e objetos só são reconstruídos para classes
+registradas com register_cache_type() (estado restaurado em __dict__, sem
+chamar construtores). Artefatos com outros tipos não são gravados.
+
+O payload guarda a versão do analisador e os parâmetros usados; qualquer
+divergência (ou arquivo corrompido/formato antigo) conta como miss e o
+arquivo é descartado.
+
+Layout: <cache_dir>/<sha[:2]>/<sha>/<namespace>-<hash dos params>.bin
+
+Variáveis de ambiente:
+    NEUROROM_ANALYSIS_CACHE_DIR  diretório do cache (padrão: ~/.cache/neurorom/analysis)
+    NEUROROM_ANALYSIS_CACHE      "0" desativa o cache
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Type
+
+from .rom_io import atomic_write_bytes, ensure_parent_dir
+
+ANALYSIS_CACHE_VERSION = 2  # 2: JSON marcado (1 era pickle, descartado ao ler)
+CACHE_MAGIC = b"NRAC"
+CACHE_DIR_ENV = "NEUROROM_ANALYSIS_CACHE_DIR"
+CACHE_ENABLED_ENV = "NEUROROM_ANALYSIS_CACHE"
+
+_HEADER = struct.Struct(">4sHI")
+_MISSING = object()
+
+# Marcadores do JSON (um dict com uma única chave marcadora é um valor codificado)
+_TAG_BYTES = "__b64__"
+_TAG_TUPLE = "__tuple__"
+_TAG_SET = "__set__"
+_TAG_PAIRS = "__pairs__"
+_TAG_OBJECT = "__obj__"
+_TAGS = frozenset((_TAG_BYTES, _TAG_TUPLE, _TAG_SET, _TAG_PAIRS, _TAG_OBJECT))
+
+_REGISTERED_TYPES: Dict[str, Type] = {}
+
+
+def register_cache_type(cls: Type, name: Optional[str] = None) -> Type:
+    """
+    Permite gravar instâncias de `cls` no cache (estado = vars(obj)).
+
+    Só classes registradas são reconstruídas na leitura; o nome padrão é
+    "<módulo>.<classe>" sem o pacote, estável entre import relativo/absoluto.
+    """
+    key = name or f"{cls.__module__.rsplit('.', 1)[-1]}.{cls.__qualname__}"
+    _REGISTERED_TYPES[key] = cls
+    return cls
+
+
+def _type_name(cls: Type) -> Optional[str]:
+    for key, registered in _REGISTERED_TYPES.items():
+        if registered is cls:
+            return key
+    return None
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_TAG_BYTES: base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {_TAG_TUPLE: [_encode(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        return {_TAG_SET: [_encode(v) for v in value]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not (len(value) == 1 and next(iter(value)) in _TAGS):
+            return {k: _encode(v) for k, v in value.items()}
+        return {_TAG_PAIRS: [[_encode(k), _encode(v)] for k, v in value.items()]}
+    name = _type_name(type(value))
+    if name is not None and hasattr(value, "__dict__"):
+        return {_TAG_OBJECT: name, "state": _encode(vars(value))}
+    raise TypeError(f"tipo não suportado no cache de análise: {type(value).__name__}")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        (tag, inner), = value.items()
+        if tag == _TAG_BYTES:
+            return base64.b64decode(inner)
+        if tag == _TAG_TUPLE:
+            return tuple(_decode_value(v) for v in inner)
+        if tag == _TAG_SET:
+            return {_decode_value(v) for v in inner}
+        if tag == _TAG_PAIRS:
+            return {_decode_value(k): _decode_value(v) for k, v in inner}
+    if _TAG_OBJECT in value and set(value) == {_TAG_OBJECT, "state"}:
+        cls = _REGISTERED_TYPES.get(value[_TAG_OBJECT])
+        if cls is None:
+            raise ValueError(f"classe não registrada: {value[_TAG_OBJECT]}")
+        obj = cls.__new__(cls)
+        obj.__dict__.update(_decode_value(value["state"]))
+        return obj
+    return {k: _decode_value(v) for k, v in value.items()}
+
+
+def default_cache_dir() -> Path:
+    """Diretório do cache (env NEUROROM_ANALYSIS_CACHE_DIR ou ~/.cache/neurorom/analysis)."""
+    env = os.environ.get(CACHE_DIR_ENV, "").strip()
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".cache" / "neurorom" / "analysis"
+
+
+def cache_enabled_by_env() -> bool:
+    """False quando NEUROROM_ANALYSIS_CACHE vale 0/false/no/off."""
+    value = os.environ.get(CACHE_ENABLED_ENV, "1").strip().lower()
+    return value not in ("0", "false", "no", "off")
+
+
+def params_key(params: Optional[Dict[str, Any]]) -> str:
+    """Hash estável (16 hex) dos parâmetros da análise."""
+    blob = json.dumps(params or {}, sort_keys=True, default=str, ensure_ascii=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """Cache em disco de artefatos de análise, compartilhado entre execuções."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, enabled: Optional[bool] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.enabled = cache_enabled_by_env() if enabled is None else bool(enabled)
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "invalidated": 0}
+
+    def path_for(self, rom_sha: str, namespace: str, params: Optional[Dict[str, Any]] = None) -> Path:
+        """Caminho do artefato no cache."""
+        rom_sha = rom_sha.lower()
+        return self.cache_dir / rom_sha[:2] / rom_sha / f"{namespace}-{params_key(params)}.bin"
+
+    def get(
+        self,
+        rom_sha: str,
+        namespace: str,
+        analyzer_version: str,
+        params: Optional[Dict[str, Any]] = None,
+        default: Any = None,
+    ) -> Any:
+        """Retorna o artefato em cache ou `default` (miss, versão antiga ou arquivo inválido)."""
+        if not self.enabled:
+            return default
+        path = self.path_for(rom_sha, namespace, params)
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            self.stats["misses"] += 1
+            return default
+
+        payload = self._decode(raw)
+        if (
+            payload is None
+            or payload.get("analyzer_version") != str(analyzer_version)
+            or payload.get("params_key") != params_key(params)
+        ):
+            self._discard(path)
+            self.stats["misses"] += 1
+            return default
+
+        self.stats["hits"] += 1
+        return payload.get("value")
+
+    def put(
+        self,
+        rom_sha: str,
+        namespace: str,
+        analyzer_version: str,
+        value: Any,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Path]:
+        """Grava o artefato (escrita atômica). Retorna o caminho, ou None se não gravou."""
+        if not self.enabled:
+            return None
+        payload = {
+            "analyzer_version": str(analyzer_version),
+            "params_key": params_key(params),
+            "value": value,
+        }
+        try:
+            blob = json.dumps(_encode(payload), ensure_ascii=False, separators=(",", ":"))
+            body = zlib.compress(blob.encode("utf-8"), 6)
+        except Exception:
+            # Artefato não serializável: segue sem cache
+            return None
+        header = _HEADER.pack(CACHE_MAGIC, ANALYSIS_CACHE_VERSION, zlib.crc32(body) & 0xFFFFFFFF)
+
+        path = self.path_for(rom_sha, namespace, params)
+        try:
+            ensure_parent_dir(path)
+            atomic_write_bytes(path, header + body)
+        except OSError:
+            return None
+        self.stats["writes"] += 1
+        return path
+
+    def get_or_compute(
+        self,
+        rom_sha: str,
+        namespace: str,
+        analyzer_version: str,
+        compute: Callable[[], Any],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Lê do cache ou executa `compute()` e grava o resultado."""
+        value = self.get(rom_sha, namespace, analyzer_version, params, default=_MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.put(rom_sha, namespace, analyzer_version, value, params)
+        return value
+
+    def invalidate(self, rom_sha: str, namespace: Optional[str] = None) -> int:
+        """Remove artefatos da ROM (todos ou só de um namespace). Retorna quantos removeu."""
+        rom_sha = rom_sha.lower()
+        rom_dir = self.cache_dir / rom_sha[:2] / rom_sha
+        if not rom_dir.is_dir():
+            return 0
+        pattern = f"{namespace}-*.bin" if namespace else "*.bin"
+        removed = 0
+        for path in rom_dir.glob(pattern):
+            if self._discard(path):
+                removed += 1
+        return removed
+
+    def _decode(self, raw: bytes) -> Optional[Dict[str, Any]]:
+        if len(raw) < _HEADER.size:
+            return None
+        magic, fmt_version, checksum = _HEADER.unpack_from(raw)
+        body = raw[_HEADER.size:]
+        if magic != CACHE_MAGIC or fmt_version != ANALYSIS_CACHE_VERSION:
+            return None
+        if zlib.crc32(body) & 0xFFFFFFFF != checksum:
+            return None
+        try:
+            payload = _decode_value(json.loads(zlib.decompress(body).decode("utf-8")))
+        except Exception:
+            # Classe não registrada ou payload truncado
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def _discard(self, path: Path) -> bool:
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        self.stats["invalidated"] += 1
+        return True
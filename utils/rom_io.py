@@ -1,12 +1,14 @@
-"""Utilitários de I/O para ROM: backup incremental, escrita atômica e checksums."""
+"""Utilitários de I/O para ROM: backup incremental, escrita atômica, checksums e RomImage (mmap)."""
 
 from __future__ import annotations
 
 import hashlib
+import mmap
 import os
+import shutil
 import zlib
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 def compute_crc32(data: bytes) -> str:
@@ -54,3 +56,316 @@ def ensure_parent_dir(path: Path) -> None:
 def compute_checksums(data: bytes) -> Tuple[str, str]:
     """Retorna (crc32, sha256)."""
     return compute_crc32(data), compute_sha256(data)
+
+
+def atomic_patch_file(
+    source: Path,
+    target: Path,
+    patches: Iterable[Tuple[int, bytes]],
+    size: Optional[int] = None,
+) -> Path:
+    """
+    Escrita atômica incremental: copia `source` para o temporário, grava só os
+    trechos alterados (offset, bytes), ajusta o tamanho e substitui `target`.
+    """
+    source, target = Path(source), Path(target)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    shutil.copyfile(source, tmp)
+    with open(tmp, "r+b") as f:
+        if size is not None:
+            f.truncate(int(size))
+        for offset, data in patches:
+            f.seek(int(offset))
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    return target
+
+
+class RomImage:
+    """
+    ROM mapeada em memória (mmap) com overlay copy-on-write por página.
+
+    - Leitura sem cópia: view() devolve memoryview do mapeamento
+    - Escritas vão para páginas sujas (bytearray); o arquivo não muda
+    - flush() grava só as páginas sujas via atomic_patch_file()
+    - to_bytes() materializa a imagem inteira (APIs legadas)
+
+    Uso:
+        with RomImage(path) as rom:
+            header = rom[0x7FF0:0x8000]        # bytes (pequenos trechos)
+            crc = rom.crc32()                  # sem copiar a ROM
+            rom.write(0x1234, b"\\x00\\x80")
+            rom.flush(out_path)
+    """
+
+    PAGE_SIZE = 4096
+
+    def __init__(self, path, page_size: int = PAGE_SIZE, fill_byte: int = 0xFF):
+        """
+        Args:
+            path: Arquivo da ROM/ISO
+            page_size: Granularidade do overlay (potência de 2)
+            fill_byte: Preenchimento ao crescer a imagem além do fim
+        """
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise ValueError("page_size precisa ser potência de 2")
+        self.path = Path(path)
+        self.page_size = int(page_size)
+        self.fill_byte = int(fill_byte) & 0xFF
+        self._pages: Dict[int, bytearray] = {}
+        self._file = None
+        self._map = None
+        self._base: Any = b""
+        self._base_size = 0
+        self._base_end = 0  # Base visível (encolhe se a imagem for truncada)
+        self._size = 0
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Mapeamento
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        self._file = open(self.path, "rb")
+        self._base_size = os.fstat(self._file.fileno()).st_size
+        if self._base_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._base = memoryview(self._map)
+        else:
+            self._map = None
+            self._base = memoryview(b"")
+        self._base_end = self._size = self._base_size
+
+    def close(self) -> None:
+        """Libera o mapeamento (páginas sujas não gravadas são descartadas)."""
+        if isinstance(self._base, memoryview):
+            self._base.release()
+        self._base = memoryview(b"")
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # Há views vivas: o mapeamento fecha quando forem coletadas
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "RomImage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pages) or self._size != self._base_size or self._base_end != self._base_size
+
+    def dirty_pages(self) -> List[int]:
+        """Índices das páginas alteradas, em ordem."""
+        return sorted(self._pages)
+
+    def _bounds(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        start, end, _ = slice(start, end).indices(self._size)
+        return start, max(start, end)
+
+    def _page(self, index: int) -> bytes:
+        """Conteúdo atual de uma página (overlay ou mapeamento)."""
+        page = self._pages.get(index)
+        if page is not None:
+            return page
+        lo = index * self.page_size
+        hi = min(lo + self.page_size, self._size)
+        base_hi = min(hi, self._base_end)
+        data = bytes(self._base[lo:base_hi]) if lo < base_hi else b""
+        return data + bytes([self.fill_byte]) * (hi - max(lo, base_hi))
+
+    def _dirty_in(self, start: int, end: int) -> bool:
+        if end > self._base_end:
+            return True
+        if not self._pages:
+            return False
+        first, last = start // self.page_size, (end - 1) // self.page_size
+        if last - first + 1 < len(self._pages):
+            return any(i in self._pages for i in range(first, last + 1))
+        return any(first <= i <= last for i in self._pages)
+
+    def view(self, start: int = 0, end: Optional[int] = None):
+        """Trecho sem cópia (memoryview) quando limpo; bytes se houver edições."""
+        start, end = self._bounds(start, end)
+        if start == end:
+            return memoryview(b"")
+        if not self._dirty_in(start, end):
+            return self._base[start:end]
+        return memoryview(self._read(start, end))
+
+    def _read(self, start: int, end: int) -> bytes:
+        ps = self.page_size
+        chunks = []
+        for index in range(start // ps, (end - 1) // ps + 1):
+            lo = index * ps
+            page = self._page(index)
+            chunks.append(page[max(start, lo) - lo:min(end, lo + ps) - lo])
+        return b"".join(bytes(c) for c in chunks)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return self.to_bytes()[key]
+            start, end = self._bounds(key.start, key.stop)
+            return bytes(self.view(start, end))
+        index = int(key)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RomImage index out of range")
+        page = self._pages.get(index // self.page_size)
+        if page is not None:
+            return page[index % self.page_size]
+        if index >= self._base_end:
+            return self.fill_byte
+        return self._base[index]
+
+    def iter_chunks(self, chunk_size: int = 1 << 20):
+        """Percorre a imagem atual em blocos (memoryview quando limpo)."""
+        for lo in range(0, self._size, max(1, int(chunk_size))):
+            yield self.view(lo, min(self._size, lo + chunk_size))
+
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Como bytes.find, sem materializar a ROM quando não há edições."""
+        start, end = self._bounds(start, end)
+        if self._map is not None and not self._dirty_in(start, end):
+            return self._map.find(sub, start, end)
+        pos = self._read(start, end).find(sub) if end > start else -1
+        return pos + start if pos >= 0 else -1
+
+    def to_bytes(self) -> bytes:
+        """Imagem completa (uma cópia)."""
+        return self._read(0, self._size) if self._size else b""
+
+    def crc32(self) -> str:
+        crc = 0
+        for chunk in self.iter_chunks():
+            crc = zlib.crc32(chunk, crc)
+        return f"{crc & 0xFFFFFFFF:08X}"
+
+    def sha256(self) -> str:
+        digest = hashlib.sha256()
+        for chunk in self.iter_chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def checksums(self) -> Tuple[str, str]:
+        """Retorna (crc32, sha256) sem copiar a imagem."""
+        return self.crc32(), self.sha256()
+
+    # ------------------------------------------------------------------
+    # Escrita (overlay copy-on-write)
+    # ------------------------------------------------------------------
+    def _dirty_page(self, index: int) -> bytearray:
+        page = self._pages.get(index)
+        if page is None:
+            lo = index * self.page_size
+            width = min(self.page_size, max(self._size, lo + 1) - lo)
+            page = bytearray(self._page(index)[:width])
+            page.extend(bytes([self.fill_byte]) * (width - len(page)))
+            self._pages[index] = page
+        return page
+
+    def resize(self, size: int) -> None:
+        """Ajusta o tamanho lógico (cresce com fill_byte ou trunca)."""
+        size = max(0, int(size))
+        ps = self.page_size
+        if size < self._size:
+            last = (size - 1) // ps if size else -1
+            for index in [i for i in self._pages if i > last]:
+                del self._pages[index]
+            if last >= 0 and last in self._pages:
+                del self._pages[last][size - last * ps:]
+            self._base_end = min(self._base_end, size)
+        else:
+            tail = (self._size - 1) // ps if self._size else -1
+            if tail >= 0 and tail in self._pages:
+                page = self._pages[tail]
+                page.extend(bytes([self.fill_byte]) * (min(size, (tail + 1) * ps) - tail * ps - len(page)))
+        self._size = size
+
+    def write(self, offset: int, data: bytes) -> None:
+        """Grava `data` em `offset` no overlay (cresce a imagem se preciso)."""
+        offset = int(offset)
+        if offset < 0:
+            raise ValueError("offset negativo")
+        data = memoryview(bytes(data) if not isinstance(data, (bytes, bytearray)) else data)
+        if not data:
+            return
+        end = offset + len(data)
+        if end > self._size:
+            self.resize(end)
+        ps = self.page_size
+        pos = offset
+        while pos < end:
+            index = pos // ps
+            page = self._dirty_page(index)
+            lo = pos - index * ps
+            take = min(end - pos, ps - lo)
+            page[lo:lo + take] = data[pos - offset:pos - offset + take]
+            pos += take
+
+    def __setitem__(self, key, value) -> None:
+        if isinstance(key, slice):
+            start, end = self._bounds(key.start, key.stop)
+            if key.step not in (None, 1) or len(value) != end - start:
+                raise ValueError("RomImage só aceita atribuição contígua de mesmo tamanho")
+            self.write(start, value)
+            return
+        index = int(key)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RomImage index out of range")
+        self.write(index, bytes([int(value)]))
+
+    def discard(self) -> None:
+        """Descarta todas as edições pendentes."""
+        self._pages.clear()
+        self._base_end = self._size = self._base_size
+
+    def flush(self, target=None) -> Path:
+        """
+        Grava a imagem em `target` (default: o próprio arquivo).
+
+        Só as páginas sujas são escritas sobre uma cópia do arquivo base,
+        com substituição atômica. Gravando sobre o próprio arquivo, o
+        mapeamento é reaberto e o overlay esvaziado.
+        """
+        target = Path(target) if target is not None else self.path
+        ps = self.page_size
+        indices = set(self._pages)
+        # Além da base visível (base truncada ou imagem crescida) o arquivo
+        # copiado tem bytes antigos ou zeros: grava o preenchimento também
+        if self._base_end < self._size:
+            indices.update(range(self._base_end // ps, (self._size - 1) // ps + 1))
+        patches = [(index * ps, self._page(index)) for index in sorted(indices)]
+        same_file = target.exists() and target.resolve() == self.path.resolve()
+        if same_file:
+            # O mapeamento precisa ser fechado antes do os.replace (Windows)
+            pages, size, base_end = self._pages, self._size, self._base_end
+            self.close()
+            try:
+                atomic_patch_file(self.path, target, patches, size=size)
+            except Exception:
+                self._open()
+                self._pages, self._size, self._base_end = pages, size, base_end
+                raise
+            self._pages = {}
+            self._open()
+            return target
+        ensure_parent_dir(target)
+        return atomic_patch_file(self.path, target, patches, size=self._size)